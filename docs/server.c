@@ -4,6 +4,7 @@
 #include <fcntl.h>
 #include <limits.h>
 #include <netinet/in.h>
+#include <poll.h>
 #include <pthread.h>
 #include <stdio.h>
 #include <stdlib.h>
@@ -14,24 +15,38 @@
 #include <sys/wait.h>
 #include <unistd.h>
 #include <wordexp.h>
+#include <zlib.h>
 
 #define MAX_BUFFER_SIZE 4096
+#define FILE_CHUNK_SIZE (64 * 1024)
 #define MAX_EVENTS 64
+#define MAX_CLIENT_FDS 1024
 
 void send_msg(int sock, const char *msg);
 void handle_get_command(int sock, const char *args);
+void handle_list_command(int sock, const char *args);
+void handle_compress_command(int sock, const char *args);
 void handle_run_command(int sock, const char *args);
 void handle_exit_command(int sock, const char *args);
 void handle_power_command(int sock, const char *args);
 
 static volatile int current_fd = -1;
 
+// 每个连接是否已协商 zlib 压缩传输（按 fd 索引，建立/断开连接时清零）
+static unsigned char compress_enabled[MAX_CLIENT_FDS];
+
+static int use_zlib(int sock) {
+    return sock >= 0 && sock < MAX_CLIENT_FDS && compress_enabled[sock];
+}
+
 typedef struct {
     const char *name;
     void (*handler)(int, const char *);
 } command_t;
 
 command_t commands[] = {{"get", handle_get_command},
+                        {"list", handle_list_command},
+                        {"compress", handle_compress_command},
                         {"run", handle_run_command},
                         {"exit", handle_exit_command},
                         {"power", handle_power_command},
@@ -57,17 +72,162 @@ static int make_socket_non_blocking(int sfd) {
     return 0;
 }
 
+// 客户端 socket 为非阻塞模式，发送缓冲区满时 send 只写出部分数据，需等待可写后继续
+static int send_all(int sock, const void *data, size_t len) {
+    const char *p = data;
+    while (len > 0) {
+        ssize_t n = send(sock, p, len, MSG_NOSIGNAL);
+        if (n > 0) {
+            p += n;
+            len -= (size_t)n;
+            continue;
+        }
+        if (n < 0 && errno == EINTR) {
+            continue;
+        }
+        if (n < 0 && (errno == EAGAIN || errno == EWOULDBLOCK)) {
+            struct pollfd pfd = {.fd = sock, .events = POLLOUT};
+            if (poll(&pfd, 1, 5000) > 0) {
+                continue;
+            }
+        }
+        return -1;
+    }
+    return 0;
+}
+
 void send_msg(int sock, const char *msg) {
     uint32_t len = strlen(msg);
     uint32_t net_len = htonl(len);
-    if (send(sock, &net_len, sizeof(net_len), 0) != sizeof(net_len)) {
+    if (send_all(sock, &net_len, sizeof(net_len)) != 0) {
         perror("send length");
+        return;
     }
-    if (send(sock, msg, len, 0) != len) {
+    if (send_all(sock, msg, len) != 0) {
         perror("send message");
     }
 }
 
+// 发送一个二进制帧（4 字节大端长度 + 负载）
+static int send_frame(int sock, const void *data, size_t len) {
+    uint32_t net_len = htonl((uint32_t)len);
+    if (send_all(sock, &net_len, sizeof(net_len)) != 0) {
+        return -1;
+    }
+    return len > 0 ? send_all(sock, data, len) : 0;
+}
+
+// 压缩模式：每个文件一个 zlib 流，切分为若干帧发送，以长度为 0 的帧结束。
+// 读取失败时也会发送结束帧，客户端按解压后长度不符报错，连接仍保持同步。
+static void send_file_body_zlib(int sock, FILE *fp, long long remaining) {
+    static unsigned char in[FILE_CHUNK_SIZE];
+    static unsigned char out[FILE_CHUNK_SIZE];
+    z_stream zs;
+    memset(&zs, 0, sizeof(zs));
+    if (deflateInit(&zs, Z_DEFAULT_COMPRESSION) != Z_OK) {
+        send_frame(sock, NULL, 0);
+        return;
+    }
+
+    int flush = Z_NO_FLUSH;
+    int failed = 0;
+    while (flush != Z_FINISH && !failed) {
+        size_t want = sizeof(in);
+        if (remaining >= 0 && (long long)want > remaining) {
+            want = (size_t)remaining;
+        }
+        size_t bytes_read = want > 0 ? fread(in, 1, want, fp) : 0;
+        if (remaining >= 0) {
+            remaining -= (long long)bytes_read;
+        }
+        flush = (bytes_read == 0 || remaining == 0) ? Z_FINISH : Z_NO_FLUSH;
+        zs.next_in = in;
+        zs.avail_in = (uInt)bytes_read;
+        do {
+            zs.next_out = out;
+            zs.avail_out = sizeof(out);
+            deflate(&zs, flush);
+            size_t produced = sizeof(out) - zs.avail_out;
+            if (produced > 0 && send_frame(sock, out, produced) != 0) {
+                perror("send compressed content");
+                failed = 1;
+                break;
+            }
+        } while (zs.avail_out == 0);
+    }
+    deflateEnd(&zs);
+    if (!failed) {
+        send_frame(sock, NULL, 0);
+    }
+}
+
+// 发送文件内容：remaining < 0 表示直到文件末尾；原始模式下失败时连接已失步，由客户端超时处理
+static void send_file_body(int sock, FILE *fp, long long remaining) {
+    if (use_zlib(sock)) {
+        send_file_body_zlib(sock, fp, remaining);
+        return;
+    }
+    static char buffer[FILE_CHUNK_SIZE];
+    size_t bytes_read;
+    while (remaining != 0 && (bytes_read = fread(buffer, 1, sizeof(buffer), fp)) > 0) {
+        if (remaining > 0 && (long long)bytes_read > remaining) {
+            bytes_read = (size_t)remaining;
+        }
+        if (send_all(sock, buffer, bytes_read) != 0) {
+            perror("send file content");
+            break;
+        }
+        if (remaining > 0) {
+            remaining -= (long long)bytes_read;
+        }
+    }
+}
+
+static void send_file_content(int sock, const char *abs_path) {
+    FILE *fp = fopen(abs_path, "rb");
+    if (fp == NULL) {
+        perror("fopen after stat failed");
+        if (use_zlib(sock)) {
+            send_frame(sock, NULL, 0);
+        }
+        return;
+    }
+    send_file_body(sock, fp, -1);
+    fclose(fp);
+}
+
+// 解析客户端路径（支持 ~/ 前缀），失败时已向客户端发送 ERROR
+static int resolve_client_path(int sock, const char *args, char *resolved_path, struct stat *st) {
+    if (args == NULL) {
+        send_msg(sock, "ERROR Missing file path.");
+        return -1;
+    }
+
+    char file_path[PATH_MAX];
+    if (args[0] == '~' && args[1] == '/') {
+        const char *home = getenv("HOME");
+        if (home) {
+            snprintf(file_path, sizeof(file_path), "%s%s", home, args + 1);
+        } else {
+            strncpy(file_path, args, sizeof(file_path) - 1);
+            file_path[sizeof(file_path) - 1] = '\0';
+        }
+    } else {
+        strncpy(file_path, args, sizeof(file_path) - 1);
+        file_path[sizeof(file_path) - 1] = '\0';
+    }
+
+    if (realpath(file_path, resolved_path) == NULL) {
+        send_msg(sock, "ERROR Path not found or could not be resolved.");
+        return -1;
+    }
+    if (stat(resolved_path, st) != 0) {
+        send_msg(sock, "ERROR Path not found after resolution.");
+        return -1;
+    }
+    return 0;
+}
+
 void stream_directory(int sock, const char *abs_path, const char *client_path) {
     char msg[PATH_MAX + 32];
     snprintf(msg, sizeof(msg), "D_START %s", client_path);
@@ -105,25 +265,11 @@ void stream_directory(int sock, const char *abs_path, const char *client_path) {
             stream_directory(sock, entry_abs_path, entry_client_path);
         } else if (S_ISREG(entry_stat.st_mode)) {
             snprintf(
-                msg, sizeof(msg), "FILE %s %lld", entry_client_path, (long long)entry_stat.st_size);
+                msg, sizeof(msg), "%s %s %lld", use_zlib(sock) ? "ZFILE" : "FILE",
+                entry_client_path, (long long)entry_stat.st_size);
             send_msg(sock, msg);
-
-            FILE *fp = fopen(entry_abs_path, "rb");
-            if (fp == NULL) {
-                perror("fopen after stat failed");
-                // 无法在这里发送错误信息，因为客户端期望接收的是原始字节流。
-                continue;
-            }
-
-            char buffer[MAX_BUFFER_SIZE];
-            size_t bytes_read;
-            while ((bytes_read = fread(buffer, 1, sizeof(buffer), fp)) > 0) {
-                if (send(sock, buffer, bytes_read, 0) != bytes_read) {
-                    perror("send file content");
-                    break;
-                }
-            }
-            fclose(fp);
+            // 打开失败时无法再发送错误信息，因为客户端期望接收的是原始字节流。
+            send_file_content(sock, entry_abs_path);
         }
     }
     closedir(dir);
@@ -132,35 +278,59 @@ void stream_directory(int sock, const char *abs_path, const char *client_path) {
     send_msg(sock, msg);
 }
 
-void handle_get_command(int sock, const char *args) {
-    if (args == NULL) {
-        send_msg(sock, "ERROR Missing file path.");
-        return;
+// get <path> <offset>：路径本身不存在且末尾是数字时按断点续传解析，
+// 应答 RANGE <offset> <length> <path> 后发送 offset 之后的原始数据
+static int handle_ranged_get(int sock, const char *args) {
+    const char *space = strrchr(args, ' ');
+    if (space == NULL || space[1] == '\0' || strspn(space + 1, "0123456789") != strlen(space + 1)) {
+        return -1;
     }
 
-    char file_path[PATH_MAX];
-    if (args[0] == '~' && args[1] == '/') {
-        const char *home = getenv("HOME");
-        if (home) {
-            snprintf(file_path, sizeof(file_path), "%s%s", home, args + 1);
-        } else {
-            strncpy(file_path, args, sizeof(file_path) - 1);
-            file_path[sizeof(file_path) - 1] = '\0';
-        }
-    } else {
-        strncpy(file_path, args, sizeof(file_path) - 1);
-        file_path[sizeof(file_path) - 1] = '\0';
+    char path[PATH_MAX];
+    size_t path_len = (size_t)(space - args);
+    if (path_len == 0 || path_len >= sizeof(path)) {
+        return -1;
     }
+    memcpy(path, args, path_len);
+    path[path_len] = '\0';
 
     char resolved_path[PATH_MAX];
-    if (realpath(file_path, resolved_path) == NULL) {
-        send_msg(sock, "ERROR Path not found or could not be resolved.");
-        return;
+    struct stat path_stat;
+    if (realpath(path, resolved_path) == NULL || stat(resolved_path, &path_stat) != 0 ||
+        !S_ISREG(path_stat.st_mode)) {
+        return -1;
+    }
+
+    long long offset = atoll(space + 1);
+    if (offset > (long long)path_stat.st_size) {
+        offset = (long long)path_stat.st_size;
+    }
+
+    FILE *fp = fopen(resolved_path, "rb");
+    if (fp == NULL || fseeko(fp, (off_t)offset, SEEK_SET) != 0) {
+        if (fp != NULL) {
+            fclose(fp);
+        }
+        send_msg(sock, "ERROR Could not open file.");
+        return 0;
     }
 
+    char msg[PATH_MAX + 64];
+    snprintf(msg, sizeof(msg), "%s %lld %lld %s", use_zlib(sock) ? "ZRANGE" : "RANGE", offset,
+             (long long)path_stat.st_size - offset, path);
+    send_msg(sock, msg);
+    send_file_body(sock, fp, (long long)path_stat.st_size - offset);
+    fclose(fp);
+    return 0;
+}
+
+void handle_get_command(int sock, const char *args) {
+    char resolved_path[PATH_MAX];
     struct stat path_stat;
-    if (stat(resolved_path, &path_stat) != 0) {
-        send_msg(sock, "ERROR Path not found after resolution.");
+    if (args != NULL && realpath(args, resolved_path) == NULL && handle_ranged_get(sock, args) == 0) {
+        return;
+    }
+    if (resolve_client_path(sock, args, resolved_path, &path_stat) != 0) {
         return;
     }
 
@@ -168,29 +338,107 @@ void handle_get_command(int sock, const char *args) {
         stream_directory(sock, resolved_path, args);
     } else if (S_ISREG(path_stat.st_mode)) {
         char msg[PATH_MAX + 32];
-        snprintf(msg, sizeof(msg), "FILE %s %lld", args, (long long)path_stat.st_size);
+        snprintf(msg, sizeof(msg), "%s %s %lld", use_zlib(sock) ? "ZFILE" : "FILE", args,
+                 (long long)path_stat.st_size);
+        send_msg(sock, msg);
+        send_file_content(sock, resolved_path);
+    } else {
+        send_msg(sock, "ERROR Path is not a file or directory.");
+    }
+}
+
+// 递归列出目录：ENTRY <D|F> <size> <mtime> <path>，路径格式与 stream_directory 一致
+static int list_directory(int sock, const char *abs_path, const char *client_path) {
+    char msg[PATH_MAX + 64];
+    int count = 0;
+    DIR *dir = opendir(abs_path);
+    if (dir == NULL) {
+        snprintf(msg, sizeof(msg), "ERROR Could not open directory %s", client_path);
         send_msg(sock, msg);
+        return 0;
+    }
+
+    struct dirent *entry;
+    while ((entry = readdir(dir)) != NULL) {
+        if (strcmp(entry->d_name, ".") == 0 || strcmp(entry->d_name, "..") == 0) {
+            continue;
+        }
 
-        FILE *fp = fopen(resolved_path, "rb");
-        if (fp == NULL) {
-            perror("fopen after stat failed");
-            return;
+        char entry_abs_path[PATH_MAX];
+        snprintf(entry_abs_path, sizeof(entry_abs_path), "%s/%s", abs_path, entry->d_name);
+
+        char entry_client_path[PATH_MAX];
+        snprintf(entry_client_path, sizeof(entry_client_path), "%s/%s", client_path, entry->d_name);
+
+        struct stat entry_stat;
+        if (stat(entry_abs_path, &entry_stat) != 0) {
+            snprintf(msg, sizeof(msg), "ERROR Could not stat %s", entry_client_path);
+            send_msg(sock, msg);
+            continue;
         }
 
-        char buffer[MAX_BUFFER_SIZE];
-        size_t bytes_read;
-        while ((bytes_read = fread(buffer, 1, sizeof(buffer), fp)) > 0) {
-            if (send(sock, buffer, bytes_read, 0) != bytes_read) {
-                perror("send file content");
-                break;
-            }
+        if (S_ISDIR(entry_stat.st_mode)) {
+            snprintf(msg, sizeof(msg), "ENTRY D 0 %lld %s", (long long)entry_stat.st_mtime,
+                     entry_client_path);
+            send_msg(sock, msg);
+            count += 1 + list_directory(sock, entry_abs_path, entry_client_path);
+        } else if (S_ISREG(entry_stat.st_mode)) {
+            snprintf(msg, sizeof(msg), "ENTRY F %lld %lld %s", (long long)entry_stat.st_size,
+                     (long long)entry_stat.st_mtime, entry_client_path);
+            send_msg(sock, msg);
+            count++;
         }
-        fclose(fp);
+    }
+    closedir(dir);
+    return count;
+}
+
+void handle_list_command(int sock, const char *args) {
+    char resolved_path[PATH_MAX];
+    struct stat path_stat;
+    if (resolve_client_path(sock, args, resolved_path, &path_stat) != 0) {
+        return;
+    }
+
+    char msg[PATH_MAX + 64];
+    if (S_ISDIR(path_stat.st_mode)) {
+        snprintf(msg, sizeof(msg), "L_START D %s", args);
+        send_msg(sock, msg);
+        int count = list_directory(sock, resolved_path, args);
+        snprintf(msg, sizeof(msg), "L_END %d", count);
+        send_msg(sock, msg);
+    } else if (S_ISREG(path_stat.st_mode)) {
+        snprintf(msg, sizeof(msg), "L_START F %s", args);
+        send_msg(sock, msg);
+        snprintf(msg, sizeof(msg), "ENTRY F %lld %lld %s", (long long)path_stat.st_size,
+                 (long long)path_stat.st_mtime, args);
+        send_msg(sock, msg);
+        send_msg(sock, "L_END 1");
     } else {
         send_msg(sock, "ERROR Path is not a file or directory.");
     }
 }
 
+// compress <算法...>：协商本连接的压缩传输，应答 COMPRESS <算法>，不支持时应答 COMPRESS none
+void handle_compress_command(int sock, const char *args) {
+    int enable = 0;
+    if (args != NULL && sock >= 0 && sock < MAX_CLIENT_FDS) {
+        char buf[128];
+        strncpy(buf, args, sizeof(buf) - 1);
+        buf[sizeof(buf) - 1] = '\0';
+        char *saveptr = NULL;
+        for (char *tok = strtok_r(buf, " ,", &saveptr); tok != NULL;
+             tok = strtok_r(NULL, " ,", &saveptr)) {
+            if (strcmp(tok, "zlib") == 0) {
+                enable = 1;
+                break;
+            }
+        }
+        compress_enabled[sock] = (unsigned char)enable;
+    }
+    send_msg(sock, enable ? "COMPRESS zlib" : "COMPRESS none");
+}
+
 void handle_run_command(int sock, const char *args) {
     if (args == NULL || strlen(args) == 0) {
         send_msg(sock, "Error: no command to run");
@@ -454,6 +702,9 @@ void *server_main_loop(void *arg) {
                     }
 
                     make_socket_non_blocking(conn_sock);
+                    if (conn_sock < MAX_CLIENT_FDS) {
+                        compress_enabled[conn_sock] = 0;
+                    }
 
                     client_conn_t *conn = calloc(1, sizeof(client_conn_t));
                     conn->fd = conn_sock;
@@ -494,6 +745,9 @@ void *server_main_loop(void *arg) {
 
                 if (done) {
                     printf("Client %d disconnected.\n", conn->fd);
+                    if (conn->fd < MAX_CLIENT_FDS) {
+                        compress_enabled[conn->fd] = 0;
+                    }
                     close(conn->fd);
                     free(conn);
                 } else {
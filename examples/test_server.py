@@ -1,9 +1,11 @@
+import lzma
 import os
 import random
 import socket
 import struct
 import threading
 import time
+import zlib
 from pathlib import Path
 
 # 简易测试服务器，使用与客户端一致的 4 字节大端长度前缀协议。
@@ -12,8 +14,25 @@ from pathlib import Path
 # - {prefix}_sample_type_normal/test -> ACK
 # - {prefix}_data_coll_ctrl_start/stop -> 开始/停止推送数据
 # - （可选）推送 SPEC/Noise_Spectrum,<256点...> 的频谱数据，与 FOUP 数值同时发送
-# - get <path> -> 发送单文件目录结构，兼容 Client.get_file
+# - get <path> -> 发送单文件目录结构，兼容 Client.get_file；
+#   设置 log_root（TEST_SERVER_LOG_ROOT）后改为发送 log_root 下的真实文件/目录
+# - get <path> <offset> -> 断点续传（需 log_root），应答 RANGE <offset> <length> <path> + 原始数据
+# - list <path> -> 列出 log_root 下的目录树（L_START/ENTRY/L_END），未设置 log_root 时回 ACK（模拟旧服务端）
+# - compress <算法...> -> 协商本连接的压缩传输（zlib/lzma），应答 COMPRESS <算法> 或 COMPRESS none；
+#   之后文件以 ZFILE/ZRANGE 头 + 若干长度前缀压缩帧 + 长度为 0 的结束帧发送（需 compression_enabled）
+# - {prefix}_frame_format_binary -> 启用二进制帧（需 binary_enabled，否则按旧固件仅回 ACK）
 # 其他命令默认返回 ACK。
+#
+# 二进制帧格式与 voc_app.gui.foup_protocol 一致（16 字节头 + 大端 float32 负载）：
+#   magic=0xFB, version=1, type(1=采样,2=频谱), channel, count(uint32), timestamp_ms(uint64)
+# 配合 TEST_SERVER_SAMPLE_INTERVAL 调小发送间隔，可离线对比文本/二进制解析开销。
+
+BINARY_MAGIC = 0xFB
+BINARY_VERSION = 1
+FRAME_SAMPLES = 1
+FRAME_SPECTRUM_F32 = 2
+FILE_CHUNK_SIZE = 64 * 1024
+COMPRESSION_ALGORITHMS = ("zlib", "lzma")
 
 
 def send_prefixed(sock: socket.socket, text: str) -> None:
@@ -23,6 +42,47 @@ def send_prefixed(sock: socket.socket, text: str) -> None:
     sock.sendall(header + payload)
 
 
+def pack_binary_frame(frame_type: int, values: list[float], channel: int = 0) -> bytes:
+    """编码二进制帧负载（不含长度前缀）"""
+    header = struct.pack(
+        ">BBBBIQ",
+        BINARY_MAGIC,
+        BINARY_VERSION,
+        frame_type,
+        channel,
+        len(values),
+        int(time.time() * 1000),
+    )
+    return header + struct.pack(f">{len(values)}f", *values)
+
+
+def send_prefixed_bytes(sock: socket.socket, payload: bytes) -> None:
+    """发送带 4 字节长度前缀的二进制负载"""
+    sock.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def send_file_body(conn: socket.socket, f, length: int, compression: str | None) -> None:
+    """发送文件从当前位置起的 length 字节；compression 非空时分帧发送压缩流"""
+    if compression is None:
+        if length > 0:
+            conn.sendfile(f, f.tell(), length)
+        return
+    compressor = zlib.compressobj() if compression == "zlib" else lzma.LZMACompressor()
+    remaining = length
+    while remaining > 0:
+        chunk = f.read(min(FILE_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        packed = compressor.compress(chunk)
+        if packed:
+            send_prefixed_bytes(conn, packed)
+    packed = compressor.flush()
+    if packed:
+        send_prefixed_bytes(conn, packed)
+    send_prefixed_bytes(conn, b"")
+
+
 def recv_exact(sock: socket.socket, size: int) -> bytes | None:
     """按字节数精确读取，失败返回 None"""
     data = bytearray()
@@ -54,6 +114,10 @@ class TestServer:
         spectrum_bin_count: int = 256,
         spectrum_include_timestamp: bool = False,
         spectrum_interval_s: float = 0.5,
+        binary_enabled: bool = False,
+        sample_interval_s: float = 0.5,
+        log_root: str | None = None,
+        compression_enabled: bool = True,
     ):
         self.host = host
         self.port = port
@@ -69,6 +133,10 @@ class TestServer:
         self.spectrum_bin_count = int(spectrum_bin_count) if int(spectrum_bin_count) > 0 else 256
         self.spectrum_include_timestamp = bool(spectrum_include_timestamp)
         self.spectrum_interval_s = float(spectrum_interval_s) if float(spectrum_interval_s) > 0 else 0.5
+        self.binary_enabled = bool(binary_enabled)
+        self.sample_interval_s = float(sample_interval_s) if float(sample_interval_s) >= 0 else 0.5
+        self.log_root = Path(log_root).resolve() if log_root else None
+        self.compression_enabled = bool(compression_enabled)
 
     def start(self) -> None:
         """启动监听，阻塞主线程"""
@@ -93,18 +161,23 @@ class TestServer:
     def _handle_client(self, conn: socket.socket, addr) -> None:
         sender_thread = None
         send_flag = threading.Event()
+        binary_mode = threading.Event()
+        compression: str | None = None
 
         def sender_loop():
             """根据通道数推送数据"""
             last_spectrum_ts = 0.0
             while send_flag.is_set():
+                binary = binary_mode.is_set()
                 if self.channel_count == 1:
-                    line = str(round(random.uniform(100, 200), 2))
+                    values = [round(random.uniform(100, 200), 2)]
                 else:
                     values = [round(random.uniform(40, 70), 2) for _ in range(self.channel_count)]
-                    line = ",".join(str(v) for v in values)
                 with self._send_lock:
-                    send_prefixed(conn, line)
+                    if binary:
+                        send_prefixed_bytes(conn, pack_binary_frame(FRAME_SAMPLES, values))
+                    else:
+                        send_prefixed(conn, ",".join(str(v) for v in values))
 
                     # 可选：同时发送频谱数据包（每包带 prefix）
                     if self.spectrum_enabled:
@@ -112,15 +185,21 @@ class TestServer:
                         if (now - last_spectrum_ts) >= self.spectrum_interval_s:
                             # 归一化 0.0~1.0 的 256 点频谱
                             spectrum = [round(random.random(), 6) for _ in range(self.spectrum_bin_count)]
-                            header = self.spectrum_prefix
-                            if self.spectrum_include_timestamp:
-                                # 用 ms 时间戳模拟“SPEC,<ts>,<bins...>”格式
-                                ts_ms = int(now * 1000)
-                                header = f"{header},{ts_ms}"
-                            spectrum_line = header + "," + ",".join(str(v) for v in spectrum)
-                            send_prefixed(conn, spectrum_line)
+                            if binary:
+                                send_prefixed_bytes(
+                                    conn, pack_binary_frame(FRAME_SPECTRUM_F32, spectrum)
+                                )
+                            else:
+                                header = self.spectrum_prefix
+                                if self.spectrum_include_timestamp:
+                                    # 用 ms 时间戳模拟“SPEC,<ts>,<bins...>”格式
+                                    ts_ms = int(now * 1000)
+                                    header = f"{header},{ts_ms}"
+                                spectrum_line = header + "," + ",".join(str(v) for v in spectrum)
+                                send_prefixed(conn, spectrum_line)
                             last_spectrum_ts = now
-                time.sleep(0.5)
+                if self.sample_interval_s > 0:
+                    time.sleep(self.sample_interval_s)
 
         try:
             while True:
@@ -138,7 +217,17 @@ class TestServer:
 
                 if cmd.startswith("get "):
                     path = cmd[4:].strip() or "Log"
-                    self._handle_get(conn, path)
+                    self._handle_get(conn, path, compression)
+                    continue
+
+                if cmd.startswith("compress ") and self.compression_enabled:
+                    offer = cmd[9:].replace(",", " ").split()
+                    compression = next((a for a in offer if a in COMPRESSION_ALGORITHMS), None)
+                    send_prefixed(conn, f"COMPRESS {compression or 'none'}")
+                    continue
+
+                if cmd.startswith("list ") and self.log_root is not None:
+                    self._handle_list(conn, cmd[5:].strip() or "Log")
                     continue
 
                 if cmd == "get_function_version_info":
@@ -146,6 +235,13 @@ class TestServer:
                     send_prefixed(conn, f"{self.prefix},{version}")
                     continue
 
+                if cmd.endswith("_frame_format_binary"):
+                    # 旧固件行为：未知命令也回 ACK，但继续发送文本帧
+                    if self.binary_enabled:
+                        binary_mode.set()
+                    send_prefixed(conn, "ACK")
+                    continue
+
                 if "sample_type" in cmd:
                     send_prefixed(conn, "ACK")
                     continue
@@ -181,8 +277,83 @@ class TestServer:
                 pass
             print(f"[SERVER] {addr} closed")
 
-    def _handle_get(self, conn: socket.socket, remote_path: str) -> None:
+    def _resolve(self, remote_path: str) -> Path | None:
+        """把客户端路径映射到 log_root 下，越界时返回 None"""
+        assert self.log_root is not None
+        target = (self.log_root / remote_path.lstrip("/")).resolve()
+        if target != self.log_root and self.log_root not in target.parents:
+            return None
+        return target
+
+    def _handle_list(self, conn: socket.socket, remote_path: str) -> None:
+        """列出目录树：路径格式与 get 的 D_START/FILE 一致"""
+        target = self._resolve(remote_path)
+        if target is None or not target.exists():
+            send_prefixed(conn, "ERROR Path not found or could not be resolved.")
+            return
+        if target.is_file():
+            stat = target.stat()
+            send_prefixed(conn, f"L_START F {remote_path}")
+            send_prefixed(conn, f"ENTRY F {stat.st_size} {int(stat.st_mtime)} {remote_path}")
+            send_prefixed(conn, "L_END 1")
+            return
+        send_prefixed(conn, f"L_START D {remote_path}")
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(target):
+            rel = Path(dirpath).relative_to(target).as_posix()
+            base = remote_path if rel == "." else f"{remote_path}/{rel}"
+            for name in dirnames + filenames:
+                stat = os.stat(os.path.join(dirpath, name))
+                kind = "D" if name in dirnames else "F"
+                size = 0 if kind == "D" else stat.st_size
+                send_prefixed(conn, f"ENTRY {kind} {size} {int(stat.st_mtime)} {base}/{name}")
+                count += 1
+        send_prefixed(conn, f"L_END {count}")
+
+    def _send_tree(
+        self, conn: socket.socket, target: Path, remote_path: str, compression: str | None
+    ) -> None:
+        """按 get 协议递归发送真实文件/目录"""
+        if target.is_file():
+            size = target.stat().st_size
+            kind = "ZFILE" if compression else "FILE"
+            send_prefixed(conn, f"{kind} {remote_path} {size}")
+            with open(target, "rb") as f:
+                send_file_body(conn, f, size, compression)
+            return
+        send_prefixed(conn, f"D_START {remote_path}")
+        for child in sorted(target.iterdir()):
+            self._send_tree(conn, child, f"{remote_path}/{child.name}", compression)
+        send_prefixed(conn, f"D_END {remote_path}")
+
+    def _send_range(
+        self, conn: socket.socket, target: Path, remote_path: str, offset: int, compression: str | None
+    ) -> None:
+        """从 offset 处发送文件剩余部分"""
+        size = target.stat().st_size
+        offset = min(offset, size)
+        kind = "ZRANGE" if compression else "RANGE"
+        send_prefixed(conn, f"{kind} {offset} {size - offset} {remote_path}")
+        with open(target, "rb") as f:
+            f.seek(offset)
+            send_file_body(conn, f, size - offset, compression)
+
+    def _handle_get(self, conn: socket.socket, remote_path: str, compression: str | None = None) -> None:
         """发送单文件目录结构，兼容 Client.get_file"""
+        if self.log_root is not None:
+            target = self._resolve(remote_path)
+            head, _, tail = remote_path.rpartition(" ")
+            if (target is None or not target.exists()) and head and tail.isdigit():
+                # get <path> <offset>：路径本身不存在且末尾是数字时按偏移量解析
+                ranged = self._resolve(head)
+                if ranged is not None and ranged.is_file():
+                    self._send_range(conn, ranged, head, int(tail), compression)
+                    return
+            if target is None or not target.exists():
+                send_prefixed(conn, "ERROR Path not found or could not be resolved.")
+            else:
+                self._send_tree(conn, target, remote_path, compression)
+            return
         content = "timestamp,ch1,ch2,ch3\n0,1.0,2.0,3.0\n1,1.1,2.1,3.1\n"
         data = content.encode("utf-8")
         filename = "sample.csv"
@@ -204,6 +375,10 @@ if __name__ == "__main__":
     spectrum_bin_count = int(os.environ.get("TEST_SERVER_SPECTRUM_BINS", "256"))
     spectrum_include_timestamp = os.environ.get("TEST_SERVER_SPECTRUM_TS", "").strip().lower() in {"1", "true", "yes", "on"}
     spectrum_interval_s = float(os.environ.get("TEST_SERVER_SPECTRUM_INTERVAL", "0.5"))
+    binary_enabled = os.environ.get("TEST_SERVER_BINARY", "").strip().lower() in {"1", "true", "yes", "on"}
+    sample_interval_s = float(os.environ.get("TEST_SERVER_SAMPLE_INTERVAL", "0.5"))
+    log_root = os.environ.get("TEST_SERVER_LOG_ROOT", "").strip() or None
+    compression_enabled = os.environ.get("TEST_SERVER_COMPRESSION", "1").strip().lower() in {"1", "true", "yes", "on"}
     server = TestServer(
         host=host,
         port=port,
@@ -213,6 +388,10 @@ if __name__ == "__main__":
         spectrum_bin_count=spectrum_bin_count,
         spectrum_include_timestamp=spectrum_include_timestamp,
         spectrum_interval_s=spectrum_interval_s,
+        binary_enabled=binary_enabled,
+        sample_interval_s=sample_interval_s,
+        log_root=log_root,
+        compression_enabled=compression_enabled,
     )
     try:
         server.start()
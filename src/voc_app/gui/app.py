@@ -50,9 +50,16 @@ from voc_app.gui.csv_model import (
 )
 from voc_app.gui.alarm_store import AlarmStore
 from voc_app.gui.update_status import UpdateStatusController
+from voc_app.gui.spectrum_features import SpectrumFeatureExtractor, parse_thresholds
 from voc_app.gui.spectrum_model import SpectrumDataModel, SpectrumSimulator
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+from voc_app.gui import spectrum_renderer  # noqa: F401  注册 QML 类型 VocSpectrum.SpectrumRenderer
+from voc_app.gui.waterfall import WaterfallImageProvider
 from voc_app.gui.file_tree_browser import FilePreviewController
 from voc_app.gui.foup_acquisition import FoupAcquisitionController
+from voc_app.gui.foup_async import FoupStreamEngine, FoupStreamRouter, parse_host_list
+from voc_app.gui.store_history import StoreHistoryManager
+from voc_app.gui.timeseries_store import TimeSeriesStore
 from voc_app.loadport.ascii_serial import AsciiSerialClient
 from voc_app.version_info import get_loadport_version
 
@@ -392,6 +399,8 @@ class LoadportBridge(QObject):
             self._actuator_controller.requestE84ErrorRecovery.connect(
                 self._on_request_e84_error_recovery
             )
+        if self._foup_controller and hasattr(self._foup_controller, "e84JobFinished"):
+            self._foup_controller.e84JobFinished.connect(self._on_e84_job_finished)
 
     def start(self):
         """启动后台线程"""
@@ -400,6 +409,8 @@ class LoadportBridge(QObject):
     def shutdown(self):
         """停止后台线程，确保退出时安全清理"""
         self._worker.stop()
+        if self._foup_controller and hasattr(self._foup_controller, "shutdownE84Jobs"):
+            self._foup_controller.shutdownE84Jobs()  # type: ignore[attr-defined]
 
     def _current_timestamp(self) -> str:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -476,6 +487,11 @@ class LoadportBridge(QObject):
         if self._actuator_controller and not self._actuator_controller.run_unlock_for_unload():
             self._append_alarm("ERROR", "Unload 解锁动作执行失败")
         if self._foup_controller and hasattr(
+            self._foup_controller, "e84StartDataCollectionForUnloadAsync"
+        ):
+            # 后台执行，结果由 _on_e84_job_finished 处理，握手回调立即返回
+            self._foup_controller.e84StartDataCollectionForUnloadAsync()  # type: ignore[attr-defined]
+        elif self._foup_controller and hasattr(
             self._foup_controller, "e84StartDataCollectionForUnload"
         ):
             ok = self._foup_controller.e84StartDataCollectionForUnload()  # type: ignore[attr-defined]
@@ -487,12 +503,29 @@ class LoadportBridge(QObject):
         if self._actuator_controller and not self._actuator_controller.run_lock_for_load():
             self._append_alarm("ERROR", "Load 加锁动作执行失败")
         if self._foup_controller and hasattr(
+            self._foup_controller, "e84StopDataCollectionForLoadAsync"
+        ):
+            self._foup_controller.e84StopDataCollectionForLoadAsync()  # type: ignore[attr-defined]
+        elif self._foup_controller and hasattr(
             self._foup_controller, "e84StopDataCollectionForLoad"
         ):
             ok = self._foup_controller.e84StopDataCollectionForLoad()  # type: ignore[attr-defined]
             if not ok:
                 self._append_alarm("ERROR", "Load 采集停止命令执行失败")
 
+    _E84_JOB_FAILURES = {
+        "unload_start": "Unload 采集启动命令执行失败",
+        "load_stop": "Load 采集停止命令执行失败",
+        "log_download": "Load 日志下载失败",
+    }
+
+    def _on_e84_job_finished(self, kind: str, ok: bool, message: str) -> None:
+        if ok:
+            self._set_title_message(message)
+            return
+        prefix = self._E84_JOB_FAILURES.get(kind, f"E84 任务 {kind} 失败")
+        self._append_alarm("ERROR", f"{prefix}: {message}")
+
     def _on_actuator_serial_error(self, source: str, payload: str) -> None:
         self._append_alarm("ERROR", f"{source} 串口上报异常: {payload}")
         self._actuator_error_latched = True
@@ -582,7 +615,7 @@ if __name__ == "__main__":
     socket_bridge = QmlSocketClientBridge(Client, SocketCommunicator)
     engine.rootContext().setContextProperty("clientBridge", socket_bridge)
 
-    csv_file_manager = CsvFileManager()
+    csv_file_manager = CsvFileManager(index_path=APP_DIR / "Data" / "csv_index.json")
     engine.rootContext().setContextProperty("csvFileManager", csv_file_manager)
 
     auth_manager = AuthenticationManager()
@@ -622,19 +655,89 @@ if __name__ == "__main__":
     engine.rootContext().setContextProperty("chartListModel", chart_list_model)
 
     # 频谱分析模型和模拟器
-    spectrum_model = SpectrumDataModel(bin_count=256)
+    # VOC_SPECTRUM_CHANNELS > 1 时使用多通道模型（共享 channels x bins 缓冲区，按帧中的通道号更新），
+    # 界面默认显示通道 0，其余通道通过 spectrumChannels.channel(i) 取得
+    spectrum_channel_count = max(1, int(os.environ.get("VOC_SPECTRUM_CHANNELS", "1") or 1))
+    if spectrum_channel_count > 1:
+        spectrum_source = MultiChannelSpectrumModel(channel_count=spectrum_channel_count, bin_count=256)
+        spectrum_model = spectrum_source.channel(0)
+        engine.rootContext().setContextProperty("spectrumChannels", spectrum_source)
+    else:
+        spectrum_source = spectrum_model = SpectrumDataModel(bin_count=256)
+    # 频谱通知帧率不超过显示器刷新率，传感器帧率更高时合并通知
+    screen = app.primaryScreen()
+    if screen is not None and screen.refreshRate() > 0:
+        spectrum_source.maxFps = screen.refreshRate()
     # spectrum_simulator = SpectrumSimulator(spectrum_model)
     # spectrum_simulator.intervalMs = 50  # 20 Hz 更新率
     # spectrum_simulator.start()  # 自动启动模拟器
     engine.rootContext().setContextProperty("spectrumModel", spectrum_model)
+    # 瀑布图：image://waterfall/<配色>/<序号>，由模型的历史环形缓冲区整幅渲染
+    waterfall_provider = WaterfallImageProvider(spectrum_model)
+    engine.addImageProvider("waterfall", waterfall_provider)
     # engine.rootContext().setContextProperty("spectrumSimulator", spectrum_simulator)
 
+    # 实时采样落盘（列式分块存储），按时间范围查询
+    # 只保留最近 VOC_FOUP_STORE_MAX_CHUNKS 块（默认 64 块，每块 65536 行；8 通道约 300 MB），<= 0 表示不限制
+    store_max_chunks = int(os.environ.get("VOC_FOUP_STORE_MAX_CHUNKS", "64") or 64)
+    foup_sample_store = TimeSeriesStore(
+        Path(os.environ.get("VOC_FOUP_STORE_DIR", str(APP_DIR / "Data" / "foup_store"))),
+        max_chunks=store_max_chunks if store_max_chunks > 0 else None,
+    )
+    foup_sample_store.start()
+
+    # 固件支持时改用二进制帧；旧固件会继续发送文本帧
+    prefer_binary_frames = os.environ.get("VOC_FOUP_BINARY_FRAMES", "").lower() in {"1", "true", "yes"}
+    # 批量入库：最多 32 条样本或 100ms 合并为一次模型更新，避免高采样率下阻塞 UI
     foup_acquisition = FoupAcquisitionController(
         foup_series_models,
-        spectrum_model=spectrum_model,
+        spectrum_model=spectrum_source,
+        batch_max_size=32,
+        batch_max_latency_ms=100,
+        prefer_binary_frames=prefer_binary_frames,
+        sample_store=foup_sample_store,
     )
     engine.rootContext().setContextProperty("foupAcquisition", foup_acquisition)
 
+    # 多主机采集：VOC_FOUP_HOSTS（如 "foup1=192.168.1.10:65432,foup2=192.168.1.11"）列出的主机
+    # 由单线程 asyncio 引擎并发采集；各主机平分 FOUP 曲线，频谱按主机序号写入频谱模型，
+    # 采样落盘到 <存储目录>/hosts/<主机名>。引擎与单机采集共用曲线和频谱模型，引擎运行期间禁用单机采集
+    foup_hosts = parse_host_list(os.environ.get("VOC_FOUP_HOSTS", ""))
+    foup_stream_engine = None
+    foup_host_stores: dict[str, TimeSeriesStore] = {}
+    if foup_hosts:
+        foup_stream_engine = FoupStreamEngine(
+            batch_max_size=32,
+            batch_max_latency_ms=100,
+            prefer_binary_frames=prefer_binary_frames,
+        )
+        for name, host, port in foup_hosts:
+            foup_stream_engine.addHost(name, host, port)
+            store = TimeSeriesStore(
+                foup_sample_store.root / "hosts" / name.replace("/", "_"),
+                max_chunks=store_max_chunks if store_max_chunks > 0 else None,
+            )
+            store.start()
+            foup_host_stores[name] = store
+        FoupStreamRouter(
+            foup_stream_engine,
+            foup_series_models,
+            spectrum_model=spectrum_source,
+            host_names=[name for name, _, _ in foup_hosts],
+            sample_stores=foup_host_stores,
+            parent=foup_stream_engine,
+        )
+        stream_engine = foup_stream_engine
+        stream_engine.runningChanged.connect(
+            lambda: foup_acquisition.setStreamEngineActive(stream_engine.running)
+        )
+        engine.rootContext().setContextProperty("foupStreamEngine", foup_stream_engine)
+        foup_stream_engine.start()
+
+    # DataLog 回看已落盘的采样：本机采集与每台主机各为一个数据源，查询在工作线程执行
+    store_history = StoreHistoryManager({"本机采集": foup_sample_store, **foup_host_stores})
+    engine.rootContext().setContextProperty("storeHistory", store_history)
+
     # 将性能配置传递给 QML，让频谱图组件根据环境调整效果
     spectrum_perf_config = get_spectrum_config_for_env()
     engine.rootContext().setContextProperty("spectrumPerfConfig", spectrum_perf_config)
@@ -643,6 +746,18 @@ if __name__ == "__main__":
     # alarm_store.addAlarm("2025-11-10 18:24:00", "Temperature above threshold")
     engine.rootContext().setContextProperty("alarmStore", alarm_store)
 
+    # 频谱特征：每次频谱通知时批量提取新帧的峰值频率、质心、平坦度与频带能量，
+    # 写入曲线并按 VOC_SPECTRUM_FEATURE_THRESHOLDS（如 "centroid:100:8000,flatness::0.6"）告警；
+    # 频谱页通过 spectrumFeatures.seriesNames / seriesModel(name) 按名称取曲线，不占用 chartListModel 的行
+    spectrum_features = SpectrumFeatureExtractor(spectrum_model, alarm_store=alarm_store)
+    for name in ("peak_frequency", "centroid"):
+        series_model = SeriesTableModel(max_rows=30, parent=spectrum_features)
+        spectrum_features.add_series(name, series_model)
+    spectrum_features.set_thresholds(
+        parse_thresholds(os.environ.get("VOC_SPECTRUM_FEATURE_THRESHOLDS", ""))
+    )
+    engine.rootContext().setContextProperty("spectrumFeatures", spectrum_features)
+
     update_state_file = Path(
         os.environ.get(
             "VOC_UPDATE_STATE_FILE",
@@ -745,6 +860,8 @@ if __name__ == "__main__":
                 actuator_controller=loadport_actuator_controller,
             )
             loadport_bridge.start()
+            # E84 模式下预先建立到 FOUP 的控制连接，握手回调中不再等待建连
+            foup_acquisition.warmUpConnections()
             serial_error_handled_by_bridge = True
         except Exception as exc:  # noqa: BLE001
             logger.warning(f"未启动 E84 桥接: {exc}")
@@ -762,10 +879,19 @@ if __name__ == "__main__":
     #     csv_file_manager.parse_csv_file(csv_file_manager.csvFiles[0])
 
     app.aboutToQuit.connect(foup_acquisition.stopAcquisition)
+    if foup_stream_engine is not None:
+        app.aboutToQuit.connect(foup_stream_engine.stop)
+    app.aboutToQuit.connect(store_history.shutdown)
+    app.aboutToQuit.connect(foup_sample_store.close)
+    for store in foup_host_stores.values():
+        app.aboutToQuit.connect(store.close)
+    app.aboutToQuit.connect(csv_file_manager.shutdown)
     # app.aboutToQuit.connect(spectrum_simulator.stop)
     app.aboutToQuit.connect(loadport_serial_lock_client.disconnect)
     app.aboutToQuit.connect(loadport_serial_insert_client.disconnect)
     if loadport_bridge:
         app.aboutToQuit.connect(loadport_bridge.shutdown)
+    # E84 任务结束后再关闭连接池
+    app.aboutToQuit.connect(foup_acquisition.shutdownConnections)
 
     sys.exit(app.exec())
@@ -0,0 +1,275 @@
+"""CSV 日志目录的持久化文件索引
+
+日志目录长期运行后会积累数千个文件，每次列表都 rglob + 排序 + 读表头代价与文件数成正比。
+CsvFileIndex 把每个文件的元数据（大小、mtime、行数、列名、时间范围）和每个目录的 mtime
+保存到 JSON，刷新时：
+
+- 目录 mtime 未变：其中没有增删改名，跳过扫描，只递归进入已知子目录；
+- 目录 mtime 变化：重新 scandir 该目录，按 (size, mtime) 找出新增/修改/删除的文件；
+- 最近修改过的“热”文件（原地追加写入不会改变目录 mtime）额外 stat 一次。
+
+因此一次刷新的磁盘开销与变化量（和目录数）成正比，而不是与文件总数成正比。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import posixpath
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from voc_app.gui.csv_loader import to_milliseconds
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILE = ".csv_index.json"
+INDEX_VERSION = 1
+# 修改时间在此窗口内的文件每次刷新都重新 stat（秒）
+HOT_WINDOW_S = 600.0
+_READ_BLOCK = 1 << 20
+
+
+@dataclass
+class CsvFileEntry:
+    """单个 CSV 文件的索引项；时间范围为毫秒，无法解析时为 None。"""
+
+    path: str
+    size: int
+    mtime_ns: int
+    rows: int = 0
+    columns: List[str] = field(default_factory=list)
+    start_ms: float | None = None
+    end_ms: float | None = None
+
+    @property
+    def name(self) -> str:
+        return posixpath.basename(self.path)
+
+    @property
+    def directory(self) -> str:
+        return posixpath.dirname(self.path)
+
+
+@dataclass
+class IndexChanges:
+    """一次刷新的结果。"""
+
+    added: List[CsvFileEntry] = field(default_factory=list)
+    updated: List[CsvFileEntry] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+def _first_field(line: bytes) -> float | None:
+    try:
+        return float(line.split(b",", 1)[0])
+    except ValueError:
+        return None
+
+
+def read_csv_metadata(path: Path, relative: str, stat: os.stat_result) -> CsvFileEntry:
+    """读取表头、首尾数据行并统计行数（按块数换行符，不解析数值）。"""
+    entry = CsvFileEntry(path=relative, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+    first_line = b""
+    tail = b""
+    newlines = 0
+    with open(path, "rb") as f:
+        header = f.readline()
+        entry.columns = [c.strip() for c in header.decode("utf-8", errors="replace").strip().split(",")[1:]]
+        while True:
+            block = f.read(_READ_BLOCK)
+            if not block:
+                break
+            if not first_line:
+                first_line = (tail + block).lstrip(b"\r\n").split(b"\n", 1)[0]
+            newlines += block.count(b"\n")
+            tail = (tail + block)[-4096:]
+    lines = [line for line in tail.split(b"\n") if line.strip()]
+    entry.rows = newlines + (1 if tail and not tail.endswith(b"\n") else 0)
+    start = _first_field(first_line) if first_line.strip() else None
+    end = _first_field(lines[-1]) if lines else None
+    if start is not None and end is not None:
+        start_ms, end_ms = to_milliseconds(np.array([start, end], dtype=np.float64)).tolist()
+        entry.start_ms, entry.end_ms = start_ms, end_ms
+    return entry
+
+
+class CsvFileIndex:
+    """日志目录的增量文件索引（线程安全）。"""
+
+    def __init__(self, root: str | Path, index_path: str | Path | None = None) -> None:
+        self._root = Path(root)
+        self._index_path = Path(index_path) if index_path is not None else self._root / INDEX_FILE
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CsvFileEntry] = {}
+        self._dirs: Dict[str, int] = {}
+        self._load()
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def entries(self) -> List[CsvFileEntry]:
+        with self._lock:
+            return list(self._entries.values())
+
+    def get(self, path: str) -> CsvFileEntry | None:
+        with self._lock:
+            return self._entries.get(path)
+
+    def paths(self) -> List[str]:
+        with self._lock:
+            return sorted(self._entries)
+
+    def directories(self) -> List[Path]:
+        """已索引目录的绝对路径（供 QFileSystemWatcher 监视）。"""
+        with self._lock:
+            return [self._root / rel if rel else self._root for rel in self._dirs]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # ---- Refresh ----
+
+    def refresh(self, full: bool = False) -> IndexChanges:
+        """对比磁盘与索引，返回变化并保存索引；full=True 时忽略目录 mtime 逐个 stat。"""
+        with self._lock:
+            changes = IndexChanges()
+            files_by_dir: Dict[str, set[str]] = {}
+            for path in self._entries:
+                files_by_dir.setdefault(posixpath.dirname(path), set()).add(path)
+            children: Dict[str, List[str]] = {}
+            for rel in self._dirs:
+                if rel:
+                    children.setdefault(posixpath.dirname(rel), []).append(rel)
+
+            seen_dirs: Dict[str, int] = {}
+            unchanged_dirs: List[str] = []
+            stack = [""]
+            while stack:
+                rel = stack.pop()
+                directory = self._root / rel if rel else self._root
+                try:
+                    mtime_ns = directory.stat().st_mtime_ns
+                except OSError:
+                    continue
+                seen_dirs[rel] = mtime_ns
+                if not full and self._dirs.get(rel) == mtime_ns:
+                    unchanged_dirs.append(rel)
+                    stack.extend(children.get(rel, []))
+                    continue
+                stack.extend(self._scan_directory(rel, directory, files_by_dir.get(rel, set()), changes))
+
+            self._restat_hot_files(unchanged_dirs, files_by_dir, changes)
+            # 已消失的目录：其中的文件全部移除
+            for rel in set(self._dirs) - set(seen_dirs):
+                for path in sorted(files_by_dir.get(rel, ())):
+                    if self._entries.pop(path, None) is not None:
+                        changes.removed.append(path)
+            dirs_changed = seen_dirs != self._dirs
+            self._dirs = seen_dirs
+            if changes or dirs_changed:
+                self._save()
+        if changes:
+            logger.debug(
+                f"CSV 索引更新: +{len(changes.added)} ~{len(changes.updated)} -{len(changes.removed)}"
+            )
+        return changes
+
+    def _scan_directory(
+        self, rel: str, directory: Path, known: set[str], changes: IndexChanges
+    ) -> List[str]:
+        """扫描单个目录，返回其子目录（相对路径）。"""
+        subdirs: List[str] = []
+        present: set[str] = set()
+        try:
+            with os.scandir(directory) as it:
+                for item in it:
+                    if item.name.startswith("."):
+                        continue
+                    child = posixpath.join(rel, item.name) if rel else item.name
+                    if item.is_dir(follow_symlinks=False):
+                        subdirs.append(child)
+                    elif item.is_file() and item.name.lower().endswith(".csv"):
+                        present.add(child)
+                        self._update_file(child, Path(item.path), item.stat(), changes)
+        except OSError as exc:
+            logger.warning(f"扫描日志目录失败 {directory}: {exc}")
+            return subdirs
+        for path in sorted(known - present):
+            if self._entries.pop(path, None) is not None:
+                changes.removed.append(path)
+        return subdirs
+
+    def _restat_hot_files(
+        self, dirs: List[str], files_by_dir: Dict[str, set[str]], changes: IndexChanges
+    ) -> None:
+        threshold_ns = time.time_ns() - int(HOT_WINDOW_S * 1e9)
+        for rel in dirs:
+            for path in files_by_dir.get(rel, ()):
+                entry = self._entries.get(path)
+                if entry is None or entry.mtime_ns < threshold_ns:
+                    continue
+                try:
+                    stat = (self._root / path).stat()
+                except OSError:
+                    self._entries.pop(path, None)
+                    changes.removed.append(path)
+                    continue
+                self._update_file(path, self._root / path, stat, changes)
+
+    def _update_file(self, rel: str, path: Path, stat: os.stat_result, changes: IndexChanges) -> None:
+        old = self._entries.get(rel)
+        if old is not None and old.size == stat.st_size and old.mtime_ns == stat.st_mtime_ns:
+            return
+        try:
+            entry = read_csv_metadata(path, rel, stat)
+        except OSError as exc:
+            logger.warning(f"读取 CSV 元数据失败 {path}: {exc}")
+            return
+        self._entries[rel] = entry
+        (changes.added if old is None else changes.updated).append(entry)
+
+    # ---- Persistence ----
+
+    def _save(self) -> None:
+        payload = {
+            "version": INDEX_VERSION,
+            "dirs": self._dirs,
+            "files": [asdict(e) for e in self._entries.values()],
+        }
+        try:
+            self._index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._index_path.with_name(self._index_path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False)
+            os.replace(tmp_path, self._index_path)
+        except OSError as exc:
+            logger.warning(f"CSV 索引保存失败 {self._index_path}: {exc}")
+
+    def _load(self) -> None:
+        if not self._index_path.exists():
+            return
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != INDEX_VERSION:
+                return
+            entries = [CsvFileEntry(**item) for item in payload["files"]]
+            dirs = {str(k): int(v) for k, v in payload["dirs"].items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as exc:
+            logger.warning(f"CSV 索引损坏，重新建立: {exc}")
+            return
+        self._entries = {e.path: e for e in entries}
+        self._dirs = dirs
@@ -0,0 +1,129 @@
+"""CSV 日志的向量化加载
+
+日志格式：首行为列名，第一列为时间，其余为各通道数值。
+按块读取（默认 65536 行）并交给 np.loadtxt 的 C 解析器整体转换，
+只有含非法单元格/缺列的块才退回逐行解析，结果为每列一段连续的 float64 数组。
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+from numpy.typing import NDArray
+
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_ROWS = 65536
+
+
+@dataclass
+class CsvColumns:
+    """解析结果：共享的时间列与各数据列（非法单元格为 NaN）。"""
+
+    names: List[str]
+    x: NDArray[np.float64]
+    columns: List[NDArray[np.float64]]
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def column_points(self, index: int) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """返回第 index 列去掉 NaN 后的 (xs, ys)。"""
+        ys = self.columns[index]
+        valid = ~np.isnan(ys)
+        if valid.all():
+            return self.x, ys
+        return self.x[valid], ys[valid]
+
+
+def to_milliseconds(values: NDArray[np.float64]) -> NDArray[np.float64]:
+    """将时间值归一化为毫秒时间戳：>1e12 视为毫秒，其余（秒级时间戳/相对秒）乘 1000。"""
+    return np.where(values > 1e12, values, values * 1000.0)
+
+
+def _parse_chunk_slow(lines: List[str], width: int) -> NDArray[np.float64]:
+    """逐行解析：时间列非法的行丢弃，其余非法/缺失单元格记为 NaN。"""
+    rows: List[List[float]] = []
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        try:
+            time_val = float(row[0])
+        except ValueError:
+            continue
+        values = [time_val]
+        for i in range(1, width):
+            try:
+                values.append(float(row[i]))
+            except (ValueError, IndexError):
+                values.append(np.nan)
+        rows.append(values)
+    if not rows:
+        return np.empty((0, width), dtype=np.float64)
+    return np.asarray(rows, dtype=np.float64)
+
+
+def _parse_chunk(lines: List[str], width: int) -> NDArray[np.float64]:
+    try:
+        return np.loadtxt(
+            lines,
+            delimiter=",",
+            dtype=np.float64,
+            comments=None,
+            usecols=range(width),
+            ndmin=2,
+        )
+    except ValueError:
+        return _parse_chunk_slow(lines, width)
+
+
+def load_csv_columns(
+    path: str | Path,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    progress: Callable[[int, int], bool | None] | None = None,
+) -> CsvColumns:
+    """读取 CSV 为列数组，时间列统一转换为毫秒。
+
+    progress(已读字节, 总字节) 每块调用一次；返回 False 时中止并抛出 InterruptedError。
+    """
+    path = Path(path)
+    total_bytes = path.stat().st_size
+    chunk_rows = max(1, int(chunk_rows))
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line]), [])
+        names = header[1:]
+        width = len(header)
+        if width == 0:
+            return CsvColumns(names=[], x=np.empty(0), columns=[])
+
+        blocks: List[NDArray[np.float64]] = []
+        # 文本迭代时不能 tell()，按字符数近似已读字节
+        consumed = len(header_line)
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            block = _parse_chunk(lines, width)
+            if len(block):
+                blocks.append(block)
+            consumed += sum(len(line) for line in lines)
+            if progress is not None and progress(min(consumed, total_bytes), total_bytes) is False:
+                raise InterruptedError(f"CSV 解析已取消: {path}")
+
+    if blocks:
+        table = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+    else:
+        table = np.empty((0, width), dtype=np.float64)
+    # 每列复制为独立的连续数组，随后释放行优先的中间表
+    x = to_milliseconds(table[:, 0])
+    columns = [table[:, i].copy() for i in range(1, width)]
+    logger.debug(f"CSV 加载完成: {path.name} ({len(x)} 行, {len(columns)} 列)")
+    return CsvColumns(names=names, x=x, columns=columns)
@@ -1,5 +1,7 @@
+import bisect
 from pprint import pprint
 from pathlib import Path
+import threading
 import time
 from PySide6.QtCore import (
     QObject,
@@ -9,13 +11,22 @@ from PySide6.QtCore import (
     QAbstractTableModel,
     QModelIndex,
     QPersistentModelIndex,
+    QRunnable,
+    QThreadPool,
     Qt,
     Slot,
     QByteArray,
+    QFileSystemWatcher,
+    QTimer,
 )
 import random
-import csv
 
+import numpy as np
+
+from voc_app.gui.csv_index import CsvFileIndex
+from voc_app.gui.csv_pyramid import load_csv_with_pyramid
+from voc_app.gui.decimation import METHOD_LTTB, decimate, decimate_range
+from voc_app.gui.series_buffer import RingSeriesBuffer
 from voc_app.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -23,13 +34,39 @@ logger = get_logger(__name__)
 
 # 暴露列名和数据
 class ColumnData(QObject):
+    """单列曲线数据，内部以 float64 数组保存，点列表按需生成。
+
+    统计量（点数、坐标范围）在构造时向量化计算；dataPoints 只在 QML
+    真正读取时才转换为 [{x, y}, ...]，打开大文件时不会整体物化。
+    提供 pyramid（ColumnPyramid）时，降采样直接读取对应层级的桶极值。
+    """
+
     columnNameChanged = Signal()
     dataPointsChanged = Signal()
 
-    def __init__(self, name="", points=None, parent=None):
+    def __init__(self, name="", points=None, parent=None, xs=None, ys=None, pyramid=None):
         super().__init__(parent)
         self._column_name = name
-        self._data_points = points if points is not None else []
+        self._pyramid = pyramid
+        if xs is None or ys is None:
+            # 兼容旧接口：传入 [{"x":..., "y":...}, ...]
+            points = points if points is not None else []
+            xs = [float(p["x"]) for p in points]
+            ys = [float(p["y"]) for p in points]
+        self._xs = np.asarray(xs, dtype=np.float64)
+        self._ys = np.asarray(ys, dtype=np.float64)
+        if len(self._ys):
+            self._bounds = (
+                float(self._xs.min()),
+                float(self._xs.max()),
+                float(self._ys.min()),
+                float(self._ys.max()),
+            )
+        else:
+            self._bounds = (0.0, 0.0, 0.0, 0.0)
+        # 最近一次降采样请求与结果，多个绑定重复请求时直接复用
+        self._decimated_key = None
+        self._decimated_points = []
 
     @Property(str, notify=columnNameChanged)
     def columnName(self):
@@ -37,18 +74,88 @@ class ColumnData(QObject):
 
     @Property("QVariantList", notify=dataPointsChanged)  # pyright: ignore
     def dataPoints(self):
-        return self._data_points
+        return [{"x": x, "y": y} for x, y in zip(self._xs.tolist(), self._ys.tolist())]
+
+    @Property(int, notify=dataPointsChanged)
+    def pointCount(self):
+        return len(self._ys)
+
+    @Property(float, notify=dataPointsChanged)
+    def minX(self):
+        return self._bounds[0]
+
+    @Property(float, notify=dataPointsChanged)
+    def maxX(self):
+        return self._bounds[1]
+
+    @Property(float, notify=dataPointsChanged)
+    def minY(self):
+        return self._bounds[2]
+
+    @Property(float, notify=dataPointsChanged)
+    def maxY(self):
+        return self._bounds[3]
+
+    @property
+    def xs(self):
+        return self._xs
+
+    @property
+    def ys(self):
+        return self._ys
+
+    @Slot(int, result="QVariantMap")  # pyright: ignore
+    def pointAt(self, index):
+        if not (0 <= index < len(self._ys)):
+            return {}
+        return {"x": float(self._xs[index]), "y": float(self._ys[index])}
+
+    @Slot(float, float, result="QVariantList")  # pyright: ignore
+    def pointsInRange(self, min_x, max_x):
+        """返回 x 落在 [min_x, max_x] 内的点（x 需单调递增）。"""
+        lo = int(np.searchsorted(self._xs, min_x, side="left"))
+        hi = int(np.searchsorted(self._xs, max_x, side="right"))
+        return [
+            {"x": x, "y": y}
+            for x, y in zip(self._xs[lo:hi].tolist(), self._ys[lo:hi].tolist())
+        ]
+
+    @Slot(float, float, int, result="QVariantList")  # pyright: ignore
+    @Slot(float, float, int, str, result="QVariantList")  # pyright: ignore
+    def decimatedPoints(self, min_x, max_x, pixel_width, method=METHOD_LTTB):
+        """返回 [min_x, max_x] 内按像素宽度降采样后的点，范围无效（如 NaN）时取全部数据。"""
+        if not min_x <= max_x:
+            min_x, max_x = self._bounds[0], self._bounds[1]
+        key = (min_x, max_x, int(pixel_width), method)
+        if key != self._decimated_key:
+            level_points = None
+            if self._pyramid is not None:
+                level_points = self._pyramid.minmax_points(min_x, max_x, max(1, int(pixel_width)))
+            if level_points is not None:
+                # 层级桶数在 [像素宽度, 4 倍像素宽度) 之间，再降到 2 倍像素宽度
+                xs, ys = decimate(*level_points, 2 * max(1, int(pixel_width)), method)
+            else:
+                xs, ys = decimate_range(self._xs, self._ys, min_x, max_x, pixel_width, method)
+            self._decimated_points = [
+                {"x": x, "y": y} for x, y in zip(xs.tolist(), ys.tolist())
+            ]
+            self._decimated_key = key
+        return self._decimated_points
 
 
 class SeriesTableModel(QAbstractTableModel):
-    """二维表格模型，供 VXYModelMapper 动态映射 X/Y 数据。"""
+    """二维表格模型，供 VXYModelMapper 动态映射 X/Y 数据。
+
+    数据存放在 RingSeriesBuffer 中：追加与淘汰均为 O(1)，坐标边界由滑动
+    min/max 增量维护，因此 max_rows 提高到数万行时单点追加的开销不随窗口增长。
+    """
 
     boundsChanged = Signal()
 
     def __init__(self, max_rows=120, parent=None):
         super().__init__(parent)
-        self._rows = []
         self._max_rows = max_rows
+        self._buffer = RingSeriesBuffer(max_rows)
         self._min_x = 0.0
         self._max_x = 0.0
         self._min_y = 0.0
@@ -64,17 +171,20 @@ class SeriesTableModel(QAbstractTableModel):
         if value <= 0 or value == self._max_rows:
             return
         self._max_rows = value
-        if len(self._rows) > self._max_rows:
+        overflow = len(self._buffer) - value
+        if overflow > 0:
             # 超出限制后主动裁剪，确保内存可控
-            overflow = len(self._rows) - self._max_rows
             self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
-            del self._rows[:overflow]
+            self._buffer.discard_oldest(overflow)
+            self._buffer.set_capacity(value)
             self.endRemoveRows()
-            if self._recalculate_bounds():
+            if self._refresh_bounds():
                 self.boundsChanged.emit()
+        else:
+            self._buffer.set_capacity(value)
 
     def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()):
-        return 0 if parent.isValid() else len(self._rows)
+        return 0 if parent.isValid() else len(self._buffer)
 
     def columnCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()):
         return 0 if parent.isValid() else 2
@@ -82,10 +192,13 @@ class SeriesTableModel(QAbstractTableModel):
     def data(self, index, role: int = Qt.ItemDataRole.DisplayRole):
         if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
             return None
-        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+        if not index.isValid() or not (0 <= index.row() < len(self._buffer)):
             return None
-        row = self._rows[index.row()]
-        return row[index.column()]
+        if index.column() == 0:
+            return self._buffer.x_at(index.row())
+        if index.column() == 1:
+            return self._buffer.y_at(index.row())
+        return None
 
     @Property(float, notify=boundsChanged)
     def minX(self):
@@ -105,42 +218,78 @@ class SeriesTableModel(QAbstractTableModel):
 
     @Property(bool, notify=boundsChanged)
     def hasData(self):
-        return bool(self._rows)
+        return len(self._buffer) > 0
 
     @Slot(float, float)
     def append_point(self, x, y):
         """向表格追加一条新数据，同时维护最大行数和坐标范围。"""
         x = float(x)
         y = float(y)
-        bounds_changed = False
 
-        if len(self._rows) == self._max_rows and self._rows:
+        if len(self._buffer) == self._max_rows:
+            # 环形缓冲区满：只移动头指针淘汰最旧一行
             self.beginRemoveRows(QModelIndex(), 0, 0)
-            self._rows.pop(0)
+            self._buffer.discard_oldest(1)
             self.endRemoveRows()
-            bounds_changed = self._recalculate_bounds()
 
-        row_index = len(self._rows)
+        row_index = len(self._buffer)
         self.beginInsertRows(QModelIndex(), row_index, row_index)
-        self._rows.append([x, y])
+        self._buffer.append(x, y)
         self.endInsertRows()
-        bounds_changed = self._update_bounds(x, y) or bounds_changed
 
-        if bounds_changed:
+        if self._refresh_bounds():
+            self.boundsChanged.emit()
+
+    def append_points(self, xs, ys):
+        """批量追加数据点：整批只触发一次删除与一次插入，并只发一次 boundsChanged。
+
+        xs/ys 可以是列表或 NumPy 数组，长度不一致时按较短者截断；
+        y 为 NaN 的点视为该通道无数据，直接跳过。
+        """
+        xs_arr = np.asarray(xs, dtype=np.float64).ravel()
+        ys_arr = np.asarray(ys, dtype=np.float64).ravel()
+        count = min(len(xs_arr), len(ys_arr))
+        if count == 0:
+            return
+        xs_arr = xs_arr[:count]
+        ys_arr = ys_arr[:count]
+        valid = ~np.isnan(ys_arr)
+        if not valid.all():
+            xs_arr = xs_arr[valid]
+            ys_arr = ys_arr[valid]
+        if len(xs_arr) > self._max_rows:
+            # 单批超过容量时，只保留最新的 max_rows 条
+            xs_arr = xs_arr[-self._max_rows :]
+            ys_arr = ys_arr[-self._max_rows :]
+        count = len(xs_arr)
+        if count == 0:
+            return
+
+        overflow = len(self._buffer) + count - self._max_rows
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._buffer.discard_oldest(overflow)
+            self.endRemoveRows()
+        row_index = len(self._buffer)
+        self.beginInsertRows(QModelIndex(), row_index, row_index + count - 1)
+        self._buffer.extend(xs_arr, ys_arr)
+        self.endInsertRows()
+
+        if self._refresh_bounds():
             self.boundsChanged.emit()
 
     @Slot()
     def clear(self):
         """清空全部数据并重置坐标范围。"""
         if (
-            not self._rows
+            not len(self._buffer)
             and self._min_x == self._max_x == self._min_y == self._max_y == 0.0
             and not self._has_data
         ):
             return
 
         self.beginResetModel()
-        self._rows.clear()
+        self._buffer.clear()
         self._min_x = self._max_x = 0.0
         self._min_y = self._max_y = 0.0
         self._has_data = False
@@ -153,43 +302,10 @@ class SeriesTableModel(QAbstractTableModel):
         self.beginResetModel()
         self.endResetModel()
 
-    def _update_bounds(self, x, y):
-        """增量更新坐标边界，减少不必要的遍历。"""
-        if not self._rows:
-            return False
-
-        changed = False
-        if len(self._rows) == 1:
-            if (
-                self._min_x != x
-                or self._max_x != x
-                or self._min_y != y
-                or self._max_y != y
-            ):
-                self._min_x = self._max_x = x
-                self._min_y = self._max_y = y
-                self._has_data = True
-                changed = True
-            return changed
-
-        if x < self._min_x:
-            self._min_x = x
-            changed = True
-        if x > self._max_x:
-            self._max_x = x
-            changed = True
-        if y < self._min_y:
-            self._min_y = y
-            changed = True
-        if y > self._max_y:
-            self._max_y = y
-            changed = True
-        self._has_data = True
-        return changed
-
-    def _recalculate_bounds(self):
-        """当移除旧数据后重算一次边界。"""
-        if not self._rows:
+    def _refresh_bounds(self):
+        """从滑动极值读取当前边界，返回边界是否变化。"""
+        bounds = self._buffer.bounds()
+        if bounds is None:
             changed = any(
                 value != 0.0
                 for value in (self._min_x, self._max_x, self._min_y, self._max_y)
@@ -199,24 +315,10 @@ class SeriesTableModel(QAbstractTableModel):
             self._has_data = False
             return changed
 
-        xs = [row[0] for row in self._rows]
-        ys = [row[1] for row in self._rows]
-        new_min_x = min(xs)
-        new_max_x = max(xs)
-        new_min_y = min(ys)
-        new_max_y = max(ys)
         self._has_data = True
-        if (
-            new_min_x == self._min_x
-            and new_max_x == self._max_x
-            and new_min_y == self._min_y
-            and new_max_y == self._max_y
-        ):
+        if bounds == (self._min_x, self._max_x, self._min_y, self._max_y):
             return False
-        self._min_x = new_min_x
-        self._max_x = new_max_x
-        self._min_y = new_min_y
-        self._max_y = new_max_y
+        self._min_x, self._max_x, self._min_y, self._max_y = bounds
         return True
 
 
@@ -312,6 +414,10 @@ class ChartDataListModel(QAbstractListModel):
 class CsvDataModel(QAbstractListModel):
     ColumnNameRole = Qt.ItemDataRole.UserRole + 1
     DataPointsRole = Qt.ItemDataRole.UserRole + 2
+    PointCountRole = Qt.ItemDataRole.UserRole + 3
+    MinYRole = Qt.ItemDataRole.UserRole + 4
+    MaxYRole = Qt.ItemDataRole.UserRole + 5
+    ColumnDataRole = Qt.ItemDataRole.UserRole + 6
     columnNamesChanged = Signal()
 
     def __init__(self, parent=None):
@@ -328,6 +434,14 @@ class CsvDataModel(QAbstractListModel):
             return item.columnName
         if role == self.DataPointsRole:
             return item.dataPoints
+        if role == self.PointCountRole:
+            return item.pointCount
+        if role == self.MinYRole:
+            return item.minY
+        if role == self.MaxYRole:
+            return item.maxY
+        if role == self.ColumnDataRole:
+            return item
         return None
 
     def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()):
@@ -337,6 +451,10 @@ class CsvDataModel(QAbstractListModel):
         return {
             self.ColumnNameRole: QByteArray(b"columnName"),
             self.DataPointsRole: QByteArray(b"dataPoints"),
+            self.PointCountRole: QByteArray(b"pointCount"),
+            self.MinYRole: QByteArray(b"minY"),
+            self.MaxYRole: QByteArray(b"maxY"),
+            self.ColumnDataRole: QByteArray(b"columnData"),
         }
 
     @Property("QStringList", notify=columnNamesChanged) # pyright: ignore
@@ -346,8 +464,13 @@ class CsvDataModel(QAbstractListModel):
     def resetModelData(self, data):
         # 告诉视图模型数据即将要被重置
         self.beginResetModel()
+        old_data = self._data
         self._data = data
         self.endResetModel()
+        # 旧列对象挂在模型下，替换后释放，避免反复打开文件时数组常驻内存
+        for item in old_data:
+            if item not in data and item.parent() is self:
+                item.deleteLater()
         new_names = [item.columnName for item in self._data]
         if new_names != self._column_names:
             self._column_names = new_names
@@ -358,19 +481,370 @@ class CsvDataModel(QAbstractListModel):
         if not (0 <= row < len(self._data)):
             return {}
         item = self._data[row]
-        return {"columnName": item.columnName, "dataPoints": item.dataPoints}
+        return {
+            "columnName": item.columnName,
+            "dataPoints": item.dataPoints,
+            "pointCount": item.pointCount,
+            "minY": item.minY,
+            "maxY": item.maxY,
+        }
+
+    @Slot(int, result=QObject)
+    def columnAt(self, row):
+        """返回第 row 列的 ColumnData，不物化点列表。"""
+        if not (0 <= row < len(self._data)):
+            return None
+        return self._data[row]
+
+
+class CsvFileListModel(QAbstractListModel):
+    """CSV 文件索引的列表模型，排序与过滤在 Python 侧完成。
+
+    内部按 (排序值, 路径) 升序保存可见行，降序时倒序映射行号；
+    索引的增量变化通过二分定位后逐行插入/删除，不重置整个模型。
+    """
+
+    PathRole = Qt.ItemDataRole.UserRole + 1
+    NameRole = Qt.ItemDataRole.UserRole + 2
+    DirectoryRole = Qt.ItemDataRole.UserRole + 3
+    SizeRole = Qt.ItemDataRole.UserRole + 4
+    ModifiedRole = Qt.ItemDataRole.UserRole + 5
+    RowsRole = Qt.ItemDataRole.UserRole + 6
+    ColumnsRole = Qt.ItemDataRole.UserRole + 7
+    StartTimeRole = Qt.ItemDataRole.UserRole + 8
+    EndTimeRole = Qt.ItemDataRole.UserRole + 9
+
+    SORT_KEYS = {
+        "path": lambda e: e.path.lower(),
+        "name": lambda e: e.name.lower(),
+        "modified": lambda e: e.mtime_ns,
+        "size": lambda e: e.size,
+        "rows": lambda e: e.rows,
+        "startTime": lambda e: e.start_ms,
+        "endTime": lambda e: e.end_ms,
+    }
+
+    countChanged = Signal()
+    sortChanged = Signal()
+    filterTextChanged = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._all = {}
+        self._rows = []
+        self._keys = []
+        self._sort_key = "path"
+        self._sort_ascending = True
+        self._filter_text = ""
+
+    # ---- 排序与过滤 ----
+
+    def _key(self, entry):
+        value = self.SORT_KEYS[self._sort_key](entry)
+        # 缺失值（如无法解析的时间范围）排在最后
+        return (value is None, value if value is not None else 0, entry.path)
+
+    def _accepts(self, entry):
+        return not self._filter_text or self._filter_text in entry.path.lower()
+
+    def _row_for(self, position, count):
+        return position if self._sort_ascending else count - 1 - position
+
+    def _rebuild(self):
+        self.beginResetModel()
+        self._rows = sorted((e for e in self._all.values() if self._accepts(e)), key=self._key)
+        self._keys = [self._key(e) for e in self._rows]
+        self.endResetModel()
+        self.countChanged.emit()
+
+    @Property(str, notify=sortChanged)
+    def sortKey(self):  # pyright: ignore[reportRedeclaration]
+        return self._sort_key
+
+    @sortKey.setter
+    def sortKey(self, value):
+        if value == self._sort_key or value not in self.SORT_KEYS:
+            return
+        self._sort_key = value
+        self._rebuild()
+        self.sortChanged.emit()
+
+    @Property(bool, notify=sortChanged)
+    def sortAscending(self):  # pyright: ignore[reportRedeclaration]
+        return self._sort_ascending
+
+    @sortAscending.setter
+    def sortAscending(self, value):
+        if bool(value) == self._sort_ascending:
+            return
+        self.beginResetModel()
+        self._sort_ascending = bool(value)
+        self.endResetModel()
+        self.sortChanged.emit()
+
+    @Property(str, notify=filterTextChanged)
+    def filterText(self):  # pyright: ignore[reportRedeclaration]
+        return self._filter_text
+
+    @filterText.setter
+    def filterText(self, value):
+        value = (value or "").strip().lower()
+        if value == self._filter_text:
+            return
+        self._filter_text = value
+        self._rebuild()
+        self.filterTextChanged.emit()
+
+    @Property(int, notify=countChanged)
+    def count(self):
+        return len(self._rows)
+
+    # ---- 数据更新 ----
+
+    def set_entries(self, entries):
+        """整体替换条目（首次加载索引时使用）。"""
+        self._all = {e.path: e for e in entries}
+        self._rebuild()
+
+    def apply_changes(self, changes):
+        """按 IndexChanges 增量更新可见行。"""
+        count_before = len(self._rows)
+        for path in changes.removed:
+            old = self._all.pop(path, None)
+            if old is not None:
+                self._remove_visible(old)
+        for entry in changes.updated:
+            old = self._all.get(entry.path)
+            self._all[entry.path] = entry
+            if old is not None:
+                self._remove_visible(old)
+            self._insert_visible(entry)
+        for entry in changes.added:
+            self._all[entry.path] = entry
+            self._insert_visible(entry)
+        if len(self._rows) != count_before:
+            self.countChanged.emit()
+
+    def _remove_visible(self, entry):
+        key = self._key(entry)
+        position = bisect.bisect_left(self._keys, key)
+        if position >= len(self._keys) or self._keys[position] != key:
+            return
+        row = self._row_for(position, len(self._rows))
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[position]
+        del self._keys[position]
+        self.endRemoveRows()
+
+    def _insert_visible(self, entry):
+        if not self._accepts(entry):
+            return
+        key = self._key(entry)
+        position = bisect.bisect_left(self._keys, key)
+        row = self._row_for(position, len(self._rows) + 1)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(position, entry)
+        self._keys.insert(position, key)
+        self.endInsertRows()
+
+    # ---- 模型接口 ----
+
+    def _entry(self, row):
+        if not (0 <= row < len(self._rows)):
+            return None
+        return self._rows[row if self._sort_ascending else len(self._rows) - 1 - row]
+
+    def rowCount(self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role: int = Qt.ItemDataRole.DisplayRole):
+        entry = self._entry(index.row()) if index.isValid() else None
+        if entry is None:
+            return None
+        if role in (self.PathRole, Qt.ItemDataRole.DisplayRole):
+            return entry.path
+        if role == self.NameRole:
+            return entry.name
+        if role == self.DirectoryRole:
+            return entry.directory
+        if role == self.SizeRole:
+            return entry.size
+        if role == self.ModifiedRole:
+            return entry.mtime_ns / 1e6
+        if role == self.RowsRole:
+            return entry.rows
+        if role == self.ColumnsRole:
+            return list(entry.columns)
+        if role == self.StartTimeRole:
+            return entry.start_ms if entry.start_ms is not None else float("nan")
+        if role == self.EndTimeRole:
+            return entry.end_ms if entry.end_ms is not None else float("nan")
+        return None
+
+    def roleNames(self):
+        return {
+            self.PathRole: QByteArray(b"path"),
+            self.NameRole: QByteArray(b"name"),
+            self.DirectoryRole: QByteArray(b"directory"),
+            self.SizeRole: QByteArray(b"size"),
+            self.ModifiedRole: QByteArray(b"modified"),
+            self.RowsRole: QByteArray(b"rows"),
+            self.ColumnsRole: QByteArray(b"columns"),
+            self.StartTimeRole: QByteArray(b"startTime"),
+            self.EndTimeRole: QByteArray(b"endTime"),
+        }
+
+    @Slot(result="QStringList")  # pyright: ignore
+    def paths(self):
+        """按当前排序返回可见文件的相对路径。"""
+        return [self._entry(row).path for row in range(len(self._rows))]
+
+    @Slot(int, result="QVariantMap")  # pyright: ignore
+    def get(self, row):
+        entry = self._entry(row)
+        if entry is None:
+            return {}
+        names = self.roleNames()
+        index = self.index(row)
+        return {bytes(names[role]).decode(): self.data(index, role) for role in names}
+
+
+class _CsvParseSignals(QObject):
+    """解析任务的信号中转（QRunnable 不是 QObject），均带上任务代号。"""
+
+    progress = Signal(int, float)
+    finished = Signal(int, str, object)
+    failed = Signal(int, str, str)
+
+
+class _CsvParseTask(QRunnable):
+    """在线程池中解析 CSV，cancel 事件置位后在下一块边界退出。"""
+
+    def __init__(self, generation, file_path, relative_path, signals, cancel_event):
+        super().__init__()
+        self._generation = generation
+        self._file_path = file_path
+        self._relative_path = relative_path
+        self._signals = signals
+        self._cancel_event = cancel_event
+
+    def _report(self, done, total):
+        if self._cancel_event.is_set():
+            return False
+        ratio = done / total if total > 0 else 1.0
+        self._signals.progress.emit(self._generation, ratio)
+        return True
+
+    def run(self):
+        try:
+            table, pyramid = load_csv_with_pyramid(self._file_path, progress=self._report)
+            # NaN 过滤也放在工作线程，主线程只负责创建 ColumnData 并替换模型
+            columns = [
+                (name, *table.column_points(i), pyramid.column(i) if len(pyramid) else None)
+                for i, name in enumerate(table.names)
+            ]
+        except InterruptedError:
+            logger.debug(f"CSV 解析已取消: {self._file_path}")
+            return
+        except (OSError, ValueError) as exc:
+            logger.error(f"CSV 解析失败 {self._file_path}: {exc}")
+            self._signals.failed.emit(self._generation, self._relative_path, str(exc))
+            return
+        except Exception as exc:  # noqa: BLE001
+            # 任何异常都要报告失败，否则 parsing 状态永远不会结束
+            logger.exception(f"CSV 解析异常 {self._file_path}: {exc!r}")
+            self._signals.failed.emit(self._generation, self._relative_path, str(exc))
+            return
+        if self._cancel_event.is_set():
+            return
+        self._signals.finished.emit(self._generation, self._relative_path, columns)
+
+
+class _CsvIndexSignals(QObject):
+    """索引刷新任务的信号中转，结果排队回到主线程应用。
+
+    refreshed(changes, paths, directories)：变化与刷新后的文件、目录快照，
+    主线程直接使用快照，不再访问索引（下一次刷新可能正持有索引锁）。
+    """
+
+    refreshed = Signal(object, object, object)
+
+
+class _CsvIndexRefreshTask(QRunnable):
+    """在线程池中刷新文件索引（扫描目录、读取新文件元数据）。"""
+
+    def __init__(self, index, full, signals):
+        super().__init__()
+        self._index = index
+        self._full = full
+        self._signals = signals
+
+    def run(self):
+        try:
+            changes = self._index.refresh(full=self._full)
+        except Exception as exc:  # noqa: BLE001
+            # 仍需回报，否则 refreshing 状态永远不会结束
+            logger.exception(f"CSV 索引刷新异常: {exc!r}")
+            changes = None
+        self._signals.refreshed.emit(changes, self._index.paths(), self._index.directories())
 
 
 class CsvFileManager(QObject):
+    """CSV 日志文件列表与后台解析。
+
+    parse_csv_file 只提交解析任务并立即返回；再次调用会取消尚未完成的任务，
+    只有最后一次请求的结果会在主线程一次性替换 CsvDataModel 的内容。
+    文件列表来自持久化的 CsvFileIndex，目录变化由 QFileSystemWatcher 触发增量刷新；
+    刷新（含读取新文件统计行数）在单独的工作线程执行，完成后在主线程应用变化。
+    """
+
     csvFilesChanged = Signal()
     activeFileChanged = Signal()
+    parsingChanged = Signal()
+    parseProgressChanged = Signal()
+    parseFailed = Signal(str, str)
+    refreshingChanged = Signal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, log_dir=None, index_path=None):
         super().__init__(parent)
-        self._log_dir = Path(__file__).parent / "Log"
-        self._csv_files = []
+        self._log_dir = Path(log_dir) if log_dir is not None else Path(__file__).parent / "Log"
         self._data_model = CsvDataModel(self)
         self._active_file = ""
+
+        self._index = CsvFileIndex(self._log_dir, index_path)
+        self._csv_files = self._index.paths()
+        self._file_list_model = CsvFileListModel(self)
+        self._file_list_model.set_entries(self._index.entries)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._schedule_refresh)
+        # 合并短时间内的多次目录变化（如批量下载）
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(300)
+        self._refresh_timer.timeout.connect(self.list_csv_files)
+
+        # 单线程池：被取消的任务在当前块解析完后即退出，新任务随后开始
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._parse_signals = _CsvParseSignals(self)
+        self._parse_signals.progress.connect(self._on_parse_progress)
+        self._parse_signals.finished.connect(self._on_parse_finished)
+        self._parse_signals.failed.connect(self._on_parse_failed)
+        self._generation = 0
+        self._cancel_event = None
+        self._pending_file = ""
+        self._parsing = False
+        self._parse_progress = 0.0
+
+        # 索引刷新单独一个线程，不与解析任务排队；刷新期间的新请求合并为一次
+        self._index_pool = QThreadPool(self)
+        self._index_pool.setMaxThreadCount(1)
+        self._index_signals = _CsvIndexSignals(self)
+        self._index_signals.refreshed.connect(self._on_index_refreshed)
+        self._refreshing = False
+        self._refresh_pending = None
+
+        self._watch_directories(self._index.directories())
         self.list_csv_files()
 
     @Property(list, notify=csvFilesChanged)
@@ -386,70 +860,166 @@ class CsvFileManager(QObject):
     def dataModel(self):
         return self._data_model
 
-    def list_csv_files(self):
+    @Property(QObject, constant=True)
+    def fileListModel(self):
+        return self._file_list_model
+
+    @Property(bool, notify=parsingChanged)
+    def parsing(self):
+        return self._parsing
+
+    @Property(float, notify=parseProgressChanged)
+    def parseProgress(self):
+        return self._parse_progress
+
+    @Property(bool, notify=refreshingChanged)
+    def refreshing(self):
+        return self._refreshing
+
+    def _set_parsing(self, parsing):
+        if self._parsing != parsing:
+            self._parsing = parsing
+            self.parsingChanged.emit()
+
+    def _set_parse_progress(self, progress):
+        if self._parse_progress != progress:
+            self._parse_progress = progress
+            self.parseProgressChanged.emit()
+
+    @Slot()
+    def list_csv_files(self, full=False):
+        """在工作线程增量刷新文件索引，只处理变化的目录与文件。
+
+        立即返回；刷新进行中再次调用时，合并为结束后的一次刷新。
+        """
         if not self._log_dir.exists():
             logger.debug(f"创建日志目录: {self._log_dir}")
             self._log_dir.mkdir()
 
-        files = []
-        for path in self._log_dir.rglob("*.csv"):
-            if path.is_file():
-                files.append(path.relative_to(self._log_dir).as_posix())
-        files.sort()
-        # 更新文件列表并发出信号
-        if self._csv_files != files:
-            logger.debug(f"发现 {len(files)} 个 CSV 文件")
-            self._csv_files = files
-            self.csvFilesChanged.emit()
+        if self._refreshing:
+            self._refresh_pending = bool(full or self._refresh_pending)
+            return
+        self._refreshing = True
+        self.refreshingChanged.emit()
+        self._index_pool.start(_CsvIndexRefreshTask(self._index, full, self._index_signals))
+
+    @Slot(object, object, object)
+    def _on_index_refreshed(self, changes, files, directories):
+        # 先应用本次刷新的快照，再启动合并的下一次刷新
+        self._watch_directories(directories)
+        if changes:
+            self._file_list_model.apply_changes(changes)
+            # 更新文件列表并发出信号
+            if self._csv_files != files:
+                logger.debug(f"发现 {len(files)} 个 CSV 文件")
+                self._csv_files = files
+                self.csvFilesChanged.emit()
+        if self._refresh_pending is not None:
+            full, self._refresh_pending = self._refresh_pending, None
+            self._index_pool.start(_CsvIndexRefreshTask(self._index, full, self._index_signals))
+        else:
+            self._refreshing = False
+            self.refreshingChanged.emit()
+
+    @Slot()
+    def rescan(self):
+        """忽略目录 mtime，逐个核对所有文件（手动刷新）。"""
+        self.list_csv_files(full=True)
+
+    def _watch_directories(self, directories):
+        wanted = {str(path) for path in directories}
+        watched = set(self._watcher.directories())
+        stale = watched - wanted
+        if stale:
+            self._watcher.removePaths(sorted(stale))
+        missing = wanted - watched
+        if missing:
+            self._watcher.addPaths(sorted(missing))
+
+    @Slot(str)
+    def _schedule_refresh(self, _path=""):
+        self._refresh_timer.start()
 
     @Slot(str)
     def parse_csv_file(self, filename):
-        relative_path = Path(filename)
-        file_path = self._log_dir / relative_path
+        normalized = Path(filename).as_posix()
+        # 同一文件正在解析时（如视图切换重复触发）不重新提交
+        if self._parsing and normalized == self._pending_file:
+            return
+        self.cancelParsing()
+
+        file_path = self._log_dir / normalized
         if not file_path.exists():
             logger.warning(f"CSV 文件不存在: {file_path}")
             self._data_model.resetModelData([])
             return
 
         logger.info(f"解析 CSV 文件: {file_path}")
-
-        def to_milliseconds(value: float) -> float:
-            """将时间值归一化为毫秒时间戳，支持秒/毫秒或相对秒。"""
-            if value > 1e12:
-                return value  # 已是毫秒
-            if value > 1e9:
-                return value * 1000.0  # 秒级时间戳
-            return value * 1000.0  # 相对秒
-
-        with open(file_path, "r", newline="", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            # 读取第一行作为列名
-            header = next(reader)
-
-            parsed_data = []
-            # 跳过第一列（时间列）
-            column_names = header[1:]
-            # 每列一个列表
-            for name in column_names:
-                parsed_data.append([])
-
-            for row in reader:
-                try:
-                    time_val = to_milliseconds(float(row[0]))
-                    for i in range(1, len(row)):
-                        parsed_data[i - 1].append({"x": time_val, "y": float(row[i])})
-                except (ValueError, IndexError):
-                    continue
-
-        final_data = []
-        for i, name in enumerate(column_names):
-            final_data.append(
-                ColumnData(name=name, points=parsed_data[i], parent=self._data_model)
+        self._generation += 1
+        self._cancel_event = threading.Event()
+        self._pending_file = normalized
+        self._set_parse_progress(0.0)
+        self._set_parsing(True)
+        self._pool.start(
+            _CsvParseTask(
+                self._generation, file_path, normalized, self._parse_signals, self._cancel_event
             )
+        )
 
+    @Slot()
+    def cancelParsing(self):
+        """取消尚未完成的解析，模型保持原内容。"""
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self._cancel_event = None
+        # 代号递增后，已在队列中的旧结果都会被丢弃
+        self._generation += 1
+        self._pending_file = ""
+        self._set_parsing(False)
+
+    def wait_for_parsing(self, timeout_ms=-1):
+        """等待线程池中的任务结束（测试与退出时使用），结果仍需事件循环派发。"""
+        return self._pool.waitForDone(timeout_ms)
+
+    def wait_for_index(self, timeout_ms=-1):
+        """等待索引刷新任务结束（测试与退出时使用），结果仍需事件循环派发。"""
+        return self._index_pool.waitForDone(timeout_ms)
+
+    def shutdown(self):
+        """取消解析并等待工作线程退出。"""
+        self.cancelParsing()
+        self._refresh_pending = None
+        self.wait_for_parsing(5000)
+        self.wait_for_index(5000)
+
+    @Slot(int, float)
+    def _on_parse_progress(self, generation, progress):
+        if generation == self._generation:
+            self._set_parse_progress(progress)
+
+    @Slot(int, str, object)
+    def _on_parse_finished(self, generation, relative_path, columns):
+        if generation != self._generation:
+            return
+        final_data = [
+            ColumnData(name=name, xs=xs, ys=ys, pyramid=pyramid, parent=self._data_model)
+            for name, xs, ys, pyramid in columns
+        ]
         self._data_model.resetModelData(final_data)
 
-        normalized = relative_path.as_posix()
-        if self._active_file != normalized:
-            self._active_file = normalized
+        self._pending_file = ""
+        self._cancel_event = None
+        self._set_parse_progress(1.0)
+        self._set_parsing(False)
+        if self._active_file != relative_path:
+            self._active_file = relative_path
             self.activeFileChanged.emit()
+
+    @Slot(int, str, str)
+    def _on_parse_failed(self, generation, relative_path, message):
+        if generation != self._generation:
+            return
+        self._pending_file = ""
+        self._cancel_event = None
+        self._set_parsing(False)
+        self.parseFailed.emit(relative_path, message)
@@ -0,0 +1,292 @@
+"""CSV 日志的多分辨率金字塔与旁路缓存
+
+行数足以构建金字塔（>= 64 × 64 行）的 CSV 旁边保存一个隐藏的压缩
+``.<文件名>.pyr.npz``；小文件直接解析文本，不写缓存：
+
+- 原始列数组（时间列 + 各数据列），再次打开时直接读取二进制，无需重新解析文本；
+- 若干降采样层级：第 0 层每桶 64 行，之后每层合并 4 个桶，直到桶数不足 64。
+  每桶按列记录 min/max（及其所在 x）、和与有效点数（用于求均值）。
+
+缓存以源文件的大小和 mtime 为键，源文件变化后自动重建。
+缩放/平移时按可视范围选择桶数刚好覆盖像素宽度的层级，查询代价与可视桶数成正比。
+"""
+
+from __future__ import annotations
+
+import os
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List
+
+import numpy as np
+from numpy.typing import NDArray
+
+from voc_app.gui.csv_loader import CsvColumns, load_csv_columns
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+PYRAMID_VERSION = 1
+BASE_BUCKET_ROWS = 64
+LEVEL_FACTOR = 4
+MIN_LEVEL_BUCKETS = 64
+
+
+def sidecar_path(csv_path: str | Path) -> Path:
+    """返回 CSV 对应的金字塔文件路径（隐藏文件，不会出现在文件浏览器中）。"""
+    csv_path = Path(csv_path)
+    return csv_path.with_name(f".{csv_path.name}.pyr.npz")
+
+
+@dataclass
+class PyramidLevel:
+    """一个降采样层级；二维数组形状均为 (列数, 桶数)，空桶的 min/max 为 ±inf。"""
+
+    bucket_rows: int
+    x_first: NDArray[np.float64]
+    x_last: NDArray[np.float64]
+    mins: NDArray[np.float64]
+    maxs: NDArray[np.float64]
+    x_at_min: NDArray[np.float64]
+    x_at_max: NDArray[np.float64]
+    sums: NDArray[np.float64]
+    counts: NDArray[np.int64]
+
+    def __len__(self) -> int:
+        return len(self.x_first)
+
+    @property
+    def means(self) -> NDArray[np.float64]:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.counts > 0, self.sums / np.maximum(self.counts, 1), np.nan)
+
+    def visible(self, min_x: float, max_x: float) -> tuple[int, int]:
+        """返回与 [min_x, max_x] 相交的桶下标范围 [lo, hi)。"""
+        lo = int(np.searchsorted(self.x_last, min_x, side="left"))
+        hi = int(np.searchsorted(self.x_first, max_x, side="right"))
+        return lo, max(lo, hi)
+
+
+def _pick_along(
+    values: NDArray[np.float64],
+    group_values: NDArray[np.float64],
+    counts: NDArray[np.int64],
+    starts: NDArray[np.intp],
+    source_x: NDArray[np.float64],
+) -> NDArray[np.float64]:
+    """在每组中找到第一个取到组极值的子桶，返回其 x。"""
+    width = values.shape[1]
+    positions = np.broadcast_to(np.arange(width, dtype=np.intp), values.shape)
+    hit = values == np.repeat(group_values, counts, axis=1)
+    first = np.minimum.reduceat(np.where(hit, positions, width), starts, axis=1)
+    return np.take_along_axis(source_x, np.minimum(first, width - 1), axis=1)
+
+
+def _coarsen(
+    x_first: NDArray[np.float64],
+    x_last: NDArray[np.float64],
+    mins: NDArray[np.float64],
+    maxs: NDArray[np.float64],
+    x_at_min: NDArray[np.float64],
+    x_at_max: NDArray[np.float64],
+    sums: NDArray[np.float64],
+    counts: NDArray[np.int64],
+    factor: int,
+) -> PyramidLevel:
+    width = len(x_first)
+    starts = np.arange(0, width, factor, dtype=np.intp)
+    ends = np.minimum(starts + factor, width)
+    group_sizes = ends - starts
+    group_mins = np.minimum.reduceat(mins, starts, axis=1)
+    group_maxs = np.maximum.reduceat(maxs, starts, axis=1)
+    return PyramidLevel(
+        bucket_rows=0,
+        x_first=x_first[starts],
+        x_last=x_last[ends - 1],
+        mins=group_mins,
+        maxs=group_maxs,
+        x_at_min=_pick_along(mins, group_mins, group_sizes, starts, x_at_min),
+        x_at_max=_pick_along(maxs, group_maxs, group_sizes, starts, x_at_max),
+        sums=np.add.reduceat(sums, starts, axis=1),
+        counts=np.add.reduceat(counts, starts, axis=1),
+    )
+
+
+class CsvPyramid:
+    """一个 CSV 文件所有列共享的降采样层级（由细到粗）。"""
+
+    def __init__(self, levels: List[PyramidLevel]) -> None:
+        self.levels = levels
+
+    @classmethod
+    def build(
+        cls,
+        x: NDArray[np.float64],
+        values: NDArray[np.float64],
+        base_bucket_rows: int = BASE_BUCKET_ROWS,
+        factor: int = LEVEL_FACTOR,
+        min_buckets: int = MIN_LEVEL_BUCKETS,
+    ) -> "CsvPyramid":
+        """由原始数据构建：values 形状为 (列数, 行数)，NaN 视为缺失。"""
+        levels: List[PyramidLevel] = []
+        if values.ndim != 2 or len(x) < base_bucket_rows * min_buckets:
+            return cls(levels)
+
+        # 把每一行视为一个桶，第 0 层由行合并而来，之后逐层合并上一层
+        valid = ~np.isnan(values)
+        row_x = np.broadcast_to(x, values.shape)
+        level = _coarsen(
+            x,
+            x,
+            np.where(valid, values, np.inf),
+            np.where(valid, values, -np.inf),
+            row_x,
+            row_x,
+            np.where(valid, values, 0.0),
+            valid.astype(np.int64),
+            base_bucket_rows,
+        )
+        level.bucket_rows = base_bucket_rows
+        while len(level) >= min_buckets:
+            levels.append(level)
+            coarser = _coarsen(
+                level.x_first,
+                level.x_last,
+                level.mins,
+                level.maxs,
+                level.x_at_min,
+                level.x_at_max,
+                level.sums,
+                level.counts,
+                factor,
+            )
+            coarser.bucket_rows = level.bucket_rows * factor
+            level = coarser
+        return cls(levels)
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def column(self, index: int) -> "ColumnPyramid":
+        return ColumnPyramid(self, index)
+
+    def select_level(self, min_x: float, max_x: float, target_buckets: int) -> PyramidLevel | None:
+        """返回可视桶数不少于 target_buckets 的最粗层级；最细层级也不够时返回 None（应使用原始数据）。"""
+        for level in reversed(self.levels):
+            lo, hi = level.visible(min_x, max_x)
+            if hi - lo >= target_buckets:
+                return level
+        return None
+
+
+class ColumnPyramid:
+    """金字塔中单列的视图。"""
+
+    def __init__(self, pyramid: CsvPyramid, index: int) -> None:
+        self._pyramid = pyramid
+        self._index = index
+
+    def minmax_points(
+        self, min_x: float, max_x: float, target_buckets: int
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]] | None:
+        """返回可视范围内各桶的极值点（每桶按 x 顺序两个点），无合适层级时返回 None。"""
+        level = self._pyramid.select_level(min_x, max_x, target_buckets)
+        if level is None:
+            return None
+        lo, hi = level.visible(min_x, max_x)
+        i = self._index
+        keep = level.counts[i, lo:hi] > 0
+        x_min = level.x_at_min[i, lo:hi][keep]
+        x_max = level.x_at_max[i, lo:hi][keep]
+        y_min = level.mins[i, lo:hi][keep]
+        y_max = level.maxs[i, lo:hi][keep]
+        min_first = x_min <= x_max
+        xs = np.empty(2 * len(x_min), dtype=np.float64)
+        ys = np.empty(2 * len(x_min), dtype=np.float64)
+        xs[0::2] = np.where(min_first, x_min, x_max)
+        xs[1::2] = np.where(min_first, x_max, x_min)
+        ys[0::2] = np.where(min_first, y_min, y_max)
+        ys[1::2] = np.where(min_first, y_max, y_min)
+        return xs, ys
+
+
+# ---- 旁路缓存 ----
+
+_LEVEL_FIELDS = ("x_first", "x_last", "mins", "maxs", "x_at_min", "x_at_max", "sums", "counts")
+
+
+def _source_key(stat: os.stat_result) -> NDArray[np.int64]:
+    return np.array([PYRAMID_VERSION, stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def write_sidecar(path: Path, stat: os.stat_result, table: CsvColumns, pyramid: CsvPyramid) -> None:
+    """原子写入压缩缓存文件（先写临时文件再替换）。"""
+    arrays: dict[str, NDArray] = {
+        "source": _source_key(stat),
+        "names": np.array(table.names, dtype=str),
+        "x": table.x,
+        "values": np.stack(table.columns) if table.columns else np.empty((0, len(table.x))),
+        "bucket_rows": np.array([lvl.bucket_rows for lvl in pyramid.levels], dtype=np.int64),
+    }
+    for k, level in enumerate(pyramid.levels):
+        for field in _LEVEL_FIELDS:
+            arrays[f"L{k}_{field}"] = getattr(level, field)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+def read_sidecar(path: Path, stat: os.stat_result) -> tuple[CsvColumns, CsvPyramid] | None:
+    """读取与源文件匹配的缓存，不存在、过期或损坏时返回 None。"""
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            if not np.array_equal(data["source"], _source_key(stat)):
+                return None
+            values = data["values"]
+            table = CsvColumns(
+                names=[str(n) for n in data["names"]],
+                x=data["x"],
+                columns=list(values),
+            )
+            levels = []
+            for k, bucket_rows in enumerate(data["bucket_rows"].tolist()):
+                fields = {field: data[f"L{k}_{field}"] for field in _LEVEL_FIELDS}
+                levels.append(PyramidLevel(bucket_rows=int(bucket_rows), **fields))
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile) as exc:
+        logger.warning(f"金字塔缓存无效，重新解析 {path.name}: {exc}")
+        return None
+    return table, CsvPyramid(levels)
+
+
+def load_csv_with_pyramid(
+    path: str | Path,
+    progress: Callable[[int, int], bool | None] | None = None,
+) -> tuple[CsvColumns, CsvPyramid]:
+    """优先读取旁路缓存；缓存失效时解析 CSV、构建金字塔并写回缓存。
+
+    没有金字塔层级的小文件不写缓存，避免在磁盘上多存一份原始数据。
+    """
+    path = Path(path)
+    stat = path.stat()
+    cache_path = sidecar_path(path)
+    cached = read_sidecar(cache_path, stat)
+    if cached is not None:
+        logger.debug(f"使用金字塔缓存: {cache_path.name}")
+        if progress is not None:
+            progress(stat.st_size, stat.st_size)
+        return cached
+
+    table = load_csv_columns(path, progress=progress)
+    values = np.stack(table.columns) if table.columns else np.empty((0, len(table.x)))
+    pyramid = CsvPyramid.build(table.x, values)
+    if not pyramid.levels:
+        return table, pyramid
+    try:
+        write_sidecar(cache_path, stat, table, pyramid)
+    except OSError as exc:
+        logger.warning(f"金字塔缓存写入失败 {cache_path}: {exc}")
+    return table, pyramid
@@ -0,0 +1,115 @@
+"""曲线降采样（细节层次）
+
+图表能显示的点数受像素宽度限制，大文件逐点绘制既慢又看不出差别。
+这里提供两种 NumPy 向量化的降采样方法，输出点数只与像素宽度相关：
+
+- LTTB（Largest-Triangle-Three-Buckets）：按点数等分桶，每桶选出与相邻桶
+  构成三角形面积最大的点，保留曲线形状，适合一般趋势曲线；
+- min/max：按 x 等分为像素列，每列保留最小值与最大值两个点，
+  不会丢失尖峰，适合需要看清极值的场合。
+
+输入 xs 需单调递增且不含 NaN（ColumnData 在构造前已过滤）。
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import NDArray
+
+METHOD_LTTB = "lttb"
+METHOD_MINMAX = "minmax"
+METHODS = (METHOD_LTTB, METHOD_MINMAX)
+
+
+def lttb_indices(xs: NDArray[np.float64], ys: NDArray[np.float64], threshold: int) -> NDArray[np.intp]:
+    """返回 LTTB 选中点的下标（含首尾点），threshold 不足 3 或不小于点数时返回全部下标。"""
+    n = len(xs)
+    if threshold < 3 or threshold >= n:
+        return np.arange(n, dtype=np.intp)
+
+    # 首尾点单独保留，中间 n-2 个点分成 threshold-2 个桶
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(xs[: n - 1], edges[:-1]) / counts
+    avg_y = np.add.reduceat(ys[: n - 1], edges[:-1]) / counts
+
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    buckets = threshold - 2
+    a = 0
+    for i in range(buckets):
+        lo = edges[i]
+        hi = edges[i + 1]
+        if i + 1 < buckets:
+            cx = avg_x[i + 1]
+            cy = avg_y[i + 1]
+        else:
+            cx = xs[n - 1]
+            cy = ys[n - 1]
+        ax = xs[a]
+        ay = ys[a]
+        # 三角形面积的两倍，只比较大小无需除以 2
+        area = np.abs((ax - cx) * (ys[lo:hi] - ay) - (ax - xs[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(xs: NDArray[np.float64], ys: NDArray[np.float64], buckets: int) -> NDArray[np.intp]:
+    """按 x 等分为 buckets 列，返回每列最小值与最大值点的下标（升序、去重）。"""
+    n = len(xs)
+    if buckets < 1 or n <= 2 * buckets:
+        return np.arange(n, dtype=np.intp)
+
+    x0 = xs[0]
+    span = xs[-1] - x0
+    if span <= 0:
+        columns = np.zeros(n, dtype=np.intp)
+    else:
+        columns = np.minimum(((xs - x0) / span * buckets).astype(np.intp), buckets - 1)
+    # xs 单调递增，列号也单调，每列的起点即列号变化处
+    starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+    counts = np.diff(np.r_[starts, n])
+
+    positions = np.arange(n, dtype=np.intp)
+    mins = np.repeat(np.minimum.reduceat(ys, starts), counts)
+    maxs = np.repeat(np.maximum.reduceat(ys, starts), counts)
+    first_min = np.minimum.reduceat(np.where(ys == mins, positions, n), starts)
+    first_max = np.minimum.reduceat(np.where(ys == maxs, positions, n), starts)
+    return np.unique(np.concatenate([first_min, first_max]))
+
+
+def decimate(
+    xs: NDArray[np.float64],
+    ys: NDArray[np.float64],
+    max_points: int,
+    method: str = METHOD_LTTB,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """将曲线降到约 max_points 个点；min/max 方法每列两个点，列数取 max_points // 2。"""
+    if method == METHOD_MINMAX:
+        indices = minmax_indices(xs, ys, max(1, max_points // 2))
+    elif method == METHOD_LTTB:
+        indices = lttb_indices(xs, ys, max_points)
+    else:
+        raise ValueError(f"未知的降采样方法: {method}")
+    if len(indices) == len(xs):
+        return xs, ys
+    return xs[indices], ys[indices]
+
+
+def decimate_range(
+    xs: NDArray[np.float64],
+    ys: NDArray[np.float64],
+    min_x: float,
+    max_x: float,
+    pixel_width: int,
+    method: str = METHOD_LTTB,
+) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+    """截取 [min_x, max_x] 并按像素宽度降采样，输出不超过 2 * pixel_width 个点。
+
+    范围两侧各多带一个点，使折线能延伸到可视区域边缘。
+    """
+    lo = max(0, int(np.searchsorted(xs, min_x, side="left")) - 1)
+    hi = min(len(xs), int(np.searchsorted(xs, max_x, side="right")) + 1)
+    return decimate(xs[lo:hi], ys[lo:hi], 2 * max(1, int(pixel_width)), method)
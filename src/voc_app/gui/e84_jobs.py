@@ -0,0 +1,215 @@
+"""E84 联动任务的后台队列
+
+E84 Load/Unload 的握手回调运行在 GUI 线程，原先同步执行采集命令和日志下载，
+下载期间整个界面和事件循环都会卡住。E84JobQueue 把这些动作变成后台任务：
+
+- 两条通道各一个单线程池：命令通道（启动/停止采集，耗时短）与下载通道（日志同步）；
+  同一通道内按提交顺序执行，新的 E84 周期不会打断正在进行的下载，而是排在其后；
+- coalesce=True 的任务若已有同类任务在排队（尚未开始），直接复用该任务，避免重复下载；
+- 每个任务有超时：到期后置位其取消事件并调用 on_timeout（例如关闭阻塞中的 socket），
+  任务在下一个检查点或阻塞调用失败后退出，并以超时结束；
+- 任务开始、进度、结束通过信号（自动排队到主线程）通知 UI 与 LoadportBridge。
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from PySide6.QtCore import QObject, Property, QRunnable, QThreadPool, Signal, Slot
+
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+LANE_COMMAND = "command"
+LANE_DOWNLOAD = "download"
+
+# 任务函数：接收取消事件与进度回调（0~1），返回结果描述；失败时抛出异常
+JobFunction = Callable[[threading.Event, Callable[[float], None]], str]
+
+
+@dataclass
+class _JobState:
+    job_id: int
+    kind: str
+    lane: str
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    timed_out: bool = False
+    started: bool = False
+
+
+class _E84JobSignals(QObject):
+    """任务线程到主线程的信号中转（QRunnable 不是 QObject）。"""
+
+    started = Signal(int)
+    progress = Signal(int, float)
+    finished = Signal(int, bool, str)
+
+
+class _E84Job(QRunnable):
+    def __init__(
+        self,
+        state: _JobState,
+        fn: JobFunction,
+        timeout_s: float,
+        signals: _E84JobSignals,
+        on_timeout: Optional[Callable[[], None]] = None,
+    ):
+        super().__init__()
+        self._state = state
+        self._fn = fn
+        self._timeout_s = timeout_s
+        self._signals = signals
+        self._on_timeout_cb = on_timeout
+
+    def _on_timeout(self) -> None:
+        self._state.timed_out = True
+        self._state.cancel_event.set()
+        if self._on_timeout_cb is not None:
+            try:
+                self._on_timeout_cb()
+            except Exception as exc:
+                logger.warning(f"E84 任务超时处理失败 [{self._state.kind}]: {exc}")
+
+    def _report(self, fraction: float) -> None:
+        self._signals.progress.emit(self._state.job_id, float(fraction))
+
+    def run(self) -> None:
+        state = self._state
+        if state.cancel_event.is_set():
+            self._signals.finished.emit(state.job_id, False, "已取消")
+            return
+        # 在工作线程中直接标记，之后提交的同类任务不会再合并到已开始的任务上
+        state.started = True
+        self._signals.started.emit(state.job_id)
+        timer = None
+        if self._timeout_s > 0:
+            timer = threading.Timer(self._timeout_s, self._on_timeout)
+            timer.daemon = True
+            timer.start()
+        try:
+            message = self._fn(state.cancel_event, self._report)
+            ok = not state.cancel_event.is_set()
+            if state.timed_out:
+                message = f"超时（{self._timeout_s:.0f} s）"
+            elif not ok:
+                message = "已取消"
+        except Exception as exc:
+            logger.error(f"E84 任务失败 [{state.kind}]: {exc}")
+            ok, message = False, str(exc)
+            if state.timed_out:
+                # 超时处理关闭连接后，阻塞调用以异常退出
+                message = f"超时（{self._timeout_s:.0f} s）"
+        finally:
+            if timer is not None:
+                timer.cancel()
+        self._signals.finished.emit(state.job_id, ok, message or "")
+
+
+class E84JobQueue(QObject):
+    """E84 联动任务队列；submit 立即返回任务号，结果通过 jobFinished 通知。"""
+
+    jobStarted = Signal(int, str)
+    jobProgress = Signal(int, str, float)
+    jobFinished = Signal(int, str, bool, str)
+    busyChanged = Signal()
+    pendingCountChanged = Signal()
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._pools: Dict[str, QThreadPool] = {}
+        for lane in (LANE_COMMAND, LANE_DOWNLOAD):
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(1)
+            self._pools[lane] = pool
+        self._signals = _E84JobSignals(self)
+        self._signals.started.connect(self._on_started)
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._jobs: Dict[int, _JobState] = {}
+
+    @Property(bool, notify=busyChanged)
+    def busy(self) -> bool:
+        with self._lock:
+            return bool(self._jobs)
+
+    @Property(int, notify=pendingCountChanged)
+    def pendingCount(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def submit(
+        self,
+        kind: str,
+        fn: JobFunction,
+        lane: str = LANE_COMMAND,
+        timeout_s: float = 0.0,
+        coalesce: bool = False,
+        on_timeout: Optional[Callable[[], None]] = None,
+    ) -> int:
+        """提交任务并返回任务号（可在任意线程调用）。
+
+        on_timeout 在超时计时器线程中调用，用于中断任务里阻塞的 IO。
+        """
+        with self._lock:
+            if coalesce:
+                for state in self._jobs.values():
+                    if state.kind == kind and state.lane == lane and not state.started:
+                        logger.debug(f"E84 任务已在排队，合并: {kind} #{state.job_id}")
+                        return state.job_id
+            state = _JobState(next(self._ids), kind, lane)
+            self._jobs[state.job_id] = state
+            was_busy = len(self._jobs) > 1
+        self._pools[lane].start(_E84Job(state, fn, timeout_s, self._signals, on_timeout))
+        logger.debug(f"E84 任务已提交: {kind} #{state.job_id} ({lane})")
+        self.pendingCountChanged.emit()
+        if not was_busy:
+            self.busyChanged.emit()
+        return state.job_id
+
+    @Slot()
+    def cancelAll(self) -> None:
+        """取消所有未完成任务：排队的任务直接结束，运行中的任务在下一个检查点退出。"""
+        with self._lock:
+            states = list(self._jobs.values())
+        for state in states:
+            state.cancel_event.set()
+
+    def wait(self, timeout_ms: int = -1) -> bool:
+        """等待两条通道的任务结束（测试与退出时使用），结束信号仍需事件循环派发。"""
+        return all(pool.waitForDone(timeout_ms) for pool in self._pools.values())
+
+    def shutdown(self) -> None:
+        self.cancelAll()
+        self.wait(5000)
+
+    @Slot(int)
+    def _on_started(self, job_id: int) -> None:
+        with self._lock:
+            state = self._jobs.get(job_id)
+        if state is not None:
+            self.jobStarted.emit(job_id, state.kind)
+
+    @Slot(int, float)
+    def _on_progress(self, job_id: int, fraction: float) -> None:
+        with self._lock:
+            state = self._jobs.get(job_id)
+        if state is not None:
+            self.jobProgress.emit(job_id, state.kind, fraction)
+
+    @Slot(int, bool, str)
+    def _on_finished(self, job_id: int, ok: bool, message: str) -> None:
+        with self._lock:
+            state = self._jobs.pop(job_id, None)
+            idle = not self._jobs
+        if state is None:
+            return
+        self.pendingCountChanged.emit()
+        if idle:
+            self.busyChanged.emit()
+        self.jobFinished.emit(job_id, state.kind, ok, message)
@@ -9,8 +9,10 @@ import struct
 import threading
 import time
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Callable, Dict, Iterable, List
 
+import numpy as np
+from numpy.typing import NDArray
 from PySide6.QtCore import QObject, Property, Signal, Slot, QTimer
 
 from voc_app.gui.channel_config import (
@@ -19,12 +21,55 @@ from voc_app.gui.channel_config import (
     ChannelConfig,
     ChannelConfigManager,
 )
+from voc_app.gui.e84_jobs import LANE_DOWNLOAD, E84JobQueue
+from voc_app.gui.foup_connections import (
+    CHANNEL_CONTROL,
+    CHANNEL_DATA,
+    FoupConnectionPool,
+    PooledConnection,
+)
+from voc_app.gui.server_identity import ServerIdentity, ServerIdentityCache
+from voc_app.gui.foup_protocol import (
+    BinaryFrame,
+    FRAME_SAMPLES,
+    SPECTRUM_PREFIXES,
+    VERSION_QUERY_COMMAND,
+    build_command,
+    decode_binary_frame,
+    is_ack,
+    is_binary_frame,
+    is_numeric_text,
+    normalize_spectrum,
+    parse_sample_text,
+    parse_spectrum_text,
+    parse_version_response,
+)
+from voc_app.gui.sample_batch import SampleBatchBuffer
+from voc_app.gui.spectrum_mailbox import SpectrumMailbox
 from voc_app.gui.spectrum_model import SpectrumDataModel, SpectrumSimulator
-from voc_app.gui.socket_client import SocketCommunicator, Client
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+from voc_app.gui.timeseries_store import TimeSeriesStore
+from voc_app.gui.socket_client import (
+    COMPRESSION_ALGORITHMS,
+    FrameReader,
+    ParallelDownloader,
+    SocketCommunicator,
+)
 from voc_app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# 下载日志目录时的并发连接数（服务端不支持 list 时退化为单连接）
+LOG_DOWNLOAD_CONNECTIONS = 4
+
+# E84 后台任务类型与超时（秒）
+JOB_E84_UNLOAD_START = "unload_start"
+JOB_E84_LOAD_STOP = "load_stop"
+JOB_LOG_DOWNLOAD = "log_download"
+JOB_IDENTITY_REVALIDATE = "identity_revalidate"
+E84_COMMAND_TIMEOUT_S = 30.0
+E84_DOWNLOAD_TIMEOUT_S = 900.0
+
 
 class FoupAcquisitionController(QObject):
     """管理 FOUP 采集通道的 TCP 连接与数据分发。
@@ -34,6 +79,18 @@ class FoupAcquisitionController(QObject):
     - sample_normal: {prefix}_sample_type_normal
     - start: {prefix}_data_coll_ctrl_start
     - stop: {prefix}_data_coll_ctrl_stop
+    - frame_binary: {prefix}_frame_format_binary（prefer_binary_frames=True 时发送）
+
+    二进制帧（见 foup_protocol）：每帧按首字节判断格式，固件不支持协商时
+    继续按文本帧解析，因此新旧固件都可直接接入。
+
+    批量入库模式（batch_max_size > 1）：
+    工作线程把样本写入预分配的 SampleBatchBuffer，GUI 线程在批次写满或
+    达到 batch_max_latency_ms 时整批取走，每批只发一次 dataBatchReceived /
+    channelValuesChanged / lastValueChanged，并通过 append_points 一次性写入曲线模型。
+
+    E84 联动（*Async 槽）：命令与日志下载作为后台任务放入 E84JobQueue，立即返回任务号，
+    结果通过 e84JobProgress / e84JobFinished 通知；Load 停止命令成功后再排队下载日志。
     """
 
     # Signals
@@ -49,9 +106,16 @@ class FoupAcquisitionController(QObject):
     serverVersionChanged = Signal()
     operationModeChanged = Signal()
     normalModeRemotePathChanged = Signal()
+    streamEngineActiveChanged = Signal()
     dataPointReceived = Signal(float, list)
-    spectrumFrameReceived = Signal(list)
+    # (xs, ys) 为独立副本，接收方可以跨线程或排队连接后再使用
+    dataBatchReceived = Signal(object, object)
+    spectrumFrameReceived = Signal(int, object)
+    e84JobProgress = Signal(str, float)
+    e84JobFinished = Signal(str, bool, str)
     _channelCountDetected = Signal(int)
+    _sampleBatchReady = Signal()
+    _spectrumFrameReady = Signal()
 
     def __init__(
         self,
@@ -59,8 +123,13 @@ class FoupAcquisitionController(QObject):
         host: str = "192.168.1.53",
         # host: str = "127.0.0.1",
         port: int = 65432,
-        spectrum_model: SpectrumDataModel | None = None,
+        spectrum_model: SpectrumDataModel | MultiChannelSpectrumModel | None = None,
         spectrum_simulator: SpectrumSimulator | None = None,
+        batch_max_size: int = 1,
+        batch_max_latency_ms: int = 50,
+        prefer_binary_frames: bool = False,
+        sample_store: TimeSeriesStore | None = None,
+        identity_cache: ServerIdentityCache | None = None,
         parent: QObject | None = None,
     ) -> None:
         super().__init__(parent)
@@ -71,6 +140,9 @@ class FoupAcquisitionController(QObject):
         self._spectrum_model = spectrum_model
         self._spectrum_simulator = spectrum_simulator
         self._external_spectrum_seen = False
+        # 频谱帧直接写入预分配缓冲区，GUI 只取各通道最新一帧
+        self._spectrum_mailbox = SpectrumMailbox()
+        self._spectrum_mailboxes: Dict[int, SpectrumMailbox] = {0: self._spectrum_mailbox}
 
         # 线程安全锁
         self._lock = threading.Lock()
@@ -87,36 +159,59 @@ class FoupAcquisitionController(QObject):
         self._command_prefix: str = ""  # 从服务器响应解析的命令前缀（大写）
         self._operation_mode: str = "test"
         self._normal_mode_remote_path: str = "Log"
+        self._prefer_binary_frames: bool = bool(prefer_binary_frames)
+        # 多主机引擎运行时与本控制器共用曲线、频谱模型，此时不允许启动单机采集
+        self._stream_engine_active: bool = False
+        # 可选的磁盘存储：采样在工作线程中追加，落盘由存储自己的写线程完成
+        self._sample_store = sample_store
 
         # 线程管理
         self._worker: threading.Thread | None = None
         self._stop_event = threading.Event()
         self._communicator: SocketCommunicator | None = None
         self._e84_communicator: SocketCommunicator | None = None
+        # 常驻连接池：E84 命令走控制通道，采集数据流与日志下载走数据通道
+        self._connections = FoupConnectionPool(lambda host, port: SocketCommunicator(host, port))
+        self._connection: PooledConnection | None = None
+        self._e84_connection: PooledConnection | None = None
+        # 每个连接一个帧读取器，预读到的后续帧保存在其缓冲区中
+        self._frame_reader: FrameReader | None = None
+        self._e84_frame_reader: FrameReader | None = None
         self._e84_io_lock = threading.Lock()
+        # 采集线程与身份复核任务都会在数据连接上发送命令
+        self._data_send_lock = threading.Lock()
+        self._e84_jobs = E84JobQueue(self)
+        self._e84_jobs.jobProgress.connect(self._on_e84_job_progress)
+        self._e84_jobs.jobFinished.connect(self._on_e84_job_finished)
         self._sample_index: int = 0
         self._last_timestamp_ms: float = 0.0
         self._detected_channel_count: int = 0
 
         self._config_manager = ChannelConfigManager()
+        # 服务端身份缓存：命中时跳过开始前的版本查询，改为后台复核
+        self._identity_cache = identity_cache if identity_cache is not None else ServerIdentityCache()
+
+        # 批量入库：batch_max_size <= 1 时保持逐条发信号的旧行为
+        self._sample_batch: SampleBatchBuffer | None = None
+        self._batch_timer: QTimer | None = None
+        if int(batch_max_size) > 1:
+            self._sample_batch = SampleBatchBuffer(
+                batch_max_size, max(1, len(self._series_models))
+            )
+            self._batch_timer = QTimer(self)
+            self._batch_timer.setInterval(max(1, int(batch_max_latency_ms)))
+            self._batch_timer.timeout.connect(self._drain_sample_batch)
+            self._sampleBatchReady.connect(self._drain_sample_batch)
 
         self.dataPointReceived.connect(self._append_point_to_model)
+        self.dataBatchReceived.connect(self._append_batch_to_models)
         self.spectrumFrameReceived.connect(self._on_spectrum_frame_received)
+        self._spectrumFrameReady.connect(self._take_spectrum_frame)
         self._channelCountDetected.connect(self._on_channel_count_detected)
 
     @staticmethod
     def _is_spectrum_prefix(prefix: str) -> bool:
-        return prefix.upper() in {"SPEC"}
-
-    @staticmethod
-    def _normalize_spectrum_bins(values: list[float]) -> list[float]:
-        """将频谱数据归一化到 0.0~1.0（适配 uint32 等大整数输入）。"""
-        if not values:
-            return []
-        max_v = max(values)
-        if max_v <= 0:
-            return [0.0 for _ in values]
-        return [max(0.0, float(v) / float(max_v)) for v in values]
+        return prefix.upper() in SPECTRUM_PREFIXES
 
     # ---- Thread-safe property accessors ----
 
@@ -125,6 +220,20 @@ class FoupAcquisitionController(QObject):
         with self._lock:
             return self._running
 
+    @Property(bool, notify=streamEngineActiveChanged)
+    def streamEngineActive(self) -> bool:
+        with self._lock:
+            return self._stream_engine_active
+
+    @Slot(bool)
+    def setStreamEngineActive(self, active: bool) -> None:
+        """多主机引擎启停时调用；引擎运行期间 startAcquisition 直接拒绝。"""
+        with self._lock:
+            if self._stream_engine_active == bool(active):
+                return
+            self._stream_engine_active = bool(active)
+        self.streamEngineActiveChanged.emit()
+
     @Property(str, notify=statusMessageChanged)
     def statusMessage(self) -> str:
         with self._lock:
@@ -134,6 +243,10 @@ class FoupAcquisitionController(QObject):
     def seriesModel(self) -> QObject | None:
         return self._primary_series
 
+    @Property(QObject, constant=True)
+    def e84Jobs(self) -> QObject:
+        return self._e84_jobs
+
     @Property(float, notify=lastValueChanged)
     def lastValue(self) -> float:
         with self._lock:
@@ -238,7 +351,10 @@ class FoupAcquisitionController(QObject):
         with self._lock:
             if self._running or (self._worker and self._worker.is_alive()):
                 return
-            if not self._host:
+            if self._stream_engine_active:
+                self._status = "多主机采集运行中，单机采集已禁用"
+                emit_status = True
+            elif not self._host:
                 self._status = "请先配置采集 IP"
                 emit_status = True
             elif self._operation_mode == "test" and not self._series_models:
@@ -259,6 +375,10 @@ class FoupAcquisitionController(QObject):
                     logger.warning(f"clear series failed: {exc!r}")
             self._sample_index = 0
             self._last_timestamp_ms = 0.0
+            if self._sample_batch is not None:
+                self._sample_batch.clear()
+            if self._batch_timer is not None:
+                self._batch_timer.start()
 
         self._stop_event.clear()
         with self._lock:
@@ -282,41 +402,163 @@ class FoupAcquisitionController(QObject):
 
     @Slot(result=bool)
     def e84StartDataCollectionForUnload(self) -> bool:
-        """E84 Unload 阶段：查询类型/版本后发送采集启动命令。"""
+        """E84 Unload 阶段：查询类型/版本后发送采集启动命令（同步执行）。"""
+        try:
+            self._e84_start_collection()
+            return True
+        except Exception as exc:
+            self._report_e84_failure(f"E84 Unload 启动采集失败: {exc}")
+            return False
+
+    @Slot(result=bool)
+    def e84StopDataCollectionForLoad(self) -> bool:
+        """E84 Load 阶段：发送采集停止命令并下载日志（同步执行）。"""
+        try:
+            self._e84_stop_collection()
+            saved_files = self._download_logs()
+            self._set_status(f"E84 Load 日志下载完成: {len(saved_files)} 个文件")
+            return True
+        except Exception as exc:
+            self._report_e84_failure(f"E84 Load 停止采集失败: {exc}")
+            return False
+
+    @Slot(result=int)
+    def e84StartDataCollectionForUnloadAsync(self) -> int:
+        """后台执行 Unload 采集启动，立即返回任务号。"""
+        return self._e84_jobs.submit(
+            JOB_E84_UNLOAD_START,
+            self._e84_command_job(self._e84_start_collection, "E84 Unload 启动采集失败"),
+            timeout_s=E84_COMMAND_TIMEOUT_S,
+            on_timeout=self._abort_e84_io,
+        )
+
+    @Slot(result=int)
+    def e84StopDataCollectionForLoadAsync(self) -> int:
+        """后台执行 Load 采集停止，成功后日志下载排入下载通道；立即返回任务号。"""
+        return self._e84_jobs.submit(
+            JOB_E84_LOAD_STOP,
+            self._e84_command_job(self._e84_stop_collection, "E84 Load 停止采集失败"),
+            timeout_s=E84_COMMAND_TIMEOUT_S,
+            on_timeout=self._abort_e84_io,
+        )
+
+    @Slot()
+    def shutdownE84Jobs(self) -> None:
+        """取消排队中的 E84 任务并等待运行中的任务退出（应用退出时调用）。"""
+        self._e84_jobs.shutdown()
+
+    @Slot()
+    def warmUpConnections(self) -> None:
+        """在后台预先连接当前主机，E84 命令不再等待建连。"""
+        with self._lock:
+            host, port = self._host, self._port
+        self._connections.warm_up(host, port)
+
+    @Slot()
+    def shutdownConnections(self) -> None:
+        """关闭连接池（应用退出时调用）。"""
+        self._connections.close()
+
+    def _e84_start_collection(self, cancel_event: threading.Event | None = None) -> str:
+        with self._lock:
+            host, port = self._host, self._port
         with self._e84_io_lock:
             try:
-                self._set_status("E84 Unload：查询版本并启动采集")
-                self._e84_query_server_identity()
+                # 排队等待 IO 锁期间可能已被取消或超时
+                if cancel_event is not None and cancel_event.is_set():
+                    return "E84 Unload 已取消"
+                cached = self._apply_cached_identity(host, port)
+                if cached is None:
+                    self._set_status("E84 Unload：查询版本并启动采集")
+                    self._e84_query_server_identity()
+                    if cancel_event is not None and cancel_event.is_set():
+                        return "E84 Unload 已取消"
                 start_cmd = self._select_command("start")
                 self._e84_send_command(start_cmd)
-                self._set_status(f"E84 Unload 已发送: {start_cmd}")
-                return True
-            except Exception as exc:
-                self._close_e84_socket()
-                message = f"E84 Unload 启动采集失败: {exc}"
-                logger.error(message)
-                self.errorOccurred.emit(message)
+                message = f"E84 Unload 已发送: {start_cmd}"
                 self._set_status(message)
-                return False
+            finally:
+                self._release_e84_connection()
+        if cached is not None:
+            self._revalidate_identity(cached, self._e84_resend_start)
+        return message
 
-    @Slot(result=bool)
-    def e84StopDataCollectionForLoad(self) -> bool:
-        """E84 Load 阶段：发送采集停止命令并下载日志。"""
+    def _e84_resend_start(self) -> None:
+        start_cmd = self._select_command("start")
         with self._e84_io_lock:
             try:
+                self._e84_send_command(start_cmd)
+            finally:
+                self._release_e84_connection()
+        self._set_status(f"E84 Unload 已补发: {start_cmd}")
+
+    def _e84_stop_collection(self, cancel_event: threading.Event | None = None) -> str:
+        with self._e84_io_lock:
+            try:
+                if cancel_event is not None and cancel_event.is_set():
+                    return "E84 Load 已取消"
                 self._set_status("E84 Load：停止采集并下载日志")
                 stop_cmd = self._select_command("stop")
                 self._e84_send_command(stop_cmd)
-                saved_files = self._download_logs()
-                self._set_status(f"E84 Load 日志下载完成: {len(saved_files)} 个文件")
-                return True
+                return f"E84 Load 已发送: {stop_cmd}"
+            finally:
+                self._release_e84_connection()
+
+    def _e84_command_job(self, action, failure_prefix: str):
+        def run(cancel_event: threading.Event, progress) -> str:
+            try:
+                return action(cancel_event)
             except Exception as exc:
                 self._close_e84_socket()
-                message = f"E84 Load 停止采集失败: {exc}"
-                logger.error(message)
-                self.errorOccurred.emit(message)
-                self._set_status(message)
-                return False
+                raise RuntimeError(f"{failure_prefix}: {exc}") from exc
+
+        return run
+
+    def _e84_download_job(self, cancel_event: threading.Event, progress) -> str:
+        def report(done: int, total: int) -> None:
+            progress(done / total if total > 0 else 1.0)
+
+        self._set_status("E84 Load：后台下载日志")
+        saved_files = self._download_logs(cancel_event=cancel_event, progress=report)
+        return f"E84 Load 日志下载完成: {len(saved_files)} 个文件"
+
+    def _report_e84_failure(self, message: str) -> None:
+        self._close_e84_socket()
+        logger.error(message)
+        self.errorOccurred.emit(message)
+        self._set_status(message)
+
+    @Slot(int, str, float)
+    def _on_e84_job_progress(self, job_id: int, kind: str, fraction: float) -> None:
+        self.e84JobProgress.emit(kind, fraction)
+
+    @Slot(int, str, bool, str)
+    def _on_e84_job_finished(self, job_id: int, kind: str, ok: bool, message: str) -> None:
+        if kind == JOB_IDENTITY_REVALIDATE:
+            # 复核只是对缓存身份的校验，失败时沿用缓存，不作为 E84 故障上报
+            if ok:
+                logger.debug(message)
+            else:
+                logger.warning(f"服务端身份复核失败: {message}")
+            return
+        if ok:
+            self._set_status(message)
+            if kind == JOB_E84_LOAD_STOP:
+                # 已有下载在排队时合并，新周期的文件由增量同步一并取回
+                self._e84_jobs.submit(
+                    JOB_LOG_DOWNLOAD,
+                    self._e84_download_job,
+                    lane=LANE_DOWNLOAD,
+                    timeout_s=E84_DOWNLOAD_TIMEOUT_S,
+                    coalesce=True,
+                )
+        else:
+            if kind == JOB_LOG_DOWNLOAD:
+                message = f"E84 Load 日志下载失败: {message}"
+            logger.error(message)
+            self.errorOccurred.emit(message)
+            self._set_status(message)
+        self.e84JobFinished.emit(kind, ok, message)
 
     def _cleanup(self) -> None:
         """清理资源：关闭 socket 并等待线程结束"""
@@ -325,6 +567,10 @@ class FoupAcquisitionController(QObject):
         if worker and worker.is_alive():
             worker.join(timeout=2.0)
         self._worker = None
+        if self._batch_timer is not None:
+            self._batch_timer.stop()
+        # 将停止前残留的样本写入模型
+        self._drain_sample_batch()
 
     # ---- Internal implementation ----
 
@@ -332,19 +578,23 @@ class FoupAcquisitionController(QObject):
         try:
             with self._lock:
                 host, port = self._host, self._port
-            self._communicator = SocketCommunicator(host, port)
+            self._open_data_connection(host, port)
             self._set_running(True)
             self._set_status("采集中")
-            self._perform_version_query()
-            self._send_sample_type_command()
-            start_cmd = self._select_command("start")
-            if start_cmd:
-                self._send_command(start_cmd)
+            cached = self._apply_cached_identity(host, port)
+            if cached is None:
+                self._perform_version_query()
+            self._send_start_sequence()
+            if cached is not None:
+                connection = self._connection
+                self._revalidate_identity(
+                    cached, lambda: self._resend_start_sequence(connection)
+                )
             while not self._stop_event.is_set():
-                message = self._recv_message()
-                if message is None:
+                payload = self._recv_frame()
+                if payload is None:
                     break
-                self._handle_line(message)
+                self._handle_frame(payload)
         except Exception as exc:
             try:
                 self.errorOccurred.emit(f"FOUP 采集异常: {exc}")
@@ -354,6 +604,7 @@ class FoupAcquisitionController(QObject):
         finally:
             self._send_stop_command()
             self._close_socket()
+            self._request_batch_flush()
             self._set_running(False)
             emit_status = False
             with self._lock:
@@ -371,11 +622,15 @@ class FoupAcquisitionController(QObject):
         try:
             with self._lock:
                 host, port = self._host, self._port
-            self._communicator = SocketCommunicator(host, port)
+            self._open_data_connection(host, port)
             self._set_running(True)
-            self._set_status("查询版本...")
-            self._perform_version_query()
+            cached = self._apply_cached_identity(host, port)
+            if cached is None:
+                self._set_status("查询版本...")
+                self._perform_version_query()
             self._send_sample_type_command()
+            if cached is not None:
+                self._revalidate_identity(cached, self._resend_sample_type_command)
         except Exception as exc:
             try:
                 self.errorOccurred.emit(f"FOUP 连接异常: {exc}")
@@ -408,8 +663,13 @@ class FoupAcquisitionController(QObject):
             self._set_running(False)
             self._stop_event.clear()
 
-    def _download_logs(self) -> List[str]:
-        if self._stop_event.is_set():
+    def _download_logs(
+        self,
+        cancel_event: threading.Event | None = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> List[str]:
+        cancel_event = cancel_event or self._stop_event
+        if cancel_event.is_set():
             return []
         dest_root = Path(__file__).parent / "Log"
         dest_root.mkdir(parents=True, exist_ok=True)
@@ -418,50 +678,97 @@ class FoupAcquisitionController(QObject):
             host, port = self._host, self._port
             remote_path = self._normal_mode_remote_path
 
-        communicator: SocketCommunicator | None = None
+        downloader = ParallelDownloader(
+            self._connections.data_factory(host, port),
+            connections=LOG_DOWNLOAD_CONNECTIONS,
+            cancel_event=cancel_event,
+            compression=COMPRESSION_ALGORITHMS,
+        )
         try:
-            communicator = SocketCommunicator(host, port)
-            client = Client(communicator)
-            return client.get_file(remote_path, str(dest_root))
+            # 增量同步：本地已有且大小/mtime 一致的文件不再下载，中断的文件从断点续传
+            return downloader.sync(remote_path, str(dest_root), progress)
         except Exception as exc:
             logger.error(f"下载日志失败: {exc}")
             raise
-        finally:
-            # 确保 communicator 被关闭（无论 client 是否创建成功）
-            if communicator is not None:
-                try:
-                    communicator.close()
-                except Exception as e:
-                    logger.debug(f"关闭 communicator 时异常: {e}")
 
     def _perform_version_query(self) -> None:
         try:
-            self._send_command("get_function_version_info")
+            self._send_command(VERSION_QUERY_COMMAND)
         except Exception:
             return
         for _ in range(3):
             response = self._recv_message()
             if not response:
                 break
-            if response.strip().lower() == "ack":
+            if is_ack(response):
                 self._set_status("收到 ACK")
                 continue
             version, prefix = self._parse_version_response(response)
             if version or prefix:
                 self._apply_server_identity(version, prefix)
+                self._remember_identity(version, prefix)
                 break
 
+    def _apply_cached_identity(self, host: str, port: int) -> ServerIdentity | None:
+        """按缓存的身份设置前缀/版本/通道数，未命中返回 None。"""
+        cached = self._identity_cache.get(host, port)
+        if cached is None:
+            return None
+        emit_count = False
+        if cached.channel_count > 0:
+            with self._lock:
+                if self._channel_count <= 0:
+                    self._channel_count = cached.channel_count
+                    emit_count = True
+        if emit_count:
+            self.channelCountChanged.emit()
+        self._apply_server_identity(cached.version, cached.prefix)
+        logger.debug(f"使用缓存的服务端身份 {host}:{port}: {cached.prefix} {cached.version}")
+        return cached
+
+    def _remember_identity(self, version: str, prefix: str) -> None:
+        if not prefix:
+            return
+        with self._lock:
+            host, port = self._host, self._port
+        self._identity_cache.record(host, port, prefix, version)
+
+    def _revalidate_identity(self, cached: ServerIdentity, on_changed: Callable[[], None]) -> int:
+        """在 E84 命令通道排队复核版本；前缀与缓存不同时调用 on_changed 补发命令。
+
+        与 E84 命令串行执行，退出时随队列取消，排队中的复核会合并为一次。
+        """
+
+        def run(cancel_event: threading.Event, progress) -> str:
+            with self._e84_io_lock:
+                try:
+                    self._e84_query_server_identity()
+                except Exception:
+                    self._close_e84_socket()
+                    raise
+                finally:
+                    self._release_e84_connection()
+            with self._lock:
+                prefix = self._command_prefix
+            if not prefix or prefix == cached.prefix:
+                return f"服务端身份已确认: {prefix or cached.prefix}"
+            if cancel_event.is_set():
+                return f"服务端前缀已变化: {cached.prefix} -> {prefix}，任务已取消"
+            logger.warning(f"服务端前缀已变化: {cached.prefix} -> {prefix}，补发命令")
+            on_changed()
+            return f"服务端前缀已变化: {cached.prefix} -> {prefix}，已补发命令"
+
+        return self._e84_jobs.submit(
+            JOB_IDENTITY_REVALIDATE,
+            run,
+            timeout_s=E84_COMMAND_TIMEOUT_S,
+            coalesce=True,
+            on_timeout=self._abort_e84_io,
+        )
+
     def _parse_version_response(self, response: str) -> tuple[str, str]:
         """解析版本响应，返回 (version, prefix)，prefix 统一大写"""
-        cleaned = (response or "").strip()
-        if not cleaned or not any(ch.isalpha() for ch in cleaned):
-            return "", ""
-        parts = [part.strip() for part in cleaned.split(",") if part.strip()]
-        type_token = parts[0] if parts else cleaned
-        version = parts[1] if len(parts) > 1 else ""
-        # prefix 统一转大写
-        prefix = type_token.upper()
-        return version, prefix
+        return parse_version_response(response)
 
     def _apply_server_identity(
         self, version: str | None = None, prefix: str | None = None
@@ -493,13 +800,38 @@ class FoupAcquisitionController(QObject):
         if self._config_manager.get_prefix() != prefix:
             self._config_manager.set_prefix(prefix, channel_count)
 
-    def _on_spectrum_frame_received(self, values: list) -> None:
-        """将频谱帧转发给 SpectrumDataModel（在 Qt 主线程执行）。"""
+    def _publish_spectrum(self, bins: NDArray, channel: int = 0) -> None:
+        """归一化写入该通道的邮箱缓冲区；邮箱原本为空时才通知 GUI（在工作线程执行）。"""
+        mailbox = self._spectrum_mailboxes.get(channel)
+        if mailbox is None:
+            with self._lock:
+                mailbox = self._spectrum_mailboxes.setdefault(channel, SpectrumMailbox())
+        normalize_spectrum(bins, out=mailbox.back_buffer(bins.size))
+        if mailbox.publish(bins.size):
+            self._spectrumFrameReady.emit()
+
+    def _take_spectrum_frame(self) -> None:
+        with self._lock:
+            mailboxes = list(self._spectrum_mailboxes.items())
+        for channel, mailbox in mailboxes:
+            bins = mailbox.take()
+            if bins is not None:
+                self.spectrumFrameReceived.emit(channel, bins)
+
+    def _on_spectrum_frame_received(self, channel: int, values: NDArray[np.float64]) -> None:
+        """将频谱帧转发给频谱模型（在 Qt 主线程执行）。
+
+        多通道模型按通道号更新对应行；单通道 SpectrumDataModel 接收所有通道的帧（与以前相同）。
+        values 是邮箱缓冲区的视图，模型会复制数据，不能在此之后保留引用。
+        """
         model = self._spectrum_model
         if model is None:
             return
         try:
-            model.updateSpectrum(values)  # type: ignore[arg-type]
+            if isinstance(model, MultiChannelSpectrumModel):
+                model.updateChannel(channel, values)
+            else:
+                model.updateSpectrum(values)  # type: ignore[arg-type]
         except Exception as exc:
             logger.warning(f"updateSpectrum failed: {exc!r}")
             return
@@ -528,13 +860,31 @@ class FoupAcquisitionController(QObject):
             prefix = self._config_manager.get_prefix()
         if not prefix:
             prefix = DEFAULT_PREFIX_BY_CHANNEL.get(channel_count, "VOC")
-        actions = {
-            "sample_test": "sample_type_test",
-            "sample_normal": "sample_type_normal",
-            "start": "data_coll_ctrl_start",
-            "stop": "data_coll_ctrl_stop",
-        }
-        return f"{prefix}_{actions.get(key, key)}"
+        return build_command(prefix, key)
+
+    def _send_start_sequence(self) -> None:
+        self._send_sample_type_command()
+        if self._prefer_binary_frames:
+            # 旧固件会忽略或仅 ACK 该命令，数据仍按文本帧到达
+            self._send_command(self._select_command("frame_binary"))
+        start_cmd = self._select_command("start")
+        if start_cmd:
+            self._send_command(start_cmd)
+
+    def _resend_start_sequence(self, connection: PooledConnection | None) -> None:
+        # 只补发给发起复核的那一次采集：采集已停止或连接已更换时放弃
+        if connection is None or self._stop_event.is_set() or not self.running:
+            return
+        if self._connection is connection:
+            self._send_start_sequence()
+
+    def _resend_sample_type_command(self) -> None:
+        cmd = self._select_command("sample_normal")
+        with self._e84_io_lock:
+            try:
+                self._e84_send_command(cmd)
+            finally:
+                self._release_e84_connection()
 
     def _send_sample_type_command(self) -> None:
         with self._lock:
@@ -551,65 +901,67 @@ class FoupAcquisitionController(QObject):
         if cmd:
             self._send_command(cmd)
 
+    def _handle_frame(self, payload: bytes | memoryview) -> None:
+        """按首字节区分二进制帧与文本帧。"""
+        if is_binary_frame(payload):
+            try:
+                frame = decode_binary_frame(payload)
+            except ValueError as exc:
+                logger.warning(f"丢弃无效二进制帧: {exc}")
+                return
+            self._handle_binary_frame(frame)
+            return
+        try:
+            text = str(payload, "utf-8")
+        except UnicodeDecodeError:
+            return
+        self._handle_line(text)
+
+    def _handle_binary_frame(self, frame: BinaryFrame) -> None:
+        if frame.is_spectrum:
+            if frame.values.size:
+                self._publish_spectrum(frame.values, frame.channel)
+            return
+        if frame.frame_type == FRAME_SAMPLES and frame.values.size:
+            # 帧内时间戳为 0 表示服务端未提供，由 _ingest_values 使用本机时间
+            self._ingest_values(frame.values, frame.timestamp_ms)
+
     def _handle_line(self, text: str) -> None:
         cleaned = text.strip()
         if not cleaned:
             return
 
-        if cleaned.lower() == "ack":
+        if is_ack(cleaned):
             self._set_status("收到 ACK")
             return
 
-        # 频谱数据（每包带 prefix）：Noise_Spectrum,<float>,<float>...（256 点）
+        # 频谱数据（每包带 prefix）：SPEC,[<ts>,]<bins...>
         # 注意：频谱前缀不应覆盖命令前缀（serverType），避免影响 FOUP 曲线与命令生成。
-        if "," in cleaned and any(ch.isalpha() for ch in cleaned):
-            parts = [part.strip() for part in cleaned.split(",")]
-            if parts and parts[0] and self._is_spectrum_prefix(parts[0]):
-                spectrum_values: List[float] = []
-                for token in parts[1:]:
-                    if not token:
-                        continue
-                    try:
-                        spectrum_values.append(float(token))
-                    except ValueError:
-                        spectrum_values = []
-                        break
-                if spectrum_values:
-                    # 兼容：SPEC,<timestamp>,<256 bins...>
-                    bins = spectrum_values
-                    if len(bins) == 257 and bins[0] > 1_000_000:
-                        bins = bins[1:]
-
-                    # 频谱图组件期望 0.0~1.0；如果输入是 uint32 等大数，做每帧归一化避免爆表。
-                    if bins and (max(bins) > 1.0 or min(bins) < 0.0):
-                        bins = self._normalize_spectrum_bins(bins)
-
-                    self.spectrumFrameReceived.emit(bins)
-                return
+        spectrum = parse_spectrum_text(cleaned, normalize=False)
+        if spectrum is not None:
+            if spectrum.size:
+                self._publish_spectrum(spectrum)
+            return
 
         version, prefix = self._parse_version_response(cleaned)
         if version or prefix:
             self._apply_server_identity(version, prefix)
-            if not all(ch in "0123456789.,-+ " for ch in cleaned):
-                return
-
-        values: List[float] = []
-        if "," in cleaned:
-            for token in cleaned.split(","):
-                try:
-                    values.append(float(token.strip()))
-                except ValueError:
-                    continue
-        else:
-            try:
-                values.append(float(cleaned))
-            except ValueError:
+            if not is_numeric_text(cleaned):
                 return
 
+        values = parse_sample_text(cleaned)
         if not values:
             return
+        self._ingest_values(values)
+
+    def _ingest_values(self, values: List[float] | NDArray, timestamp_ms: float = 0.0) -> None:
+        """记录一条多通道采样并分发到曲线模型（逐条或批量）。
 
-        detected_count = len(values)
+        values 可以是二进制帧接收缓冲区上的数组视图：缓冲区与存储写入时直接复制数组，
+        只有通道值快照转换为 list。timestamp_ms 为 0 时使用本机时间。
+        """
+        channel_values = values.tolist() if isinstance(values, np.ndarray) else list(values)
+        detected_count = len(channel_values)
         if self._detected_channel_count != detected_count:
             self._detected_channel_count = detected_count
             self._channelCountDetected.emit(detected_count)
@@ -619,22 +971,58 @@ class FoupAcquisitionController(QObject):
             if self._channel_count != detected_count:
                 self._channel_count = detected_count
                 emit_count = True
-            self._channel_values = values.copy()
-            self._last_value = values[0]
+            self._channel_values = channel_values
+            self._last_value = channel_values[0]
 
         if emit_count:
             self.channelCountChanged.emit()
             self._init_config_if_ready()
-        self.channelValuesChanged.emit()
-        self.lastValueChanged.emit()
+            with self._lock:
+                host, port = self._host, self._port
+            self._identity_cache.record_channel_count(host, port, detected_count)
 
         self._sample_index += 1
-        timestamp_ms = time.time() * 1000.0
+        if not timestamp_ms:
+            timestamp_ms = time.time() * 1000.0
         if timestamp_ms <= self._last_timestamp_ms:
             timestamp_ms = self._last_timestamp_ms + 1.0
         self._last_timestamp_ms = timestamp_ms
 
-        self.dataPointReceived.emit(timestamp_ms, values)
+        if self._sample_store is not None:
+            self._sample_store.append(timestamp_ms, values)
+
+        if self._sample_batch is not None:
+            # 批量模式：只写缓冲区，信号在 GUI 线程取批时统一发出
+            if self._sample_batch.append(timestamp_ms, values):
+                self._request_batch_flush()
+            return
+
+        self.channelValuesChanged.emit()
+        self.lastValueChanged.emit()
+        self.dataPointReceived.emit(float(timestamp_ms), list(channel_values))
+
+    def _request_batch_flush(self) -> None:
+        """请求 GUI 线程尽快取走当前批次（跨线程时为排队调用）。"""
+        if self._sample_batch is None:
+            return
+        try:
+            self._sampleBatchReady.emit()
+        except RuntimeError:
+            # 对象已被删除，忽略
+            pass
+
+    def _drain_sample_batch(self) -> None:
+        """在 GUI 线程取走一批样本并整体分发。"""
+        if self._sample_batch is None:
+            return
+        batch = self._sample_batch.drain()
+        if batch is None:
+            return
+        xs, ys = batch
+        # drain() 返回双缓冲区的视图，下一批会覆盖它；对外信号发出副本
+        self.dataBatchReceived.emit(xs.copy(), ys.copy())
+        self.channelValuesChanged.emit()
+        self.lastValueChanged.emit()
 
     def _on_channel_count_detected(self, channel_count: int) -> None:
         """当检测到通道数时，如果还没有 prefix，则使用默认前缀"""
@@ -655,6 +1043,25 @@ class FoupAcquisitionController(QObject):
         except Exception as exc:
             logger.error(f"_append_point_to_model: {exc!r}")
 
+    def _append_batch_to_models(self, xs: Any, ys: Any) -> None:
+        """将一批样本按通道写入曲线模型，优先使用 append_points 批量接口。"""
+        try:
+            channel_count = min(ys.shape[1], len(self._series_models))
+            for channel_idx in range(channel_count):
+                model = self._series_models[channel_idx]
+                if model is None:
+                    continue
+                column = ys[:, channel_idx]
+                append_points = getattr(model, "append_points", None)
+                if callable(append_points):
+                    append_points(xs, column)
+                    continue
+                for x, y in zip(xs.tolist(), column.tolist()):
+                    if y == y:  # 跳过 NaN（该样本无此通道）
+                        model.append_point(x, y)  # type: ignore
+        except Exception as exc:
+            logger.error(f"_append_batch_to_models: {exc!r}")
+
     def _set_running(self, value: bool) -> None:
         changed = False
         with self._lock:
@@ -681,33 +1088,58 @@ class FoupAcquisitionController(QObject):
                 # 对象已被删除，忽略
                 pass
 
+    def _open_data_connection(self, host: str, port: int) -> None:
+        conn = self._connections.checkout(host, port, CHANNEL_DATA)
+        self._connection = conn
+        self._communicator = conn.communicator
+        self._frame_reader = conn.reader
+
     def _close_socket(self) -> None:
-        comm = self._communicator
+        # 采集数据流停止后仍可能有帧在途，连接不再复用
+        conn = self._connection
+        self._connection = None
         self._communicator = None
-        if comm is None:
-            return
-        try:
-            comm.close()
-        except Exception:
-            pass
+        self._frame_reader = None
+        if conn is not None:
+            self._connections.release(conn, reusable=False)
 
     def _close_e84_socket(self) -> None:
-        comm = self._e84_communicator
+        conn = self._e84_connection
+        self._e84_connection = None
         self._e84_communicator = None
-        if comm is None:
-            return
-        try:
-            comm.close()
-        except Exception:
-            pass
+        self._e84_frame_reader = None
+        if conn is not None:
+            self._connections.release(conn, reusable=False)
+
+    def _abort_e84_io(self) -> None:
+        """E84 任务超时（计时器线程）：关闭控制连接的 socket，使阻塞中的收发立即失败。
+
+        只关闭 socket 并标记连接不可复用，字段由命令线程在退出时照常归还清理。
+        """
+        conn = self._e84_connection
+        if conn is not None:
+            logger.warning("E84 命令超时，关闭控制连接")
+            conn.close()
+
+    def _release_e84_connection(self) -> None:
+        """E84 命令序列结束：控制连接归还连接池，保持连接供下次使用。"""
+        conn = self._e84_connection
+        self._e84_connection = None
+        self._e84_communicator = None
+        self._e84_frame_reader = None
+        if conn is not None:
+            self._connections.release(conn)
 
     def _ensure_e84_connected(self) -> SocketCommunicator:
         if self._e84_communicator is not None:
             return self._e84_communicator
         with self._lock:
             host, port = self._host, self._port
-        self._e84_communicator = SocketCommunicator(host, port)
-        return self._e84_communicator
+        conn = self._connections.checkout(host, port, CHANNEL_CONTROL)
+        self._e84_connection = conn
+        self._e84_communicator = conn.communicator
+        self._e84_frame_reader = conn.reader
+        return conn.communicator
 
     def _send_command_with_communicator(
         self, communicator: SocketCommunicator, text: str
@@ -716,37 +1148,45 @@ class FoupAcquisitionController(QObject):
         header = struct.pack(">I", len(payload))
         communicator.send(header + payload)
 
+    def _frame_reader_for(self, communicator: SocketCommunicator) -> FrameReader:
+        if communicator is self._e84_communicator:
+            reader = self._e84_frame_reader
+            if reader is None or reader.communicator is not communicator:
+                reader = self._e84_frame_reader = FrameReader(communicator)
+            return reader
+        reader = self._frame_reader
+        if reader is None or reader.communicator is not communicator:
+            reader = self._frame_reader = FrameReader(communicator)
+        return reader
+
     def _recv_exact_from_communicator(
         self, communicator: SocketCommunicator, size: int
     ) -> bytes | None:
-        chunks: List[bytes] = []
-        remaining = size
-        while remaining > 0:
-            try:
-                chunk = communicator.recv(remaining)
-            except Exception as exc:
-                logger.warning(f"recv exception: {exc}")
-                return None
-            if not chunk:
-                return None
-            chunks.append(chunk)
-            remaining -= len(chunk)
-        return b"".join(chunks)
+        try:
+            data = self._frame_reader_for(communicator).read_exact(size)
+        except Exception as exc:
+            logger.warning(f"recv exception: {exc}")
+            return None
+        return None if data is None else bytes(data)
+
+    def _recv_frame_from_communicator(
+        self, communicator: SocketCommunicator
+    ) -> memoryview | None:
+        """读取一帧原始负载（指向读取缓冲区，下次读取前有效），连接中断返回 None。"""
+        try:
+            return self._frame_reader_for(communicator).read_frame()
+        except Exception as exc:
+            logger.warning(f"recv exception: {exc}")
+            return None
 
     def _recv_message_from_communicator(
         self, communicator: SocketCommunicator
     ) -> str | None:
-        header = self._recv_exact_from_communicator(communicator, 4)
-        if not header:
-            return None
-        (length,) = struct.unpack(">I", header)
-        if length == 0:
-            return ""
-        payload = self._recv_exact_from_communicator(communicator, length)
+        payload = self._recv_frame_from_communicator(communicator)
         if payload is None:
             return None
         try:
-            return payload.decode("utf-8")
+            return str(payload, "utf-8")
         except UnicodeDecodeError:
             return None
 
@@ -768,34 +1208,29 @@ class FoupAcquisitionController(QObject):
         return message
 
     def _e84_query_server_identity(self) -> None:
-        self._e84_send_command("get_function_version_info")
+        self._e84_send_command(VERSION_QUERY_COMMAND)
         for _ in range(3):
             response = self._e84_recv_message()
             if not response:
                 break
-            if response.strip().lower() == "ack":
+            if is_ack(response):
                 continue
             version, prefix = self._parse_version_response(response)
             if version or prefix:
                 self._apply_server_identity(version, prefix)
+                self._remember_identity(version, prefix)
                 break
 
-    def _recv_message(self) -> str | None:
+    def _recv_frame(self) -> memoryview | None:
+        """读取一帧原始负载（不解码），连接中断返回 None。"""
         if not self._communicator:
             return None
-        header = self._recv_exact_from_communicator(self._communicator, 4)
-        if not header:
-            return None
-        (length,) = struct.unpack(">I", header)
-        if length == 0:
-            return ""
-        payload = self._recv_exact_from_communicator(self._communicator, length)
-        if payload is None:
-            return None
-        try:
-            return payload.decode("utf-8")
-        except UnicodeDecodeError:
+        return self._recv_frame_from_communicator(self._communicator)
+
+    def _recv_message(self) -> str | None:
+        if not self._communicator:
             return None
+        return self._recv_message_from_communicator(self._communicator)
 
     def _recv_exact(self, size: int) -> bytes | None:
         """
@@ -806,12 +1241,14 @@ class FoupAcquisitionController(QObject):
         return self._recv_exact_from_communicator(self._communicator, size)
 
     def _send_command(self, text: str) -> None:
-        if not self._communicator:
+        communicator = self._communicator
+        if not communicator:
             return
         try:
             payload = text.encode("utf-8")
             header = struct.pack(">I", len(payload))
-            self._communicator.send(header + payload)
+            with self._data_send_lock:
+                communicator.send(header + payload)
         except Exception as exc:
             logger.error(f"send_command error: {exc}")
 
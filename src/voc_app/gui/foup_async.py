@@ -0,0 +1,509 @@
+"""多主机 FOUP 采集引擎（asyncio）
+
+FoupAcquisitionController 每个实例占用一个阻塞读线程、只连一台主机；
+一台设备上有多个 FOUP 传感器时，改用 FoupStreamEngine：
+
+- 单个后台线程运行 asyncio 事件循环，每台主机一个协程；
+- asyncio.StreamReader.readexactly 做长度前缀分帧，帧解析复用 foup_protocol；
+- 采样写入每台主机的 SampleBatchBuffer，GUI 线程按批取走后通过 Qt 信号分发；
+- 连接断开后按指数退避自动重连，单台主机故障不影响其他主机。
+
+FoupStreamRouter 把引擎的采样与频谱分发到曲线模型和频谱模型；app.py 在设置
+VOC_FOUP_HOSTS（如 "foup1=192.168.1.10:65432,foup2=192.168.1.11"）时创建引擎与路由。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import struct
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+from PySide6.QtCore import QObject, Property, QTimer, Signal, Slot
+
+from voc_app.gui.foup_protocol import (
+    FRAME_SAMPLES,
+    VERSION_QUERY_COMMAND,
+    build_command,
+    decode_binary_frame,
+    is_ack,
+    is_binary_frame,
+    is_numeric_text,
+    normalize_spectrum,
+    parse_sample_text,
+    parse_spectrum_text,
+    parse_version_response,
+)
+from voc_app.gui.sample_batch import SampleBatchBuffer
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+from voc_app.gui.timeseries_store import TimeSeriesStore
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+# 主机连接状态
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_DISCONNECTED = "disconnected"
+STATE_STOPPED = "stopped"
+
+DEFAULT_PORT = 65432
+
+# stop() 后等待各主机发送 stop 命令并断开的最长时间，超时则直接结束事件循环
+_SHUTDOWN_TIMEOUT_S = 3.0
+
+
+def parse_host_list(text: str, default_port: int = DEFAULT_PORT) -> List[tuple[str, str, int]]:
+    """解析 "name=host:port,..." 形式的主机列表；名称与端口可省略。"""
+    hosts: List[tuple[str, str, int]] = []
+    for index, item in enumerate(part.strip() for part in text.split(",")):
+        if not item:
+            continue
+        name, sep, address = item.partition("=")
+        if not sep:
+            name, address = f"FOUP {index + 1}", item
+        host, _, port_text = address.strip().partition(":")
+        try:
+            port = int(port_text) if port_text else default_port
+        except ValueError:
+            logger.warning(f"忽略无效的 FOUP 主机配置: {item!r}")
+            continue
+        if host:
+            hosts.append((name.strip(), host.strip(), port))
+    return hosts
+
+
+@dataclass
+class _HostSession:
+    """单台主机的连接状态（仅在事件循环线程中修改，batch 除外）。"""
+
+    name: str
+    host: str
+    port: int
+    batch: SampleBatchBuffer
+    prefix: str = ""
+    version: str = ""
+    state: str = STATE_DISCONNECTED
+    task: asyncio.Task | None = field(default=None, repr=False)
+    last_timestamp_ms: float = 0.0
+
+
+class FoupStreamEngine(QObject):
+    """在一个事件循环线程中维护多条 FOUP 连接，并把结果桥接到 Qt。
+
+    所有信号都从事件循环线程发出，连接到 GUI 对象时由 Qt 自动排队到主线程；
+    samplesReceived 在 GUI 线程取批时发出，xs 为时间戳(ms)，ys 形状为 (样本数, 通道数)，均为独立副本；
+    spectrumReceived 的 bins 为每帧新分配的 float64 数组。
+    """
+
+    runningChanged = Signal()
+    hostsChanged = Signal()
+    hostStateChanged = Signal(str, str)
+    hostIdentityChanged = Signal(str, str, str)
+    samplesReceived = Signal(str, object, object)
+    spectrumReceived = Signal(str, object)
+    errorOccurred = Signal(str, str)
+    _sampleBatchReady = Signal()
+    # 事件循环线程结束时发出（排队到 GUI 线程取走剩余样本）
+    _engineStopped = Signal()
+
+    def __init__(
+        self,
+        batch_max_size: int = 32,
+        batch_max_latency_ms: int = 100,
+        max_channels: int = 16,
+        prefer_binary_frames: bool = False,
+        connect_timeout_s: float = 5.0,
+        reconnect_delay_s: float = 1.0,
+        max_reconnect_delay_s: float = 30.0,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._batch_max_size = max(1, int(batch_max_size))
+        self._max_channels = max(1, int(max_channels))
+        self._prefer_binary_frames = bool(prefer_binary_frames)
+        self._connect_timeout_s = float(connect_timeout_s)
+        self._reconnect_delay_s = max(0.01, float(reconnect_delay_s))
+        self._max_reconnect_delay_s = max(self._reconnect_delay_s, float(max_reconnect_delay_s))
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, _HostSession] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+        self._batch_timer = QTimer(self)
+        self._batch_timer.setInterval(max(1, int(batch_max_latency_ms)))
+        self._batch_timer.timeout.connect(self.drainSamples)
+        self._sampleBatchReady.connect(self.drainSamples)
+        self._engineStopped.connect(self.drainSamples)
+
+    # ---- Properties ----
+
+    @Property(bool, notify=runningChanged)
+    def running(self) -> bool:
+        return self._loop is not None
+
+    @Property(list, notify=hostsChanged)
+    def hostNames(self) -> List[str]:
+        with self._lock:
+            return list(self._sessions)
+
+    @Slot(str, result=str)
+    def hostState(self, name: str) -> str:
+        with self._lock:
+            session = self._sessions.get(name)
+            return session.state if session else ""
+
+    @Slot(str, result=str)
+    def hostPrefix(self, name: str) -> str:
+        with self._lock:
+            session = self._sessions.get(name)
+            return session.prefix if session else ""
+
+    # ---- Public API ----
+
+    @Slot()
+    def start(self) -> None:
+        """启动事件循环线程，并连接已添加的所有主机。"""
+        if self._loop is not None:
+            return
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run() -> None:
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            try:
+                loop.run_forever()
+            finally:
+                loop.close()
+                try:
+                    self._engineStopped.emit()
+                except RuntimeError:
+                    # 对象已被删除，忽略
+                    pass
+
+        self._loop = loop
+        self._thread = threading.Thread(target=run, name="FoupStreamEngine", daemon=True)
+        self._thread.start()
+        ready.wait(timeout=2.0)
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            loop.call_soon_threadsafe(self._spawn, session)
+        self._batch_timer.start()
+        self.runningChanged.emit()
+
+    @Slot()
+    def stop(self) -> None:
+        """断开所有主机（尽量先发送 stop 命令）并结束事件循环线程。
+
+        不等待断开完成：关闭在事件循环线程中进行，线程结束后经排队信号取走剩余样本。
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        self._loop = None
+        self._thread = None
+        self._batch_timer.stop()
+        future = asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+        future.add_done_callback(self._log_future_error("FOUP 引擎停止失败"))
+        # 兜底：断开超时也要结束事件循环
+        loop.call_soon_threadsafe(loop.call_later, _SHUTDOWN_TIMEOUT_S, loop.stop)
+        self.runningChanged.emit()
+
+    @Slot(str, str, int)
+    def addHost(self, name: str, host: str, port: int) -> None:
+        """添加一台主机；引擎运行中时立即开始连接。同名主机会被替换。"""
+        name = name.strip()
+        if not name:
+            return
+        self.removeHost(name)
+        session = _HostSession(
+            name=name,
+            host=host.strip(),
+            port=int(port),
+            batch=SampleBatchBuffer(self._batch_max_size, self._max_channels),
+        )
+        with self._lock:
+            self._sessions[name] = session
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._spawn, session)
+        self.hostsChanged.emit()
+
+    @Slot(str)
+    def removeHost(self, name: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(name, None)
+        if session is None:
+            return
+        loop = self._loop
+        if loop is not None:
+            # 不等待断开完成，结果只记录日志
+            future = asyncio.run_coroutine_threadsafe(self._cancel(session), loop)
+            future.add_done_callback(self._log_future_error(f"移除主机 {name} 失败"))
+        self.hostsChanged.emit()
+
+    @staticmethod
+    def _log_future_error(message: str):
+        def on_done(future) -> None:
+            if future.cancelled():
+                return
+            exc = future.exception()
+            if exc is not None:
+                logger.warning(f"{message}: {exc!r}")
+
+        return on_done
+
+    @Slot()
+    def drainSamples(self) -> None:
+        """在 GUI 线程取走所有主机的待处理样本并发出 samplesReceived。"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for session in sessions:
+            batch = session.batch.drain()
+            if batch is None:
+                continue
+            xs, ys = batch
+            # drain() 返回双缓冲区的视图，对外信号发出副本
+            self.samplesReceived.emit(session.name, xs.copy(), ys.copy())
+
+    # ---- Event loop side ----
+
+    def _spawn(self, session: _HostSession) -> None:
+        loop = asyncio.get_running_loop()
+        task = session.task
+        # 上一个事件循环可能仍在关闭中，旧任务不属于当前循环
+        if task is None or task.done() or task.get_loop() is not loop:
+            session.task = loop.create_task(self._run_host(session))
+
+    async def _cancel(self, session: _HostSession) -> None:
+        task = session.task
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _shutdown(self) -> None:
+        """取消本循环中的所有主机任务（各自发送 stop 命令）后停止事件循环。"""
+        loop = asyncio.get_running_loop()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks(loop) if task is not current]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        loop.stop()
+
+    def _set_state(self, session: _HostSession, state: str) -> None:
+        with self._lock:
+            if session.state == state:
+                return
+            session.state = state
+        self.hostStateChanged.emit(session.name, state)
+
+    async def _run_host(self, session: _HostSession) -> None:
+        delay = self._reconnect_delay_s
+        try:
+            while True:
+                self._set_state(session, STATE_CONNECTING)
+                try:
+                    reader, writer = await asyncio.wait_for(
+                        asyncio.open_connection(session.host, session.port),
+                        timeout=self._connect_timeout_s,
+                    )
+                except (OSError, asyncio.TimeoutError) as exc:
+                    self.errorOccurred.emit(session.name, f"连接失败: {exc}")
+                else:
+                    self._set_state(session, STATE_CONNECTED)
+                    delay = self._reconnect_delay_s
+                    try:
+                        await self._session_loop(session, reader, writer)
+                    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as exc:
+                        self.errorOccurred.emit(session.name, f"连接中断: {exc}")
+                    except asyncio.CancelledError:
+                        await self._send_stop(session, writer)
+                        raise
+                    finally:
+                        writer.close()
+                self._set_state(session, STATE_DISCONNECTED)
+                self._sampleBatchReady.emit()
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self._max_reconnect_delay_s)
+        except asyncio.CancelledError:
+            self._set_state(session, STATE_STOPPED)
+            raise
+
+    async def _send_stop(self, session: _HostSession, writer: asyncio.StreamWriter) -> None:
+        try:
+            self._write_command(writer, build_command(session.prefix or "VOC", "stop"))
+            await asyncio.wait_for(writer.drain(), timeout=1.0)
+        except Exception as exc:
+            logger.debug(f"{session.name} 发送停止命令失败: {exc!r}")
+
+    @staticmethod
+    def _write_command(writer: asyncio.StreamWriter, text: str) -> None:
+        payload = text.encode("utf-8")
+        writer.write(_HEADER.pack(len(payload)) + payload)
+
+    @staticmethod
+    async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+        header = await reader.readexactly(_HEADER.size)
+        (length,) = _HEADER.unpack(header)
+        if length == 0:
+            return b""
+        return await reader.readexactly(length)
+
+    async def _session_loop(
+        self,
+        session: _HostSession,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        # 查询版本得到命令前缀，最多等待 3 条响应（与线程版一致）；超时则沿用默认前缀
+        self._write_command(writer, VERSION_QUERY_COMMAND)
+        await writer.drain()
+        for _ in range(3):
+            try:
+                payload = await asyncio.wait_for(
+                    self._read_frame(reader), timeout=self._connect_timeout_s
+                )
+            except asyncio.TimeoutError:
+                break
+            if self._handle_payload(session, payload):
+                break
+
+        prefix = session.prefix or "VOC"
+        commands = [build_command(prefix, "sample_test")]
+        if self._prefer_binary_frames:
+            commands.append(build_command(prefix, "frame_binary"))
+        commands.append(build_command(prefix, "start"))
+        for command in commands:
+            self._write_command(writer, command)
+        await writer.drain()
+
+        while True:
+            self._handle_payload(session, await self._read_frame(reader))
+
+    def _handle_payload(self, session: _HostSession, payload: bytes) -> bool:
+        """处理一帧，返回 True 表示收到了版本响应。"""
+        if is_binary_frame(payload):
+            try:
+                frame = decode_binary_frame(payload)
+            except ValueError as exc:
+                logger.warning(f"{session.name} 丢弃无效二进制帧: {exc}")
+                return False
+            if frame.is_spectrum:
+                if frame.values.size:
+                    bins = np.empty(frame.values.size, dtype=np.float64)
+                    normalize_spectrum(frame.values, out=bins)
+                    self.spectrumReceived.emit(session.name, bins)
+            elif frame.frame_type == FRAME_SAMPLES and frame.values.size:
+                self._append_sample(session, frame.values.tolist(), frame.timestamp_ms)
+            return False
+
+        try:
+            cleaned = payload.decode("utf-8").strip()
+        except UnicodeDecodeError:
+            return False
+        if not cleaned or is_ack(cleaned):
+            return False
+
+        spectrum = parse_spectrum_text(cleaned)
+        if spectrum is not None:
+            if spectrum.size:
+                self.spectrumReceived.emit(session.name, spectrum)
+            return False
+
+        version, prefix = parse_version_response(cleaned)
+        if version or prefix:
+            if prefix != session.prefix or version != session.version:
+                with self._lock:
+                    session.prefix = prefix
+                    session.version = version
+                self.hostIdentityChanged.emit(session.name, version, prefix)
+            if not is_numeric_text(cleaned):
+                return True
+
+        values = parse_sample_text(cleaned)
+        if values:
+            self._append_sample(session, values, 0)
+        return False
+
+    def _append_sample(
+        self, session: _HostSession, values: List[float], timestamp_ms: float
+    ) -> None:
+        if not timestamp_ms:
+            timestamp_ms = time.time() * 1000.0
+        if timestamp_ms <= session.last_timestamp_ms:
+            timestamp_ms = session.last_timestamp_ms + 1.0
+        session.last_timestamp_ms = timestamp_ms
+        if session.batch.append(timestamp_ms, values):
+            try:
+                self._sampleBatchReady.emit()
+            except RuntimeError:
+                # 对象已被删除，忽略
+                pass
+
+
+class FoupStreamRouter(QObject):
+    """把 FoupStreamEngine 的采样与频谱写入曲线模型和频谱模型（在 GUI 线程执行）。
+
+    - 曲线：按 host_names 顺序，每台主机分得 len(series_models) // 主机数 个连续的曲线模型，
+      超出部分的通道丢弃；
+    - 频谱：多通道模型时第 i 台主机写入通道 i，单通道模型只接收第一台主机；
+    - 落盘：sample_stores 按主机名给出各自的 TimeSeriesStore（各主机时间戳独立递增，不混写一处）。
+    """
+
+    def __init__(
+        self,
+        engine: FoupStreamEngine,
+        series_models: Sequence[QObject],
+        spectrum_model: QObject | None = None,
+        host_names: Sequence[str] = (),
+        sample_stores: Mapping[str, TimeSeriesStore] | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._series_models = list(series_models)
+        self._sample_stores = dict(sample_stores or {})
+        self._spectrum_model = spectrum_model
+        self._host_index = {name: i for i, name in enumerate(host_names)}
+        self._per_host = len(self._series_models) // max(1, len(self._host_index))
+        # 引擎信号可能来自事件循环线程，连接到本对象的槽后由 Qt 排队到 GUI 线程
+        engine.samplesReceived.connect(self._on_samples)
+        engine.spectrumReceived.connect(self._on_spectrum)
+
+    @Slot(str, object, object)
+    def _on_samples(self, name: str, xs, ys) -> None:
+        index = self._host_index.get(name)
+        if index is None:
+            return
+        store = self._sample_stores.get(name)
+        if store is not None:
+            for x, row in zip(xs.tolist(), ys.tolist()):
+                store.append(x, row)
+        offset = index * self._per_host
+        for channel in range(min(ys.shape[1], self._per_host)):
+            model = self._series_models[offset + channel]
+            if model is not None:
+                model.append_points(xs, ys[:, channel])
+
+    @Slot(str, object)
+    def _on_spectrum(self, name: str, bins) -> None:
+        model = self._spectrum_model
+        index = self._host_index.get(name)
+        if model is None or index is None:
+            return
+        if isinstance(model, MultiChannelSpectrumModel):
+            model.updateChannel(index, bins)
+        elif index == 0:
+            model.updateSpectrum(bins)
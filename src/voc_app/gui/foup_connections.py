@@ -0,0 +1,437 @@
+"""FOUP 主机的常驻连接池
+
+控制器原先每次测试/正常模式采集、每次日志下载都新建 TCP 连接，E84 命令也在第一次发送时
+才建立连接，握手关键路径上要承担建连延迟（失败时最长 5 s 超时）。FoupConnectionPool
+按主机保持已连接、经过健康检查的连接：
+
+- 控制通道：每台主机一条常驻连接，独占租用（E84 命令、版本查询），命令之间不断开；
+- 数据通道：采集数据流与日志下载使用，空闲连接放回池中复用（最多 max_idle_data 条）；
+- 后台维护线程对空闲超过 ping_interval_s 的连接发送 get_function_version_info 探活，
+  断开的控制连接立即重连，连续失败时按指数退避（backoff_initial_s 起，最长 backoff_max_s）；
+- 租出前按帧丢弃已到达的未读应答（ACK、旧数据帧），保证下一条命令读到的是自己的应答。
+
+维护线程在第一次租用连接时启动，只维护最近使用的主机；切换主机时旧主机的空闲连接被关闭。
+"""
+
+from __future__ import annotations
+
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+from voc_app.gui.foup_protocol import VERSION_QUERY_COMMAND, is_ack
+from voc_app.gui.socket_client import Communicator, FrameReader
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CHANNEL_CONTROL = "control"
+CHANNEL_DATA = "data"
+
+PING_INTERVAL_S = 15.0
+PING_TIMEOUT_S = 2.0
+# 单次清理最多丢弃的帧数，避免对端持续推送时卡在清理中
+_DRAIN_MAX_FRAMES = 4096
+
+Endpoint = Tuple[str, int]
+CommunicatorFactory = Callable[[str, int], Communicator]
+
+
+def _readable(sock: socket.socket) -> bool:
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+class PooledConnection:
+    """池中的一条连接：通信器与帧读取器（预读缓冲随连接保存）。"""
+
+    def __init__(self, endpoint: Endpoint, channel: str, communicator: Communicator) -> None:
+        self.endpoint = endpoint
+        self.channel = channel
+        self.communicator = communicator
+        self.reader = FrameReader(communicator)
+        self.last_used = time.monotonic()
+        self.broken = False
+        self.leased = False
+
+    @property
+    def sock(self) -> socket.socket | None:
+        return getattr(self.communicator, "sock", None)
+
+    def send_frame(self, payload: bytes) -> None:
+        self.communicator.send(FrameReader.HEADER.pack(len(payload)) + payload)
+
+    def drain(self) -> int:
+        """按帧丢弃已到达的未读数据，返回丢弃的帧数；连接已断开时标记 broken。"""
+        sock = self.sock
+        frames = 0
+        while frames < _DRAIN_MAX_FRAMES and (
+            self.reader.buffered or (sock is not None and _readable(sock))
+        ):
+            try:
+                payload = self.reader.read_frame()
+            except Exception:
+                payload = None
+            if payload is None:
+                self.broken = True
+                break
+            frames += 1
+        return frames
+
+    def close(self) -> None:
+        self.broken = True
+        try:
+            self.communicator.close()
+        except Exception:
+            pass
+
+
+class _LeasedCommunicator(Communicator):
+    """交给 ParallelDownloader 的数据连接：归还连接池而不是断开。
+
+    Client.close() 调用 release(reusable)，传输未完整结束（中途异常、长度不符、解压失败）
+    或读取器仍有残留字节时 reusable=False，连接被关闭而不是放回池中。
+    """
+
+    def __init__(self, pool: "FoupConnectionPool", conn: PooledConnection) -> None:
+        self._pool = pool
+        self._conn = conn
+        self.supports_readahead = bool(getattr(conn.communicator, "supports_readahead", False))
+
+    def send(self, data: bytes) -> None:
+        try:
+            self._conn.communicator.send(data)
+        except Exception:
+            self._conn.broken = True
+            raise
+
+    def recv(self, size: int) -> bytes:
+        try:
+            data = self._conn.communicator.recv(size)
+        except Exception:
+            self._conn.broken = True
+            raise
+        if not data:
+            self._conn.broken = True
+        return data
+
+    def recv_into(self, buffer: memoryview) -> int:
+        try:
+            received = self._conn.communicator.recv_into(buffer)
+        except Exception:
+            self._conn.broken = True
+            raise
+        if not received:
+            self._conn.broken = True
+        return received
+
+    def release(self, reusable: bool = True) -> None:
+        self._pool.release(self._conn, reusable=reusable)
+
+    def close(self) -> None:
+        self.release()
+
+
+@dataclass
+class _EndpointState:
+    control: PooledConnection | None = None
+    control_lock: threading.Lock = field(default_factory=threading.Lock)
+    idle_data: List[PooledConnection] = field(default_factory=list)
+    data_used: bool = False
+    failures: int = 0
+    next_attempt: float = 0.0
+
+
+class FoupConnectionPool:
+    """按主机维护的常驻连接池（线程安全）。"""
+
+    def __init__(
+        self,
+        factory: CommunicatorFactory,
+        ping_interval_s: float = PING_INTERVAL_S,
+        ping_timeout_s: float = PING_TIMEOUT_S,
+        min_idle_data: int = 1,
+        max_idle_data: int = 4,
+        backoff_initial_s: float = 0.5,
+        backoff_max_s: float = 30.0,
+        checkout_timeout_s: float = 10.0,
+    ) -> None:
+        self._factory = factory
+        self._ping_interval_s = float(ping_interval_s)
+        self._ping_timeout_s = float(ping_timeout_s)
+        self._min_idle_data = max(0, int(min_idle_data))
+        self._max_idle_data = max(self._min_idle_data, int(max_idle_data))
+        self._backoff_initial_s = float(backoff_initial_s)
+        self._backoff_max_s = float(backoff_max_s)
+        self._checkout_timeout_s = float(checkout_timeout_s)
+        self._tick_s = max(0.02, min(1.0, self._ping_interval_s / 4, self._backoff_initial_s))
+
+        self._lock = threading.Lock()
+        self._endpoints: Dict[Endpoint, _EndpointState] = {}
+        self._active: Endpoint | None = None
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: threading.Thread | None = None
+
+    # ---- 租用与归还 ----
+
+    def checkout(self, host: str, port: int, channel: str = CHANNEL_CONTROL) -> PooledConnection:
+        """租用一条已连接的连接；控制通道独占，忙时最多等待 checkout_timeout_s。"""
+        endpoint = (host, int(port))
+        state = self._activate(endpoint)
+        if channel == CHANNEL_CONTROL:
+            if not state.control_lock.acquire(timeout=self._checkout_timeout_s):
+                raise TimeoutError(f"控制连接忙: {host}:{port}")
+            try:
+                conn = state.control
+                if conn is not None:
+                    conn.drain()
+                if conn is None or conn.broken:
+                    if conn is not None:
+                        conn.close()
+                        state.control = None
+                    conn = state.control = self._connect(state, endpoint, CHANNEL_CONTROL)
+            except BaseException:
+                state.control_lock.release()
+                raise
+        else:
+            conn = None
+            while conn is None:
+                with self._lock:
+                    state.data_used = True
+                    candidate = state.idle_data.pop() if state.idle_data else None
+                if candidate is None:
+                    conn = self._connect(state, endpoint, CHANNEL_DATA)
+                    break
+                candidate.drain()
+                if candidate.broken:
+                    candidate.close()
+                else:
+                    conn = candidate
+        conn.leased = True
+        return conn
+
+    def release(self, conn: PooledConnection, reusable: bool = True) -> None:
+        """归还连接；reusable=False、已断开或主机已切换时关闭。重复归还被忽略。"""
+        with self._lock:
+            if not conn.leased:
+                return
+            conn.leased = False
+            state = self._endpoints.get(conn.endpoint)
+            keep = (
+                reusable
+                and not conn.broken
+                and not self._closed
+                and conn.endpoint == self._active
+                and state is not None
+            )
+            if keep and conn.channel == CHANNEL_DATA:
+                keep = len(state.idle_data) < self._max_idle_data
+                if keep:
+                    conn.last_used = time.monotonic()
+                    state.idle_data.append(conn)
+        if conn.channel == CHANNEL_CONTROL and state is not None:
+            conn.last_used = time.monotonic()
+            if not keep:
+                conn.close()
+                if state.control is conn:
+                    state.control = None
+                    self._wake.set()
+            state.control_lock.release()
+        elif not keep:
+            conn.close()
+
+    def data_factory(self, host: str, port: int) -> Callable[[], Communicator]:
+        """返回供 ParallelDownloader 使用的连接工厂：每次租用一条数据连接，close() 时归还。"""
+
+        def factory() -> Communicator:
+            return _LeasedCommunicator(self, self.checkout(host, port, CHANNEL_DATA))
+
+        return factory
+
+    def warm_up(self, host: str, port: int) -> None:
+        """把主机设为当前主机并在后台预先建立控制连接（不阻塞调用方）。"""
+        self._activate((host, int(port)))
+
+    def close(self) -> None:
+        """停止维护线程并关闭所有空闲连接；租出中的连接在归还时关闭。"""
+        with self._lock:
+            self._closed = True
+            states = list(self._endpoints.values())
+            idle = [conn for state in states for conn in state.idle_data]
+            for state in states:
+                state.idle_data.clear()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self._ping_timeout_s + 1.0)
+        for conn in idle:
+            conn.close()
+        for state in states:
+            if state.control_lock.acquire(blocking=False):
+                try:
+                    if state.control is not None:
+                        state.control.close()
+                        state.control = None
+                finally:
+                    state.control_lock.release()
+
+    # ---- 内部实现 ----
+
+    def _activate(self, endpoint: Endpoint) -> _EndpointState:
+        stale: List[PooledConnection] = []
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("连接池已关闭")
+            state = self._endpoints.setdefault(endpoint, _EndpointState())
+            if self._active != endpoint:
+                # 切换主机：旧主机的空闲数据连接直接关闭，控制连接由维护线程关闭
+                for other, other_state in self._endpoints.items():
+                    if other != endpoint:
+                        stale.extend(other_state.idle_data)
+                        other_state.idle_data.clear()
+                self._active = endpoint
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="foup-connections", daemon=True
+                )
+                self._thread.start()
+        for conn in stale:
+            conn.close()
+        self._wake.set()
+        return state
+
+    def _connect(self, state: _EndpointState, endpoint: Endpoint, channel: str) -> PooledConnection:
+        try:
+            communicator = self._factory(*endpoint)
+        except Exception:
+            with self._lock:
+                state.failures += 1
+                delay = min(self._backoff_max_s, self._backoff_initial_s * 2 ** (state.failures - 1))
+                state.next_attempt = time.monotonic() + delay
+            raise
+        with self._lock:
+            state.failures = 0
+            state.next_attempt = 0.0
+        sock = getattr(communicator, "sock", None)
+        if sock is not None:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            except OSError:
+                pass
+        logger.debug(f"FOUP {channel} 连接已建立: {endpoint[0]}:{endpoint[1]}")
+        return PooledConnection(endpoint, channel, communicator)
+
+    def _ping(self, conn: PooledConnection) -> bool:
+        """探活：有未读数据说明连接仍在工作；否则发送版本查询并等待非 ACK 应答。"""
+        if conn.drain() or conn.broken:
+            conn.last_used = time.monotonic()
+            return not conn.broken
+        sock = conn.sock
+        previous = sock.gettimeout() if sock is not None else None
+        try:
+            if sock is not None:
+                sock.settimeout(self._ping_timeout_s)
+            conn.send_frame(VERSION_QUERY_COMMAND.encode("utf-8"))
+            for _ in range(3):
+                payload = conn.reader.read_frame()
+                if payload is None:
+                    return False
+                if not is_ack(str(payload, "utf-8", errors="replace")):
+                    conn.last_used = time.monotonic()
+                    return True
+            return False
+        except Exception as exc:
+            logger.debug(f"FOUP 连接探活失败 {conn.endpoint}: {exc}")
+            return False
+        finally:
+            if sock is not None:
+                try:
+                    sock.settimeout(previous)
+                except OSError:
+                    pass
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._tick_s)
+            self._wake.clear()
+            with self._lock:
+                if self._closed:
+                    return
+                endpoint = self._active
+                others = [
+                    (other, state) for other, state in self._endpoints.items() if other != endpoint
+                ]
+            for other, state in others:
+                self._retire_control(state)
+            if endpoint is None:
+                continue
+            try:
+                self._maintain(endpoint, self._endpoints[endpoint])
+            except Exception as exc:
+                logger.warning(f"FOUP 连接维护异常: {exc}")
+
+    def _retire_control(self, state: _EndpointState) -> None:
+        if state.control is None or not state.control_lock.acquire(blocking=False):
+            return
+        try:
+            if state.control is not None:
+                state.control.close()
+                state.control = None
+        finally:
+            state.control_lock.release()
+
+    def _due(self, state: _EndpointState) -> bool:
+        with self._lock:
+            return not self._closed and time.monotonic() >= state.next_attempt
+
+    def _maintain(self, endpoint: Endpoint, state: _EndpointState) -> None:
+        host, port = endpoint
+        if state.control_lock.acquire(blocking=False):
+            try:
+                conn = state.control
+                if conn is not None and time.monotonic() - conn.last_used >= self._ping_interval_s:
+                    if not self._ping(conn):
+                        logger.info(f"FOUP 控制连接探活失败，重新连接: {host}:{port}")
+                        conn.close()
+                        state.control = conn = None
+                if conn is None and self._due(state):
+                    try:
+                        state.control = self._connect(state, endpoint, CHANNEL_CONTROL)
+                    except Exception as exc:
+                        logger.debug(f"FOUP 控制连接预热失败 {host}:{port}: {exc}")
+            finally:
+                state.control_lock.release()
+
+        now = time.monotonic()
+        with self._lock:
+            stale = [c for c in state.idle_data if now - c.last_used >= self._ping_interval_s]
+            for conn in stale:
+                state.idle_data.remove(conn)
+        for conn in stale:
+            alive = self._ping(conn)
+            with self._lock:
+                keep = alive and not self._closed and len(state.idle_data) < self._max_idle_data
+                if keep:
+                    state.idle_data.append(conn)
+            if not keep:
+                conn.close()
+
+        # 数据通道用过之后保持至少 min_idle_data 条空闲连接
+        while state.data_used and self._due(state):
+            with self._lock:
+                if len(state.idle_data) >= self._min_idle_data or self._active != endpoint:
+                    break
+            try:
+                conn = self._connect(state, endpoint, CHANNEL_DATA)
+            except Exception as exc:
+                logger.debug(f"FOUP 数据连接预热失败 {host}:{port}: {exc}")
+                break
+            with self._lock:
+                state.idle_data.append(conn)
@@ -0,0 +1,245 @@
+"""FOUP 采集流帧格式
+
+所有消息都包在 4 字节大端长度前缀中，负载有两种格式：
+
+文本帧（旧固件，默认）::
+
+    "12.3,45.6,78.9"                 # 采样值，逗号分隔
+    "SPEC,<ts>,<bin0>,<bin1>,..."     # 频谱帧（时间戳可选）
+
+二进制帧（通过 {prefix}_frame_format_binary 协商后启用）::
+
+    偏移  长度  含义
+    0     1     魔数 0xFB（UTF-8 中不可能出现的起始字节，不会与文本帧混淆）
+    1     1     版本号，当前为 1
+    2     1     帧类型：1=采样 float32，2=频谱 float32，3=频谱 uint32
+    3     1     通道号（频谱通道；采样帧为 0）
+    4     4     元素个数 count（uint32，大端）
+    8     8     时间戳 ms（uint64，大端；0 表示未提供）
+    16    4*n   负载：count 个大端 float32 / uint32
+
+解码使用 numpy.frombuffer 直接引用接收缓冲区，不做逐元素拷贝；
+控制器按帧判断格式，协商失败（旧固件忽略命令）时继续按文本解析。
+
+文本帧解析与命令生成也放在这里，供 FoupAcquisitionController（线程版）
+与 FoupStreamEngine（asyncio 多主机版）共用。
+"""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+BINARY_MAGIC = 0xFB
+BINARY_VERSION = 1
+
+FRAME_SAMPLES = 1
+FRAME_SPECTRUM_F32 = 2
+FRAME_SPECTRUM_U32 = 3
+
+VERSION_QUERY_COMMAND = "get_function_version_info"
+
+# 命令键 -> 动作名，完整命令为 {prefix}_{action}
+COMMAND_ACTIONS: dict[str, str] = {
+    "sample_test": "sample_type_test",
+    "sample_normal": "sample_type_normal",
+    "start": "data_coll_ctrl_start",
+    "stop": "data_coll_ctrl_stop",
+    "frame_binary": "frame_format_binary",
+}
+
+SPECTRUM_PREFIXES = frozenset({"SPEC"})
+
+BINARY_HEADER = struct.Struct(">BBBBIQ")
+
+_PAYLOAD_DTYPES: dict[int, np.dtype] = {
+    FRAME_SAMPLES: np.dtype(">f4"),
+    FRAME_SPECTRUM_F32: np.dtype(">f4"),
+    FRAME_SPECTRUM_U32: np.dtype(">u4"),
+}
+
+
+@dataclass(frozen=True)
+class BinaryFrame:
+    """解码后的二进制帧，values 为接收缓冲区上的只读视图。"""
+
+    frame_type: int
+    channel: int
+    timestamp_ms: int
+    values: NDArray
+
+    @property
+    def is_spectrum(self) -> bool:
+        return self.frame_type in (FRAME_SPECTRUM_F32, FRAME_SPECTRUM_U32)
+
+
+def is_binary_frame(payload: bytes | bytearray | memoryview) -> bool:
+    """判断负载是否为二进制帧（首字节为魔数）。"""
+    return len(payload) > 0 and payload[0] == BINARY_MAGIC
+
+
+def decode_binary_frame(payload: bytes | bytearray | memoryview) -> BinaryFrame:
+    """解码二进制帧，格式不合法时抛出 ValueError。"""
+    if len(payload) < BINARY_HEADER.size:
+        raise ValueError(f"二进制帧过短: {len(payload)} bytes")
+    magic, version, frame_type, channel, count, timestamp_ms = BINARY_HEADER.unpack_from(
+        payload, 0
+    )
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"二进制帧魔数错误: 0x{magic:02X}")
+    if version != BINARY_VERSION:
+        raise ValueError(f"不支持的二进制帧版本: {version}")
+    dtype = _PAYLOAD_DTYPES.get(frame_type)
+    if dtype is None:
+        raise ValueError(f"未知的二进制帧类型: {frame_type}")
+    expected = BINARY_HEADER.size + count * dtype.itemsize
+    if len(payload) < expected:
+        raise ValueError(f"二进制帧负载不完整: 需要 {expected} bytes，实际 {len(payload)}")
+    values = np.frombuffer(payload, dtype=dtype, count=count, offset=BINARY_HEADER.size)
+    return BinaryFrame(
+        frame_type=frame_type,
+        channel=channel,
+        timestamp_ms=timestamp_ms,
+        values=values,
+    )
+
+
+def encode_binary_frame(
+    frame_type: int,
+    values: Sequence[float] | NDArray,
+    channel: int = 0,
+    timestamp_ms: int = 0,
+) -> bytes:
+    """编码二进制帧负载（不含 4 字节长度前缀）。"""
+    dtype = _PAYLOAD_DTYPES.get(frame_type)
+    if dtype is None:
+        raise ValueError(f"未知的二进制帧类型: {frame_type}")
+    body = np.asarray(values).astype(dtype, copy=False)
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, BINARY_VERSION, frame_type, channel, len(body), int(timestamp_ms)
+    )
+    return header + body.tobytes()
+
+
+def normalize_spectrum(
+    bins: NDArray, out: NDArray[np.float64] | None = None
+) -> NDArray[np.float64]:
+    """频谱图组件期望 0.0~1.0：超出范围的输入（如 uint32）按帧最大值归一化。
+
+    与旧实现一致：范围内的数据原样返回；否则除以最大值并把负值钳到 0，
+    最大值 <= 0 时整帧置 0。给出 out（可以就是 bins 本身）时结果写入 out
+    并原地计算，不分配新数组。
+    """
+    if out is not None:
+        if out is not bins:
+            np.copyto(out, bins)
+        bins = out
+    if bins.size == 0:
+        return bins
+    max_v = float(bins.max())
+    if max_v <= 1.0 and float(bins.min()) >= 0.0:
+        return bins
+    if max_v <= 0:
+        if out is not None:
+            out.fill(0.0)
+            return out
+        return np.zeros_like(bins, dtype=np.float64)
+    if out is not None:
+        out /= max_v
+        normalized = out
+    else:
+        normalized = bins / max_v
+    np.maximum(normalized, 0.0, out=normalized)
+    return normalized
+
+
+def build_command(prefix: str, key: str) -> str:
+    """生成 {prefix}_{action} 命令，未知 key 原样作为动作名。"""
+    return f"{prefix}_{COMMAND_ACTIONS.get(key, key)}"
+
+
+def is_ack(text: str) -> bool:
+    return text.strip().lower() == "ack"
+
+
+def parse_version_response(response: str) -> tuple[str, str]:
+    """解析版本响应，返回 (version, prefix)，prefix 统一大写"""
+    cleaned = (response or "").strip()
+    if not cleaned or not any(ch.isalpha() for ch in cleaned):
+        return "", ""
+    parts = [part.strip() for part in cleaned.split(",") if part.strip()]
+    type_token = parts[0] if parts else cleaned
+    version = parts[1] if len(parts) > 1 else ""
+    # prefix 统一转大写
+    prefix = type_token.upper()
+    return version, prefix
+
+
+def parse_spectrum_text(cleaned: str, normalize: bool = True) -> NDArray[np.float64] | None:
+    """解析文本频谱帧 SPEC,[<ts>,]<bins...>。
+
+    不是频谱帧时返回 None；是频谱帧但数据无效时返回空数组；
+    否则返回归一化到 0.0~1.0 的 bins（normalize=False 时返回原始值，
+    由调用方归一化到自己的缓冲区）。
+    """
+    head, sep, body = cleaned.partition(",")
+    if not sep or head.strip().upper() not in SPECTRUM_PREFIXES:
+        return None
+    values = _parse_spectrum_bins(body)
+    if values is None:
+        return np.empty(0, dtype=np.float64)
+    # 兼容：SPEC,<timestamp>,<256 bins...>
+    if len(values) == 257 and values[0] > 1_000_000:
+        values = values[1:]
+    if not normalize:
+        return values
+    return normalize_spectrum(values, out=values)
+
+
+def _parse_spectrum_bins(body: str) -> NDArray[np.float64] | None:
+    """逗号分隔的数值一次性解析为 float64 数组，含无效字段时返回 None。"""
+    try:
+        # 快速路径：C 层逐段解析，不为每个 bin 创建 Python float
+        values = np.fromstring(body, dtype=np.float64, sep=",")
+    except ValueError:
+        pass
+    else:
+        # NumPy 1.x 遇到无效字段不抛异常，只告警并返回已解析的前缀；按字段数核对
+        if len(values) == body.count(",") + 1:
+            return values
+    # 慢速路径：兼容空字段（如 "1,,2"），与旧实现一致地跳过
+    values: list[float] = []
+    for token in body.split(","):
+        token = token.strip()
+        if not token:
+            continue
+        try:
+            values.append(float(token))
+        except ValueError:
+            return None
+    return np.asarray(values, dtype=np.float64)
+
+
+def is_numeric_text(cleaned: str) -> bool:
+    return all(ch in "0123456789.,-+ " for ch in cleaned)
+
+
+def parse_sample_text(cleaned: str) -> list[float]:
+    """解析逗号分隔的采样值，无法解析的字段被跳过。"""
+    values: list[float] = []
+    if "," in cleaned:
+        for token in cleaned.split(","):
+            try:
+                values.append(float(token.strip()))
+            except ValueError:
+                continue
+    else:
+        try:
+            values.append(float(cleaned))
+        except ValueError:
+            pass
+    return values
@@ -146,16 +146,11 @@ def get_spectrum_config_for_env() -> dict:
         "showPeakHold": True,
     }
 
-    # WSL2 环境 - 降低效果以提升性能
+    # WSL2 环境 - 关闭扫描线等全屏叠加层；发光与倒影已由 SpectrumRenderer
+    # 以几何方式绘制（不再使用 MultiEffect 模糊），可以保留
     if env_info["is_wsl2"]:
-        config = {
-            "glowEnabled": False,        # 禁用发光 - 最大性能影响
-            "reflectionEnabled": False,  # 禁用倒影 - 中等性能影响
-            "scanLineEnabled": False,
-            "borderGlowEnabled": True,   # 保留边框发光 - 影响小
-            "showPeakHold": True,
-        }
-        logger.info("WSL2 环境: 建议禁用 glowEnabled 和 reflectionEnabled 以提升性能")
+        config["scanLineEnabled"] = False
+        logger.info("WSL2 环境: 发光与倒影为几何效果，保持启用")
 
     return config
 
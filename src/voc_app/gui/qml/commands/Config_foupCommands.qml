@@ -85,7 +85,7 @@ Column {
     CustomButton {
         text: acquisitionController && acquisitionController.running ? "采集中" : "开始采集"
         width: parent.width
-        enabled: acquisitionController && !acquisitionController.running && operationMode === "test"
+        enabled: acquisitionController && !acquisitionController.running && !acquisitionController.streamEngineActive && operationMode === "test"
         status: acquisitionController && acquisitionController.running ? "processing" : "normal"
         onClicked: {
             if (!acquisitionController) {
@@ -66,6 +66,21 @@ Column {
         }
     }
 
+    CustomButton {
+        text: "采样历史"
+        width: parent.width
+        visible: typeof storeHistory !== "undefined"
+        onClicked: {
+            const view = dataLogCommands.dataLogView();
+            if (!view)
+                return;
+            if (view.historyVisible)
+                view.closeStoredHistory();
+            else if (view.showStoredHistory)
+                view.showStoredHistory();
+        }
+    }
+
     CustomButton {
         text: "保存图片"
         width: parent.width
@@ -79,7 +94,7 @@ Column {
     CustomButton {
         text: acquisitionController && acquisitionController.running ? "采集中" : "下载日志（正常模式）"
         width: parent.width
-        enabled: acquisitionController && !acquisitionController.running
+        enabled: acquisitionController && !acquisitionController.running && !acquisitionController.streamEngineActive
         status: acquisitionController && acquisitionController.running ? "processing" : "normal"
         onClicked: {
             if (!acquisitionController) {
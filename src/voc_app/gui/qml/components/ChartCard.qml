@@ -51,6 +51,15 @@ Rectangle {
     property int yColumn: 1
     property real scaleFactor: Components.UiTheme.controlScale
 
+    // 降采样数据源（如 ColumnData），设置后按绘图区像素宽度向 Python 请求点，忽略 dataPoints
+    property var pointSource: null
+    property string decimationMethod: "lttb"  // "lttb" 或 "minmax"
+    // 可视 x 范围（ms），NaN 表示显示全部数据
+    property real viewMinX: Number.NaN
+    property real viewMaxX: Number.NaN
+    // 允许滚轮/双指缩放 x 范围，双击恢复全部范围
+    property bool rangeZoomEnabled: false
+
 
     ColumnLayout {
         anchors.fill: parent
@@ -256,6 +265,48 @@ Rectangle {
                 markerSize: 12
             }
 
+            // 绘图区尺寸变化（布局、进入放大视图）时合并为一次重新降采样
+            onPlotAreaChanged: if (chartCard.pointSource) decimationTimer.restart()
+
+            Timer {
+                id: decimationTimer
+                interval: 30
+                repeat: false
+                onTriggered: chartCard.refreshDecimatedPoints()
+            }
+
+            WheelHandler {
+                target: null
+                enabled: chartCard.rangeZoomEnabled && chartCard.pointSource !== null
+                onWheel: function (event) {
+                    var factor = event.angleDelta.y > 0 ? 1.25 : 0.8;
+                    chartCard.zoomRange(chartCard.currentMinX(), chartCard.currentMaxX(), factor, point.position.x);
+                }
+            }
+
+            PinchHandler {
+                id: rangePinch
+                target: null
+                enabled: chartCard.rangeZoomEnabled && chartCard.pointSource !== null
+                property real startMinX: 0
+                property real startMaxX: 0
+                onActiveChanged: {
+                    if (active) {
+                        startMinX = chartCard.currentMinX();
+                        startMaxX = chartCard.currentMaxX();
+                    }
+                }
+                onActiveScaleChanged: {
+                    if (active)
+                        chartCard.zoomRange(startMinX, startMaxX, activeScale, centroid.position.x);
+                }
+            }
+
+            TapHandler {
+                enabled: chartCard.rangeZoomEnabled && chartCard.pointSource !== null
+                onDoubleTapped: chartCard.resetViewRange()
+            }
+
             VXYModelMapper {
                 id: lineMapper
                 // 绑定将在 updateMapperBinding 中处理
@@ -284,6 +335,9 @@ Rectangle {
         if (chartCard.seriesModel && chartCard.seriesModel.hasData) {
             minX = chartCard.seriesModel.minX;
             maxX = chartCard.seriesModel.maxX;
+        } else if (chartCard.pointSource && chartCard.pointSource.pointCount > 0) {
+            minX = chartCard.pointSource.minX;
+            maxX = chartCard.pointSource.maxX;
         } else if (chartCard.dataPoints && chartCard.dataPoints.length > 0) {
             minX = chartCard.dataPoints[0].x;
             maxX = chartCard.dataPoints[0].x;
@@ -443,22 +497,81 @@ Rectangle {
 
     // 如果不使用 Model 而是直接传入 dataPoints 数组
     onDataPointsChanged: {
-        if (chartCard.seriesModel) return;
+        if (chartCard.seriesModel || chartCard.pointSource) return;
+        plotPoints(dataPoints);
+    }
+
+    onPointSourceChanged: {
+        viewMinX = Number.NaN;
+        viewMaxX = Number.NaN;
+        refreshDecimatedPoints();
+    }
+    onViewMinXChanged: if (pointSource) decimationTimer.restart()
+    onViewMaxXChanged: if (pointSource) decimationTimer.restart()
+    onDecimationMethodChanged: if (pointSource) refreshDecimatedPoints()
+
+    function currentMinX() {
+        return isNaN(viewMinX) ? pointSource.minX : viewMinX;
+    }
+
+    function currentMaxX() {
+        return isNaN(viewMaxX) ? pointSource.maxX : viewMaxX;
+    }
+
+    function resetViewRange() {
+        viewMinX = Number.NaN;
+        viewMaxX = Number.NaN;
+    }
+
+    // 以绘图区内横坐标 px 对应的时间为中心，把 [minX, maxX] 缩放 scale 倍
+    function zoomRange(minX, maxX, scale, px) {
+        if (!pointSource || scale <= 0 || maxX <= minX)
+            return;
+        var plot = chartView.plotArea;
+        var ratio = plot.width > 0 ? Math.min(1, Math.max(0, (px - plot.x) / plot.width)) : 0.5;
+        var center = minX + ratio * (maxX - minX);
+        var fullMin = pointSource.minX;
+        var fullMax = pointSource.maxX;
+        var span = Math.max(10, (maxX - minX) / scale);
+        if (span >= fullMax - fullMin) {
+            resetViewRange();
+            return;
+        }
+        var newMin = Math.max(fullMin, center - ratio * span);
+        var newMax = Math.min(fullMax, newMin + span);
+        viewMinX = newMax - span;
+        viewMaxX = newMax;
+    }
+
+    // 按当前绘图区宽度和可视范围请求降采样后的点，点数与屏幕宽度相关而与文件大小无关
+    function refreshDecimatedPoints() {
+        if (!pointSource) {
+            plotPoints(dataPoints);
+            return;
+        }
+        var width = Math.max(1, Math.round(chartView.plotArea.width));
+        plotPoints(pointSource.decimatedPoints(viewMinX, viewMaxX, width, decimationMethod));
+        if (!isNaN(viewMinX) && !isNaN(viewMaxX)) {
+            xAxis.min = new Date(viewMinX);
+            xAxis.max = new Date(viewMaxX);
+        }
+    }
 
+    function plotPoints(points) {
         lineSeries.clear();
         pointSeries.clear();
-        if (!dataPoints || dataPoints.length === 0) {
+        if (!points || points.length === 0) {
             resetAxesToDefault();
             return;
         }
 
-        var minX = dataPoints[0].x;
-        var maxX = dataPoints[0].x;
-        var minY = dataPoints[0].y;
-        var maxY = dataPoints[0].y;
+        var minX = points[0].x;
+        var maxX = points[0].x;
+        var minY = points[0].y;
+        var maxY = points[0].y;
 
-        for (var i = 0; i < dataPoints.length; i++) {
-            var point = dataPoints[i];
+        for (var i = 0; i < points.length; i++) {
+            var point = points[i];
             lineSeries.append(point.x, point.y);
             pointSeries.append(point.x, point.y);
             if (point.x < minX) minX = point.x;
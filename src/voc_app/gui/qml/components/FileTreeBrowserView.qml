@@ -15,6 +15,9 @@ Rectangle {
     property string selectedPath: ""
     property string filterText: ""
     property var nameFilters: filterText.length > 0 ? ["*" + filterText + "*"] : ["*"]
+    // 可选：Python 侧的文件索引模型（CsvFileListModel）。设置后以可排序的平铺列表代替目录树，
+    // 过滤与排序都交给模型完成，不再由 FolderListModel 遍历目录
+    property var fileListModel: null
     // 规范化目录
     property string normalizedBasePath: basePath ? basePath.replace(/\\/g, "/") : ""
     // 用于显示的根目录名称
@@ -67,7 +70,22 @@ Rectangle {
             treePane.contentY = maxY;
     }
 
-    function updateDefaultPreview(path) {
+    function absolutePath(relative) {
+        if (!normalizedBasePath)
+            return relative;
+        return normalizedBasePath.endsWith("/") ? normalizedBasePath + relative : normalizedBasePath + "/" + relative;
+    }
+
+    onFilterTextChanged: {
+        if (fileListModel)
+            fileListModel.filterText = filterText;
+    }
+    onFileListModelChanged: {
+        if (fileListModel)
+            fileListModel.filterText = filterText;
+    }
+
+        function updateDefaultPreview(path) {
         if (!fileControllerRef || previewComponent || !previewContentItem)
             return;
         if ("text" in previewContentItem) {
@@ -125,17 +143,20 @@ Rectangle {
 
                 Item {
                     width: treeColumn.width
-                    implicitHeight: rootChildrenLoader.item ? rootChildrenLoader.item.implicitHeight : 0
+                    // 平铺列表自带滚动，占满剩余高度；目录树按内容高度展开
+                    implicitHeight: root.fileListModel
+                        ? Math.max(0, treePane.height - filterField.y - filterField.height - treeColumn.spacing)
+                        : (rootChildrenLoader.item ? rootChildrenLoader.item.implicitHeight : 0)
                     height: implicitHeight
 
                     Loader {
                         id: rootChildrenLoader
                         anchors.fill: parent
-                        active: root.basePath && root.basePath.length > 0
-                        sourceComponent: directoryContents
+                        active: root.fileListModel !== null || (root.basePath && root.basePath.length > 0)
+                        sourceComponent: root.fileListModel ? indexedFileList : directoryContents
                         onLoaded: {
                             const topColumn = rootChildrenLoader.item;
-                            if (!topColumn)
+                            if (!topColumn || root.fileListModel)
                                 return;
                             topColumn.folderPath = root.basePath;
                             topColumn.parentDepth = -1;
@@ -344,6 +365,108 @@ Rectangle {
         }
     }
 
+    // 基于文件索引模型的平铺列表（只创建可见行的委托）
+    Component {
+        id: indexedFileList
+        ColumnLayout {
+            spacing: 2 * root.scaleFactor
+
+            RowLayout {
+                Layout.fillWidth: true
+                Layout.leftMargin: 6 * root.scaleFactor
+                Layout.rightMargin: 6 * root.scaleFactor
+                spacing: 6 * root.scaleFactor
+
+                ComboBox {
+                    id: sortBox
+                    Layout.fillWidth: true
+                    font.pixelSize: Components.UiTheme.fontSize("body")
+                    textRole: "text"
+                    valueRole: "value"
+                    model: [
+                        { "text": "按路径", "value": "path" },
+                        { "text": "按修改时间", "value": "modified" },
+                        { "text": "按数据时间", "value": "startTime" },
+                        { "text": "按大小", "value": "size" },
+                        { "text": "按行数", "value": "rows" }
+                    ]
+                    Component.onCompleted: currentIndex = Math.max(0, indexOfValue(root.fileListModel.sortKey))
+                    onActivated: root.fileListModel.sortKey = currentValue
+                }
+
+                Button {
+                    text: root.fileListModel && root.fileListModel.sortAscending ? "↑" : "↓"
+                    font.pixelSize: Components.UiTheme.fontSize("body")
+                    onClicked: root.fileListModel.sortAscending = !root.fileListModel.sortAscending
+                }
+            }
+
+            ListView {
+                id: indexedList
+                Layout.fillWidth: true
+                Layout.fillHeight: true
+                clip: true
+                model: root.fileListModel
+                ScrollBar.vertical: ScrollBar {}
+
+                delegate: Item {
+                    id: fileRow
+                    required property string path
+                    required property string name
+                    required property string directory
+                    required property int rows
+                    readonly property string absolute: root.absolutePath(path)
+                    width: indexedList.width
+                    height: 52 * root.scaleFactor
+
+                    Rectangle {
+                        anchors.fill: parent
+                        anchors.leftMargin: Components.UiTheme.spacing("sm")
+                        anchors.rightMargin: Components.UiTheme.spacing("sm")
+                        anchors.topMargin: Components.UiTheme.spacing("xs")
+                        anchors.bottomMargin: Components.UiTheme.spacing("xs")
+                        radius: Components.UiTheme.radius("md")
+                        color: Components.UiTheme.color("accentInfo")
+                        opacity: root.selectedPath === fileRow.absolute ? 0.25 : 0
+                    }
+
+                    Column {
+                        anchors.verticalCenter: parent.verticalCenter
+                        anchors.left: parent.left
+                        anchors.right: parent.right
+                        anchors.leftMargin: 12 * root.scaleFactor
+                        anchors.rightMargin: 10 * root.scaleFactor
+
+                        Text {
+                            width: parent.width
+                            text: fileRow.name
+                            elide: Text.ElideRight
+                            color: Components.UiTheme.color("textPrimary")
+                            font.pixelSize: Components.UiTheme.fontSize("body")
+                        }
+
+                        Text {
+                            width: parent.width
+                            text: (fileRow.directory ? fileRow.directory + " · " : "") + fileRow.rows + " 行"
+                            elide: Text.ElideRight
+                            color: Components.UiTheme.color("textSecondary")
+                            font.pixelSize: Components.UiTheme.fontSize("caption")
+                        }
+                    }
+
+                    MouseArea {
+                        anchors.fill: parent
+                        onClicked: {
+                            root.selectedPath = fileRow.absolute;
+                            root.updateDefaultPreview(fileRow.absolute);
+                            root.fileSelected(fileRow.absolute);
+                        }
+                    }
+                }
+            }
+        }
+    }
+
     // 默认的预览组件
     Component {
         id: defaultPreviewComponent
@@ -1,6 +1,6 @@
 import QtQuick
 import QtQuick.Layouts
-import QtQuick.Effects
+import VocSpectrum 1.0
 import "." as Components
 
 /**
@@ -8,12 +8,13 @@ import "." as Components
  * =========================================
  *
  * 这是一个用于 QML 的高性能频谱可视化组件，专为实时频谱显示设计。
- * 使用 Canvas 直接绘制，避免 QtCharts 的模型绑定开销。
+ * 频谱主体由 Python 端 SpectrumRenderer（场景图几何节点）绘制，
+ * 网格与扫描线等静态内容仍使用 Canvas，避免 QtCharts 的模型绑定开销。
  *
  * 设计目标
  * --------
  * - 支持高频更新（256 点/包，10+ Hz）
- * - 使用 Canvas.Threaded 进行非阻塞渲染
+ * - 顶点直接从 NumPy 缓冲区生成，不经过 JavaScript 数组
  * - 预计算颜色查找表 (LUT) 避免每帧重复计算
  * - 支持多种图表类型（柱状图、折线图）
  * - 丰富的视觉效果（发光、倒影、扫描线等）
@@ -139,7 +140,7 @@ import "." as Components
  *
  * 视觉效果:
  *   - glowEnabled: bool         - 启用发光效果 (默认: true)
- *                                 注意: 使用 MultiEffect，GPU 开销较大
+ *                                 以加宽半透明几何实现，开销很小
  *   - glowIntensity: real       - 发光强度 0.0~1.0 (默认: 0.6)
  *   - reflectionEnabled: bool   - 启用倒影效果 (默认: true)
  *   - reflectionOpacity: real   - 倒影透明度 0.0~1.0 (默认: 0.15)
@@ -155,15 +156,12 @@ import "." as Components
  * 性能建议
  * --------
  * 1. 视觉效果对性能的影响（从高到低）:
- *    - glowEnabled: ~50% GPU 开销（使用 MultiEffect 模糊）
- *    - reflectionEnabled: ~25% GPU 开销
  *    - scanLineEnabled: ~10% GPU 开销
  *    - borderGlowEnabled: ~5% GPU 开销
+ *    - glowEnabled / reflectionEnabled: 与主体在同一几何节点中绘制，仅增加顶点数
  *
  * 2. 高频更新场景建议:
- *    - 禁用 glowEnabled（影响最大）
  *    - 减少 bin 数量（如 128 代替 256）
- *    - 使用 useGradient: true（单次渐变比逐柱着色更快）
  *
  * 3. 移动设备/嵌入式设备建议:
  *    - 禁用所有视觉效果
@@ -252,8 +250,7 @@ Rectangle {
 
     // ==================== 视觉效果 ====================
     // 这些效果会增加 GPU 开销，在性能敏感场景建议禁用
-    // glowEnabled: 使用 MultiEffect 模糊，开销最大 (~50%)
-    // reflectionEnabled: 绘制倒影 Canvas，开销中等 (~25%)
+    // glowEnabled / reflectionEnabled: 由 SpectrumRenderer 以几何方式绘制，开销很小
     // scanLineEnabled: CRT 风格扫描线，开销较小 (~10%)
     // borderGlowEnabled: 边框发光，开销最小 (~5%)
     // 注意: 默认值会被 spectrumPerfConfig (如果存在) 覆盖
@@ -266,12 +263,6 @@ Rectangle {
     property bool borderGlowEnabled: (typeof spectrumPerfConfig !== "undefined" && spectrumPerfConfig) ? spectrumPerfConfig.borderGlowEnabled : true
     property bool animateChanges: true            // 动画过渡效果（预留）
 
-    // ==================== 内部状态 ====================
-    // cachedData/cachedPeaks: 从 Python 模型获取的数据缓存
-    // 避免每次绑定表达式求值时重复调用 Python 属性
-    property var cachedData: []
-    property var cachedPeaks: []
-
     // ==================== 配色方案定义 ====================
     // 每个配色方案定义一组颜色停止点 (position, r, g, b)
     // position: 0.0~1.0，对应归一化值
@@ -429,452 +420,31 @@ Rectangle {
                     onHeightChanged: requestPaint()
                 }
 
-                // 频谱柱状图 Canvas
-                // 使用 Canvas.Threaded 渲染策略，在单独线程中执行绑制操作
-                // 避免阻塞 UI 线程，提高高频更新时的响应性
-                Canvas {
-                    id: spectrumCanvas
+                // 频谱主体（柱状图/折线图 + 发光 + 倒影 + 峰值保持）
+                // 由 Python 端 SpectrumRenderer 在场景图中直接从 NumPy 缓冲区生成顶点，
+                // 单个几何节点一次绘制；发光与倒影是几何效果，不再使用离屏模糊和额外 Canvas
+                SpectrumRenderer {
+                    id: spectrumRenderer
                     anchors.fill: parent
                     anchors.margins: 2
-                    renderStrategy: Canvas.Threaded  // 使用线程渲染提高性能
-
-                    // ===== 颜色查找表 (LUT) =====
-                    // 预计算 lutSize+1 个颜色值，避免每帧重复插值计算
-                    // 查找时间复杂度 O(1)，相比实时插值 O(n) 大幅提升性能
-                    property var colorLUT: []
-                    property int lutSize: 64  // 查找表大小
-
-                    /**
-                     * 初始化颜色查找表
-                     * 在配色方案变化时调用，预计算所有颜色值
-                     */
-                    function buildColorLUT() {
-                        var lut = [];
-                        for (var i = 0; i <= lutSize; i++) {
-                            lut.push(computeColor(i / lutSize));
-                        }
-                        colorLUT = lut;
-                    }
-
-                    /**
-                     * 计算单个颜色值（内部方法）
-                     * @param normalizedValue - 归一化值 0.0~1.0
-                     * @returns Canvas 可用的颜色字符串 "rgb(r,g,b)" 或 "rgba(r,g,b,a)"
-                     *
-                     * 根据配色方案在颜色停止点之间进行线性插值
-                     */
-                    function computeColor(normalizedValue) {
-                        if (spectrumCard.colorScheme === "mono") {
-                            var mc = spectrumCard.monoColor;
-                            var alpha = 0.3 + 0.7 * normalizedValue;
-                            var r = Math.floor(mc.r * 255);
-                            var g = Math.floor(mc.g * 255);
-                            var b = Math.floor(mc.b * 255);
-                            return "rgba(" + r + "," + g + "," + b + "," + alpha + ")";
-                        }
-
-                        var scheme = spectrumCard.colorSchemes[spectrumCard.colorScheme] || spectrumCard.colorSchemes["spectrum"];
-                        var v = Math.max(0, Math.min(1, normalizedValue));
-
-                        var idx = 0;
-                        while (idx < scheme.length - 1 && scheme[idx + 1].pos < v) idx++;
-
-                        if (idx >= scheme.length - 1) {
-                            var last = scheme[scheme.length - 1];
-                            return "rgb(" + last.r + "," + last.g + "," + last.b + ")";
-                        }
-
-                        var c1 = scheme[idx];
-                        var c2 = scheme[idx + 1];
-                        var t = (v - c1.pos) / (c2.pos - c1.pos);
-
-                        var r = Math.floor(c1.r + (c2.r - c1.r) * t);
-                        var g = Math.floor(c1.g + (c2.g - c1.g) * t);
-                        var b = Math.floor(c1.b + (c2.b - c1.b) * t);
-
-                        return "rgb(" + r + "," + g + "," + b + ")";
-                    }
-
-                    /**
-                     * 从查找表获取颜色（快速路径）
-                     * @param normalizedValue - 归一化值 0.0~1.0
-                     * @returns 预计算的颜色字符串
-                     *
-                     * 使用 O(1) 查表代替 O(n) 插值计算
-                     */
-                    function getBarColor(normalizedValue) {
-                        if (colorLUT.length === 0) return "#ff0000";
-                        var idx = Math.floor(Math.max(0, Math.min(1, normalizedValue)) * lutSize);
-                        return colorLUT[Math.min(idx, lutSize)];
-                    }
-
-                    /**
-                     * 获取带透明度的颜色（用于折线图填充）
-                     * @param normalizedValue - 归一化值 0.0~1.0
-                     * @param alpha - 透明度 0.0~1.0
-                     * @returns 带 alpha 通道的颜色字符串 "rgba(r,g,b,a)"
-                     *
-                     * 不使用 LUT，因为 alpha 值可变
-                     */
-                    function getBarColorWithAlpha(normalizedValue, alpha) {
-                        if (spectrumCard.colorScheme === "mono") {
-                            var mc = spectrumCard.monoColor;
-                            var r = Math.floor(mc.r * 255);
-                            var g = Math.floor(mc.g * 255);
-                            var b = Math.floor(mc.b * 255);
-                            return "rgba(" + r + "," + g + "," + b + "," + alpha + ")";
-                        }
-
-                        var scheme = spectrumCard.colorSchemes[spectrumCard.colorScheme] || spectrumCard.colorSchemes["spectrum"];
-                        var v = Math.max(0, Math.min(1, normalizedValue));
-
-                        var idx = 0;
-                        while (idx < scheme.length - 1 && scheme[idx + 1].pos < v) idx++;
-
-                        if (idx >= scheme.length - 1) {
-                            var last = scheme[scheme.length - 1];
-                            return "rgba(" + last.r + "," + last.g + "," + last.b + "," + alpha + ")";
-                        }
-
-                        var c1 = scheme[idx];
-                        var c2 = scheme[idx + 1];
-                        var t = (v - c1.pos) / (c2.pos - c1.pos);
-
-                        var r = Math.floor(c1.r + (c2.r - c1.r) * t);
-                        var g = Math.floor(c1.g + (c2.g - c1.g) * t);
-                        var b = Math.floor(c1.b + (c2.b - c1.b) * t);
-
-                        return "rgba(" + r + "," + g + "," + b + "," + alpha + ")";
-                    }
-
-                    Component.onCompleted: buildColorLUT()
-
-                    /**
-                     * 主绑制函数 - 每帧调用
-                     *
-                     * 根据 chartType 选择绘制模式：
-                     * - "bar": 柱状图模式，每个 bin 绘制一个矩形
-                     * - "line": 折线图模式，连接所有数据点
-                     *
-                     * 渲染流程：
-                     * 1. 清空画布
-                     * 2. 获取缓存数据
-                     * 3. 根据图表类型绘制主体
-                     * 4. 绘制峰值保持线（如果启用）
-                     */
-                    onPaint: {
-                        var ctx = getContext("2d");
-                        var w = width;
-                        var h = height;
-
-                        ctx.clearRect(0, 0, w, h);
-
-                        var data = spectrumCard.cachedData;
-                        if (!data || data.length === 0) return;
-
-                        var binCount = data.length;
-                        var useGrad = spectrumCard.useGradient;
-                        var intensity = spectrumCard.gradientIntensity;
-
-                        // 根据图表类型选择绘制方式
-                        if (spectrumCard.chartType === "line") {
-                            // ========== 折线图模式 ==========
-                            var stepX = w / (binCount - 1);
-
-                            // 创建渐变
-                            var gradient = ctx.createLinearGradient(0, h, 0, 0);
-                            gradient.addColorStop(0, getBarColor(0.1 * intensity));
-                            gradient.addColorStop(0.3, getBarColor(0.3 * intensity));
-                            gradient.addColorStop(0.6, getBarColor(0.6 * intensity));
-                            gradient.addColorStop(1, getBarColor(1.0));
-
-                            // 绘制填充区域
-                            if (spectrumCard.lineFill) {
-                                ctx.beginPath();
-                                ctx.moveTo(0, h);
-                                for (var i = 0; i < binCount; i++) {
-                                    var value = data[i] || 0;
-                                    var x = i * stepX;
-                                    var y = h - (value * h);
-                                    if (i === 0) {
-                                        ctx.lineTo(x, y);
-                                    } else {
-                                        ctx.lineTo(x, y);
-                                    }
-                                }
-                                ctx.lineTo(w, h);
-                                ctx.closePath();
-
-                                if (useGrad) {
-                                    // 创建填充渐变，带透明度
-                                    var fillGradient = ctx.createLinearGradient(0, h, 0, 0);
-                                    var fillOpacity = spectrumCard.lineFillOpacity;
-                                    fillGradient.addColorStop(0, getBarColorWithAlpha(0.1 * intensity, fillOpacity * 0.5));
-                                    fillGradient.addColorStop(0.5, getBarColorWithAlpha(0.5 * intensity, fillOpacity));
-                                    fillGradient.addColorStop(1, getBarColorWithAlpha(1.0, fillOpacity));
-                                    ctx.fillStyle = fillGradient;
-                                } else {
-                                    ctx.fillStyle = getBarColorWithAlpha(0.7, spectrumCard.lineFillOpacity);
-                                }
-                                ctx.fill();
-                            }
-
-                            // 绘制折线
-                            ctx.beginPath();
-                            for (var j = 0; j < binCount; j++) {
-                                var val = data[j] || 0;
-                                var px = j * stepX;
-                                var py = h - (val * h);
-                                if (j === 0) {
-                                    ctx.moveTo(px, py);
-                                } else {
-                                    ctx.lineTo(px, py);
-                                }
-                            }
-
-                            if (useGrad) {
-                                ctx.strokeStyle = gradient;
-                            } else {
-                                ctx.strokeStyle = getBarColor(0.8);
-                            }
-                            ctx.lineWidth = spectrumCard.lineWidth;
-                            ctx.lineJoin = "round";
-                            ctx.stroke();
-
-                            // 折线图的峰值保持线
-                            if (spectrumCard.showPeakHold) {
-                                var peaks = spectrumCard.cachedPeaks;
-                                if (peaks && peaks.length === binCount) {
-                                    var pc = spectrumCard.peakHoldColor;
-                                    ctx.strokeStyle = "rgba(" + Math.floor(pc.r * 255) + "," + Math.floor(pc.g * 255) + "," + Math.floor(pc.b * 255) + "," + pc.a + ")";
-                                    ctx.lineWidth = spectrumCard.peakHoldLineWidth;
-
-                                    ctx.beginPath();
-                                    for (var k = 0; k < binCount; k++) {
-                                        var peakVal = peaks[k] || 0;
-                                        var peakX = k * stepX;
-                                        var peakY = h - (peakVal * h);
-                                        if (k === 0) {
-                                            ctx.moveTo(peakX, peakY);
-                                        } else {
-                                            ctx.lineTo(peakX, peakY);
-                                        }
-                                    }
-                                    ctx.stroke();
-                                }
-                            }
-                        } else {
-                            // ========== 柱状图模式 ==========
-                            var spacing = spectrumCard.barSpacing;
-                            var totalSpacing = (binCount - 1) * spacing;
-                            var barWidth = (w - totalSpacing) / binCount;
-                            if (barWidth < 1) barWidth = 1;
-
-                            var minH = spectrumCard.barMinHeight;
-
-                            if (useGrad) {
-                                // 使用渐变模式 - 为了性能，使用单个全高度渐变
-                                var barGradient = ctx.createLinearGradient(0, h, 0, 0);
-                                barGradient.addColorStop(0, getBarColor(0.1 * intensity));
-                                barGradient.addColorStop(0.3, getBarColor(0.3 * intensity));
-                                barGradient.addColorStop(0.6, getBarColor(0.6 * intensity));
-                                barGradient.addColorStop(1, getBarColor(1.0));
-                                ctx.fillStyle = barGradient;
-
-                                for (var bi = 0; bi < binCount; bi++) {
-                                    var bValue = data[bi] || 0;
-                                    var barHeight = Math.max(minH, bValue * h);
-                                    var bx = bi * (barWidth + spacing);
-                                    var by = h - barHeight;
-                                    ctx.fillRect(bx, by, barWidth, barHeight);
-                                }
-                            } else {
-                                // 纯色模式 - 每个柱子独立颜色
-                                for (var bj = 0; bj < binCount; bj++) {
-                                    var bjValue = data[bj] || 0;
-                                    var bjHeight = Math.max(minH, bjValue * h);
-                                    if (bjHeight > 0) {
-                                        var bjx = bj * (barWidth + spacing);
-                                        var bjy = h - bjHeight;
-                                        ctx.fillStyle = getBarColor(bjValue);
-                                        ctx.fillRect(bjx, bjy, barWidth, bjHeight);
-                                    }
-                                }
-                            }
-
-                            // 柱状图的峰值保持线
-                            if (spectrumCard.showPeakHold) {
-                                var barPeaks = spectrumCard.cachedPeaks;
-                                if (barPeaks && barPeaks.length === binCount) {
-                                    var bpc = spectrumCard.peakHoldColor;
-                                    ctx.strokeStyle = "rgba(" + Math.floor(bpc.r * 255) + "," + Math.floor(bpc.g * 255) + "," + Math.floor(bpc.b * 255) + "," + bpc.a + ")";
-                                    ctx.lineWidth = spectrumCard.peakHoldLineWidth;
-
-                                    ctx.beginPath();
-                                    for (var bk = 0; bk < binCount; bk++) {
-                                        var bPeakValue = barPeaks[bk] || 0;
-                                        if (bPeakValue > 0.01) {
-                                            var bPeakY = h - (bPeakValue * h);
-                                            var bpx = bk * (barWidth + spacing);
-                                            ctx.moveTo(bpx, bPeakY);
-                                            ctx.lineTo(bpx + barWidth, bPeakY);
-                                        }
-                                    }
-                                    ctx.stroke();
-                                }
-                            }
-                        }
-                    }
-                }
-
-                // 发光效果层
-                Item {
-                    id: glowLayer
-                    visible: spectrumCard.glowEnabled
-                    anchors.fill: spectrumCanvas
-                    layer.enabled: spectrumCard.glowEnabled
-                    layer.effect: MultiEffect {
-                        blurEnabled: true
-                        blur: spectrumCard.chartType === "line" ? 0.2 : 0.3
-                        blurMax: spectrumCard.chartType === "line" ? 16 : 32
-                        brightness: spectrumCard.glowIntensity * 0.3
-                    }
-
-                    Canvas {
-                        id: glowCanvas
-                        anchors.fill: parent
-                        renderStrategy: Canvas.Threaded
-
-                        onPaint: {
-                            var ctx = getContext("2d");
-                            var w = width;
-                            var h = height;
-                            ctx.clearRect(0, 0, w, h);
-
-                            var data = spectrumCard.cachedData;
-                            if (!data || data.length === 0) return;
-
-                            var binCount = data.length;
-
-                            if (spectrumCard.chartType === "line") {
-                                // 折线图模式：降采样以提升性能
-                                var step = Math.max(1, Math.floor(binCount / 64));
-                                var stepX = w / (binCount - 1);
-                                ctx.beginPath();
-                                for (var i = 0; i < binCount; i += step) {
-                                    var value = data[i] || 0;
-                                    var x = i * stepX;
-                                    var y = h - (value * h);
-                                    if (i === 0) ctx.moveTo(x, y);
-                                    else ctx.lineTo(x, y);
-                                }
-                                // 确保最后一点被绘制
-                                if ((binCount - 1) % step !== 0) {
-                                    var lastVal = data[binCount - 1] || 0;
-                                    ctx.lineTo(w, h - (lastVal * h));
-                                }
-                                ctx.strokeStyle = spectrumCanvas.getBarColor(0.8);
-                                ctx.lineWidth = spectrumCard.lineWidth + 2;
-                                ctx.stroke();
-                            } else {
-                                var spacing = spectrumCard.barSpacing;
-                                var barWidth = (w - (binCount - 1) * spacing) / binCount;
-                                if (barWidth < 1) barWidth = 1;
-
-                                for (var j = 0; j < binCount; j++) {
-                                    var val = data[j] || 0;
-                                    if (val > 0.3) {
-                                        var barH = val * h;
-                                        var bx = j * (barWidth + spacing);
-                                        var by = h - barH;
-                                        ctx.fillStyle = spectrumCanvas.getBarColor(val);
-                                        ctx.fillRect(bx, by, barWidth, barH);
-                                    }
-                                }
-                            }
-                        }
-                    }
-                }
-
-                // 倒影效果
-                Item {
-                    visible: spectrumCard.reflectionEnabled
-                    anchors.left: spectrumCanvas.left
-                    anchors.right: spectrumCanvas.right
-                    anchors.top: spectrumCanvas.bottom
-                    height: spectrumCanvas.height * 0.3
-                    clip: true
-                    opacity: spectrumCard.reflectionOpacity
-
-                    Canvas {
-                        id: reflectionCanvas
-                        width: parent.width
-                        height: spectrumCanvas.height
-                        transform: Scale { yScale: -1; origin.y: 0 }
-
-                        onPaint: {
-                            var ctx = getContext("2d");
-                            var w = width;
-                            var h = height;
-                            ctx.clearRect(0, 0, w, h);
-
-                            var data = spectrumCard.cachedData;
-                            if (!data || data.length === 0) return;
-
-                            var binCount = data.length;
-
-                            if (spectrumCard.chartType === "line") {
-                                // 折线图模式：降采样以提升性能
-                                var step = Math.max(1, Math.floor(binCount / 64));
-                                var stepX = w / (binCount - 1);
-                                ctx.beginPath();
-                                ctx.moveTo(0, h);
-                                for (var i = 0; i < binCount; i += step) {
-                                    var val = data[i] || 0;
-                                    ctx.lineTo(i * stepX, h - val * h);
-                                }
-                                // 确保最后一点被绘制
-                                if ((binCount - 1) % step !== 0) {
-                                    var lastVal = data[binCount - 1] || 0;
-                                    ctx.lineTo(w, h - lastVal * h);
-                                }
-                                ctx.lineTo(w, h);
-                                ctx.closePath();
-
-                                var grad = ctx.createLinearGradient(0, h, 0, 0);
-                                grad.addColorStop(0, "rgba(0,0,0,0)");
-                                grad.addColorStop(1, spectrumCanvas.getBarColor(0.5));
-                                ctx.fillStyle = grad;
-                                ctx.fill();
-                            } else {
-                                var spacing = spectrumCard.barSpacing;
-                                var barWidth = (w - (binCount - 1) * spacing) / binCount;
-                                if (barWidth < 1) barWidth = 1;
-
-                                var gradient = ctx.createLinearGradient(0, h, 0, 0);
-                                gradient.addColorStop(0, "rgba(0,0,0,0)");
-                                gradient.addColorStop(0.5, spectrumCanvas.getBarColorWithAlpha(0.3, 0.3));
-                                gradient.addColorStop(1, spectrumCanvas.getBarColorWithAlpha(0.7, 0.5));
-                                ctx.fillStyle = gradient;
-
-                                for (var j = 0; j < binCount; j++) {
-                                    var value = data[j] || 0;
-                                    var barH = value * h * 0.5;
-                                    var bx = j * (barWidth + spacing);
-                                    ctx.fillRect(bx, h - barH, barWidth, barH);
-                                }
-                            }
-                        }
-                    }
-
-                    // 倒影渐变遮罩
-                    Rectangle {
-                        anchors.fill: parent
-                        gradient: Gradient {
-                            GradientStop { position: 0.0; color: "transparent" }
-                            GradientStop { position: 1.0; color: spectrumCard.chartBackground }
-                        }
-                    }
+                    spectrumModel: spectrumCard.spectrumModel
+                    chartType: spectrumCard.chartType
+                    colorScheme: spectrumCard.colorScheme
+                    monoColor: spectrumCard.monoColor
+                    useGradient: spectrumCard.useGradient
+                    gradientIntensity: spectrumCard.gradientIntensity
+                    barSpacing: spectrumCard.barSpacing
+                    barMinHeight: spectrumCard.barMinHeight
+                    lineWidth: spectrumCard.lineWidth
+                    lineFill: spectrumCard.lineFill
+                    lineFillOpacity: spectrumCard.lineFillOpacity
+                    showPeakHold: spectrumCard.showPeakHold
+                    peakHoldColor: spectrumCard.peakHoldColor
+                    peakHoldLineWidth: spectrumCard.peakHoldLineWidth
+                    glowEnabled: spectrumCard.glowEnabled
+                    glowIntensity: spectrumCard.glowIntensity
+                    reflectionEnabled: spectrumCard.reflectionEnabled
+                    reflectionOpacity: spectrumCard.reflectionOpacity
                 }
 
                 // 扫描线效果（CRT 风格）
@@ -959,24 +529,8 @@ Rectangle {
         }
     }
 
-    // ==================== 数据更新连接 ====================
-    // 监听 Python 端 SpectrumDataModel 的 spectrumDataChanged 信号
-    // 信号触发时更新缓存数据并请求重绘所有 Canvas
-    Connections {
-        target: spectrumCard.spectrumModel
-        enabled: spectrumCard.spectrumModel !== null
-
-        /**
-         * 数据更新回调
-         * 当 Python 端调用 updateSpectrum() 等方法时触发
-         * 更新缓存并请求重绘
-         */
-        function onSpectrumDataChanged() {
-            spectrumCard.cachedData = spectrumCard.spectrumModel.spectrumData;
-            spectrumCard.cachedPeaks = spectrumCard.spectrumModel.peakHoldData;
-            spectrumCard.requestAllPaint();
-        }
-    }
+    // ==================== 数据更新 ====================
+    // SpectrumRenderer 直接连接模型的 spectrumDataChanged，数据更新不经过 QML
 
     // 防抖定时器：用于样式变化时的延迟重绘
     Timer {
@@ -1016,13 +570,10 @@ Rectangle {
 
     /**
      * 统一重绘函数
-     * 请求所有相关 Canvas 重绘（主图、发光层、倒影层）
-     * 根据当前启用的效果选择性重绘以优化性能
+     * 请求频谱主体重绘（发光与倒影在同一几何节点中）
      */
     function requestAllPaint() {
-        spectrumCanvas.requestPaint();
-        if (glowEnabled) glowCanvas.requestPaint();
-        if (reflectionEnabled) reflectionCanvas.requestPaint();
+        spectrumRenderer.update();
     }
 
     /**
@@ -1034,35 +585,7 @@ Rectangle {
     }
 
     // ==================== 属性变化处理 ====================
-    // 模型变更时初始化缓存数据
-    onSpectrumModelChanged: {
-        if (spectrumModel) {
-            cachedData = spectrumModel.spectrumData;
-            cachedPeaks = spectrumModel.peakHoldData;
-            requestAllPaint();
-        } else {
-            cachedData = [];
-            cachedPeaks = [];
-            requestAllPaint();
-        }
-    }
-
-    // 配色方案变化时重建颜色查找表（使用延迟重绘）
-    onColorSchemeChanged: { spectrumCanvas.buildColorLUT(); requestStyleRepaint(); }
-    onMonoColorChanged: { spectrumCanvas.buildColorLUT(); requestStyleRepaint(); }
-
-    // 以下属性变化时仅需重绘，无需重建 LUT（使用延迟重绘）
-    onUseGradientChanged: requestStyleRepaint()
-    onGradientIntensityChanged: requestStyleRepaint()
-    onChartTypeChanged: requestStyleRepaint()
-    onLineWidthChanged: requestStyleRepaint()
-    onLineFillChanged: requestStyleRepaint()
-    onLineFillOpacityChanged: requestStyleRepaint()
-    onBarSpacingChanged: requestStyleRepaint()
-    onBarMinHeightChanged: requestStyleRepaint()
-    onShowPeakHoldChanged: requestStyleRepaint()
-    onPeakHoldColorChanged: requestStyleRepaint()
-    onPeakHoldLineWidthChanged: requestStyleRepaint()
+    // 频谱样式属性通过绑定传给 SpectrumRenderer，由其自行重绘
 
     // 网格配置变化时仅重绘网格 Canvas（使用防抖）
     onShowGridChanged: gridDebounceTimer.restart()
@@ -1071,12 +594,7 @@ Rectangle {
     onGridColorChanged: gridDebounceTimer.restart()
     onGridLineWidthChanged: gridDebounceTimer.restart()
 
-    // 背景和效果变化（使用延迟重绘）
-    onChartBackgroundChanged: requestStyleRepaint()
-    onGlowEnabledChanged: requestStyleRepaint()
-    onGlowIntensityChanged: requestStyleRepaint()
-    onReflectionEnabledChanged: requestStyleRepaint()
-    onReflectionOpacityChanged: requestStyleRepaint()
+    // 扫描线变化（使用防抖）
     onScanLineEnabledChanged: scanLineDebounceTimer.restart()
     onScanLineOpacityChanged: scanLineDebounceTimer.restart()
 
@@ -0,0 +1,42 @@
+import QtQuick
+import "." as Components
+
+/**
+ * WaterfallView - 频谱瀑布图（时频图）
+ *
+ * 显示 SpectrumDataModel 的历史帧：横轴为频率 bin，纵轴为时间（最新一帧在最上方）。
+ * 图像由 Python 端 image://waterfall 提供者整幅生成（NumPy 颜色查找表），
+ * 每次 spectrumDataChanged 后通过 frameSerial 重新请求，不做逐 bin 绘制。
+ *
+ * 需要在加载 QML 前注册：engine.addImageProvider("waterfall", WaterfallImageProvider(model))
+ *
+ * 使用示例:
+ *    Components.WaterfallView {
+ *        spectrumModel: spectrumModel
+ *        colorScheme: "spectrum"
+ *    }
+ */
+Rectangle {
+    id: waterfallRoot
+
+    property var spectrumModel: null
+    // 配色方案，与 SpectrumChart.colorScheme 取值相同
+    property string colorScheme: "spectrum"
+
+    color: "#1a1a2e"
+    radius: Components.UiTheme.radius("sm")
+    clip: true
+
+    Image {
+        anchors.fill: parent
+        anchors.margins: 1
+        // 同步请求（在 GUI 线程渲染），且不缓存：每个序号只使用一次
+        asynchronous: false
+        cache: false
+        smooth: true
+        fillMode: Image.Stretch
+        source: waterfallRoot.spectrumModel
+            ? "image://waterfall/" + waterfallRoot.colorScheme + "/" + waterfallRoot.spectrumModel.frameSerial
+            : ""
+    }
+}
@@ -24,7 +24,19 @@ Rectangle {
 
     property bool zoomActive: false
     property string zoomColumnName: ""
-    property var zoomDataPoints: null
+    property var zoomColumnData: null
+
+    // 采样存储回看（查询在 Python 侧工作线程执行，结果写入 storeHistory.dataModel）
+    readonly property var storeHistoryRef: (typeof storeHistory !== "undefined") ? storeHistory : null
+    property bool historyVisible: false
+    property string historyError: ""
+    // 回看时间范围（分钟），0 表示全部
+    readonly property var historyRanges: [
+        { text: "最近 10 分钟", minutes: 10 },
+        { text: "最近 1 小时", minutes: 60 },
+        { text: "最近 24 小时", minutes: 1440 },
+        { text: "全部", minutes: 0 }
+    ]
 
     Connections {
         target: acquisitionController
@@ -147,20 +159,6 @@ Rectangle {
         updateSettingsSummary();
     }
 
-    // 接收数据点数组，计算并返回统计信息，包括点数、最小值和最大值
-    function computeStats(points) {
-        if (!points || points.length === 0)
-        return { count: 0, min: 0, max: 0 };
-        let minVal = points[0].y;
-        let maxVal = points[0].y;
-        for (let i = 1; i < points.length; i++) {
-            const y = points[i].y;
-            if (y < minVal) minVal = y;
-            if (y > maxVal) maxVal = y;
-        }
-        return { count: points.length, min: minVal, max: maxVal };
-    }
-
     // 更新设置摘要文本，显示当前选中的列
     function updateSettingsSummary() {
         const cols = selectedColumns();
@@ -181,6 +179,7 @@ Rectangle {
             return;
         }
         chartsVisible = true;
+        historyVisible = false;
         zoomActive = false;
         lastSettingsSummary = "当前绘制列：" + lastPlottedColumns.join(", ");
     }
@@ -192,6 +191,27 @@ Rectangle {
         updateSettingsSummary();
     }
 
+    // 切换到采样存储回看面板
+    function showStoredHistory() {
+        if (!storeHistoryRef)
+            return;
+        historyVisible = true;
+        zoomActive = false;
+    }
+
+    function closeStoredHistory() {
+        historyVisible = false;
+        updateSettingsSummary();
+    }
+
+    function queryStoredHistory() {
+        if (!storeHistoryRef || historySourceBox.currentIndex < 0)
+            return;
+        const range = historyRanges[historyRangeBox.currentIndex];
+        historyError = "";
+        storeHistoryRef.queryRecent(historySourceBox.currentText, range ? range.minutes : 0);
+    }
+
     // 打开保存图表的文件对话框
     function openSaveDialog() {
         if (!chartsVisible || lastPlottedColumns.length === 0) {
@@ -253,17 +273,17 @@ Rectangle {
     // 当用户点击某个图标时，进入放大模式
     function enterZoom(rowIndex) {
         const model = dataLogView.csvFileManagerRef ? dataLogView.csvFileManagerRef.dataModel : null;
-        if (!model || typeof model.get !== "function") {
+        if (!model || typeof model.columnAt !== "function") {
             console.warn("[DataLog] enterZoom: data model 不可用");
             return;
         }
-        const rowData = model.get(rowIndex);
+        const rowData = model.columnAt(rowIndex);
         if (!rowData) {
             console.warn("[DataLog] enterZoom: row 数据为空 ->", rowIndex);
             return;
         }
         zoomColumnName = rowData.columnName || "";
-        zoomDataPoints = rowData.dataPoints || [];
+        zoomColumnData = rowData;
         zoomActive = true;
     }
 
@@ -271,7 +291,7 @@ Rectangle {
     function exitZoom() {
         zoomActive = false;
         zoomColumnName = "";
-        zoomDataPoints = null;
+        zoomColumnData = null;
     }
 
     RowLayout {
@@ -293,6 +313,8 @@ Rectangle {
                 anchors.margins: Components.UiTheme.spacing("sm")
                 basePath: dataLogView.logRootPath
                 fileControllerRef: fileController
+                // 文件列表来自 Python 侧的持久化索引，排序与过滤在模型中完成
+                fileListModel: dataLogView.csvFileManagerRef ? dataLogView.csvFileManagerRef.fileListModel : null
                 scaleFactor: dataLogView.scaleFactor
                 // 当选择文件时调用 handleSelection 方法，在其中加载并解析文件，并更新模型和视图
                 onFileSelected: function (filePath) {
@@ -315,25 +337,35 @@ Rectangle {
                 spacing: Components.UiTheme.spacing("lg")
 
                 Text {
-                    text: chartsVisible ? "绘图结果" : "列信息"
+                    text: historyVisible ? "采样历史" : (chartsVisible ? "绘图结果" : "列信息")
                     font.bold: true
                     font.pixelSize: Components.UiTheme.fontSize("title")
                     color: Components.UiTheme.color("textPrimary")
                 }
 
                 Text {
+                    visible: !historyVisible
                     text: lastSettingsSummary
                     color: Components.UiTheme.color("textSecondary")
                     wrapMode: Text.WordWrap
                     font.pixelSize: Components.UiTheme.fontSize("body")
                 }
 
+                // 后台解析进度，解析完成前保留上一个文件的内容
+                ProgressBar {
+                    Layout.fillWidth: true
+                    visible: !historyVisible && !!(dataLogView.csvFileManagerRef && dataLogView.csvFileManagerRef.parsing)
+                    from: 0
+                    to: 1
+                    value: dataLogView.csvFileManagerRef ? dataLogView.csvFileManagerRef.parseProgress : 0
+                }
+
                 // 该布局用于在列信息视图和绘画视图之间切换
                 StackLayout {
                     id: contentStack
                     Layout.fillWidth: true
                     Layout.fillHeight: true
-                    currentIndex: chartsVisible ? 1 : 0
+                    currentIndex: historyVisible ? 2 : (chartsVisible ? 1 : 0)
 
                     // 列信息面板
                     ScrollView {
@@ -393,8 +425,8 @@ Rectangle {
                                             }
 
                                             Text {
-                                                readonly property var stats: dataLogView.computeStats(model.dataPoints)
-                                                text: "点数: " + stats.count + "    最小值: " + stats.min.toFixed(2) + "    最大值: " + stats.max.toFixed(2)
+                                                // 统计量由 ColumnData 在 Python 侧向量化计算，避免为统计物化全部点
+                                                text: "点数: " + model.pointCount + "    最小值: " + model.minY.toFixed(2) + "    最大值: " + model.maxY.toFixed(2)
                                                 color: Components.UiTheme.color("textSecondary")
                                                 font.pixelSize: Components.UiTheme.fontSize("label")
                                             }
@@ -428,7 +460,8 @@ Rectangle {
                                     Layout.preferredHeight: shouldShow ? Components.UiTheme.controlHeight(220) : 0
                                     Layout.fillWidth: true
                                     chartTitle: model.columnName
-                                    dataPoints: model.dataPoints
+                                    // 仅在需要绘制时才请求点，点数按图表像素宽度降采样
+                                    pointSource: shouldShow ? model.columnData : null
                                     scaleFactor: dataLogView.scaleFactor
 
                                     MouseArea {
@@ -442,6 +475,82 @@ Rectangle {
                             }
                         }
                     }
+
+                    // 采样存储回看面板
+                    ColumnLayout {
+                        spacing: Components.UiTheme.spacing("md")
+
+                        RowLayout {
+                            Layout.fillWidth: true
+                            spacing: Components.UiTheme.spacing("md")
+
+                            ComboBox {
+                                id: historySourceBox
+                                Layout.preferredWidth: Components.UiTheme.controlWidth(220)
+                                model: dataLogView.storeHistoryRef ? dataLogView.storeHistoryRef.sources : []
+                            }
+
+                            ComboBox {
+                                id: historyRangeBox
+                                Layout.preferredWidth: Components.UiTheme.controlWidth(200)
+                                model: dataLogView.historyRanges
+                                textRole: "text"
+                            }
+
+                            CustomButton {
+                                text: "查询"
+                                enabled: !!(dataLogView.storeHistoryRef && !dataLogView.storeHistoryRef.querying)
+                                onClicked: dataLogView.queryStoredHistory()
+                            }
+
+                            Item { Layout.fillWidth: true }
+                        }
+
+                        ProgressBar {
+                            Layout.fillWidth: true
+                            visible: !!(dataLogView.storeHistoryRef && dataLogView.storeHistoryRef.querying)
+                            indeterminate: true
+                        }
+
+                        Text {
+                            text: dataLogView.historyError.length > 0
+                                ? dataLogView.historyError
+                                : dataLogView.storeHistoryRef && dataLogView.storeHistoryRef.source
+                                ? dataLogView.storeHistoryRef.source + "：共 " + dataLogView.storeHistoryRef.rowCount + " 条采样"
+                                : "选择数据源与时间范围后查询"
+                            color: Components.UiTheme.color("textSecondary")
+                            font.pixelSize: Components.UiTheme.fontSize("body")
+                        }
+
+                        Flickable {
+                            Layout.fillWidth: true
+                            Layout.fillHeight: true
+                            contentWidth: width
+                            contentHeight: historyGrid.implicitHeight
+                            clip: true
+
+                            GridLayout {
+                                id: historyGrid
+                                width: parent.width
+                                columns: 2
+                                rowSpacing: Components.UiTheme.spacing("lg")
+                                columnSpacing: Components.UiTheme.spacing("lg")
+
+                                Repeater {
+                                    model: dataLogView.storeHistoryRef ? dataLogView.storeHistoryRef.dataModel : null
+                                    delegate: ChartCard {
+                                        Layout.preferredHeight: Components.UiTheme.controlHeight(220)
+                                        Layout.fillWidth: true
+                                        chartTitle: model.columnName
+                                        // 点数按图表像素宽度降采样，长时间范围读取金字塔层级
+                                        pointSource: dataLogView.historyVisible ? model.columnData : null
+                                        rangeZoomEnabled: true
+                                        scaleFactor: dataLogView.scaleFactor
+                                    }
+                                }
+                            }
+                        }
+                    }
                 }
             }
         }
@@ -482,7 +591,9 @@ Rectangle {
                 rightMargin: 24 * dataLogView.scaleFactor
             }
             chartTitle: dataLogView.zoomColumnName ? dataLogView.zoomColumnName + "（放大）" : "放大图"
-            dataPoints: dataLogView.zoomDataPoints || []
+            // 放大后绘图区更宽，按新宽度重新降采样；支持滚轮/双指缩放时间范围
+            pointSource: dataLogView.zoomColumnData
+            rangeZoomEnabled: true
             color: Components.UiTheme.color("panel")
             scaleFactor: dataLogView.scaleFactor
         }
@@ -666,6 +777,9 @@ Rectangle {
         function onActiveFileChanged() {
             browser.selectedPath = dataLogView.absolutePathFor(dataLogView.csvFileManagerRef.activeFile);
         }
+        function onParseFailed(file, message) {
+            dataLogView.lastSettingsSummary = "文件解析失败：" + file + "（" + message + "）";
+        }
     }
 
     Connections {
@@ -684,5 +798,13 @@ Rectangle {
         }
     }
 
+    Connections {
+        target: dataLogView.storeHistoryRef
+        enabled: !!dataLogView.storeHistoryRef
+        function onQueryFailed(source, message) {
+            dataLogView.historyError = "采样查询失败：" + source + "（" + message + "）";
+        }
+    }
+
     Component.onCompleted: updateSettingsSummary()
 }
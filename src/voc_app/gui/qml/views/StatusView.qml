@@ -21,6 +21,7 @@ Rectangle {
     // 频谱模型引用（避免与组件属性命名冲突）
     readonly property var globalSpectrumModel: (typeof spectrumModel !== "undefined") ? spectrumModel : null
     readonly property var globalSpectrumSimulator: (typeof spectrumSimulator !== "undefined") ? spectrumSimulator : null
+    readonly property var globalSpectrumFeatures: (typeof spectrumFeatures !== "undefined") ? spectrumFeatures : null
 
     // Loadport 子页面使用的实时曲线配置
     readonly property var loadportCharts: [
@@ -598,31 +599,85 @@ Rectangle {
                             checked: spectrumChartView.showPeakHold
                             onCheckedChanged: spectrumChartView.showPeakHold = checked
                         }
+
+                        CheckBox {
+                            id: waterfallCheck
+                            text: "瀑布图"
+                            checked: false
+                        }
+
+                        CheckBox {
+                            id: featureCheck
+                            text: "特征曲线"
+                            checked: true
+                            visible: statusRoot.globalSpectrumFeatures !== null
+                        }
                     }
 
                     Item { Layout.fillHeight: true }
                 }
             }
 
-            // 右侧频谱图
-            Components.SpectrumChart {
-                id: spectrumChartView
+            // 右侧频谱图与瀑布图（频谱历史，勾选“瀑布图”后显示）
+            ColumnLayout {
                 Layout.fillWidth: true
                 Layout.fillHeight: true
-                spectrumModel: statusRoot.globalSpectrumModel
-                chartTitle: "实时频谱分析"
-                showTitle: true
-                chartType: "bar"
-                colorScheme: "spectrum"
-                glowEnabled: true
-                reflectionEnabled: true
-                scanLineEnabled: false
-                showPeakHold: true
-                minDb: -80
-                maxDb: 0
-                minFreq: 0
-                maxFreq: 22
-                xAxisUnit: "kHz"
+                spacing: Components.UiTheme.spacing("sm")
+
+                Components.SpectrumChart {
+                    id: spectrumChartView
+                    Layout.fillWidth: true
+                    Layout.fillHeight: true
+                    spectrumModel: statusRoot.globalSpectrumModel
+                    chartTitle: "实时频谱分析"
+                    showTitle: true
+                    chartType: "bar"
+                    colorScheme: "spectrum"
+                    glowEnabled: true
+                    reflectionEnabled: true
+                    scanLineEnabled: false
+                    showPeakHold: true
+                    minDb: -80
+                    maxDb: 0
+                    minFreq: 0
+                    maxFreq: 22
+                    xAxisUnit: "kHz"
+                }
+
+                Components.WaterfallView {
+                    Layout.fillWidth: true
+                    Layout.fillHeight: true
+                    visible: waterfallCheck.checked
+                    spectrumModel: visible ? statusRoot.globalSpectrumModel : null
+                    colorScheme: spectrumChartView.colorScheme
+                }
+
+                // 频谱特征曲线（峰值频率、质心等，按名称从 spectrumFeatures 取曲线模型）
+                RowLayout {
+                    Layout.fillWidth: true
+                    Layout.preferredHeight: Components.UiTheme.controlHeight(200)
+                    visible: featureCheck.checked && statusRoot.globalSpectrumFeatures !== null
+                    spacing: Components.UiTheme.spacing("sm")
+
+                    Repeater {
+                        model: statusRoot.globalSpectrumFeatures ? statusRoot.globalSpectrumFeatures.seriesNames : []
+
+                        delegate: Components.ChartCard {
+                            readonly property var features: statusRoot.globalSpectrumFeatures.features
+                            Layout.fillWidth: true
+                            Layout.fillHeight: true
+                            radius: Components.UiTheme.radius(18)
+                            color: Components.UiTheme.color("panel")
+                            border.color: Components.UiTheme.color("outline")
+                            seriesModel: statusRoot.globalSpectrumFeatures.seriesModel(modelData)
+                            chartTitle: statusRoot.globalSpectrumFeatures.featureLabel(modelData)
+                            yAxisUnit: statusRoot.globalSpectrumFeatures.featureUnit(modelData)
+                            currentValue: (features && typeof features[modelData] === "number") ? features[modelData] : Number.NaN
+                            showLimits: false
+                            scaleFactor: statusRoot.scaleFactor
+                        }
+                    }
+                }
             }
         }
     }
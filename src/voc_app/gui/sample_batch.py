@@ -0,0 +1,124 @@
+"""采集样本批缓冲
+
+工作线程逐条写入解码后的样本，GUI 线程按批整体取走，
+用一次模型插入代替每条样本一次的 Qt 信号。
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SampleBatchBuffer:
+    """线程安全的预分配样本批缓冲（双缓冲）。
+
+    - append() 在工作线程调用，写入当前写缓冲区；
+    - drain() 在 GUI 线程调用，交换读写缓冲区并返回已写入部分的视图。
+
+    drain() 返回的数组是内部缓冲区的视图，只在下一次 drain() 之前有效，
+    调用方需在同一次处理中消费完毕（模型 append_points 会复制数据）。
+
+    GUI 来不及取走时写缓冲区按倍数扩容，最多到 max_capacity 行（默认
+    capacity * MAX_GROWTH）；达到上限后丢弃最旧的一批样本并计入 dropped。
+    """
+
+    # 未指定 max_capacity 时，写缓冲区最多扩容到 capacity 的倍数
+    MAX_GROWTH = 64
+
+    def __init__(self, capacity: int, channels: int, max_capacity: int | None = None) -> None:
+        self._capacity = max(1, int(capacity))
+        self._channels = max(1, int(channels))
+        if max_capacity is None:
+            max_capacity = self._capacity * self.MAX_GROWTH
+        self._max_capacity = max(self._capacity, int(max_capacity))
+        self._lock = threading.Lock()
+        self._front = self._allocate(self._capacity)
+        self._back = self._allocate(self._capacity)
+        self._count = 0
+        # 当前批次中出现过的最大通道数，决定 drain 返回的列数
+        self._batch_channels = 0
+        # 缓冲区达到上限后被丢弃、未送到 GUI 的样本数
+        self.dropped = 0
+
+    def _allocate(self, capacity: int) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        xs = np.empty(capacity, dtype=np.float64)
+        ys = np.full((capacity, self._channels), np.nan, dtype=np.float64)
+        return xs, ys
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def max_capacity(self) -> int:
+        return self._max_capacity
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count
+
+    def append(self, timestamp_ms: float, values: Sequence[float]) -> bool:
+        """写入一条样本，返回 True 表示批次已满、应尽快通知 GUI 取走。"""
+        with self._lock:
+            xs, ys = self._front
+            if self._count >= len(xs):
+                if len(xs) < self._max_capacity:
+                    # GUI 尚未取走上一批：先扩容而不是丢弃样本
+                    new_capacity = min(len(xs) * 2, self._max_capacity)
+                    logger.debug(f"样本批缓冲扩容: {len(xs)} -> {new_capacity}")
+                    grown_xs, grown_ys = self._allocate(new_capacity)
+                    grown_xs[: self._count] = xs[: self._count]
+                    grown_ys[: self._count] = ys[: self._count]
+                    self._front = (grown_xs, grown_ys)
+                    xs, ys = self._front
+                else:
+                    # 已达上限：一次丢弃最旧的一批，避免每条样本都整体搬移
+                    drop = min(self._capacity, self._count)
+                    keep = self._count - drop
+                    xs[:keep] = xs[drop : self._count]
+                    ys[:keep] = ys[drop : self._count]
+                    self._count = keep
+                    self.dropped += drop
+                    logger.debug(f"样本批缓冲已满 ({len(xs)} 行)，丢弃最旧的 {drop} 条样本")
+            row = self._count
+            xs[row] = timestamp_ms
+            width = min(len(values), self._channels)
+            ys[row, :width] = values[:width]
+            if width < self._channels:
+                ys[row, width:] = np.nan
+            if width > self._batch_channels:
+                self._batch_channels = width
+            self._count += 1
+            return self._count == self._capacity
+
+    def drain(self) -> tuple[NDArray[np.float64], NDArray[np.float64]] | None:
+        """取走当前批次，返回 (xs, ys)；ys 形状为 (样本数, 通道数)。无数据时返回 None。"""
+        with self._lock:
+            if self._count == 0:
+                return None
+            count = self._count
+            channels = self._batch_channels
+            xs, ys = self._front
+            self._front = self._back
+            # 扩容过的缓冲区交换到读侧后，下次交换回写侧时仍保留更大的容量
+            self._back = (xs, ys)
+            self._count = 0
+            self._batch_channels = 0
+        return xs[:count], ys[:count, :channels]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._count = 0
+            self._batch_channels = 0
@@ -0,0 +1,178 @@
+"""曲线数据的定长环形存储
+
+为 SeriesTableModel 提供 O(1) 追加/淘汰与增量 min/max：
+- NumPy 预分配的 x/y 环形缓冲区，淘汰最旧数据只移动头指针；
+- 单调双端队列维护滑动窗口极值，淘汰时无需重扫全部数据。
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class SlidingExtrema:
+    """FIFO 窗口的滑动最小/最大值（单调双端队列，摊还 O(1)）。
+
+    元素以递增序号 seq 入队；expire(oldest_seq) 丢弃序号更小的元素。
+    """
+
+    def __init__(self) -> None:
+        # 队列元素为 (seq, value)；_mins 值单调递增，_maxs 值单调递减
+        self._mins: deque[tuple[int, float]] = deque()
+        self._maxs: deque[tuple[int, float]] = deque()
+
+    def push(self, seq: int, value: float) -> None:
+        mins = self._mins
+        while mins and mins[-1][1] >= value:
+            mins.pop()
+        mins.append((seq, value))
+        maxs = self._maxs
+        while maxs and maxs[-1][1] <= value:
+            maxs.pop()
+        maxs.append((seq, value))
+
+    def expire(self, oldest_seq: int) -> None:
+        mins = self._mins
+        while mins and mins[0][0] < oldest_seq:
+            mins.popleft()
+        maxs = self._maxs
+        while maxs and maxs[0][0] < oldest_seq:
+            maxs.popleft()
+
+    @property
+    def minimum(self) -> float:
+        return self._mins[0][1]
+
+    @property
+    def maximum(self) -> float:
+        return self._maxs[0][1]
+
+    def __bool__(self) -> bool:
+        return bool(self._mins)
+
+    def clear(self) -> None:
+        self._mins.clear()
+        self._maxs.clear()
+
+
+class RingSeriesBuffer:
+    """定长 (x, y) 环形缓冲区，行号 0 始终是最旧的数据。"""
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = max(1, int(capacity))
+        self._xs: NDArray[np.float64] = np.zeros(self._capacity, dtype=np.float64)
+        self._ys: NDArray[np.float64] = np.zeros(self._capacity, dtype=np.float64)
+        # 全局递增序号：位置 = seq % capacity
+        self._head_seq = 0
+        self._next_seq = 0
+        self._x_extrema = SlidingExtrema()
+        self._y_extrema = SlidingExtrema()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    def __len__(self) -> int:
+        return self._next_seq - self._head_seq
+
+    def x_at(self, row: int) -> float:
+        return float(self._xs[(self._head_seq + row) % self._capacity])
+
+    def y_at(self, row: int) -> float:
+        return float(self._ys[(self._head_seq + row) % self._capacity])
+
+    def append(self, x: float, y: float) -> int:
+        """追加一个点，返回被淘汰的点数（0 或 1）。"""
+        evicted = 1 if len(self) == self._capacity else 0
+        seq = self._next_seq
+        pos = seq % self._capacity
+        self._xs[pos] = x
+        self._ys[pos] = y
+        self._next_seq = seq + 1
+        self._x_extrema.push(seq, x)
+        self._y_extrema.push(seq, y)
+        if evicted:
+            self._head_seq += 1
+            self._x_extrema.expire(self._head_seq)
+            self._y_extrema.expire(self._head_seq)
+        return evicted
+
+    def extend(
+        self,
+        xs: Sequence[float] | NDArray[np.float64],
+        ys: Sequence[float] | NDArray[np.float64],
+    ) -> int:
+        """批量追加，返回被淘汰的旧点数。超过容量时只保留最新 capacity 个点。"""
+        xs_arr = np.asarray(xs, dtype=np.float64)
+        ys_arr = np.asarray(ys, dtype=np.float64)
+        count = min(len(xs_arr), len(ys_arr))
+        if count > self._capacity:
+            xs_arr = xs_arr[count - self._capacity : count]
+            ys_arr = ys_arr[count - self._capacity : count]
+            count = self._capacity
+        if count == 0:
+            return 0
+        evicted = max(0, len(self) + count - self._capacity)
+
+        start = self._next_seq
+        positions = np.arange(start, start + count) % self._capacity
+        self._xs[positions] = xs_arr[:count]
+        self._ys[positions] = ys_arr[:count]
+        for offset, (x, y) in enumerate(zip(xs_arr[:count].tolist(), ys_arr[:count].tolist())):
+            self._x_extrema.push(start + offset, x)
+            self._y_extrema.push(start + offset, y)
+        self._next_seq = start + count
+        if evicted:
+            self._head_seq += evicted
+            self._x_extrema.expire(self._head_seq)
+            self._y_extrema.expire(self._head_seq)
+        return evicted
+
+    def discard_oldest(self, count: int) -> int:
+        """丢弃最旧的 count 个点（只移动头指针），返回实际丢弃数。"""
+        count = max(0, min(int(count), len(self)))
+        if count:
+            self._head_seq += count
+            self._x_extrema.expire(self._head_seq)
+            self._y_extrema.expire(self._head_seq)
+        return count
+
+    def bounds(self) -> tuple[float, float, float, float] | None:
+        """返回 (min_x, max_x, min_y, max_y)，无数据时返回 None。"""
+        if not self._x_extrema:
+            return None
+        return (
+            self._x_extrema.minimum,
+            self._x_extrema.maximum,
+            self._y_extrema.minimum,
+            self._y_extrema.maximum,
+        )
+
+    def to_arrays(self) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """按从旧到新的顺序返回 x/y 的副本。"""
+        positions = np.arange(self._head_seq, self._next_seq) % self._capacity
+        return self._xs[positions], self._ys[positions]
+
+    def set_capacity(self, capacity: int) -> int:
+        """调整容量（O(n) 重建），返回因缩容被淘汰的旧点数。"""
+        capacity = max(1, int(capacity))
+        if capacity == self._capacity:
+            return 0
+        xs, ys = self.to_arrays()
+        evicted = max(0, len(xs) - capacity)
+        self._capacity = capacity
+        self._xs = np.zeros(capacity, dtype=np.float64)
+        self._ys = np.zeros(capacity, dtype=np.float64)
+        self.clear()
+        self.extend(xs[evicted:], ys[evicted:])
+        return evicted
+
+    def clear(self) -> None:
+        self._head_seq = 0
+        self._next_seq = 0
+        self._x_extrema.clear()
+        self._y_extrema.clear()
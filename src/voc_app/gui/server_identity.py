@@ -0,0 +1,123 @@
+"""FOUP 服务端身份缓存
+
+每次开始采集和每次 E84 Unload 都要先发送 get_function_version_info，等待（可能先到的 ACK
+和）版本应答后才能发出第一条数据命令。服务端类型在同一台主机上几乎不会变化，
+ServerIdentityCache 按主机（host:port）记录前缀、版本、通道数与最近一次确认时间，
+保存在 channel_config.json 旁边的 server_identity.json 中：
+
+- 开始时若缓存未过期，直接按缓存的前缀发送命令，省掉一次往返；
+- 随后在后台重新查询版本（复核），结果写回缓存；前缀变化时由调用方补发命令。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict
+
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+IDENTITY_FILE = "server_identity.json"
+IDENTITY_VERSION = 1
+# 超过该时间未确认的缓存不再直接使用（秒）
+IDENTITY_MAX_AGE_S = 7 * 24 * 3600.0
+
+
+@dataclass
+class ServerIdentity:
+    """一台服务端的身份；verified_at 为最近一次收到版本应答的时间（time.time()）。"""
+
+    prefix: str
+    version: str = ""
+    channel_count: int = 0
+    verified_at: float = 0.0
+
+
+class ServerIdentityCache:
+    """按 host:port 保存的服务端身份（线程安全）。"""
+
+    def __init__(
+        self, path: str | Path | None = None, max_age_s: float = IDENTITY_MAX_AGE_S
+    ) -> None:
+        self._path = Path(path) if path is not None else Path(__file__).parent / IDENTITY_FILE
+        self._max_age_s = float(max_age_s)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, ServerIdentity] = {}
+        self._load()
+
+    @staticmethod
+    def _key(host: str, port: int) -> str:
+        return f"{host}:{int(port)}"
+
+    def get(self, host: str, port: int) -> ServerIdentity | None:
+        """返回未过期的缓存身份，没有或已过期时返回 None。"""
+        with self._lock:
+            entry = self._entries.get(self._key(host, port))
+        if entry is None or not entry.prefix:
+            return None
+        if time.time() - entry.verified_at > self._max_age_s:
+            return None
+        return ServerIdentity(**asdict(entry))
+
+    def record(
+        self, host: str, port: int, prefix: str, version: str | None = None
+    ) -> None:
+        """记录一次成功的版本查询。"""
+        key = self._key(host, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.prefix != prefix:
+                entry = self._entries[key] = ServerIdentity(prefix=prefix)
+            if version:
+                entry.version = version
+            entry.verified_at = time.time()
+            self._save()
+
+    def record_channel_count(self, host: str, port: int, channel_count: int) -> None:
+        """记录实际收到的通道数（不改变确认时间）。"""
+        key = self._key(host, port)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.channel_count == channel_count:
+                return
+            entry.channel_count = int(channel_count)
+            self._save()
+
+    def invalidate(self, host: str, port: int) -> None:
+        with self._lock:
+            if self._entries.pop(self._key(host, port), None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        payload = {
+            "version": IDENTITY_VERSION,
+            "hosts": {key: asdict(entry) for key, entry in self._entries.items()},
+        }
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._path.with_name(self._path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self._path)
+        except OSError as exc:
+            logger.warning(f"服务端身份缓存保存失败 {self._path}: {exc}")
+
+    def _load(self) -> None:
+        if not self._path.exists():
+            return
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                payload = json.load(f)
+            if payload.get("version") != IDENTITY_VERSION:
+                return
+            entries = {str(k): ServerIdentity(**v) for k, v in payload["hosts"].items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError) as exc:
+            logger.warning(f"服务端身份缓存损坏，忽略: {exc}")
+            return
+        self._entries = entries
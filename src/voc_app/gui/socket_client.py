@@ -1,20 +1,57 @@
 import socket
+import lzma
 import os
+import queue
 import struct
+import threading
+import time
+import zlib
 import serial
 import abc
-from typing import Any, Optional, Iterable, Union, List
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Iterable, Sequence, Union, List
 
 from voc_app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# 文件下载时的读缓冲区大小，一次 recv_into / write 处理至多这么多字节
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
+# 客户端支持的压缩传输算法（按偏好排序）
+COMPRESSION_ALGORITHMS = ("zlib", "lzma")
+
+
+def _decompressor(algorithm: str) -> Any:
+    if algorithm == "zlib":
+        return zlib.decompressobj()
+    if algorithm == "lzma":
+        return lzma.LZMADecompressor()
+    raise ValueError(f"不支持的压缩算法: {algorithm}")
+
+
+def _inflate(decompressor: Any, data: Any, limit: int) -> Iterable[bytes]:
+    """增量解压一块数据，每次产出不超过 limit 字节，解压比很高时内存占用也有上限。"""
+    yield decompressor.decompress(data, limit)
+    if isinstance(decompressor, lzma.LZMADecompressor):
+        while not decompressor.eof and not decompressor.needs_input:
+            yield decompressor.decompress(b"", limit)
+    else:
+        while decompressor.unconsumed_tail:
+            yield decompressor.decompress(decompressor.unconsumed_tail, limit)
+
 
 # --- 1. 通信层抽象 ---
 
 
 class Communicator(abc.ABC):
-    """通信接口抽象基类."""
+    """通信接口抽象基类.
+
+    supports_readahead 为 True 表示 recv 可能返回少于请求的字节数且不会因此阻塞，
+    FrameReader 会一次读取尽量多的数据；否则严格按需读取。
+    """
+
+    supports_readahead: bool = False
 
     @abc.abstractmethod
     def send(self, data: bytes) -> None:
@@ -28,6 +65,13 @@ class Communicator(abc.ABC):
     def close(self) -> None:
         pass
 
+    def recv_into(self, buffer: memoryview) -> int:
+        """读取到 buffer 中并返回字节数；默认基于 recv 实现，子类可覆盖以避免拷贝。"""
+        data = self.recv(len(buffer))
+        size = len(data)
+        buffer[:size] = data
+        return size
+
     def __enter__(self) -> "Communicator":
         return self
 
@@ -43,6 +87,8 @@ class Communicator(abc.ABC):
 class SocketCommunicator(Communicator):
     """使用 Socket 进行通信的实现."""
 
+    supports_readahead = True
+
     def __init__(self, host: str, port: int, timeout: float | None = 5.0) -> None:
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         # 设置超时，避免阻塞导致线程无法退出
@@ -66,6 +112,13 @@ class SocketCommunicator(Communicator):
             logger.debug("Socket recv 超时")
             return b""
 
+    def recv_into(self, buffer: memoryview) -> int:
+        try:
+            return self.sock.recv_into(buffer)
+        except socket.timeout:
+            logger.debug("Socket recv 超时")
+            return 0
+
     def close(self) -> None:
         try:
             self.sock.shutdown(socket.SHUT_RDWR)
@@ -110,7 +163,120 @@ class SerialCommunicator(Communicator):
             logger.warning(f"串口 close 异常: {e}")
 
 
-# --- 2. 可复用客户端类 ---
+# --- 2. 长度前缀帧读取 ---
+
+
+class FrameReader:
+    """长度前缀协议（4 字节大端长度 + 负载）的缓冲读取器.
+
+    - 使用可复用的 bytearray + recv_into 读取，避免每个字段一次 recv 和临时对象；
+    - 通信器支持预读时一次尽量读满缓冲区，高速数据流下多帧共享一次系统调用；
+    - 返回的 memoryview 指向内部缓冲区，只在下一次读取之前有效。
+
+    读取失败（超时/断开，recv 返回空）时返回 None，异常由调用方处理。
+    """
+
+    HEADER = struct.Struct(">I")
+
+    def __init__(self, communicator: Any, buffer_size: int = 64 * 1024) -> None:
+        self.communicator = communicator
+        self._buffer = bytearray(max(self.HEADER.size, int(buffer_size)))
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._readahead = bool(getattr(communicator, "supports_readahead", False))
+        self._recv_into = getattr(communicator, "recv_into", None)
+
+    @property
+    def buffered(self) -> int:
+        """已读入但尚未消费的字节数。"""
+        return self._end - self._start
+
+    def _recv(self, target: memoryview) -> int:
+        if self._recv_into is not None:
+            return self._recv_into(target)
+        data = self.communicator.recv(len(target))
+        target[: len(data)] = data
+        return len(data)
+
+    def _reserve(self, size: int) -> None:
+        """保证从 _start 起有 size 字节的连续空间。"""
+        if self._start + size <= len(self._buffer):
+            return
+        pending = self._end - self._start
+        if size > len(self._buffer):
+            # 超大帧：换一块更大的缓冲区（旧视图可能仍被调用方引用，不能原地扩容）
+            grown = bytearray(max(size, len(self._buffer) * 2))
+            grown[:pending] = self._view[self._start : self._end]
+            self._buffer = grown
+            self._view = memoryview(grown)
+        elif pending:
+            self._view[:pending] = self._view[self._start : self._end]
+        self._start = 0
+        self._end = pending
+
+    def _fill(self, size: int) -> bool:
+        """读取直到缓冲区中至少有 size 字节未消费数据。"""
+        if self._end - self._start >= size:
+            return True
+        if self._start == self._end:
+            self._start = self._end = 0
+        self._reserve(size)
+        while self._end - self._start < size:
+            if self._readahead:
+                target = self._view[self._end :]
+            else:
+                target = self._view[self._end : self._start + size]
+            received = self._recv(target)
+            if not received:
+                return False
+            self._end += received
+        return True
+
+    def read_exact(self, size: int) -> memoryview | None:
+        """读取恰好 size 字节，失败返回 None。"""
+        if not self._fill(size):
+            return None
+        start = self._start
+        self._start = start + size
+        return self._view[start : start + size]
+
+    def read_frame(self) -> memoryview | None:
+        """读取一帧负载（不含长度前缀），失败返回 None；长度为 0 时返回空视图。"""
+        header = self.read_exact(self.HEADER.size)
+        if header is None:
+            return None
+        (length,) = self.HEADER.unpack(header)
+        return self.read_exact(length)
+
+    def read_chunk(self, max_size: int) -> memoryview | None:
+        """读取至多 max_size 字节（用于大文件流式写盘），失败返回 None。"""
+        if max_size <= 0:
+            return self._view[0:0]
+        if self._start == self._end:
+            self._start = self._end = 0
+            limit = len(self._buffer) if self._readahead else min(max_size, len(self._buffer))
+            received = self._recv(self._view[:limit])
+            if not received:
+                return None
+            self._end = received
+        size = min(max_size, self._end - self._start)
+        start = self._start
+        self._start = start + size
+        return self._view[start : start + size]
+
+    def skip(self, size: int) -> bool:
+        """丢弃 size 字节，失败返回 False。"""
+        remaining = size
+        while remaining > 0:
+            chunk = self.read_chunk(remaining)
+            if chunk is None:
+                return False
+            remaining -= len(chunk)
+        return True
+
+
+# --- 3. 可复用客户端类 ---
 
 
 class Client:
@@ -118,44 +284,88 @@ class Client:
     面向外部调用的客户端封装:
     - 支持 run() / power() 命令
     - 支持 get() 文件/目录下载（流式协议）
+    - 支持 list() 列出目录树（供 ParallelDownloader 使用）
+    - compression 非空时在首次下载前协商压缩传输（ZFILE/ZRANGE），服务端不支持时按原始字节传输
     - 返回结果或抛出异常，无控制台打印
     """
 
-    def __init__(self, communicator: Communicator, max_message_size: int = 1024 * 1024) -> None:
+    def __init__(
+        self,
+        communicator: Communicator,
+        max_message_size: int = 1024 * 1024,
+        buffer_size: int = 64 * 1024,
+        compression: Sequence[str] = (),
+    ) -> None:
         self.comm = communicator
         self.max_message_size = max_message_size
+        self._reader = FrameReader(communicator, buffer_size)
         self._closed = False
+        self._compression_offer = tuple(compression)
+        self._compression: Optional[str] = None
+        self._negotiated = not self._compression_offer
+        # 最近一次请求的应答已完整读完（失败、超时或中途异常时为 False）
+        self._exchange_done = True
+
+    @property
+    def compression(self) -> Optional[str]:
+        """已协商的压缩算法，未启用时为 None。"""
+        return self._compression
+
+    @property
+    def idle(self) -> bool:
+        """上一次交互已完整结束且读取器中没有残留字节，连接可以安全地交给下一个使用者。"""
+        return self._exchange_done and self._reader.buffered == 0
 
     # --- 基础消息编解码 ---
 
     def _send_msg(self, msg: str) -> None:
         msg_bytes = msg.encode("utf-8")
         packed = struct.pack(">I", len(msg_bytes)) + msg_bytes
+        self._exchange_done = False
         self.comm.send(packed)
 
     def _recvall(self, n: int) -> Optional[bytes]:
-        data = bytearray()
-        while len(data) < n:
-            packet = self.comm.recv(n - len(data))
-            if not packet:
-                return None
-            data.extend(packet)
+        data = self._reader.read_exact(n)
+        if data is None:
+            return None
         return bytes(data)
 
     def _recv_msg(self) -> Optional[str]:
-        raw_len = self._recvall(4)
-        if not raw_len:
+        raw_len = self._reader.read_exact(4)
+        if raw_len is None:
             return None
-        msglen = struct.unpack(">I", raw_len)[0]
+        msglen = FrameReader.HEADER.unpack(raw_len)[0]
         if msglen > self.max_message_size:
             # 超限：消费掉消息体后返回提示
             logger.warning(f"消息过大 ({msglen} bytes)，已丢弃")
-            self._recvall(msglen)
+            self._reader.skip(msglen)
             return "错误: 消息过大已被丢弃."
-        body = self._recvall(msglen)
+        body = self._reader.read_exact(msglen)
         if not body:
             return None
-        return body.decode("utf-8")
+        return str(body, "utf-8")
+
+    def negotiate_compression(self) -> Optional[str]:
+        """
+        发送 compress <算法...>，服务端应答 COMPRESS <算法> 或 COMPRESS none。
+        旧服务端回复 Unknown command / ACK 时视为不支持；返回选定的算法或 None。
+        """
+        self._negotiated = True
+        offer = [a for a in self._compression_offer if a in COMPRESSION_ALGORITHMS]
+        if not offer:
+            return None
+        self._send_msg("compress " + " ".join(offer))
+        reply = self._recv_msg()
+        if reply is None:
+            raise RuntimeError("连接中断或接收超时。")
+        parts = reply.split()
+        if len(parts) == 2 and parts[0] == "COMPRESS" and parts[1] in offer:
+            self._compression = parts[1]
+            logger.debug(f"已启用压缩传输: {self._compression}")
+        else:
+            logger.debug(f"服务端不支持压缩传输: {reply}")
+        self._exchange_done = True
+        return self._compression
 
     # --- 命令方法 ---
 
@@ -171,7 +381,9 @@ class Client:
             cmd_str = " ".join(command)
         logger.debug(f"run_shell: {cmd_str}")
         self._send_msg(f"run {cmd_str}")
-        return self._recv_msg()
+        reply = self._recv_msg()
+        self._exchange_done = reply is not None
+        return reply
 
     def get_file(self, remote_path: str, dest_root: Optional[str] = None) -> List[str]:
         """
@@ -184,6 +396,8 @@ class Client:
         dest_root = os.path.abspath(dest_root)
         logger.debug(f"get_file: {remote_path} -> {dest_root}")
 
+        if not self._negotiated:
+            self.negotiate_compression()
         self._send_msg(f"get {remote_path}")
 
         dir_stack = []
@@ -221,9 +435,10 @@ class Client:
                 dir_stack.pop()
                 if not dir_stack:
                     # 根目录处理完毕
+                    self._exchange_done = True
                     return saved_files
 
-            elif msg_type == "FILE":
+            elif msg_type in ("FILE", "ZFILE"):
                 try:
                     _, server_filepath, filesize_str = msg.split(" ", 2)
                     filesize = int(filesize_str)
@@ -244,21 +459,13 @@ class Client:
                 if parent_dir:
                     os.makedirs(parent_dir, exist_ok=True)
 
-                remaining = filesize
-                with open(local_filepath, "wb") as f:
-                    while remaining > 0:
-                        chunk_size = min(4096, remaining)
-                        data = self._recvall(chunk_size)
-                        if not data:
-                            raise RuntimeError("文件传输中断或超时。")
-                        f.write(data)
-                        remaining -= len(data)
-
+                self._receive_file(local_filepath, filesize, compressed=msg_type == "ZFILE")
                 saved_files.append(os.path.abspath(local_filepath))
                 logger.debug(f"已下载: {local_filepath}")
 
                 # 如果是单文件模式，收到第一份文件就结束
                 if server_root is None:
+                    self._exchange_done = True
                     return saved_files
 
             elif msg_type == "ERROR":
@@ -270,11 +477,149 @@ class Client:
                 logger.error(f"未知的服务端响应: {msg}")
                 raise RuntimeError(f"未知的服务端响应: {msg}")
 
+    def list_files(self, remote_path: str) -> Optional["RemoteListing"]:
+        """
+        列出服务端文件或目录树（list 命令）。
+        返回 RemoteListing；服务端不支持 list 时返回 None（响应已被消费，连接仍可继续使用）。
+        响应格式：L_START <D|F> <root>，若干 ENTRY <D|F> <size> <mtime> <path>，L_END <count>。
+        """
+        self._send_msg(f"list {remote_path}")
+        msg = self._recv_msg()
+        if msg is None:
+            raise RuntimeError("连接中断或接收超时。")
+        if msg.startswith("ERROR"):
+            detail = msg[6:]
+            logger.error(f"服务端错误: {detail}")
+            raise RuntimeError(f"服务端错误: {detail}")
+        parts = msg.split(" ", 2)
+        if parts[0] != "L_START" or len(parts) != 3 or parts[1] not in ("D", "F"):
+            logger.debug(f"服务端不支持 list: {msg}")
+            self._exchange_done = True
+            return None
+
+        listing = RemoteListing(root=parts[2], is_dir=parts[1] == "D")
+        while True:
+            msg = self._recv_msg()
+            if msg is None:
+                raise RuntimeError("连接中断或接收超时。")
+            parts = msg.split(" ", 4)
+            if parts[0] == "ENTRY" and len(parts) == 5:
+                try:
+                    entry = RemoteEntry(
+                        path=parts[4],
+                        size=int(parts[2]),
+                        mtime=int(parts[3]),
+                        is_dir=parts[1] == "D",
+                    )
+                except ValueError:
+                    raise RuntimeError(f"协议错误: 无效的 ENTRY 消息: {msg}")
+                listing.entries.append(entry)
+            elif parts[0] == "L_END":
+                self._exchange_done = True
+                return listing
+            elif parts[0] == "ERROR":
+                # 单个条目无法访问时服务端只报告错误，继续列出其余条目
+                logger.warning(f"服务端列目录错误: {msg[6:]}")
+            else:
+                raise RuntimeError(f"协议错误: 无效的 list 响应: {msg}")
+
+    def fetch_file(self, remote_path: str, local_path: str, offset: int = 0) -> int:
+        """
+        下载单个文件到 local_path（get 命令的单文件模式），返回本次接收的字节数。
+        offset > 0 时发送 get <path> <offset>，服务端以 RANGE <offset> <length> <path> 应答，
+        数据追加到 local_path 的 offset 处；服务端不支持续传时自动改为完整下载。
+        """
+        if not self._negotiated:
+            self.negotiate_compression()
+        if offset > 0:
+            self._send_msg(f"get {remote_path} {offset}")
+        else:
+            self._send_msg(f"get {remote_path}")
+        msg = self._recv_msg()
+        if msg is None:
+            raise RuntimeError("连接中断或接收超时。")
+        if msg.startswith("ERROR"):
+            if offset > 0:
+                # 旧服务端把偏移量当作路径的一部分，找不到文件
+                logger.info(f"服务端不支持断点续传，完整下载: {remote_path}")
+                return self.fetch_file(remote_path, local_path)
+            raise RuntimeError(f"服务端错误: {msg[6:]}")
+        try:
+            msg_type, rest = msg.split(" ", 1)
+            if msg_type in ("RANGE", "ZRANGE"):
+                start_str, length_str, _ = rest.split(" ", 2)
+                start, length = int(start_str), int(length_str)
+            else:
+                start, length = 0, int(rest.rsplit(" ", 1)[1])
+        except (ValueError, IndexError):
+            raise RuntimeError(f"协议错误: 无效的文件消息: {msg}")
+        if msg_type not in ("FILE", "RANGE", "ZFILE", "ZRANGE") or start > offset:
+            raise RuntimeError(f"协议错误: 期望 FILE/RANGE，收到: {msg}")
+        self._receive_file(local_path, length, start, compressed=msg_type.startswith("Z"))
+        self._exchange_done = True
+        return length
+
+    def _receive_file(
+        self, local_path: str, filesize: int, offset: int = 0, compressed: bool = False
+    ) -> None:
+        """把紧随 FILE/RANGE（或 ZFILE/ZRANGE）消息的 filesize 字节数据写入本地文件的 offset 处。"""
+        remaining = filesize
+        mode = "r+b" if offset > 0 else "wb"
+        with open(local_path, mode, buffering=DOWNLOAD_BUFFER_SIZE) as f:
+            if offset > 0:
+                f.truncate(offset)
+                f.seek(offset)
+            if compressed:
+                self._receive_compressed(f, filesize)
+                return
+            while remaining > 0:
+                data = self._reader.read_chunk(remaining)
+                if not data:
+                    raise RuntimeError("文件传输中断或超时。")
+                f.write(data)
+                remaining -= len(data)
+
+    def _receive_compressed(self, f: Any, filesize: int) -> None:
+        """压缩模式：读取压缩帧直到长度为 0 的结束帧，边解压边写盘。"""
+        if self._compression is None:
+            raise RuntimeError("协议错误: 未协商压缩却收到压缩数据。")
+        decompressor = _decompressor(self._compression)
+        written = 0
+        while True:
+            header = self._reader.read_exact(FrameReader.HEADER.size)
+            if header is None:
+                raise RuntimeError("文件传输中断或超时。")
+            (length,) = FrameReader.HEADER.unpack(header)
+            if length == 0:
+                break
+            if length > self.max_message_size:
+                raise RuntimeError(f"协议错误: 压缩帧过大 ({length} bytes)")
+            chunk = self._reader.read_exact(length)
+            if chunk is None:
+                raise RuntimeError("文件传输中断或超时。")
+            for data in _inflate(decompressor, chunk, DOWNLOAD_BUFFER_SIZE):
+                f.write(data)
+                written += len(data)
+        if not isinstance(decompressor, lzma.LZMADecompressor):
+            tail = decompressor.flush()
+            f.write(tail)
+            written += len(tail)
+        if written != filesize:
+            raise RuntimeError(f"协议错误: 解压后长度 {written} 与声明的 {filesize} 不符。")
+
     def close(self) -> None:
-        """关闭底层通信。若合适会尝试先发送 exit。"""
+        """关闭底层通信。
+
+        通信器提供 release(reusable)（如连接池租出的连接）时改为归还：只有上一次交互
+        完整结束且没有预读残留时才允许复用，否则连接已失步，由连接池关闭。
+        """
         if self._closed:
             return
-        self.comm.close()
+        release = getattr(self.comm, "release", None)
+        if release is not None:
+            release(reusable=self.idle)
+        else:
+            self.comm.close()
         self._closed = True
 
     def __enter__(self) -> "Client":
@@ -287,3 +632,320 @@ class Client:
         exc_tb: Any,
     ) -> None:
         self.close()
+
+
+# --- 4. 并行目录下载 ---
+
+
+@dataclass
+class RemoteEntry:
+    """list 返回的单个条目；path 为服务端路径，mtime 为 Unix 秒。"""
+
+    path: str
+    size: int
+    mtime: int
+    is_dir: bool = False
+
+
+@dataclass
+class RemoteListing:
+    """list 的完整结果。"""
+
+    root: str
+    is_dir: bool
+    entries: List[RemoteEntry] = field(default_factory=list)
+
+    @property
+    def files(self) -> List[RemoteEntry]:
+        return [e for e in self.entries if not e.is_dir]
+
+
+@dataclass
+class DownloadStats:
+    """一次下载的汇总统计；bytes 只计本次实际传输的字节。"""
+
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    connections: int = 0
+    skipped: int = 0
+    resumed: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """总吞吐量（字节/秒）。"""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        text = (
+            f"{self.files} 个文件, {self.bytes / 1e6:.2f} MB, {self.seconds:.2f} s, "
+            f"{self.throughput / 1e6:.2f} MB/s, {self.connections} 个连接"
+        )
+        if self.skipped or self.resumed:
+            text += f", 跳过 {self.skipped} 个未变化文件, 续传 {self.resumed} 个"
+        return text
+
+
+@dataclass
+class _DownloadJob:
+    remote: str
+    local: str
+    size: int
+    mtime: int
+    offset: int = 0
+
+    @property
+    def part_path(self) -> str:
+        return partial_path(self.local, self.mtime)
+
+
+def partial_path(local_path: str, mtime: int) -> str:
+    """未完成下载的临时文件：隐藏文件，文件名带远端 mtime，远端文件变化后不会被误续传。"""
+    directory, name = os.path.split(local_path)
+    return os.path.join(directory, f".{name}.{mtime}.part")
+
+
+def _is_up_to_date(local_path: str, entry: RemoteEntry) -> bool:
+    try:
+        stat = os.stat(local_path)
+    except OSError:
+        return False
+    return stat.st_size == entry.size and int(stat.st_mtime) == entry.mtime
+
+
+class ParallelDownloader:
+    """
+    并行目录下载：先用 list 列出整棵目录树，再通过多个连接并发逐个 get 文件。
+
+    - communicator_factory 每次调用返回一个新连接（如 lambda: SocketCommunicator(host, port)）；
+    - 文件按大小从大到小分发，避免最后只剩一个大文件在单连接上传输；
+    - 额外连接建立失败时以已有连接继续下载；
+    - 服务端不支持 list 时回退到单连接串行 get_file；
+    - cancel_event 置位后不再开始新的文件，返回已完成的文件；
+    - compression 传给每个连接的 Client，由各连接分别与服务端协商压缩传输。
+
+    文件先写入隐藏的 .part 文件，完成后改名并把本地 mtime 设为远端 mtime。
+    sync() 据此只下载大小或 mtime 与本地不同的文件；连接中断时保留 .part，
+    重连后（或下次同步时）从已有长度处续传。
+
+    progress(done_bytes, total_bytes) 在工作线程中调用。
+    """
+
+    def __init__(
+        self,
+        communicator_factory: Callable[[], Communicator],
+        connections: int = 4,
+        buffer_size: int = DOWNLOAD_BUFFER_SIZE,
+        max_message_size: int = 1024 * 1024,
+        cancel_event: threading.Event | None = None,
+        retries: int = 2,
+        compression: Sequence[str] = (),
+    ) -> None:
+        self._factory = communicator_factory
+        self._connections = max(1, int(connections))
+        self._buffer_size = int(buffer_size)
+        self._max_message_size = max_message_size
+        self._cancel_event = cancel_event or threading.Event()
+        self._retries = max(0, int(retries))
+        self._compression = tuple(compression)
+        self.last_stats = DownloadStats()
+
+    def _open_client(self) -> Client:
+        return Client(self._factory(), self._max_message_size, self._buffer_size, self._compression)
+
+    def download(
+        self,
+        remote_path: str,
+        dest_root: Optional[str] = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> List[str]:
+        """完整下载文件或目录，本地目录布局与 Client.get_file 一致；返回本地文件绝对路径列表。"""
+        return self._transfer(remote_path, dest_root, progress, incremental=False)
+
+    def sync(
+        self,
+        remote_path: str,
+        dest_root: Optional[str] = None,
+        progress: Callable[[int, int], None] | None = None,
+    ) -> List[str]:
+        """增量同步：只下载新增或变化的文件并续传未完成的文件；返回本次下载的本地文件路径列表。"""
+        return self._transfer(remote_path, dest_root, progress, incremental=True)
+
+    def _transfer(
+        self,
+        remote_path: str,
+        dest_root: Optional[str],
+        progress: Callable[[int, int], None] | None,
+        incremental: bool,
+    ) -> List[str]:
+        dest_root = os.path.abspath(dest_root or ".")
+        started = time.monotonic()
+        client = self._open_client()
+        try:
+            listing = client.list_files(remote_path)
+            if listing is None:
+                logger.info("服务端不支持 list，回退到串行下载")
+                saved = client.get_file(remote_path, dest_root)
+                total = sum(os.path.getsize(p) for p in saved)
+                self._finish(DownloadStats(len(saved), total, 0.0, 1), started)
+                return saved
+            jobs, skipped = self._plan(listing, dest_root, incremental)
+            saved, stats = self._run_jobs(client, jobs, progress)
+        finally:
+            client.close()
+        stats.skipped = skipped
+        self._finish(stats, started)
+        return saved
+
+    def _finish(self, stats: DownloadStats, started: float) -> None:
+        stats.seconds = time.monotonic() - started
+        self.last_stats = stats
+        logger.info(f"下载完成: {stats}")
+
+    @staticmethod
+    def _plan(
+        listing: RemoteListing, dest_root: str, incremental: bool
+    ) -> tuple[List[_DownloadJob], int]:
+        """创建本地目录，返回待下载任务（按大小降序）与跳过的文件数。"""
+        if listing.is_dir:
+            local_root = os.path.join(dest_root, os.path.basename(listing.root))
+            os.makedirs(local_root, exist_ok=True)
+        jobs: List[_DownloadJob] = []
+        skipped = 0
+        # 每个目录只列一次，用于清理过期的 .part 文件
+        dir_names: dict[str, List[str]] = {}
+        for entry in listing.entries:
+            if listing.is_dir:
+                local_path = entry.path.replace(listing.root, local_root, 1)
+            else:
+                local_path = os.path.join(dest_root, os.path.basename(listing.root))
+            if entry.is_dir:
+                os.makedirs(local_path, exist_ok=True)
+                continue
+            parent_dir = os.path.dirname(local_path)
+            if parent_dir:
+                os.makedirs(parent_dir, exist_ok=True)
+            if incremental and _is_up_to_date(local_path, entry):
+                skipped += 1
+                continue
+            job = _DownloadJob(entry.path, local_path, entry.size, entry.mtime)
+            if parent_dir not in dir_names:
+                try:
+                    dir_names[parent_dir] = [n for n in os.listdir(parent_dir) if n.endswith(".part")]
+                except OSError:
+                    dir_names[parent_dir] = []
+            _discard_stale_parts(job, dir_names[parent_dir])
+            if incremental and os.path.exists(job.part_path):
+                part_size = os.path.getsize(job.part_path)
+                job.offset = part_size if part_size <= entry.size else 0
+            jobs.append(job)
+        jobs.sort(key=lambda job: job.size, reverse=True)
+        return jobs, skipped
+
+    def _fetch(self, client: Client, job: _DownloadJob) -> int:
+        """下载到 .part 后原子改名，返回本次传输的字节数；失败时保留 .part 并记录续传位置。"""
+        part_path = job.part_path
+        try:
+            received = client.fetch_file(job.remote, part_path, job.offset)
+        except Exception:
+            if os.path.exists(part_path):
+                job.offset = os.path.getsize(part_path)
+            raise
+        os.replace(part_path, job.local)
+        os.utime(job.local, (job.mtime, job.mtime))
+        return received
+
+    def _run_jobs(
+        self,
+        first_client: Client,
+        jobs: List[_DownloadJob],
+        progress: Callable[[int, int], None] | None,
+    ) -> tuple[List[str], DownloadStats]:
+        pending: "queue.SimpleQueue[_DownloadJob]" = queue.SimpleQueue()
+        for job in jobs:
+            pending.put(job)
+        total_bytes = sum(job.size - job.offset for job in jobs)
+        stats = DownloadStats()
+        saved: List[str] = []
+        errors: List[BaseException] = []
+        lock = threading.Lock()
+        abort = threading.Event()
+
+        def worker(client: Client | None) -> None:
+            owned = client is None
+            if owned:
+                try:
+                    client = self._open_client()
+                except Exception as exc:
+                    logger.warning(f"建立下载连接失败，使用已有连接继续: {exc}")
+                    return
+            with lock:
+                stats.connections += 1
+            try:
+                while not abort.is_set() and not self._cancel_event.is_set():
+                    try:
+                        job = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    resumed = job.offset > 0
+                    attempt = 0
+                    while True:
+                        try:
+                            size = self._fetch(client, job)
+                            break
+                        except Exception as exc:
+                            # 传输中途失败的连接已失步，换一个新连接从已接收的位置续传
+                            attempt += 1
+                            if attempt > self._retries or self._cancel_event.is_set():
+                                raise
+                            logger.warning(f"下载中断，重连后从 {job.offset} 字节处续传 {job.remote}: {exc}")
+                            client.close()
+                            owned = True
+                            client = self._open_client()
+                            resumed = resumed or job.offset > 0
+                    logger.debug(f"已下载: {job.local}")
+                    with lock:
+                        saved.append(os.path.abspath(job.local))
+                        stats.files += 1
+                        stats.bytes += size
+                        stats.resumed += int(resumed)
+                        done = stats.bytes
+                    if progress is not None:
+                        progress(done, total_bytes)
+            except Exception as exc:
+                with lock:
+                    errors.append(exc)
+                abort.set()
+            finally:
+                if owned:
+                    client.close()
+
+        count = min(self._connections, len(jobs))
+        threads = [
+            threading.Thread(target=worker, args=(None,), name=f"download-{i}", daemon=True)
+            for i in range(1, count)
+        ]
+        for thread in threads:
+            thread.start()
+        worker(first_client)
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise RuntimeError(f"下载失败: {errors[0]}") from errors[0]
+        return sorted(saved), stats
+
+
+def _discard_stale_parts(job: _DownloadJob, names: List[str]) -> None:
+    """删除同一文件旧版本（远端 mtime 不同）留下的 .part 文件；names 为所在目录的文件名列表。"""
+    directory, name = os.path.split(job.local)
+    keep = os.path.basename(job.part_path)
+    prefix = f".{name}."
+    for candidate in names:
+        if candidate == keep or not (candidate.startswith(prefix) and candidate.endswith(".part")):
+            continue
+        if candidate[len(prefix) : -len(".part")].isdigit():
+            try:
+                os.remove(os.path.join(directory, candidate))
+            except OSError:
+                pass
@@ -0,0 +1,399 @@
+"""频谱特征提取 (SpectrumFeatureExtractor)
+
+频谱帧原先只用于显示。SpectrumFeatureExtractor 在每次 spectrumDataChanged 时
+从模型的历史环形缓冲区取出自上次以来新增的所有帧，整批向量化计算：
+
+- peak_bin / peak_frequency：主峰 bin 与频率 (Hz)；
+- centroid：频谱质心 (Hz)；
+- flatness：频谱平坦度（功率几何平均 / 算术平均，0~1，越接近 1 越像白噪声）；
+- band_0 ... band_n：各频带的平均功率。
+
+特征按帧写入固定容量的 FeatureHistory（frames x 特征数，float64），不保留完整频谱。
+最新特征可按间隔写入曲线模型（SeriesTableModel），并按上下限阈值向 AlarmStore 发出告警。
+
+特征按线性幅度计算。模型中的帧是显示刻度：updateSpectrum / updateChannel 直接写入的
+帧本身就是线性幅度，而 updateFromTimeDomain / pushSamples 写入的帧是相对帧最大值的
+dB 归一化值。跟随模型时按模型的 db_range 用 db_to_linear 还原为线性幅度（相对帧最大值）
+再计算；直接调用 extract() / process() 时传入的帧视为线性幅度。
+
+bin 的频率间隔取 getMaxFrequency() / binCount：模型的 bin 均匀覆盖 0~奈奎斯特频率，
+getFrequencyResolution() 描述的是 STFT 帧本身的分辨率，两者在重采样后并不相同。
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from datetime import datetime
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from PySide6.QtCore import Property, QObject, Signal, Slot
+
+from voc_app.gui.spectrum_stft import db_to_linear
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+BASE_FEATURES = ("peak_bin", "peak_frequency", "centroid", "flatness")
+DEFAULT_BAND_COUNT = 4
+DEFAULT_FEATURE_FRAMES = 1024
+DEFAULT_SAMPLE_RATE = 44100.0
+# 图表默认每 500ms 写入一个点，避免高帧率下把曲线挤满
+DEFAULT_CHART_INTERVAL_MS = 500
+
+FEATURE_LABELS = {
+    "peak_bin": "峰值 bin",
+    "peak_frequency": "峰值频率",
+    "centroid": "频谱质心",
+    "flatness": "频谱平坦度",
+}
+
+FEATURE_UNITS = {
+    "peak_frequency": "Hz",
+    "centroid": "Hz",
+}
+
+_EPS = 1e-12
+
+
+def feature_label(name: str) -> str:
+    """特征的显示名称（频带为“频带 i 能量”）。"""
+    if name.startswith("band_"):
+        return f"频带 {name[5:]} 能量"
+    return FEATURE_LABELS.get(name, name)
+
+
+def parse_thresholds(text: str) -> dict[str, tuple[float | None, float | None]]:
+    """解析 "centroid:100:8000,flatness::0.6" 形式的阈值配置（下限或上限可留空）。"""
+    thresholds: dict[str, tuple[float | None, float | None]] = {}
+    for item in text.split(","):
+        parts = [part.strip() for part in item.split(":")]
+        if len(parts) != 3 or not parts[0]:
+            if item.strip():
+                logger.warning(f"忽略无效的频谱特征阈值: {item!r}")
+            continue
+        try:
+            lower = float(parts[1]) if parts[1] else None
+            upper = float(parts[2]) if parts[2] else None
+        except ValueError:
+            logger.warning(f"忽略无效的频谱特征阈值: {item!r}")
+            continue
+        thresholds[parts[0]] = (lower, upper)
+    return thresholds
+
+
+class FeatureHistory:
+    """固定容量的特征环形缓冲区（frames x columns，float64），只在 GUI 线程使用。"""
+
+    def __init__(self, columns: Sequence[str], frames: int = DEFAULT_FEATURE_FRAMES) -> None:
+        self._columns = tuple(columns)
+        self._index = {name: i for i, name in enumerate(self._columns)}
+        self._data = np.zeros((max(1, int(frames)), len(self._columns)), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self._columns
+
+    @property
+    def frames(self) -> int:
+        return self._data.shape[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def clear(self) -> None:
+        self._head = 0
+        self._count = 0
+
+    def extend(self, rows: NDArray[np.float64]) -> None:
+        """按时间顺序写入多行，超过容量时只保留最新的 frames 行。"""
+        rows = rows[-self.frames :]
+        count = len(rows)
+        if count == 0:
+            return
+        first = min(count, self.frames - self._head)
+        self._data[self._head : self._head + first] = rows[:first]
+        self._data[: count - first] = rows[first:]
+        self._head = (self._head + count) % self.frames
+        self._count = min(self._count + count, self.frames)
+
+    def latest(self, name: str | None = None, n: int | None = None) -> NDArray[np.float64]:
+        """按时间从旧到新返回最近 n 帧（副本）；指定 name 时只返回该列。"""
+        n = self._count if n is None else max(0, min(int(n), self._count))
+        order = (self._head - n + np.arange(n)) % self.frames
+        if name is None:
+            return self._data[order]
+        return self._data[order, self._index[name]]
+
+
+class SpectrumFeatureExtractor(QObject):
+    """从频谱模型的新帧中批量提取特征，写入特征历史、曲线与告警。
+
+    spectrum_model 可以是 SpectrumDataModel 或 SpectrumChannel（需要 history 与
+    spectrumDataChanged）；band_edges 为频带边界 (Hz)，省略时把 0~奈奎斯特频率均分为 4 段。
+    """
+
+    featuresChanged = Signal()
+    seriesChanged = Signal()
+    # 特征越过阈值时发出 (特征名, 当前值)
+    thresholdExceeded = Signal(str, float)
+
+    def __init__(
+        self,
+        spectrum_model: QObject | None = None,
+        band_edges: Sequence[float] | None = None,
+        alarm_store: Any = None,
+        history_frames: int = DEFAULT_FEATURE_FRAMES,
+        sample_rate: float = DEFAULT_SAMPLE_RATE,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._band_edges = None if band_edges is None else sorted(float(e) for e in band_edges)
+        band_count = DEFAULT_BAND_COUNT if self._band_edges is None else len(self._band_edges) - 1
+        if band_count < 1:
+            raise ValueError("band_edges 至少需要两个边界")
+        columns = BASE_FEATURES + tuple(f"band_{i}" for i in range(band_count))
+        self._history = FeatureHistory(columns, history_frames)
+        self._alarm_store = alarm_store
+        self._sample_rate = float(sample_rate)
+        self._thresholds: dict[str, tuple[float, float]] = {}
+        # 当前处于越限状态的特征（只在进入越限时告警一次）
+        self._active: set[str] = set()
+        self._series: dict[str, Any] = {}
+        self._chart_interval = DEFAULT_CHART_INTERVAL_MS / 1000.0
+        self._last_chart = 0.0
+        # (bins, bin_hz) -> (各 bin 频率, 频带起止 bin 索引)
+        self._layout_key: tuple[int, float] | None = None
+        self._freqs = np.zeros(0, dtype=np.float64)
+        self._band_lo = np.zeros(0, dtype=np.intp)
+        self._band_hi = np.zeros(0, dtype=np.intp)
+        self._latest: dict[str, float] = {}
+        self._model: QObject | None = None
+        self._seen = 0
+        if spectrum_model is not None:
+            self.attach(spectrum_model)
+
+    # ---------- 配置 ----------
+
+    def attach(self, spectrum_model: QObject) -> None:
+        """开始跟随 spectrum_model 的新帧（只处理连接之后写入的帧）。"""
+        if self._model is not None:
+            self._model.spectrumDataChanged.disconnect(self._on_spectrum_changed)
+        self._model = spectrum_model
+        self._seen = spectrum_model.history.appended
+        spectrum_model.spectrumDataChanged.connect(self._on_spectrum_changed)
+
+    @property
+    def history(self) -> FeatureHistory:
+        return self._history
+
+    @property
+    def columns(self) -> tuple[str, ...]:
+        return self._history.columns
+
+    def add_series(self, name: str, series_model: Any) -> None:
+        """把特征 name 的最新值按图表间隔写入曲线模型（x 为毫秒时间戳）。"""
+        if name not in self.columns:
+            raise KeyError(name)
+        self._series[name] = series_model
+        self.seriesChanged.emit()
+
+    def _get_chart_interval_ms(self) -> int:
+        return int(self._chart_interval * 1000)
+
+    def _set_chart_interval_ms(self, value: int) -> None:
+        self._chart_interval = max(0, int(value)) / 1000.0
+
+    chartIntervalMs = Property(int, _get_chart_interval_ms, _set_chart_interval_ms)  # pyright: ignore[reportAssignmentType]
+
+    @Slot(str, float, float)
+    def setThreshold(self, name: str, lower: float, upper: float) -> None:
+        """设置特征的上下限，NaN 表示不限制该侧。"""
+        if name not in self.columns:
+            logger.warning(f"未知的频谱特征: {name}")
+            return
+        lower = -math.inf if lower is None or math.isnan(lower) else float(lower)
+        upper = math.inf if upper is None or math.isnan(upper) else float(upper)
+        self._thresholds[name] = (lower, upper)
+        self._active.discard(name)
+
+    @Slot(str)
+    def clearThreshold(self, name: str) -> None:
+        self._thresholds.pop(name, None)
+        self._active.discard(name)
+
+    def set_thresholds(self, thresholds: Mapping[str, tuple[float | None, float | None]]) -> None:
+        for name, (lower, upper) in thresholds.items():
+            self.setThreshold(name, math.nan if lower is None else lower, math.nan if upper is None else upper)
+
+    # ---------- QML 属性 ----------
+
+    def _get_features(self) -> dict[str, float]:
+        return dict(self._latest)
+
+    features = Property("QVariantMap", _get_features, notify=featuresChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
+
+    def _get_feature_names(self) -> list[str]:
+        return list(self.columns)
+
+    featureNames = Property("QVariantList", _get_feature_names, constant=True)  # pyright: ignore[reportArgumentType, reportAssignmentType]
+
+    def _get_series_names(self) -> list[str]:
+        return list(self._series)
+
+    # 已绑定曲线模型的特征，QML 据此按名称生成特征曲线卡片
+    seriesNames = Property("QVariantList", _get_series_names, notify=seriesChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
+
+    @Slot(str, result=QObject)
+    def seriesModel(self, name: str) -> QObject | None:
+        """返回特征 name 的曲线模型，未绑定时返回 None。"""
+        series_model = self._series.get(name)
+        return series_model if isinstance(series_model, QObject) else None
+
+    @Slot(str, result=str)
+    def featureLabel(self, name: str) -> str:
+        return feature_label(name)
+
+    @Slot(str, result=str)
+    def featureUnit(self, name: str) -> str:
+        return FEATURE_UNITS.get(name, "")
+
+    # ---------- 计算 ----------
+
+    def _bin_hz(self, bins: int) -> float:
+        get_max = getattr(self._model, "getMaxFrequency", None)
+        nyquist = get_max() if callable(get_max) else self._sample_rate / 2.0
+        return nyquist / bins
+
+    def _prepare(self, bins: int, bin_hz: float) -> None:
+        if self._layout_key == (bins, bin_hz):
+            return
+        self._freqs = np.arange(bins, dtype=np.float64) * bin_hz
+        if self._band_edges is None:
+            edges = np.linspace(0, bins, DEFAULT_BAND_COUNT + 1)
+        else:
+            edges = np.asarray(self._band_edges) / bin_hz
+        edges = np.clip(np.rint(edges), 0, bins).astype(np.intp)
+        self._band_lo = edges[:-1]
+        self._band_hi = edges[1:]
+        self._layout_key = (bins, bin_hz)
+
+    def extract(self, frames: NDArray, bin_hz: float) -> NDArray[np.float64]:
+        """计算 (帧数, bins) 线性幅度频谱的特征，返回 (帧数, len(columns))。"""
+        frames = np.asarray(frames, dtype=np.float64)
+        if frames.ndim == 1:
+            frames = frames[np.newaxis]
+        count, bins = frames.shape
+        self._prepare(bins, bin_hz)
+        out = np.empty((count, len(self.columns)), dtype=np.float64)
+        if count == 0:
+            return out
+
+        peak = frames.argmax(axis=1)
+        out[:, 0] = peak
+        out[:, 1] = self._freqs[peak]
+        totals = frames.sum(axis=1)
+        weighted = frames @ self._freqs
+        np.divide(weighted, totals, out=out[:, 2], where=totals > 0)
+        out[totals <= 0, 2] = 0.0
+
+        power = frames * frames
+        mean_power = power.mean(axis=1)
+        geometric = np.exp(np.log(power + _EPS).mean(axis=1))
+        np.divide(geometric, mean_power, out=out[:, 3], where=mean_power > 0)
+        out[mean_power <= 0, 3] = 0.0
+        np.minimum(out[:, 3], 1.0, out=out[:, 3])
+
+        # 累积和相减得到各频带功率和，空频带（边界重合）记为 0
+        cumulative = np.zeros((count, bins + 1), dtype=np.float64)
+        np.cumsum(power, axis=1, out=cumulative[:, 1:])
+        widths = np.maximum(self._band_hi - self._band_lo, 1)
+        out[:, len(BASE_FEATURES) :] = (
+            cumulative[:, self._band_hi] - cumulative[:, self._band_lo]
+        ) / widths
+        return out
+
+    def process(self, frames: NDArray, bin_hz: float | None = None) -> NDArray[np.float64]:
+        """提取一批帧的特征并写入历史、曲线与告警；返回特征数组。"""
+        frames = np.asarray(frames, dtype=np.float64)
+        if frames.ndim == 1:
+            frames = frames[np.newaxis]
+        if len(frames) == 0 or frames.shape[1] == 0:
+            return np.zeros((0, len(self.columns)), dtype=np.float64)
+        if bin_hz is None:
+            bin_hz = self._bin_hz(frames.shape[1])
+        features = self.extract(frames, bin_hz)
+        self._history.extend(features)
+        self._latest = dict(zip(self.columns, features[-1].tolist()))
+        self._check_thresholds(features)
+        self._append_series()
+        self.featuresChanged.emit()
+        return features
+
+    def _on_spectrum_changed(self) -> None:
+        history = self._model.history
+        appended = history.appended
+        count = min(appended - self._seen, len(history))
+        self._seen = appended
+        if count <= 0:
+            return
+        # latest() 从新到旧，翻转为时间顺序
+        frames = history.latest(count)[::-1]
+        # dB 归一化的显示帧先还原为线性幅度
+        db_range = getattr(self._model, "db_range", None)
+        if db_range is not None:
+            frames = db_to_linear(frames, *db_range)
+        self.process(frames)
+
+    def _check_thresholds(self, features: NDArray[np.float64]) -> None:
+        for name, (lower, upper) in self._thresholds.items():
+            column = features[:, self.columns.index(name)]
+            low = column < lower
+            high = column > upper
+            violated = low | high
+            if not violated.any():
+                self._active.discard(name)
+                continue
+            if name not in self._active:
+                index = int(np.flatnonzero(violated)[-1])
+                self._raise_alarm(name, float(column[index]), bool(high[index]), lower, upper)
+            if violated[-1]:
+                self._active.add(name)
+            else:
+                self._active.discard(name)
+
+    def _raise_alarm(self, name: str, value: float, high: bool, lower: float, upper: float) -> None:
+        label = feature_label(name)
+        # 消息不含当前值，便于 AlarmStore 按消息去重
+        if high:
+            message = f"[SPECTRUM] {label}: 高于上限 {upper:g}"
+        else:
+            message = f"[SPECTRUM] {label}: 低于下限 {lower:g}"
+        logger.warning(f"{message}（当前值 {value:.4g}）")
+        self.thresholdExceeded.emit(name, value)
+        if self._alarm_store is not None:
+            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._alarm_store.addAlarm(timestamp, message)
+
+    def _append_series(self) -> None:
+        if not self._series:
+            return
+        now = time.monotonic()
+        if self._last_chart and now - self._last_chart < self._chart_interval:
+            return
+        self._last_chart = now
+        x = time.time() * 1000.0
+        for name, series_model in self._series.items():
+            series_model.append_point(x, self._latest[name])
+
+    @Slot()
+    def clear(self) -> None:
+        """清空特征历史与越限状态。"""
+        self._history.clear()
+        self._active.clear()
+        self._latest = {}
+        self.featuresChanged.emit()
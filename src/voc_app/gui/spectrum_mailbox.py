@@ -0,0 +1,74 @@
+"""频谱帧邮箱
+
+频谱帧以 20 Hz 左右的速率到达，GUI 只需要显示最新一帧。
+工作线程把解码、归一化后的 bins 直接写进预分配的 float64 缓冲区，
+GUI 线程取走最新一帧交给 SpectrumDataModel，中间不再转换为 Python list；
+GUI 来不及取走时新帧覆盖旧帧，不会在 Qt 事件队列中积压。
+"""
+
+from __future__ import annotations
+
+import threading
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+class SpectrumMailbox:
+    """线程安全的最新帧邮箱（三缓冲：写 / 待取 / 读）。
+
+    - back_buffer(size) 在工作线程调用，返回写缓冲区上长度为 size 的视图；
+    - publish(size) 发布刚写好的帧，返回 True 表示此前没有待取帧、应通知 GUI；
+    - take() 在 GUI 线程调用，返回最新一帧，没有新帧时返回 None。
+
+    take() 返回的数组是内部缓冲区的视图，只在下一次 take() 之前有效，
+    调用方需在同一次处理中消费完毕（SpectrumDataModel.updateSpectrum 会复制数据）。
+    """
+
+    def __init__(self, bin_count: int = 256) -> None:
+        capacity = max(1, int(bin_count))
+        self._lock = threading.Lock()
+        self._back = np.zeros(capacity, dtype=np.float64)
+        self._pending = np.zeros(capacity, dtype=np.float64)
+        self._front = np.zeros(capacity, dtype=np.float64)
+        self._back_size = 0
+        self._pending_size = 0
+        self._has_pending = False
+        # 被后续帧覆盖、未送到 GUI 的帧数
+        self.dropped = 0
+
+    def back_buffer(self, size: int) -> NDArray[np.float64]:
+        """返回可写入 size 个 bin 的写缓冲区视图（容量不足时重新分配）。"""
+        size = max(0, int(size))
+        if size > len(self._back):
+            self._back = np.zeros(size, dtype=np.float64)
+        self._back_size = size
+        return self._back[:size]
+
+    def publish(self, size: int | None = None) -> bool:
+        """发布写缓冲区中的帧，返回 True 表示需要通知 GUI 取走。"""
+        if size is None:
+            size = self._back_size
+        with self._lock:
+            notify = not self._has_pending
+            if not notify:
+                self.dropped += 1
+            self._back, self._pending = self._pending, self._back
+            self._pending_size = int(size)
+            self._has_pending = True
+        return notify
+
+    def post(self, values: NDArray) -> bool:
+        """复制一帧并发布，返回值同 publish()。"""
+        np.copyto(self.back_buffer(values.size), values.reshape(-1))
+        return self.publish(values.size)
+
+    def take(self) -> NDArray[np.float64] | None:
+        """取走最新一帧；没有新帧时返回 None。"""
+        with self._lock:
+            if not self._has_pending:
+                return None
+            self._front, self._pending = self._pending, self._front
+            size = self._pending_size
+            self._has_pending = False
+        return self._front[:size]
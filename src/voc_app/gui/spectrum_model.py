@@ -39,13 +39,14 @@
 
 3. 实时单点数据累积::
 
-    # 配置缓冲区
-    model.setBufferSize(512)      # 累积 512 个采样后计算 FFT
+    # 配置滑动窗口
+    model.setBufferSize(512)      # 帧长 512 个采样
+    model.setOverlap(0.5)         # 50% 重叠：每 256 个新采样更新一次
     model.setSampleRate(44100.0)  # 设置采样率
 
     # 在数据接收回调中
     def on_sample_received(value):
-        model.pushSample(value)  # 自动累积，满后触发更新
+        model.pushSample(value)  # 自动累积，每凑齐一帧触发更新
 
 4. 与 QML 集成::
 
@@ -61,6 +62,9 @@ API 参考
 --------
 属性 (Property):
     - binCount: int - 频谱 bin 数量，可动态修改
+    - maxFps: float - spectrumDataChanged 的最高通知帧率，0 表示不限制
+    - historyFrames: int - 瀑布图保留的历史帧数
+    - frameSerial: int - 每次通知递增，供 image://waterfall 刷新
     - spectrumData: QVariantList - 当前频谱数据（只读）
     - peakHoldData: QVariantList - 峰值保持数据（只读）
 
@@ -75,7 +79,8 @@ API 参考
 配置方法:
     - setDbRange(min, max) - 设置 dB 范围（用于 FFT 归一化）
     - setPeakDecayRate(rate) - 设置峰值衰减速率
-    - setBufferSize(size) - 设置累积缓冲区大小
+    - setBufferSize(size) - 设置 STFT 帧长
+    - setHopSize(hop) / setOverlap(ratio) - 设置 STFT 帧移 / 重叠比例
     - setSampleRate(rate) - 设置采样率
     - setAutoUpdate(enabled) - 设置是否自动更新
 
@@ -87,23 +92,105 @@ API 参考
 信号 (Signal):
     - spectrumDataChanged - 频谱数据更新时发出
     - binCountChanged - bin 数量变化时发出
+    - maxFpsChanged - 通知帧率上限变化时发出
+
+呈现帧率
+--------
+数据更新立即写入 NumPy 状态，spectrumDataChanged 则按 maxFps 合并发出：
+距上次通知不足一个周期时由单次定时器延后到周期末尾，期间的多帧只通知一次。
+spectrumData/peakHoldData 的列表快照在数据变化后首次读取时生成并缓存，
+同一帧被多次读取不会重复转换。
+
+流式 STFT
+---------
+pushSample/pushSamples 的采样写入 spectrum_stft.StreamingSTFT 的 NumPy 缓冲区，
+按帧长与帧移（默认 50% 重叠）切帧，一次推入凑齐的多帧批量 FFT；
+窗函数与重采样插值索引均缓存。
+
+瀑布图
+------
+每帧同时写入固定大小的 SpectrumHistory（float32 环形缓冲区），
+由 waterfall.WaterfallImageProvider 经颜色查找表渲染为 QImage。
 """
 
 from __future__ import annotations
 
 import math
 import random
-from typing import Sequence
+import time
+from typing import Callable, Sequence
 
 import numpy as np
 from numpy.typing import NDArray
 
 from PySide6.QtCore import QObject, Property, Signal, Slot, QTimer
 
+from voc_app.gui.spectrum_stft import (
+    DEFAULT_FRAME_SIZE,
+    BinResampler,
+    SpectrumPlan,
+    StreamingSTFT,
+    normalize_db,
+)
+from voc_app.gui.waterfall import DEFAULT_HISTORY_FRAMES, SpectrumHistory
 from voc_app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# 默认通知帧率上限（Hz），与常见显示器刷新率一致
+DEFAULT_MAX_FPS = 60.0
+
+
+class PublishThrottle:
+    """按帧率上限合并通知（单通道与多通道频谱模型共用，仅 GUI 线程使用）。
+
+    schedule() 在距上次通知已满一个周期时立即调用 publish，否则由单次定时器延后到周期末尾；
+    publish 开头需调用 mark_published() 记录通知时间并取消尚未到期的定时器。
+    """
+
+    def __init__(
+        self, parent: QObject, publish: Callable[[], None], max_fps: float = DEFAULT_MAX_FPS
+    ) -> None:
+        self._publish = publish
+        # 通知帧率上限 (Hz)，0 表示每帧都通知
+        self._max_fps = max(0.0, float(max_fps))
+        # 上一次通知的时间（time.monotonic()）
+        self.last_publish = 0.0
+        self._timer = QTimer(parent)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(publish)
+
+    @property
+    def max_fps(self) -> float:
+        return self._max_fps
+
+    def set_max_fps(self, value: float) -> bool:
+        """修改帧率上限（<= 0 表示不限制），返回是否发生变化；尚未发出的通知按新周期重新安排。"""
+        value = max(0.0, float(value))
+        if value == self._max_fps:
+            return False
+        self._max_fps = value
+        if self._timer.isActive():
+            self._timer.stop()
+            self.schedule()
+        return True
+
+    def schedule(self) -> None:
+        if self._timer.isActive():
+            return
+        if self._max_fps <= 0:
+            self._publish()
+            return
+        remaining = 1.0 / self._max_fps - (time.monotonic() - self.last_publish)
+        if remaining <= 0:
+            self._publish()
+            return
+        self._timer.start(max(1, math.ceil(remaining * 1000)))
+
+    def mark_published(self) -> None:
+        self._timer.stop()
+        self.last_publish = time.monotonic()
+
 
 class SpectrumDataModel(QObject):
     """
@@ -127,14 +214,24 @@ class SpectrumDataModel(QObject):
     spectrumDataChanged = Signal()
     # 当 bin 数量变化时发出
     binCountChanged = Signal()
+    # 当通知帧率上限变化时发出
+    maxFpsChanged = Signal()
+    # 当瀑布图历史帧数变化时发出
+    historyFramesChanged = Signal()
 
-    def __init__(self, bin_count: int = 256, parent: QObject | None = None) -> None:
+    def __init__(
+        self,
+        bin_count: int = 256,
+        parent: QObject | None = None,
+        history_frames: int = DEFAULT_HISTORY_FRAMES,
+    ) -> None:
         """
         初始化频谱数据模型。
 
         Args:
             bin_count: 频谱 bin 数量，默认 256。决定频率分辨率。
             parent: Qt 父对象，用于内存管理。
+            history_frames: 瀑布图保留的历史帧数，默认 256。
 
         Note:
             bin_count 可以后续通过 binCount 属性动态修改。
@@ -152,24 +249,38 @@ class SpectrumDataModel(QObject):
         self._peak_decay_rate = 0.02
 
         # ===== FFT 配置 =====
-        # 窗函数缓存（避免每帧重复创建）
-        self._fft_window: NDArray[np.float64] | None = None
+        # updateFromTimeDomain 的计算计划缓存（窗函数、插值权重、中间缓冲区）
+        self._spectrum_plan: SpectrumPlan | None = None
         # FFT 大小（默认 2x bin_count，零填充提升频率分辨率）
         self._fft_size = bin_count * 2
         # dB 范围，用于 FFT 结果归一化
         self._db_min = -80.0  # 最小分贝值
         self._db_max = 0.0    # 最大分贝值
-
-        # ===== 实时数据累积缓冲区 =====
-        # 用于 pushSample/pushSamples 方法
-        self._sample_buffer: list[float] = []
-        # 缓冲区大小（累积多少采样后计算 FFT）
-        self._buffer_size = 512
+        # 最近写入的帧若由 dB 归一化得到，记录当时的 (db_min, db_max)；直接写入的线性幅度为 None
+        self._frame_db_range: tuple[float, float] | None = None
+
+        # ===== 实时数据流式 STFT =====
+        # 用于 pushSample/pushSamples 方法：帧长 512、默认 50% 重叠
+        self._stft = StreamingSTFT(DEFAULT_FRAME_SIZE, min_fft_size=self._fft_size)
+        # 频谱重采样到 bin_count 的插值索引缓存
+        self._resampler = BinResampler()
         # 采样率 (Hz)，用于频率轴计算
         self._sample_rate = 44100.0
         # 缓冲区满时是否自动触发 FFT 更新
         self._auto_update = True
 
+        # ===== 呈现帧率控制 =====
+        # 按 maxFps 合并 spectrumDataChanged 通知
+        self._throttle = PublishThrottle(self, self._publish)
+        # 当前数据的列表快照（数据变化后置 None，首次读取时生成）
+        self._spectrum_list: list[float] | None = None
+        self._peak_list: list[float] | None = None
+        # 每次通知递增的序号
+        self._frame_serial = 0
+
+        # ===== 瀑布图历史 =====
+        self._history = SpectrumHistory(history_frames, bin_count)
+
     # ==================== binCount 属性 ====================
 
     def _get_bin_count(self) -> int:
@@ -190,12 +301,15 @@ class SpectrumDataModel(QObject):
             # 重新分配数组
             self._spectrum_data = np.zeros(value, dtype=np.float64)
             self._peak_hold = np.zeros(value, dtype=np.float64)
-            # 清除窗函数缓存（因为大小可能变化）
-            self._fft_window = None
+            self._history.resize(bins=value)
+            # 计算计划随 bin 数失效
+            self._spectrum_plan = None
             self._fft_size = value * 2
+            self._stft.configure(min_fft_size=self._fft_size)
             # 发出信号通知变化
             self.binCountChanged.emit()
-            self.spectrumDataChanged.emit()
+            self._invalidate_snapshots()
+            self._publish()
 
     # Qt Property 定义，使 QML 可以访问
     binCount = Property(int, _get_bin_count, _set_bin_count, notify=binCountChanged)  # pyright: ignore[reportAssignmentType]
@@ -209,7 +323,9 @@ class SpectrumDataModel(QObject):
         Returns:
             长度为 bin_count 的浮点数列表
         """
-        return self._spectrum_data.tolist()
+        if self._spectrum_list is None:
+            self._spectrum_list = self._spectrum_data.tolist()
+        return self._spectrum_list
 
     # 使用 QVariantList 类型，一次性传递整个数组到 QML
     spectrumData = Property("QVariantList", _get_spectrum_data, notify=spectrumDataChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
@@ -225,10 +341,30 @@ class SpectrumDataModel(QObject):
         Returns:
             长度为 bin_count 的浮点数列表
         """
-        return self._peak_hold.tolist()
+        if self._peak_list is None:
+            self._peak_list = self._peak_hold.tolist()
+        return self._peak_list
 
     peakHoldData = Property("QVariantList", _get_peak_hold_data, notify=spectrumDataChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
 
+    @property
+    def spectrum_array(self) -> NDArray[np.float64]:
+        """当前频谱的内部缓冲区（只读使用，供 SpectrumRenderer 直接生成顶点）。"""
+        return self._spectrum_data
+
+    @property
+    def peak_hold_array(self) -> NDArray[np.float64]:
+        """峰值保持的内部缓冲区（只读使用）。"""
+        return self._peak_hold
+
+    @property
+    def db_range(self) -> tuple[float, float] | None:
+        """当前帧的 dB 归一化范围；updateSpectrum 直接写入的线性幅度返回 None。
+
+        SpectrumFeatureExtractor 据此把显示用的 dB 刻度还原为线性幅度后再计算特征。
+        """
+        return self._frame_db_range
+
     # ==================== 核心数据更新方法 ====================
 
     @Slot(list)
@@ -254,23 +390,26 @@ class SpectrumDataModel(QObject):
         Note:
             此方法会自动更新峰值保持数据。
         """
+        self._frame_db_range = None
+        self._append_frame(data)
+
+    def _append_frame(self, data: Sequence[float] | NDArray[np.float64]) -> None:
+        """写入一帧并更新峰值保持、历史与通知（dB 刻度由调用方记录在 _frame_db_range）。"""
         if len(data) == 0:
             return
 
         # 转换为 NumPy 数组（如果已是 NumPy 数组则零开销）
         arr = np.asarray(data, dtype=np.float64)
 
-        # 数据长度适配
-        if len(arr) != self._bin_count:
-            if len(arr) > self._bin_count:
-                # 截断
-                arr = arr[: self._bin_count]
-            else:
-                # 补零
-                arr = np.pad(arr, (0, self._bin_count - len(arr)), constant_values=0.0)
-
-        # 更新频谱数据
-        self._spectrum_data = arr
+        # 复制到模型自己的缓冲区（调用方可能复用传入的数组，不能保留引用）；
+        # 超长截断，不足补零
+        count = min(len(arr), self._bin_count)
+        target = self._spectrum_data
+        target[:count] = arr[:count]
+        if count < self._bin_count:
+            target[count:] = 0.0
+        arr = target
+        self._history.append(arr)
 
         # ===== 峰值保持更新（向量化操作，比 Python 循环快 ~18x）=====
         # 1. 峰值衰减
@@ -280,7 +419,63 @@ class SpectrumDataModel(QObject):
         # 3. 如果当前值更高，更新峰值
         np.maximum(arr, self._peak_hold, out=self._peak_hold)
 
-        # 通知 QML 数据已更新
+        # 通知 QML 数据已更新（按 maxFps 合并）
+        self._invalidate_snapshots()
+        self._schedule_publish()
+
+    # ==================== 呈现帧率控制 ====================
+
+    def _get_max_fps(self) -> float:
+        """获取通知帧率上限 (Hz)。"""
+        return self._throttle.max_fps
+
+    def _set_max_fps(self, value: float) -> None:
+        """
+        设置通知帧率上限。
+
+        Args:
+            value: 每秒最多发出多少次 spectrumDataChanged，<= 0 表示不限制
+        """
+        if self._throttle.set_max_fps(value):
+            self.maxFpsChanged.emit()
+
+    maxFps = Property(float, _get_max_fps, _set_max_fps, notify=maxFpsChanged)  # pyright: ignore[reportAssignmentType]
+
+    # ==================== 瀑布图 ====================
+
+    @property
+    def history(self) -> SpectrumHistory:
+        """频谱历史环形缓冲区（仅 GUI 线程访问）。"""
+        return self._history
+
+    def _get_history_frames(self) -> int:
+        return self._history.frames
+
+    def _set_history_frames(self, value: int) -> None:
+        """修改历史帧数（清空已有历史），value 必须 > 0。"""
+        if value > 0 and value != self._history.frames:
+            self._history.resize(frames=value)
+            self.historyFramesChanged.emit()
+            self._publish()
+
+    historyFrames = Property(int, _get_history_frames, _set_history_frames, notify=historyFramesChanged)  # pyright: ignore[reportAssignmentType]
+
+    def _get_frame_serial(self) -> int:
+        return self._frame_serial
+
+    frameSerial = Property(int, _get_frame_serial, notify=spectrumDataChanged)  # pyright: ignore[reportAssignmentType]
+
+    def _invalidate_snapshots(self) -> None:
+        self._spectrum_list = None
+        self._peak_list = None
+
+    def _schedule_publish(self) -> None:
+        """距上次通知已满一个周期时立即通知，否则延后到周期末尾。"""
+        self._throttle.schedule()
+
+    def _publish(self) -> None:
+        self._throttle.mark_published()
+        self._frame_serial += 1
         self.spectrumDataChanged.emit()
 
     @Slot(list)
@@ -306,6 +501,7 @@ class SpectrumDataModel(QObject):
             - 使用汉宁窗减少频谱泄漏
             - FFT 大小会自动调整为 2 的幂次
             - 输出会重采样到 bin_count 大小
+            - 输入长度、bin 数与 dB 范围不变时复用同一个 SpectrumPlan
         """
         if len(samples) == 0:
             return
@@ -317,35 +513,15 @@ class SpectrumDataModel(QObject):
         fft_size = max(self._fft_size, n)
         fft_size = int(2 ** np.ceil(np.log2(fft_size)))
 
-        # 获取或创建窗函数（缓存以避免重复创建）
-        if self._fft_window is None or len(self._fft_window) != n:
-            self._fft_window = np.hanning(n).astype(np.float64)
-
-        # 加窗（减少频谱泄漏）
-        windowed = arr * self._fft_window
-
-        # FFT（零填充到 fft_size）
-        spectrum = np.fft.rfft(windowed, n=fft_size)
-
-        # 计算幅度谱（只取正频率部分）
-        magnitude = np.abs(spectrum[: fft_size // 2])
-
-        # 避免 log(0)
-        magnitude = np.maximum(magnitude, 1e-10)
-
-        # 转换为 dB（相对于最大值）
-        db = 20 * np.log10(magnitude / np.max(magnitude))
-
-        # 归一化到 0.0~1.0
-        normalized = (db - self._db_min) / (self._db_max - self._db_min)
-        normalized = np.clip(normalized, 0.0, 1.0)
+        # 计算计划（窗函数、插值索引、中间缓冲区）按参数缓存，参数不变时每帧不再分配数组
+        key = (n, fft_size, self._bin_count, self._db_min, self._db_max)
+        plan = self._spectrum_plan
+        if plan is None or plan.key != key:
+            plan = self._spectrum_plan = SpectrumPlan(*key)
 
-        # 重采样到 bin_count（线性插值）
-        if len(normalized) != self._bin_count:
-            indices = np.linspace(0, len(normalized) - 1, self._bin_count)
-            normalized = np.interp(indices, np.arange(len(normalized)), normalized)
-
-        self.updateSpectrum(normalized)
+        normalized = plan.execute(arr)
+        self._frame_db_range = (self._db_min, self._db_max)
+        self._append_frame(normalized)
 
     @Slot(list, int)
     def updateFromRawBytes(self, raw_data: Sequence[int], bits: int = 16) -> None:
@@ -421,19 +597,39 @@ class SpectrumDataModel(QObject):
     @Slot(int)
     def setBufferSize(self, size: int) -> None:
         """
-        设置累积缓冲区大小。
-
-        影响 pushSample/pushSamples 的行为。
+        设置 STFT 帧长（pushSample/pushSamples 每帧的采样数），保持当前重叠比例。
 
         Args:
-            size: 累积多少采样后触发 FFT 计算
+            size: 每帧采样数
 
         Note:
-            较大的缓冲区 = 更好的频率分辨率，但更新更慢
-            较小的缓冲区 = 更快的更新，但频率分辨率较低
+            较大的帧长 = 更好的频率分辨率，但时间分辨率较低
+            较小的帧长 = 更快的响应，但频率分辨率较低
         """
         if size > 0:
-            self._buffer_size = size
+            self._stft.configure(frame_size=size)
+
+    @Slot(int)
+    def setHopSize(self, hop: int) -> None:
+        """
+        设置 STFT 帧移：每累积 hop 个新采样计算一帧（1 ~ 帧长）。
+
+        帧移等于帧长时各帧不重叠（旧版行为）；帧移越小，频谱更新越平滑。
+        """
+        if hop > 0:
+            self._stft.configure(hop_size=hop)
+
+    @Slot(float)
+    def setOverlap(self, overlap: float) -> None:
+        """
+        按重叠比例设置帧移，overlap 取 0.0 ~ 0.95（默认 0.5）。
+
+        Example::
+
+            model.setOverlap(0.75)  # 帧长 512 时每 128 个采样更新一次
+        """
+        overlap = min(max(float(overlap), 0.0), 0.95)
+        self._stft.configure(hop_size=int(round(self._stft.frame_size * (1.0 - overlap))))
 
     @Slot(float)
     def setSampleRate(self, rate: float) -> None:
@@ -482,9 +678,9 @@ class SpectrumDataModel(QObject):
         获取频率分辨率 (Hz/bin)。
 
         Returns:
-            采样率 / 缓冲区大小
+            采样率 / 帧长
         """
-        return self._sample_rate / self._buffer_size
+        return self._sample_rate / self._stft.frame_size
 
     # ==================== 实时单点数据输入 ====================
 
@@ -493,7 +689,7 @@ class SpectrumDataModel(QObject):
         """
         推入单个采样点。
 
-        当缓冲区累积到 buffer_size 时，自动计算 FFT 并更新频谱。
+        每凑齐一帧（首帧需 frame_size 个采样，之后每 hop_size 个）自动计算并更新频谱。
 
         Args:
             sample: 单个采样值，建议范围 -1.0~1.0
@@ -504,13 +700,12 @@ class SpectrumDataModel(QObject):
             def on_data_received(value):
                 model.pushSample(value)
         """
-        self._sample_buffer.append(sample)
-
-        if len(self._sample_buffer) >= self._buffer_size:
-            if self._auto_update:
-                self.updateFromTimeDomain(self._sample_buffer)
-            # 清空缓冲区（非滑动窗口模式）
-            self._sample_buffer.clear()
+        if not self._auto_update:
+            self.pushSamples((sample,))
+            return
+        magnitude = self._stft.push_sample(sample)
+        if magnitude is not None:
+            self._update_from_stft(magnitude)
 
     @Slot(list)
     def pushSamples(self, samples: Sequence[float]) -> None:
@@ -528,15 +723,16 @@ class SpectrumDataModel(QObject):
             def on_batch_received(data_list):
                 model.pushSamples(data_list)
         """
-        self._sample_buffer.extend(samples)
+        magnitude = self._stft.push(samples, buffer_only=not self._auto_update)
+        if len(magnitude) > 0:
+            self._update_from_stft(magnitude)
 
-        # 处理所有完整的缓冲区
-        while len(self._sample_buffer) >= self._buffer_size:
-            if self._auto_update:
-                batch = self._sample_buffer[: self._buffer_size]
-                self.updateFromTimeDomain(batch)
-            # 移除已处理的样本
-            self._sample_buffer = self._sample_buffer[self._buffer_size :]
+    def _update_from_stft(self, magnitude: NDArray[np.float64]) -> None:
+        """批量归一化、重采样 STFT 各帧后逐帧送入（峰值与历史逐帧更新）。"""
+        frames = self._resampler(normalize_db(magnitude, self._db_min, self._db_max), self._bin_count)
+        self._frame_db_range = (self._db_min, self._db_max)
+        for frame in frames:
+            self._append_frame(frame)
 
     @Slot(int)
     def pushRawSample(self, raw_value: int, bits: int = 16) -> None:
@@ -554,39 +750,41 @@ class SpectrumDataModel(QObject):
     @Slot()
     def flushBuffer(self) -> None:
         """
-        强制处理当前缓冲区（即使未满）。
+        强制处理缓冲区中尚未计算过的采样（即使未满一帧）。
 
-        适用于数据流结束时处理剩余数据。
+        适用于数据流结束时处理剩余数据；与上一帧重叠、已计算过的采样不会重复处理。
         """
-        if len(self._sample_buffer) > 0:
-            self.updateFromTimeDomain(self._sample_buffer)
-            self._sample_buffer.clear()
+        tail = self._stft.drain()
+        if len(tail) > 0:
+            self.updateFromTimeDomain(tail)
 
     @Slot()
     def clearBuffer(self) -> None:
         """清空缓冲区（不处理数据）。"""
-        self._sample_buffer.clear()
+        self._stft.clear()
 
     def getBufferLevel(self) -> int:
-        """获取当前缓冲区已累积的采样数。"""
-        return len(self._sample_buffer)
+        """获取已累积、尚未计算过的采样数（不含与上一帧重叠的部分）。"""
+        return self._stft.pending
 
     def getBufferProgress(self) -> float:
         """
-        获取缓冲区填充进度。
+        获取距离下一帧的进度（首帧需帧长个采样，之后每帧移个采样）。
 
         Returns:
             0.0~1.0 的进度值
         """
-        return len(self._sample_buffer) / self._buffer_size
+        return self._stft.progress
 
     @Slot()
     def clear(self) -> None:
         """清空所有数据（频谱、峰值、缓冲区）。"""
         self._spectrum_data.fill(0.0)
         self._peak_hold.fill(0.0)
-        self._sample_buffer.clear()
-        self.spectrumDataChanged.emit()
+        self._stft.clear()
+        self._history.clear()
+        self._invalidate_snapshots()
+        self._publish()
 
 
 class SpectrumSimulator(QObject):
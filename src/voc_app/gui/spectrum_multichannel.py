@@ -0,0 +1,339 @@
+"""多通道频谱数据模型 (MultiChannelSpectrumModel)
+
+噪声传感器可以同时给出多路频谱。为每一路各建一个 SpectrumDataModel 时，
+FFT、归一化、峰值保持和通知定时器都要按通道重复一遍。
+MultiChannelSpectrumModel 把所有通道保存在一个 (channels x bins) 的 float64 数组中：
+
+- updateSpectra(frames) / updateFromTimeDomain(samples) 一次处理全部通道
+  （批量 rfft(axis=1)、逐行 dB 归一化、缓存的重采样索引、向量化峰值保持）；
+- updateChannel(index, values) 用于按通道逐帧到达的数据（如带通道号的二进制频谱帧）；
+- 通知按 maxFps 合并，所有通道共用一个定时器，只通知有新数据的通道。
+
+QML 通过 channel(i) / channels 取得 SpectrumChannel：它是共享数组中一行的视图，
+提供与 SpectrumDataModel 相同的属性、信号与 clear()，可直接交给
+SpectrumChart / SpectrumRenderer / WaterfallView 使用。
+"""
+
+from __future__ import annotations
+
+from typing import List, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from PySide6.QtCore import Property, QObject, Signal, Slot
+
+from voc_app.gui.spectrum_model import PublishThrottle
+from voc_app.gui.spectrum_stft import BinResampler, normalize_db
+from voc_app.gui.waterfall import DEFAULT_HISTORY_FRAMES, SpectrumHistory
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SpectrumChannel(QObject):
+    """多通道模型中单个通道的视图（接口与 SpectrumDataModel 的只读部分一致）。"""
+
+    spectrumDataChanged = Signal()
+    binCountChanged = Signal()
+
+    def __init__(self, owner: "MultiChannelSpectrumModel", index: int, history_frames: int) -> None:
+        super().__init__(owner)
+        self._owner = owner
+        self._index = index
+        self._frame_serial = 0
+        self._spectrum_list: list[float] | None = None
+        self._peak_list: list[float] | None = None
+        self._history = SpectrumHistory(history_frames, owner.bin_count)
+        # 本通道当前帧的 dB 归一化范围，直接写入的线性幅度为 None
+        self._db_range: tuple[float, float] | None = None
+
+    def _get_channel_index(self) -> int:
+        return self._index
+
+    channelIndex = Property(int, _get_channel_index, constant=True)  # pyright: ignore[reportAssignmentType]
+
+    def _get_bin_count(self) -> int:
+        return self._owner.bin_count
+
+    binCount = Property(int, _get_bin_count, notify=binCountChanged)  # pyright: ignore[reportAssignmentType]
+
+    def _get_spectrum_data(self) -> list[float]:
+        if self._spectrum_list is None:
+            self._spectrum_list = self.spectrum_array.tolist()
+        return self._spectrum_list
+
+    spectrumData = Property("QVariantList", _get_spectrum_data, notify=spectrumDataChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
+
+    def _get_peak_hold_data(self) -> list[float]:
+        if self._peak_list is None:
+            self._peak_list = self.peak_hold_array.tolist()
+        return self._peak_list
+
+    peakHoldData = Property("QVariantList", _get_peak_hold_data, notify=spectrumDataChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
+
+    def _get_frame_serial(self) -> int:
+        return self._frame_serial
+
+    frameSerial = Property(int, _get_frame_serial, notify=spectrumDataChanged)  # pyright: ignore[reportAssignmentType]
+
+    @property
+    def spectrum_array(self) -> NDArray[np.float64]:
+        """共享数组中本通道的一行（视图，只读使用）。"""
+        return self._owner.spectra[self._index]
+
+    @property
+    def peak_hold_array(self) -> NDArray[np.float64]:
+        return self._owner.peak_holds[self._index]
+
+    @property
+    def history(self) -> SpectrumHistory:
+        return self._history
+
+    @property
+    def db_range(self) -> tuple[float, float] | None:
+        """当前帧的 dB 归一化范围（同 SpectrumDataModel.db_range）。"""
+        return self._db_range
+
+    @Slot()
+    def clear(self) -> None:
+        """清空本通道的频谱、峰值与历史。"""
+        self._owner.clearChannel(self._index)
+
+    def _notify(self) -> None:
+        self._spectrum_list = None
+        self._peak_list = None
+        self._frame_serial += 1
+        self.spectrumDataChanged.emit()
+
+
+class MultiChannelSpectrumModel(QObject):
+    """(channels x bins) 共享缓冲区的多通道频谱模型。"""
+
+    spectraChanged = Signal()
+    channelCountChanged = Signal()
+    binCountChanged = Signal()
+    maxFpsChanged = Signal()
+
+    def __init__(
+        self,
+        channel_count: int = 1,
+        bin_count: int = 256,
+        parent: QObject | None = None,
+        history_frames: int = DEFAULT_HISTORY_FRAMES,
+    ) -> None:
+        super().__init__(parent)
+        self._bin_count = max(1, int(bin_count))
+        self._history_frames = history_frames
+        self._spectra: NDArray[np.float64] = np.zeros((0, self._bin_count), dtype=np.float64)
+        self._peaks: NDArray[np.float64] = np.zeros((0, self._bin_count), dtype=np.float64)
+        # 自上次通知以来有新数据的通道
+        self._dirty: NDArray[np.bool_] = np.zeros(0, dtype=bool)
+        self._channels: List[SpectrumChannel] = []
+        self._peak_decay_rate = 0.02
+        self._db_min = -80.0
+        self._db_max = 0.0
+        # 批量 FFT 的窗函数缓存与重采样索引缓存
+        self._window: NDArray[np.float64] = np.zeros(0, dtype=np.float64)
+        self._resampler = BinResampler()
+
+        self._throttle = PublishThrottle(self, self._publish)
+
+        self._resize_channels(max(1, int(channel_count)))
+
+    # ==================== 形状 ====================
+
+    @property
+    def bin_count(self) -> int:
+        return self._bin_count
+
+    @property
+    def spectra(self) -> NDArray[np.float64]:
+        """(channels x bins) 频谱缓冲区（只读使用）。"""
+        return self._spectra
+
+    @property
+    def peak_holds(self) -> NDArray[np.float64]:
+        return self._peaks
+
+    def _resize_channels(self, count: int) -> None:
+        old = len(self._channels)
+        keep = min(old, count)
+        spectra = np.zeros((count, self._bin_count), dtype=np.float64)
+        peaks = np.zeros((count, self._bin_count), dtype=np.float64)
+        spectra[:keep] = self._spectra[:keep]
+        peaks[:keep] = self._peaks[:keep]
+        self._spectra, self._peaks = spectra, peaks
+        self._dirty = np.zeros(count, dtype=bool)
+        for channel in self._channels[count:]:
+            channel.deleteLater()
+        del self._channels[count:]
+        for index in range(old, count):
+            self._channels.append(SpectrumChannel(self, index, self._history_frames))
+
+    def _get_channel_count(self) -> int:
+        return len(self._channels)
+
+    def _set_channel_count(self, value: int) -> None:
+        """修改通道数：保留已有通道的数据，新增通道从 0 开始。"""
+        if value > 0 and value != len(self._channels):
+            self._resize_channels(int(value))
+            self.channelCountChanged.emit()
+
+    channelCount = Property(int, _get_channel_count, _set_channel_count, notify=channelCountChanged)  # pyright: ignore[reportAssignmentType]
+
+    def _get_bin_count(self) -> int:
+        return self._bin_count
+
+    def _set_bin_count(self, value: int) -> None:
+        """修改 bin 数，所有通道的数据与历史被清空。"""
+        if value > 0 and value != self._bin_count:
+            self._bin_count = int(value)
+            self._spectra = np.zeros((len(self._channels), value), dtype=np.float64)
+            self._peaks = np.zeros_like(self._spectra)
+            for channel in self._channels:
+                channel.history.resize(bins=value)
+                channel.binCountChanged.emit()
+            self.binCountChanged.emit()
+            self._dirty[:] = True
+            self._publish()
+
+    binCount = Property(int, _get_bin_count, _set_bin_count, notify=binCountChanged)  # pyright: ignore[reportAssignmentType]
+
+    def _get_channels(self) -> list:
+        return list(self._channels)
+
+    channels = Property("QVariantList", _get_channels, notify=channelCountChanged)  # pyright: ignore[reportArgumentType, reportAssignmentType]
+
+    @Slot(int, result=QObject)
+    def channel(self, index: int) -> SpectrumChannel | None:
+        """返回第 index 个通道的视图，越界时返回 None。"""
+        if 0 <= index < len(self._channels):
+            return self._channels[index]
+        return None
+
+    # ==================== 数据输入 ====================
+
+    def updateSpectra(self, frames: Sequence[Sequence[float]] | NDArray[np.float64]) -> None:
+        """一次更新前 len(frames) 个通道（每行归一化 0.0~1.0，超长截断、不足补 0）。"""
+        self._write_spectra(frames, None)
+
+    def _write_spectra(
+        self,
+        frames: Sequence[Sequence[float]] | NDArray[np.float64],
+        db_range: tuple[float, float] | None,
+    ) -> None:
+        arr = np.asarray(frames, dtype=np.float64)
+        if arr.ndim != 2 or arr.shape[0] == 0:
+            return
+        rows = min(arr.shape[0], len(self._channels))
+        cols = min(arr.shape[1], self._bin_count)
+        target = self._spectra[:rows]
+        target[:, :cols] = arr[:rows, :cols]
+        if cols < self._bin_count:
+            target[:, cols:] = 0.0
+        for channel in self._channels[:rows]:
+            channel._db_range = db_range
+        self._after_update(slice(0, rows))
+
+    @Slot(int, list)
+    def updateChannel(self, index: int, data: Sequence[float] | NDArray[np.float64]) -> None:
+        """更新单个通道（按通道逐帧到达的数据）。"""
+        if not 0 <= index < len(self._channels) or len(data) == 0:
+            return
+        arr = np.asarray(data, dtype=np.float64)
+        count = min(len(arr), self._bin_count)
+        row = self._spectra[index]
+        row[:count] = arr[:count]
+        if count < self._bin_count:
+            row[count:] = 0.0
+        self._channels[index]._db_range = None
+        self._after_update(slice(index, index + 1))
+
+    def updateFromTimeDomain(self, samples: Sequence[Sequence[float]] | NDArray[np.float64]) -> None:
+        """各通道时域采样 (channels x n) 一次批量 FFT 后更新频谱。
+
+        处理流程与 SpectrumDataModel.updateFromTimeDomain 相同：加窗 -> FFT -> 幅度
+        -> 逐行相对最大值的 dB 归一化 -> 重采样到 bin_count。
+        """
+        arr = np.asarray(samples, dtype=np.float64)
+        if arr.ndim != 2 or arr.shape[1] == 0:
+            return
+        arr = arr[: len(self._channels)]
+        n = arr.shape[1]
+        fft_size = 1 << (max(self._bin_count * 2, n) - 1).bit_length()
+        if len(self._window) != n:
+            self._window = np.hanning(n).astype(np.float64)
+        spectra = np.fft.rfft(arr * self._window, n=fft_size, axis=1)
+        magnitude = np.abs(spectra[:, : fft_size // 2])
+        normalized = self._resampler(
+            normalize_db(magnitude, self._db_min, self._db_max), self._bin_count
+        )
+        self._write_spectra(normalized, (self._db_min, self._db_max))
+
+    def _after_update(self, rows: slice) -> None:
+        """对更新过的行做向量化峰值保持、写入历史并安排通知。"""
+        spectra = self._spectra[rows]
+        peaks = self._peaks[rows]
+        peaks -= self._peak_decay_rate
+        np.maximum(peaks, 0.0, out=peaks)
+        np.maximum(spectra, peaks, out=peaks)
+        for index in range(*rows.indices(len(self._channels))):
+            self._channels[index].history.append(self._spectra[index])
+        self._dirty[rows] = True
+        self._schedule_publish()
+
+    # ==================== 配置 ====================
+
+    @Slot(float, float)
+    def setDbRange(self, db_min: float, db_max: float) -> None:
+        self._db_min = db_min
+        self._db_max = db_max
+
+    @Slot(float)
+    def setPeakDecayRate(self, rate: float) -> None:
+        if rate > 0:
+            self._peak_decay_rate = rate
+
+    def _get_max_fps(self) -> float:
+        return self._throttle.max_fps
+
+    def _set_max_fps(self, value: float) -> None:
+        """设置所有通道共用的通知帧率上限，0 或负数表示不限制。"""
+        if self._throttle.set_max_fps(value):
+            self.maxFpsChanged.emit()
+
+    maxFps = Property(float, _get_max_fps, _set_max_fps, notify=maxFpsChanged)  # pyright: ignore[reportAssignmentType]
+
+    @Slot(int)
+    def clearChannel(self, index: int) -> None:
+        if not 0 <= index < len(self._channels):
+            return
+        self._spectra[index].fill(0.0)
+        self._peaks[index].fill(0.0)
+        self._channels[index].history.clear()
+        self._dirty[index] = True
+        self._publish()
+
+    @Slot()
+    def clear(self) -> None:
+        """清空所有通道的数据与历史。"""
+        self._spectra.fill(0.0)
+        self._peaks.fill(0.0)
+        for channel in self._channels:
+            channel.history.clear()
+        self._dirty[:] = True
+        self._publish()
+
+    # ==================== 通知 ====================
+
+    def _schedule_publish(self) -> None:
+        """与 SpectrumDataModel 相同：满一个周期立即通知，否则延后到周期末尾。"""
+        self._throttle.schedule()
+
+    def _publish(self) -> None:
+        self._throttle.mark_published()
+        dirty = np.flatnonzero(self._dirty)
+        self._dirty[:] = False
+        for index in dirty:
+            self._channels[index]._notify()
+        self.spectraChanged.emit()
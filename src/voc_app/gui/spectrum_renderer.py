@@ -0,0 +1,455 @@
+"""场景图频谱渲染器 (SpectrumRenderer)
+
+替代 SpectrumChart.qml 中逐帧在 JavaScript 里遍历所有 bin 的多个 Canvas
+（主图 / 发光 / 倒影）。SpectrumRenderer 是一个 QQuickItem，直接从
+SpectrumDataModel 的 NumPy 缓冲区生成顶点：每个图元是一个由两个三角形组成的四边形，
+颜色按顶点给出（QSGVertexColorMaterial），整幅频谱只有一个几何节点、一次绘制。
+
+- 柱状图：每个 bin 一个四边形，渐变通过底部/顶部顶点颜色插值实现；
+- 折线图：每段折线一个带宽度的四边形，填充区域为每段到基线的四边形；
+- 发光：绘制在主体之前的加宽半透明四边形；
+- 倒影：基线以下的镜像四边形，透明度向下渐隐到 0；
+- 峰值保持：每个 bin 一条细四边形。
+
+顶点缓冲区原地更新（数量不变时不重新分配），计算全部向量化，
+每帧开销不再随 JavaScript 循环次数增长。
+
+QML 中使用::
+
+    import VocSpectrum 1.0
+
+    SpectrumRenderer {
+        spectrumModel: spectrumModel
+        chartType: "bar"
+        colorScheme: "spectrum"
+    }
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+from numpy.typing import NDArray
+from PySide6.QtCore import Property, QObject, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtQml import QmlElement
+from PySide6.QtQuick import (
+    QQuickItem,
+    QSGGeometry,
+    QSGGeometryNode,
+    QSGNode,
+    QSGRendererInterface,
+    QSGVertexColorMaterial,
+)
+from shiboken6 import VoidPtr
+
+from voc_app.gui.waterfall import LUT_SIZE, build_colormap_lut
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+QML_IMPORT_NAME = "VocSpectrum"
+QML_IMPORT_MAJOR_VERSION = 1
+
+# 与 QSGGeometry::ColoredPoint2D 一致：x, y (float) + r, g, b, a (uchar)，颜色为预乘 alpha
+VERTEX_DTYPE = np.dtype(
+    [("x", "<f4"), ("y", "<f4"), ("r", "u1"), ("g", "u1"), ("b", "u1"), ("a", "u1")]
+)
+VERTICES_PER_QUAD = 6
+# QSGGeometry 只保存属性集的指针，必须在模块生命周期内持有
+_COLORED_POINT_ATTRIBUTES = QSGGeometry.defaultAttributes_ColoredPoint2D()
+
+# 倒影区域高度（相对图表高度）与倒影柱高比例，与旧 Canvas 实现一致
+REFLECTION_HEIGHT_RATIO = 0.3
+REFLECTION_SCALE = 0.5
+# 柱状图发光阈值：低于该值的 bin 不发光
+GLOW_THRESHOLD = 0.3
+
+
+def _rgba_lut(scheme: str, mono_color: tuple[int, int, int, int]) -> NDArray[np.float32]:
+    """返回 (256, 4) 的 RGBA 查找表（0~255 浮点，未预乘）。"""
+    lut = np.empty((LUT_SIZE, 4), dtype=np.float32)
+    if scheme == "mono":
+        lut[:, :3] = mono_color[:3]
+        # 与旧实现一致：单色模式 alpha 随数值 0.3 -> 1.0
+        lut[:, 3] = (0.3 + 0.7 * np.linspace(0.0, 1.0, LUT_SIZE)) * 255.0
+        return lut
+    packed = build_colormap_lut(scheme)
+    lut[:, 0] = (packed >> 16) & 0xFF
+    lut[:, 1] = (packed >> 8) & 0xFF
+    lut[:, 2] = packed & 0xFF
+    lut[:, 3] = 255.0
+    return lut
+
+
+@dataclass
+class SpectrumStyle:
+    """渲染参数，字段与 SpectrumChart.qml 的同名属性对应。"""
+
+    chart_type: str = "bar"
+    color_scheme: str = "spectrum"
+    mono_color: tuple[int, int, int, int] = (0, 255, 0, 255)
+    use_gradient: bool = True
+    gradient_intensity: float = 1.0
+    bar_spacing: float = 0.0
+    bar_min_height: float = 1.0
+    line_width: float = 2.0
+    line_fill: bool = True
+    line_fill_opacity: float = 0.3
+    show_peak_hold: bool = True
+    peak_hold_color: tuple[int, int, int, int] = (255, 255, 255, 204)
+    peak_hold_line_width: float = 2.0
+    glow_enabled: bool = True
+    glow_intensity: float = 0.6
+    reflection_enabled: bool = True
+    reflection_opacity: float = 0.15
+
+
+class SpectrumGeometryBuilder:
+    """把频谱与峰值数组转换为顶点（不依赖场景图，便于单独测试）。"""
+
+    def __init__(self, style: SpectrumStyle | None = None) -> None:
+        self.style = style if style is not None else SpectrumStyle()
+        self._luts: Dict[tuple, NDArray[np.float32]] = {}
+
+    def _lut(self) -> NDArray[np.float32]:
+        key = (self.style.color_scheme, self.style.mono_color)
+        lut = self._luts.get(key)
+        if lut is None:
+            lut = self._luts[key] = _rgba_lut(*key)
+        return lut
+
+    def _colors(self, levels: NDArray, alpha: float | NDArray = 1.0) -> NDArray[np.float32]:
+        """按 0~1 的级别查表，返回 (n, 4) 颜色，alpha 为额外透明度系数。"""
+        index = np.clip(np.asarray(levels) * (LUT_SIZE - 1), 0, LUT_SIZE - 1).astype(np.intp)
+        colors = self._lut()[index]
+        colors[:, 3] *= alpha
+        return colors
+
+    def _gradient_levels(self, values: NDArray) -> NDArray:
+        """全高渐变在高度 values 处的颜色级别（停止点 0/0.3/0.6/1，同旧实现）。"""
+        k = self.style.gradient_intensity
+        return np.interp(values, (0.0, 0.3, 0.6, 1.0), (0.1 * k, 0.3 * k, 0.6 * k, 1.0))
+
+    # ---------- 四边形数量 ----------
+
+    def quad_count(self, bins: int) -> int:
+        """给定 bin 数时的四边形总数（决定顶点缓冲区大小）。"""
+        if bins <= 0:
+            return 0
+        s = self.style
+        if s.chart_type == "line":
+            if bins < 2:
+                return 0
+            segments = bins - 1
+            count = segments  # 折线
+            count += segments if s.line_fill else 0
+            count += segments if s.glow_enabled else 0
+            count += segments if s.reflection_enabled else 0
+            count += segments if s.show_peak_hold else 0
+            return count
+        layers = 1 + s.glow_enabled + s.reflection_enabled + s.show_peak_hold
+        return bins * layers
+
+    def vertex_count(self, bins: int) -> int:
+        return self.quad_count(bins) * VERTICES_PER_QUAD
+
+    # ---------- 顶点生成 ----------
+
+    def fill(
+        self,
+        out: NDArray,
+        spectrum: NDArray,
+        peaks: NDArray | None,
+        width: float,
+        height: float,
+    ) -> None:
+        """把一帧写入 out（VERTEX_DTYPE，长度为 vertex_count(len(spectrum))）。"""
+        values = np.clip(np.asarray(spectrum, dtype=np.float32), 0.0, 1.0)
+        if peaks is None or len(peaks) != len(values):
+            peaks = np.zeros_like(values)
+        else:
+            peaks = np.clip(np.asarray(peaks, dtype=np.float32), 0.0, 1.0)
+        writer = _QuadWriter(out)
+        if self.style.chart_type == "line":
+            self._fill_line(writer, values, peaks, float(width), float(height))
+        else:
+            self._fill_bars(writer, values, peaks, float(width), float(height))
+
+    def _fill_bars(self, writer: "_QuadWriter", values, peaks, w: float, h: float) -> None:
+        s = self.style
+        n = len(values)
+        bar_width = max(1.0, (w - (n - 1) * s.bar_spacing) / n)
+        x0 = np.arange(n, dtype=np.float32) * (bar_width + s.bar_spacing)
+        x1 = x0 + bar_width
+        bar_heights = np.maximum(s.bar_min_height, values * h)
+        top = h - bar_heights
+        base = np.full(n, h, dtype=np.float32)
+
+        if s.reflection_enabled:
+            depth = np.minimum(values * h * REFLECTION_SCALE, h * REFLECTION_HEIGHT_RATIO)
+            near = self._colors(values * 0.7, s.reflection_opacity)
+            far = near.copy()
+            far[:, 3] = 0.0
+            writer.rects(x0, base, x1, base + depth, near, far)
+
+        if s.glow_enabled:
+            # 加宽、加高的半透明柱，低于阈值的 bin 透明
+            spread = bar_width * 0.5
+            alpha = np.where(values > GLOW_THRESHOLD, s.glow_intensity * 0.5, 0.0)
+            glow_top = self._colors(values, alpha)
+            glow_bottom = glow_top.copy()
+            glow_bottom[:, 3] *= 0.3
+            writer.rects(x0 - spread, top - spread, x1 + spread, base, glow_top, glow_bottom)
+
+        if s.use_gradient:
+            top_colors = self._colors(self._gradient_levels(values))
+            bottom_colors = self._colors(np.full(n, 0.1 * s.gradient_intensity))
+        else:
+            top_colors = self._colors(values)
+            bottom_colors = top_colors
+        writer.rects(x0, top, x1, base, top_colors, bottom_colors)
+
+        if s.show_peak_hold:
+            peak_y = h - peaks * h
+            color = self._peak_colors(n, peaks > 0.01)
+            writer.rects(x0, peak_y - s.peak_hold_line_width / 2, x1, peak_y + s.peak_hold_line_width / 2, color, color)
+
+    def _fill_line(self, writer: "_QuadWriter", values, peaks, w: float, h: float) -> None:
+        s = self.style
+        n = len(values)
+        xs = np.arange(n, dtype=np.float32) * (w / (n - 1))
+        ys = h - values * h
+        seg_levels = (values[:-1] + values[1:]) / 2
+        base = np.full(n - 1, h, dtype=np.float32)
+
+        if s.reflection_enabled:
+            depth = np.minimum(values * h * REFLECTION_SCALE, h * REFLECTION_HEIGHT_RATIO)
+            near = self._colors(np.full(n - 1, 0.5), s.reflection_opacity)
+            far = near.copy()
+            far[:, 3] = 0.0
+            writer.quads(
+                xs[:-1], base, xs[1:], base,
+                xs[:-1], h + depth[:-1], xs[1:], h + depth[1:],
+                near, far,
+            )
+
+        if s.glow_enabled:
+            glow = self._colors(np.full(n - 1, 0.8), s.glow_intensity * 0.3)
+            writer.segments(xs, ys, s.line_width + 6.0, glow)
+
+        if s.line_fill:
+            if s.use_gradient:
+                top = self._colors(self._gradient_levels(seg_levels), s.line_fill_opacity)
+                bottom = self._colors(np.full(n - 1, 0.1 * s.gradient_intensity), s.line_fill_opacity * 0.5)
+            else:
+                top = self._colors(np.full(n - 1, 0.7), s.line_fill_opacity)
+                bottom = top
+            writer.quads(
+                xs[:-1], ys[:-1], xs[1:], ys[1:],
+                xs[:-1], base, xs[1:], base,
+                top, bottom,
+            )
+
+        if s.use_gradient:
+            line = self._colors(self._gradient_levels(seg_levels))
+        else:
+            line = self._colors(np.full(n - 1, 0.8))
+        writer.segments(xs, ys, s.line_width, line)
+
+        if s.show_peak_hold:
+            writer.segments(xs, h - peaks * h, s.peak_hold_line_width, self._peak_colors(n - 1))
+
+    def _peak_colors(self, n: int, visible: NDArray | None = None) -> NDArray[np.float32]:
+        colors = np.empty((n, 4), dtype=np.float32)
+        colors[:] = self.style.peak_hold_color
+        if visible is not None:
+            colors[:, 3] *= visible
+        return colors
+
+
+class _QuadWriter:
+    """按顺序向顶点数组写入四边形（每个 6 个顶点，两个三角形）。"""
+
+    def __init__(self, out: NDArray) -> None:
+        self._out = out
+        self._offset = 0
+
+    def rects(self, x0, y0, x1, y1, top_colors, bottom_colors) -> None:
+        """轴对齐矩形：(x0, y0) 为上沿左端，(x1, y1) 为下沿右端。"""
+        self.quads(x0, y0, x1, y0, x0, y1, x1, y1, top_colors, bottom_colors)
+
+    def segments(self, xs, ys, width: float, colors) -> None:
+        """折线 (xs, ys) 的每一段画成宽度为 width 的四边形。"""
+        dx = np.diff(xs)
+        dy = np.diff(ys)
+        length = np.hypot(dx, dy)
+        length[length == 0] = 1.0
+        nx = -dy / length * (width / 2)
+        ny = dx / length * (width / 2)
+        self.quads(
+            xs[:-1] + nx, ys[:-1] + ny, xs[1:] + nx, ys[1:] + ny,
+            xs[:-1] - nx, ys[:-1] - ny, xs[1:] - nx, ys[1:] - ny,
+            colors, colors,
+        )
+
+    def quads(self, ax, ay, bx, by, cx, cy, dx, dy, top_colors, bottom_colors) -> None:
+        """任意四边形：a-b 为“顶边”（使用 top_colors），c-d 为“底边”。
+
+        两个三角形为 (a, b, c) 与 (b, d, c)。
+        """
+        n = len(ax)
+        block = self._out[self._offset : self._offset + n * VERTICES_PER_QUAD].reshape(n, VERTICES_PER_QUAD)
+        self._offset += n * VERTICES_PER_QUAD
+        block["x"] = np.stack((ax, bx, cx, bx, dx, cx), axis=1)
+        block["y"] = np.stack((ay, by, cy, by, dy, cy), axis=1)
+        top = _premultiply(top_colors)
+        bottom = _premultiply(bottom_colors)
+        # 顶点 0/1/3 属于顶边，2/4/5 属于底边
+        for channel_index, channel in enumerate(("r", "g", "b", "a")):
+            column = block[channel]
+            column[:, (0, 1, 3)] = top[:, channel_index : channel_index + 1]
+            column[:, (2, 4, 5)] = bottom[:, channel_index : channel_index + 1]
+
+
+def _premultiply(colors: NDArray[np.float32]) -> NDArray[np.uint8]:
+    alpha = np.clip(colors[:, 3:4], 0.0, 255.0)
+    result = np.empty((len(colors), 4), dtype=np.uint8)
+    result[:, :3] = np.clip(colors[:, :3] * (alpha / 255.0), 0.0, 255.0)
+    result[:, 3:] = alpha
+    return result
+
+
+def geometry_vertices(geometry: QSGGeometry) -> NDArray:
+    """以 VERTEX_DTYPE 数组的形式返回 geometry 的顶点缓冲区（可写视图）。"""
+    count = geometry.vertexCount()
+    pointer = VoidPtr(int(geometry.vertexData()), count * VERTEX_DTYPE.itemsize, True)
+    return np.frombuffer(pointer, dtype=VERTEX_DTYPE, count=count)
+
+
+def _color_tuple(color: QColor) -> tuple[int, int, int, int]:
+    return (color.red(), color.green(), color.blue(), color.alpha())
+
+
+def _style_property(field: str, type_, notify: Signal) -> Property:
+    """生成读写 SpectrumStyle 字段的 Qt 属性，写入后重绘。"""
+
+    def getter(self: "SpectrumRenderer"):
+        value = getattr(self._builder.style, field)
+        if type_ is QColor:
+            return QColor(*value)
+        return value
+
+    def setter(self: "SpectrumRenderer", value) -> None:
+        if type_ is QColor:
+            value = _color_tuple(QColor(value))
+        if getattr(self._builder.style, field) == value:
+            return
+        setattr(self._builder.style, field, value)
+        self.styleChanged.emit()
+        self.update()
+
+    return Property(type_, getter, setter, notify=notify)
+
+
+@QmlElement
+class SpectrumRenderer(QQuickItem):
+    """在场景图中绘制 SpectrumDataModel 当前帧（柱状图或折线图）。"""
+
+    spectrumModelChanged = Signal()
+    styleChanged = Signal()
+
+    def __init__(self, parent: QQuickItem | None = None) -> None:
+        super().__init__(parent)
+        self.setFlag(QQuickItem.ItemHasContents, True)
+        self._model: QObject | None = None
+        self._builder = SpectrumGeometryBuilder()
+
+    # ==================== spectrumModel 属性 ====================
+
+    def _get_spectrum_model(self) -> QObject | None:
+        return self._model
+
+    def _set_spectrum_model(self, model: QObject | None) -> None:
+        if model is self._model:
+            return
+        if self._model is not None:
+            try:
+                self._model.spectrumDataChanged.disconnect(self.update)
+                self._model.binCountChanged.disconnect(self.update)
+            except (RuntimeError, TypeError):
+                pass
+        self._model = model
+        if model is not None:
+            model.spectrumDataChanged.connect(self.update)
+            model.binCountChanged.connect(self.update)
+        self.spectrumModelChanged.emit()
+        self.update()
+
+    spectrumModel = Property(QObject, _get_spectrum_model, _set_spectrum_model, notify=spectrumModelChanged)  # pyright: ignore[reportAssignmentType]
+
+    # ==================== 样式属性（与 SpectrumChart.qml 同名） ====================
+
+    chartType = _style_property("chart_type", str, styleChanged)
+    colorScheme = _style_property("color_scheme", str, styleChanged)
+    monoColor = _style_property("mono_color", QColor, styleChanged)
+    useGradient = _style_property("use_gradient", bool, styleChanged)
+    gradientIntensity = _style_property("gradient_intensity", float, styleChanged)
+    barSpacing = _style_property("bar_spacing", float, styleChanged)
+    barMinHeight = _style_property("bar_min_height", float, styleChanged)
+    lineWidth = _style_property("line_width", float, styleChanged)
+    lineFill = _style_property("line_fill", bool, styleChanged)
+    lineFillOpacity = _style_property("line_fill_opacity", float, styleChanged)
+    showPeakHold = _style_property("show_peak_hold", bool, styleChanged)
+    peakHoldColor = _style_property("peak_hold_color", QColor, styleChanged)
+    peakHoldLineWidth = _style_property("peak_hold_line_width", float, styleChanged)
+    glowEnabled = _style_property("glow_enabled", bool, styleChanged)
+    glowIntensity = _style_property("glow_intensity", float, styleChanged)
+    reflectionEnabled = _style_property("reflection_enabled", bool, styleChanged)
+    reflectionOpacity = _style_property("reflection_opacity", float, styleChanged)
+
+    # ==================== 场景图 ====================
+
+    def geometryChange(self, new_geometry, old_geometry) -> None:
+        super().geometryChange(new_geometry, old_geometry)
+        if new_geometry.size() != old_geometry.size():
+            self.update()
+
+    def updatePaintNode(self, old_node: QSGNode | None, _data) -> QSGNode:
+        """在渲染线程同步阶段调用（GUI 线程此时阻塞），原地更新顶点缓冲区。"""
+        node = old_node
+        if node is None:
+            window = self.window()
+            if (
+                window is not None
+                and window.rendererInterface().graphicsApi() == QSGRendererInterface.GraphicsApi.Software
+            ):
+                logger.warning("软件场景图后端不支持自定义几何节点，频谱将不显示；请使用 OpenGL/RHI 后端")
+            node = QSGGeometryNode()
+            geometry = QSGGeometry(_COLORED_POINT_ATTRIBUTES, 0)
+            geometry.setDrawingMode(QSGGeometry.DrawingMode.DrawTriangles)
+            node.setGeometry(geometry)
+            node.setFlag(QSGNode.Flag.OwnsGeometry)
+            node.setMaterial(QSGVertexColorMaterial())
+            node.setFlag(QSGNode.Flag.OwnsMaterial)
+        geometry = node.geometry()
+
+        spectrum = self._model.spectrum_array if self._model is not None else None
+        bins = 0 if spectrum is None else len(spectrum)
+        if self.width() <= 0 or self.height() <= 0:
+            bins = 0
+        count = self._builder.vertex_count(bins)
+        if geometry.vertexCount() != count:
+            geometry.allocate(count)
+        if count:
+            self._builder.fill(
+                geometry_vertices(geometry),
+                spectrum,
+                self._model.peak_hold_array,
+                self.width(),
+                self.height(),
+            )
+        node.markDirty(QSGNode.DirtyStateBit.DirtyGeometry)
+        return node
@@ -0,0 +1,295 @@
+"""流式短时傅里叶变换 (STFT)
+
+SpectrumDataModel.pushSample/pushSamples 的时域采样先写入 StreamingSTFT 的 NumPy 缓冲区，
+每积累 hop_size 个新采样就产生一帧（帧长 frame_size，帧间重叠 frame_size - hop_size）。
+一次推入中凑齐的所有帧组成缓冲区上的二维跨步视图（不复制），
+加窗后用一次 np.fft.rfft(axis=1) 批量计算。窗函数与频率重采样索引都按参数缓存。
+
+缓冲区只保留下一帧还要用到的尾部采样（处理后少于 frame_size 个），
+每次处理后把尾部移到缓冲区开头，不再为每个采样追加 Python list。
+有重叠时尾部开头的 frame_size - hop_size 个采样已经计算过，pending / drain()
+只统计和取出其后尚未进入任何一帧的新采样。
+
+SpectrumPlan 是 updateFromTimeDomain 的单帧计算计划：按（输入长度, FFT 长度, bin 数, dB 范围）
+预先生成窗函数、插值索引与权重和全部中间缓冲区，之后每帧都用 out= 原地计算。
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+DEFAULT_FRAME_SIZE = 512
+DEFAULT_OVERLAP = 0.5
+# numpy >= 2.0 的 FFT 函数支持 out= 参数
+_RFFT_HAS_OUT = "out" in inspect.signature(np.fft.rfft).parameters
+
+
+def _next_pow2(n: int) -> int:
+    return 1 << max(0, int(n) - 1).bit_length()
+
+
+class StreamingSTFT:
+    """滑动窗口 STFT（只在单一线程中使用）。
+
+    - push(samples) 追加采样，返回本次凑齐各帧的幅度谱，形状 (帧数, fft_size // 2)；
+    - push_sample(sample) 为单个采样的快速路径，不足一帧时不创建数组；
+    - buffer_only=True 时照常按帧移推进但不计算（对应模型的手动更新模式）；
+    - drain() 取出尚未进入任何一帧的新采样并清空缓冲区（用于 flush）。
+    """
+
+    def __init__(
+        self,
+        frame_size: int = DEFAULT_FRAME_SIZE,
+        hop_size: int | None = None,
+        min_fft_size: int = 0,
+    ) -> None:
+        self._buffer = np.zeros(0, dtype=np.float64)
+        self._length = 0
+        # 缓冲区末尾尚未进入任何一帧的采样数（其余为与上一帧重叠、已计算过的采样）
+        self._fresh = 0
+        self._min_fft_size = 0
+        self.configure(frame_size, hop_size, min_fft_size)
+
+    # ---------- 配置 ----------
+
+    def configure(
+        self,
+        frame_size: int | None = None,
+        hop_size: int | None = None,
+        min_fft_size: int | None = None,
+    ) -> None:
+        """修改帧长 / 帧移 / 最小 FFT 长度；hop_size 省略时保持当前重叠比例。"""
+        old_frame = getattr(self, "_frame_size", 0)
+        frame_size = int(frame_size) if frame_size is not None else old_frame
+        frame_size = max(1, frame_size)
+        if hop_size is None:
+            overlap = self.overlap if old_frame else DEFAULT_OVERLAP
+            hop_size = int(round(frame_size * (1.0 - overlap)))
+        self._frame_size = frame_size
+        self._hop_size = min(max(1, int(hop_size)), frame_size)
+        if min_fft_size is not None:
+            self._min_fft_size = max(0, int(min_fft_size))
+        self._fft_size = _next_pow2(max(self._min_fft_size, frame_size))
+        # 缓存随帧长变化的窗函数
+        self._window = np.hanning(frame_size).astype(np.float64)
+        capacity = 2 * frame_size + self._hop_size
+        if len(self._buffer) < capacity:
+            buffer = np.zeros(capacity, dtype=np.float64)
+            buffer[: self._length] = self._buffer[: self._length]
+            self._buffer = buffer
+        # 帧长变小时丢弃多余的旧采样
+        self._keep_latest(frame_size + self._hop_size - 1)
+
+    @property
+    def frame_size(self) -> int:
+        return self._frame_size
+
+    @property
+    def hop_size(self) -> int:
+        return self._hop_size
+
+    @property
+    def overlap(self) -> float:
+        """帧间重叠比例 0.0 ~ (frame_size - 1) / frame_size。"""
+        return 1.0 - self._hop_size / self._frame_size
+
+    @property
+    def fft_size(self) -> int:
+        return self._fft_size
+
+    @property
+    def pending(self) -> int:
+        """尚未进入任何一帧的采样数（不含与上一帧重叠的部分）。"""
+        return self._fresh
+
+    @property
+    def progress(self) -> float:
+        """距离下一帧的进度 0.0 ~ 1.0：首帧需 frame_size 个采样，之后每 hop_size 个。"""
+        if self._fresh == self._length:
+            return min(1.0, self._length / self._frame_size)
+        return min(1.0, self._fresh / self._hop_size)
+
+    # ---------- 数据输入 ----------
+
+    def push(
+        self, samples: Sequence[float] | NDArray | float, buffer_only: bool = False
+    ) -> NDArray[np.float64]:
+        """追加采样并计算所有完整帧的幅度谱（不足一帧时返回 0 行）。"""
+        arr = np.asarray(samples, dtype=np.float64).reshape(-1)
+        needed = self._length + len(arr)
+        if needed > len(self._buffer):
+            buffer = np.zeros(max(needed, 2 * len(self._buffer)), dtype=np.float64)
+            buffer[: self._length] = self._buffer[: self._length]
+            self._buffer = buffer
+        self._buffer[self._length : needed] = arr
+        self._length = needed
+        self._fresh += len(arr)
+
+        if self._length < self._frame_size:
+            return np.zeros((0, self._fft_size // 2), dtype=np.float64)
+        count = (self._length - self._frame_size) // self._hop_size + 1
+        if buffer_only:
+            # 未计算的帧：丢弃的采样之外，其余仍算作新采样
+            self._consume(count * self._hop_size)
+            self._fresh = self._length
+            return np.zeros((0, self._fft_size // 2), dtype=np.float64)
+
+        # (count, frame_size) 跨步视图：第 i 行从 i * hop_size 开始，与缓冲区共享内存
+        itemsize = self._buffer.itemsize
+        frames = np.ndarray(
+            (count, self._frame_size),
+            dtype=np.float64,
+            buffer=self._buffer,
+            strides=(self._hop_size * itemsize, itemsize),
+        )
+        spectra = np.fft.rfft(frames * self._window, n=self._fft_size, axis=1)
+        magnitude = np.abs(spectra[:, : self._fft_size // 2])
+        self._consume(count * self._hop_size)
+        # 剩余采样的前 frame_size - hop_size 个属于刚计算的最后一帧
+        self._fresh = self._length - (self._frame_size - self._hop_size)
+        return magnitude
+
+    def push_sample(self, sample: float) -> NDArray[np.float64] | None:
+        """追加单个采样；凑齐一帧时返回 (1, fft_size // 2) 的幅度谱，否则返回 None。"""
+        if self._length == len(self._buffer):
+            return self.push((sample,))
+        self._buffer[self._length] = sample
+        self._length += 1
+        self._fresh += 1
+        if self._length < self._frame_size:
+            return None
+        return self.push(())
+
+    def drain(self) -> NDArray[np.float64]:
+        """取出尚未进入任何一帧的采样并清空缓冲区（已计算过的重叠部分直接丢弃）。"""
+        tail = self._buffer[self._length - self._fresh : self._length].copy()
+        self.clear()
+        return tail
+
+    def clear(self) -> None:
+        self._length = 0
+        self._fresh = 0
+
+    # ---------- 内部 ----------
+
+    def _consume(self, count: int) -> None:
+        remaining = self._length - count
+        if remaining > 0:
+            self._buffer[:remaining] = self._buffer[count : self._length]
+        self._length = max(0, remaining)
+
+    def _keep_latest(self, count: int) -> None:
+        if self._length > count:
+            self._consume(self._length - count)
+            self._fresh = min(self._fresh, self._length)
+
+
+class BinResampler:
+    """把 (帧数, n_in) 的频谱线性插值到 n_out 个 bin，插值索引与权重按尺寸缓存。"""
+
+    def __init__(self) -> None:
+        self._shape = (0, 0)
+        self._lower = np.zeros(0, dtype=np.intp)
+        self._weight = np.zeros(0, dtype=np.float64)
+
+    def _prepare(self, n_in: int, n_out: int) -> None:
+        if (n_in, n_out) == self._shape:
+            return
+        positions = np.linspace(0, n_in - 1, n_out)
+        lower = np.minimum(np.floor(positions).astype(np.intp), max(n_in - 2, 0))
+        self._lower = lower
+        self._weight = positions - lower
+        self._shape = (n_in, n_out)
+
+    def __call__(self, rows: NDArray[np.float64], n_out: int) -> NDArray[np.float64]:
+        n_in = rows.shape[-1]
+        if n_in == n_out:
+            return rows
+        if n_in == 1:
+            return np.repeat(rows, n_out, axis=-1)
+        self._prepare(n_in, n_out)
+        lower = rows[..., self._lower]
+        upper = rows[..., self._lower + 1]
+        return lower + (upper - lower) * self._weight
+
+
+def normalize_db(
+    magnitude: NDArray[np.float64], db_min: float, db_max: float
+) -> NDArray[np.float64]:
+    """逐帧相对最大值转 dB 并归一化到 0.0~1.0（与 updateFromTimeDomain 一致）。"""
+    magnitude = np.maximum(magnitude, 1e-10)
+    db = 20.0 * np.log10(magnitude / magnitude.max(axis=-1, keepdims=True))
+    normalized = (db - db_min) / (db_max - db_min)
+    return np.clip(normalized, 0.0, 1.0, out=normalized)
+
+
+def db_to_linear(
+    normalized: NDArray[np.float64], db_min: float, db_max: float
+) -> NDArray[np.float64]:
+    """normalize_db 的逆变换：0.0~1.0 -> 相对帧最大值的线性幅度。
+
+    被截断到 0 的 bin 还原为 db_min 对应的幅度（如 -80dB -> 1e-4）。
+    """
+    db = np.asarray(normalized, dtype=np.float64) * (db_max - db_min) + db_min
+    return np.power(10.0, db / 20.0)
+
+
+class SpectrumPlan:
+    """单帧时域 -> 归一化频谱的预计算计划（加窗 -> FFT -> 幅度 -> dB -> 归一化 -> 重采样）。
+
+    execute() 返回的数组是计划内部的缓冲区，下一次 execute() 会覆盖它，
+    调用方需立即消费（SpectrumDataModel.updateSpectrum 会复制）。
+    """
+
+    def __init__(self, length: int, fft_size: int, bins: int, db_min: float, db_max: float) -> None:
+        self.key = (length, fft_size, bins, db_min, db_max)
+        half = fft_size // 2
+        self._length = length
+        self._window = np.hanning(length).astype(np.float64)
+        # 零填充输入：只有前 length 个元素会被改写，其余保持 0
+        self._padded = np.zeros(fft_size, dtype=np.float64)
+        self._spectrum = np.empty(half + 1, dtype=np.complex128)
+        self._magnitude = np.empty(half, dtype=np.float64)
+        # dB 归一化合并为一次乘加：(20 * log10(m) - db_min) / (db_max - db_min)
+        span = db_max - db_min
+        self._db_scale = 20.0 / span
+        self._db_offset = -db_min / span
+        self._resample = half != bins
+        if self._resample:
+            positions = np.linspace(0, half - 1, bins)
+            lower = np.minimum(np.floor(positions).astype(np.intp), max(half - 2, 0))
+            self._lower = lower
+            self._upper = np.minimum(lower + 1, half - 1)
+            self._weight = positions - lower
+            self._low_values = np.empty(bins, dtype=np.float64)
+            self._result = np.empty(bins, dtype=np.float64)
+        else:
+            self._result = self._magnitude
+
+    def execute(self, samples: NDArray[np.float64]) -> NDArray[np.float64]:
+        np.multiply(samples, self._window, out=self._padded[: self._length])
+        if _RFFT_HAS_OUT:
+            spectrum = np.fft.rfft(self._padded, out=self._spectrum)
+        else:
+            spectrum = np.fft.rfft(self._padded)
+        magnitude = self._magnitude
+        np.abs(spectrum[: len(magnitude)], out=magnitude)
+        np.maximum(magnitude, 1e-10, out=magnitude)
+        np.divide(magnitude, magnitude.max(), out=magnitude)
+        np.log10(magnitude, out=magnitude)
+        magnitude *= self._db_scale
+        magnitude += self._db_offset
+        np.clip(magnitude, 0.0, 1.0, out=magnitude)
+        if not self._resample:
+            return magnitude
+        # 线性插值：low + (high - low) * weight
+        np.take(magnitude, self._lower, out=self._low_values)
+        np.take(magnitude, self._upper, out=self._result)
+        self._result -= self._low_values
+        self._result *= self._weight
+        self._result += self._low_values
+        return self._result
@@ -0,0 +1,199 @@
+"""采样存储的历史查询 (StoreHistoryManager)
+
+TimeSeriesStore 只负责落盘与按时间范围读取；DataLog 视图通过 StoreHistoryManager
+回看已落盘的 FOUP 采样：
+
+- 每个数据源（本机采集或多主机引擎中的一台主机）对应一个 TimeSeriesStore；
+- query() 只提交任务并立即返回，flush、memmap 读取与降采样金字塔的构建都在单线程池中完成；
+- 再次查询时旧结果按代号丢弃，只有最后一次请求的结果会在主线程替换 dataModel 的内容。
+
+dataModel 与 CSV 回看共用 CsvDataModel / ColumnData，DataLog 的 ChartCard 可以直接绘制。
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from typing import List, Mapping
+
+import numpy as np
+from PySide6.QtCore import Property, QObject, QRunnable, QThreadPool, Signal, Slot
+
+from voc_app.gui.csv_model import ColumnData, CsvDataModel
+from voc_app.gui.csv_pyramid import CsvPyramid
+from voc_app.gui.timeseries_store import TimeSeriesStore
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _StoreQuerySignals(QObject):
+    """查询任务的信号中转，结果排队回到主线程。"""
+
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class _StoreQueryTask(QRunnable):
+    """在线程池中查询存储并为每个通道准备曲线数据。"""
+
+    def __init__(
+        self,
+        generation: int,
+        store: TimeSeriesStore,
+        start_ms: float,
+        end_ms: float,
+        signals: _StoreQuerySignals,
+    ) -> None:
+        super().__init__()
+        self._generation = generation
+        self._store = store
+        self._start_ms = start_ms
+        self._end_ms = end_ms
+        self._signals = signals
+
+    def run(self) -> None:
+        try:
+            # 先写入内存中尚未落盘的样本，查询结果包含最新数据
+            self._store.flush()
+            xs, ys = self._store.query(self._start_ms, self._end_ms)
+            pyramid = CsvPyramid.build(xs, ys.T)
+            columns = []
+            for channel in range(ys.shape[1]):
+                values = ys[:, channel]
+                valid = ~np.isnan(values)
+                if not valid.any():
+                    continue
+                columns.append(
+                    (
+                        f"通道 {channel + 1}",
+                        xs[valid],
+                        values[valid],
+                        pyramid.column(channel) if len(pyramid) else None,
+                    )
+                )
+        except (OSError, ValueError) as exc:
+            logger.error(f"采样存储查询失败 {self._store.root}: {exc}")
+            self._signals.failed.emit(self._generation, str(exc))
+            return
+        except Exception as exc:  # noqa: BLE001
+            logger.exception(f"采样存储查询异常 {self._store.root}: {exc!r}")
+            self._signals.failed.emit(self._generation, str(exc))
+            return
+        self._signals.finished.emit(self._generation, (len(xs), columns))
+
+
+class StoreHistoryManager(QObject):
+    """按时间范围回看采样存储，查询在工作线程执行。"""
+
+    queryingChanged = Signal()
+    resultChanged = Signal()
+    queryFailed = Signal(str, str)
+
+    def __init__(self, stores: Mapping[str, TimeSeriesStore], parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._stores = dict(stores)
+        self._data_model = CsvDataModel(self)
+        self._source = ""
+        self._pending_source = ""
+        self._rows = 0
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _StoreQuerySignals(self)
+        self._signals.finished.connect(self._on_query_finished)
+        self._signals.failed.connect(self._on_query_failed)
+        self._generation = 0
+        self._querying = False
+
+    @Property("QStringList", constant=True)  # pyright: ignore[reportArgumentType]
+    def sources(self) -> List[str]:
+        return list(self._stores)
+
+    @Property(QObject, constant=True)
+    def dataModel(self) -> CsvDataModel:
+        return self._data_model
+
+    @Property(bool, notify=queryingChanged)
+    def querying(self) -> bool:
+        return self._querying
+
+    @Property(str, notify=resultChanged)
+    def source(self) -> str:
+        """当前结果所属的数据源。"""
+        return self._source
+
+    @Property(int, notify=resultChanged)
+    def rowCount(self) -> int:
+        """当前结果的采样行数。"""
+        return self._rows
+
+    def _set_querying(self, querying: bool) -> None:
+        if self._querying != querying:
+            self._querying = querying
+            self.queryingChanged.emit()
+
+    @Slot(str, float, float)
+    def query(self, source: str, start_ms: float, end_ms: float) -> None:
+        """查询 source 在 [start_ms, end_ms] 内的采样（NaN 表示不限制该侧），立即返回。"""
+        store = self._stores.get(source)
+        if store is None:
+            logger.warning(f"未知的采样数据源: {source}")
+            self.queryFailed.emit(source, "未知的数据源")
+            return
+        start_ms = -math.inf if math.isnan(start_ms) else float(start_ms)
+        end_ms = math.inf if math.isnan(end_ms) else float(end_ms)
+        self._generation += 1
+        self._pending_source = source
+        self._set_querying(True)
+        self._pool.start(_StoreQueryTask(self._generation, store, start_ms, end_ms, self._signals))
+
+    @Slot(str, float)
+    def queryRecent(self, source: str, minutes: float) -> None:
+        """查询最近 minutes 分钟的采样；minutes <= 0 时查询全部。"""
+        if minutes <= 0:
+            self.query(source, math.nan, math.nan)
+            return
+        now_ms = time.time() * 1000.0
+        self.query(source, now_ms - minutes * 60_000.0, math.nan)
+
+    @Slot()
+    def clear(self) -> None:
+        """丢弃进行中的查询并清空结果。"""
+        self._generation += 1
+        self._set_querying(False)
+        self._data_model.resetModelData([])
+        self._source = ""
+        self._rows = 0
+        self.resultChanged.emit()
+
+    def wait_for_query(self, timeout_ms: int = -1) -> bool:
+        """等待线程池中的任务结束（测试与退出时使用），结果仍需事件循环派发。"""
+        return self._pool.waitForDone(timeout_ms)
+
+    def shutdown(self) -> None:
+        self._generation += 1
+        self.wait_for_query(5000)
+
+    @Slot(int, object)
+    def _on_query_finished(self, generation: int, result) -> None:
+        if generation != self._generation:
+            return
+        rows, columns = result
+        self._data_model.resetModelData(
+            [
+                ColumnData(name=name, xs=xs, ys=ys, pyramid=pyramid, parent=self._data_model)
+                for name, xs, ys, pyramid in columns
+            ]
+        )
+        self._source = self._pending_source
+        self._rows = rows
+        self._set_querying(False)
+        self.resultChanged.emit()
+
+    @Slot(int, str)
+    def _on_query_failed(self, generation: int, message: str) -> None:
+        if generation != self._generation:
+            return
+        self._set_querying(False)
+        self.queryFailed.emit(self._pending_source, message)
@@ -3,10 +3,15 @@
 from __future__ import annotations
 
 import struct
+import tempfile
+import threading
+import time
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
 from voc_app.gui.foup_acquisition import FoupAcquisitionController
+from voc_app.gui.server_identity import ServerIdentityCache
 
 
 def _pack_message(text: str) -> bytes:
@@ -43,9 +48,39 @@ class FakeSocketCommunicator:
         self.closed = True
 
 
+class BlockingSocketCommunicator(FakeSocketCommunicator):
+    """recv 一直阻塞，直到连接被关闭（模拟无响应的服务端）。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._closed_event = threading.Event()
+
+    def recv(self, size: int) -> bytes:
+        self._closed_event.wait(5.0)
+        return b""
+
+    def close(self) -> None:
+        super().close()
+        self._closed_event.set()
+
+
 class FoupAcquisitionE84Tests(unittest.TestCase):
     def setUp(self) -> None:
-        self.controller = FoupAcquisitionController(series_models=[])
+        self._tmp = tempfile.TemporaryDirectory()
+        self.identity_cache = ServerIdentityCache(Path(self._tmp.name) / "server_identity.json")
+        self.controller = FoupAcquisitionController(
+            series_models=[], identity_cache=self.identity_cache
+        )
+
+    def tearDown(self) -> None:
+        self.controller.shutdownConnections()
+        self._tmp.cleanup()
+
+    def _wait_for_commands(self, comm: FakeSocketCommunicator, count: int) -> list[str]:
+        deadline = time.monotonic() + 2.0
+        while len(comm.sent_payloads) < count and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return [_unpack_command(frame) for frame in comm.sent_payloads]
 
     def test_unload_sequence_queries_version_then_starts_collection(self) -> None:
         communicators: list[FakeSocketCommunicator] = []
@@ -66,6 +101,137 @@ class FoupAcquisitionE84Tests(unittest.TestCase):
             commands,
             ["get_function_version_info", "NOISE_data_coll_ctrl_start"],
         )
+        self.assertEqual(self.identity_cache.get("192.168.1.53", 65432).prefix, "NOISE")
+
+    def test_unload_with_cached_identity_starts_immediately(self) -> None:
+        self.identity_cache.record("192.168.1.53", 65432, "NOISE", "1.2.3")
+        communicators: list[FakeSocketCommunicator] = []
+
+        def factory(host: str, port: int, timeout: float | None = 5.0):
+            _ = (host, port, timeout)
+            comm = FakeSocketCommunicator(response_messages=["ack", "Noise,1.2.3"])
+            communicators.append(comm)
+            return comm
+
+        with patch("voc_app.gui.foup_acquisition.SocketCommunicator", side_effect=factory):
+            ok = self.controller.e84StartDataCollectionForUnload()
+            commands = self._wait_for_commands(communicators[0], 2)
+
+        self.assertTrue(ok)
+        # 先按缓存前缀启动，随后后台复核版本
+        self.assertEqual(
+            commands,
+            ["NOISE_data_coll_ctrl_start", "get_function_version_info"],
+        )
+
+    def test_stale_cached_prefix_is_corrected(self) -> None:
+        self.identity_cache.record("192.168.1.53", 65432, "VOC", "1.0")
+        communicators: list[FakeSocketCommunicator] = []
+
+        def factory(host: str, port: int, timeout: float | None = 5.0):
+            _ = (host, port, timeout)
+            comm = FakeSocketCommunicator(response_messages=["Noise,1.2.3"])
+            communicators.append(comm)
+            return comm
+
+        with patch("voc_app.gui.foup_acquisition.SocketCommunicator", side_effect=factory):
+            self.controller.e84StartDataCollectionForUnload()
+            commands = self._wait_for_commands(communicators[0], 3)
+
+        self.assertEqual(
+            commands,
+            [
+                "VOC_data_coll_ctrl_start",
+                "get_function_version_info",
+                "NOISE_data_coll_ctrl_start",
+            ],
+        )
+        self.assertEqual(self.identity_cache.get("192.168.1.53", 65432).prefix, "NOISE")
+
+    def test_revalidation_is_queued_on_command_lane(self) -> None:
+        self.identity_cache.record("192.168.1.53", 65432, "NOISE", "1.2.3")
+        cached = self.identity_cache.get("192.168.1.53", 65432)
+        communicators: list[FakeSocketCommunicator] = []
+
+        def factory(host: str, port: int, timeout: float | None = 5.0):
+            _ = (host, port, timeout)
+            comm = FakeSocketCommunicator(response_messages=["Noise,1.2.3"])
+            communicators.append(comm)
+            return comm
+
+        jobs = self.controller.e84Jobs
+        gate = threading.Event()
+        with patch("voc_app.gui.foup_acquisition.SocketCommunicator", side_effect=factory):
+            # 占住命令通道：复核排在其后，排队期间重复提交合并为一次
+            jobs.submit("block", lambda cancel_event, progress: gate.wait(2.0) and "")
+            first = self.controller._revalidate_identity(cached, lambda: None)
+            second = self.controller._revalidate_identity(cached, lambda: None)
+            self.assertEqual(first, second)
+            self.assertTrue(jobs.busy)
+            self.assertEqual(jobs.pendingCount, 2)
+            gate.set()
+            self.assertTrue(jobs.wait(2000))
+
+        self.assertEqual(len(communicators), 1)
+        commands = [_unpack_command(frame) for frame in communicators[0].sent_payloads]
+        self.assertEqual(commands, ["get_function_version_info"])
+
+    def test_queued_revalidation_cancelled_at_shutdown(self) -> None:
+        self.identity_cache.record("192.168.1.53", 65432, "VOC", "1.0")
+        cached = self.identity_cache.get("192.168.1.53", 65432)
+        resent: list[int] = []
+        gate = threading.Event()
+        self.controller.e84Jobs.submit("block", lambda cancel_event, progress: gate.wait(2.0) and "")
+        self.controller._revalidate_identity(cached, lambda: resent.append(1))
+        with patch("voc_app.gui.foup_acquisition.SocketCommunicator") as factory:
+            self.controller.e84Jobs.cancelAll()
+            gate.set()
+            self.controller.shutdownE84Jobs()
+        factory.assert_not_called()
+        self.assertEqual(resent, [])
+
+    def test_command_timeout_closes_blocked_socket(self) -> None:
+        communicators: list[BlockingSocketCommunicator] = []
+
+        def factory(host: str, port: int, timeout: float | None = 5.0):
+            _ = (host, port, timeout)
+            comm = BlockingSocketCommunicator()
+            communicators.append(comm)
+            return comm
+
+        started = time.monotonic()
+        with patch("voc_app.gui.foup_acquisition.SocketCommunicator", side_effect=factory), \
+                patch("voc_app.gui.foup_acquisition.E84_COMMAND_TIMEOUT_S", 0.1):
+            self.controller.e84StartDataCollectionForUnloadAsync()
+            self.assertTrue(self.controller.e84Jobs.wait(3000))
+
+        # 超时关闭 socket 使阻塞的版本查询立即返回，且不再发送启动命令
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertTrue(communicators[0].closed)
+        commands = [_unpack_command(frame) for frame in communicators[0].sent_payloads]
+        self.assertEqual(commands, ["get_function_version_info"])
+
+    def test_cancel_between_query_and_start(self) -> None:
+        controller = self.controller
+        communicators: list[FakeSocketCommunicator] = []
+
+        class CancellingCommunicator(FakeSocketCommunicator):
+            def recv(self, size: int) -> bytes:
+                controller.e84Jobs.cancelAll()
+                return super().recv(size)
+
+        def factory(host: str, port: int, timeout: float | None = 5.0):
+            _ = (host, port, timeout)
+            comm = CancellingCommunicator(response_messages=["Noise,1.2.3"])
+            communicators.append(comm)
+            return comm
+
+        with patch("voc_app.gui.foup_acquisition.SocketCommunicator", side_effect=factory):
+            controller.e84StartDataCollectionForUnloadAsync()
+            self.assertTrue(controller.e84Jobs.wait(3000))
+
+        commands = [_unpack_command(frame) for frame in communicators[0].sent_payloads]
+        self.assertEqual(commands, ["get_function_version_info"])
 
     def test_load_sequence_stops_collection_and_downloads_logs(self) -> None:
         communicators: list[FakeSocketCommunicator] = []
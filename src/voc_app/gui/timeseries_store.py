@@ -0,0 +1,329 @@
+"""FOUP 实时采样的列式持久化存储
+
+曲线模型只在内存中保留最近几十个点，更早的数据依赖 FOUP 端日志。
+TimeSeriesStore 把采样按块追加写入磁盘，并支持按时间范围快速查询：
+
+目录结构::
+
+    index.json          块索引：[{"id", "start_ms", "end_ms", "rows", "channels"}, ...]
+    000001.ts.f64       时间戳列（ms，float64 原始字节）
+    000001.ch0.f64      通道 0 列，依此类推
+
+- append() 由采集线程调用，只写入内存中的 SampleBatchBuffer；
+- 后台写线程按 flush_interval_s 或批次写满时整批追加到当前块，内存占用与运行时长无关；
+- query() 通过块索引定位时间范围，再在时间戳列上二分查找，只映射需要的块（np.memmap）。
+
+时间戳需单调递增（采集控制器已保证），查询依赖这一点做二分。
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from voc_app.gui.sample_batch import SampleBatchBuffer
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_FILE = "index.json"
+_ITEM_SIZE = np.dtype(np.float64).itemsize
+
+
+@dataclass
+class ChunkInfo:
+    """单个数据块的索引项。"""
+
+    id: int
+    start_ms: float
+    end_ms: float
+    rows: int
+    channels: int
+
+
+class TimeSeriesStore:
+    """按块追加写入的列式时序存储（线程安全）。"""
+
+    def __init__(
+        self,
+        root: str | Path,
+        chunk_rows: int = 65536,
+        flush_interval_s: float = 1.0,
+        batch_capacity: int = 1024,
+        max_channels: int = 16,
+        max_chunks: int | None = None,
+    ) -> None:
+        self._root = Path(root)
+        self._chunk_rows = max(1, int(chunk_rows))
+        self._flush_interval_s = max(0.01, float(flush_interval_s))
+        self._max_chunks = max_chunks if max_chunks is None else max(1, int(max_chunks))
+        self._pending = SampleBatchBuffer(batch_capacity, max_channels)
+
+        # _lock 保护索引；_io_lock 串行化磁盘写入（写线程与 flush() 调用方）
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._chunks: List[ChunkInfo] = []
+        self._open_files: Dict[str, BinaryIO] = {}
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        self._root.mkdir(parents=True, exist_ok=True)
+        self._load_index()
+        # 保留块数调小后，启动时即删除多余的旧块
+        if self._apply_retention():
+            self._save_index()
+
+    # ---- Properties ----
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def chunks(self) -> List[ChunkInfo]:
+        with self._lock:
+            return [ChunkInfo(**asdict(c)) for c in self._chunks]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(c.rows for c in self._chunks)
+
+    def time_range(self) -> tuple[float, float] | None:
+        """返回已落盘数据的 (最早, 最晚) 时间戳，无数据时返回 None。"""
+        with self._lock:
+            if not self._chunks:
+                return None
+            return self._chunks[0].start_ms, self._chunks[-1].end_ms
+
+    # ---- Lifecycle ----
+
+    def start(self) -> None:
+        """启动后台写线程。"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._writer_loop, name="TimeSeriesStore", daemon=True
+        )
+        self._thread.start()
+
+    def close(self) -> None:
+        """停止写线程，写入剩余数据并关闭文件。"""
+        self._stopping.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5.0)
+        self._thread = None
+        self.flush()
+        with self._io_lock:
+            self._close_files()
+
+    def __enter__(self) -> "TimeSeriesStore":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ---- Write path ----
+
+    def append(self, timestamp_ms: float, values: Sequence[float]) -> None:
+        """追加一条采样（任意线程调用，不做磁盘 IO）。"""
+        if self._pending.append(timestamp_ms, values):
+            self._wake.set()
+
+    def flush(self) -> None:
+        """同步写入所有待写数据。"""
+        with self._io_lock:
+            batch = self._pending.drain()
+            if batch is None:
+                return
+            xs, ys = batch
+            try:
+                self._write_batch(xs, ys)
+            except OSError as exc:
+                logger.error(f"时序数据写入失败: {exc}")
+
+    def _writer_loop(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self._flush_interval_s)
+            self._wake.clear()
+            self.flush()
+
+    def _write_batch(self, xs: NDArray[np.float64], ys: NDArray[np.float64]) -> None:
+        offset = 0
+        total = len(xs)
+        channels = ys.shape[1]
+        index_dirty = False
+        while offset < total:
+            chunk = self._writable_chunk(channels)
+            count = min(total - offset, self._chunk_rows - chunk.rows)
+            part_xs = xs[offset : offset + count]
+            self._file_for(chunk, "ts").write(part_xs.tobytes())
+            for channel in range(channels):
+                column = np.ascontiguousarray(ys[offset : offset + count, channel])
+                self._file_for(chunk, f"ch{channel}").write(column.tobytes())
+            for handle in self._open_files.values():
+                handle.flush()
+            with self._lock:
+                if chunk.rows == 0:
+                    chunk.start_ms = float(part_xs[0])
+                chunk.rows += count
+                chunk.end_ms = float(part_xs[-1])
+            offset += count
+            index_dirty = True
+        if index_dirty:
+            self._apply_retention()
+            self._save_index()
+
+    def _writable_chunk(self, channels: int) -> ChunkInfo:
+        """返回可继续写入的块；已满或通道数变化时新建块。"""
+        with self._lock:
+            current = self._chunks[-1] if self._chunks else None
+            if current is not None and current.rows < self._chunk_rows and current.channels == channels:
+                return current
+            next_id = current.id + 1 if current is not None else 1
+            chunk = ChunkInfo(id=next_id, start_ms=0.0, end_ms=0.0, rows=0, channels=channels)
+            self._chunks.append(chunk)
+        self._close_files()
+        return chunk
+
+    def _file_for(self, chunk: ChunkInfo, column: str) -> BinaryIO:
+        key = f"{chunk.id:06d}.{column}"
+        handle = self._open_files.get(key)
+        if handle is None:
+            # 新块截断同名残留文件（上次异常退出时未写入索引的数据）
+            mode = "wb" if chunk.rows == 0 else "ab"
+            handle = open(self._root / f"{key}.f64", mode)
+            self._open_files[key] = handle
+        return handle
+
+    def _close_files(self) -> None:
+        for handle in self._open_files.values():
+            try:
+                handle.close()
+            except OSError:
+                pass
+        self._open_files.clear()
+
+    def _apply_retention(self) -> bool:
+        """删除超出 max_chunks 的最旧块，返回是否删除了块。"""
+        if self._max_chunks is None:
+            return False
+        with self._lock:
+            expired = self._chunks[: max(0, len(self._chunks) - self._max_chunks)]
+            self._chunks = self._chunks[len(expired) :]
+        for chunk in expired:
+            for path in self._root.glob(f"{chunk.id:06d}.*.f64"):
+                try:
+                    path.unlink()
+                except OSError as exc:
+                    logger.warning(f"删除过期数据块失败 {path}: {exc}")
+        return bool(expired)
+
+    # ---- Index ----
+
+    def _save_index(self) -> None:
+        with self._lock:
+            payload = [asdict(c) for c in self._chunks]
+        tmp_path = self._root / f"{INDEX_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_path, self._root / INDEX_FILE)
+
+    def _load_index(self) -> None:
+        path = self._root / INDEX_FILE
+        if not path.exists():
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            chunks = [ChunkInfo(**item) for item in raw]
+        except (OSError, ValueError, TypeError) as exc:
+            logger.warning(f"时序索引损坏，忽略已有数据: {exc}")
+            return
+        # 异常退出时索引可能落后于数据文件，以较短者为准
+        for chunk in chunks:
+            chunk.rows = min(chunk.rows, self._rows_on_disk(chunk))
+        self._chunks = [c for c in chunks if c.rows > 0]
+        for chunk in self._chunks:
+            ts = self._column(chunk, "ts")
+            chunk.start_ms = float(ts[0])
+            chunk.end_ms = float(ts[-1])
+            # 截掉索引之外的半截写入，保证各列行数一致
+            for name in ["ts"] + [f"ch{i}" for i in range(chunk.channels)]:
+                column_path = self._root / f"{chunk.id:06d}.{name}.f64"
+                if column_path.stat().st_size > chunk.rows * _ITEM_SIZE:
+                    os.truncate(column_path, chunk.rows * _ITEM_SIZE)
+
+    def _rows_on_disk(self, chunk: ChunkInfo) -> int:
+        rows = chunk.rows
+        for name in ["ts"] + [f"ch{i}" for i in range(chunk.channels)]:
+            path = self._root / f"{chunk.id:06d}.{name}.f64"
+            size = path.stat().st_size if path.exists() else 0
+            rows = min(rows, size // _ITEM_SIZE)
+        return rows
+
+    # ---- Query ----
+
+    def _column(self, chunk: ChunkInfo, name: str) -> NDArray[np.float64]:
+        return np.memmap(
+            self._root / f"{chunk.id:06d}.{name}.f64",
+            dtype=np.float64,
+            mode="r",
+            shape=(chunk.rows,),
+        )
+
+    def query(
+        self,
+        start_ms: float,
+        end_ms: float,
+        channels: Sequence[int] | None = None,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """返回 [start_ms, end_ms] 内的 (timestamps, values)。
+
+        values 形状为 (行数, 通道数)；channels 为 None 时返回全部通道，
+        块中不存在的通道填 NaN。只包含已落盘的数据，需要最新数据时先调用 flush()。
+        """
+        with self._lock:
+            chunks = [
+                ChunkInfo(**asdict(c))
+                for c in self._chunks
+                if c.rows > 0 and c.end_ms >= start_ms and c.start_ms <= end_ms
+            ]
+        if channels is None:
+            width = max((c.channels for c in chunks), default=0)
+            channels = list(range(width))
+        else:
+            channels = [int(c) for c in channels]
+
+        ts_parts: List[NDArray[np.float64]] = []
+        value_parts: List[NDArray[np.float64]] = []
+        for chunk in chunks:
+            ts = self._column(chunk, "ts")
+            lo = int(np.searchsorted(ts, start_ms, side="left"))
+            hi = int(np.searchsorted(ts, end_ms, side="right"))
+            if hi <= lo:
+                continue
+            ts_parts.append(np.array(ts[lo:hi]))
+            block = np.full((hi - lo, len(channels)), np.nan, dtype=np.float64)
+            for out_idx, channel in enumerate(channels):
+                if 0 <= channel < chunk.channels:
+                    block[:, out_idx] = self._column(chunk, f"ch{channel}")[lo:hi]
+            value_parts.append(block)
+
+        if not ts_parts:
+            return (
+                np.empty(0, dtype=np.float64),
+                np.empty((0, len(channels)), dtype=np.float64),
+            )
+        return np.concatenate(ts_parts), np.concatenate(value_parts)
@@ -0,0 +1,169 @@
+"""频谱瀑布图（时频图）
+
+SpectrumHistory 把每一帧频谱写入固定大小的二维环形缓冲区（帧 x bin，float32），
+内存占用与运行时长无关。WaterfallImageProvider 以 image://waterfall/<配色>/<序号>
+的形式向 QML 提供整幅 QImage：归一化值量化为 0~255 后经颜色查找表（LUT）
+一次性映射为像素，直接写入 QImage 的像素缓冲区，不再逐 bin 调用 Canvas 绘制。
+最新一帧在最上方。
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+from PySide6.QtQml import QQmlImageProviderBase
+from PySide6.QtQuick import QQuickImageProvider
+
+from voc_app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 默认保留的历史帧数（20 Hz 时约 12.8 秒）
+DEFAULT_HISTORY_FRAMES = 256
+LUT_SIZE = 256
+
+# 与 SpectrumChart.qml 的 colorSchemes 保持一致：(位置, (r, g, b))
+COLOR_SCHEMES: Dict[str, Sequence[Tuple[float, Tuple[int, int, int]]]] = {
+    "spectrum": (
+        (0.00, (0, 0, 255)),
+        (0.25, (0, 255, 255)),
+        (0.50, (0, 255, 0)),
+        (0.75, (255, 255, 0)),
+        (1.00, (255, 0, 0)),
+    ),
+    "green": ((0.00, (0, 40, 0)), (0.50, (0, 180, 0)), (1.00, (100, 255, 100))),
+    "blue": ((0.00, (0, 0, 60)), (0.50, (0, 100, 200)), (1.00, (100, 200, 255))),
+    "fire": (
+        (0.00, (20, 0, 0)),
+        (0.33, (180, 0, 0)),
+        (0.66, (255, 150, 0)),
+        (1.00, (255, 255, 100)),
+    ),
+    "purple": ((0.00, (20, 0, 40)), (0.50, (100, 0, 180)), (1.00, (200, 100, 255))),
+    "ocean": ((0.00, (0, 20, 40)), (0.50, (0, 100, 150)), (1.00, (100, 220, 220))),
+}
+
+
+def build_colormap_lut(scheme: str) -> NDArray[np.uint32]:
+    """按配色方案生成 256 项 0xFFRRGGBB 查找表，未知方案使用 "spectrum"。"""
+    stops = COLOR_SCHEMES.get(scheme) or COLOR_SCHEMES["spectrum"]
+    positions = np.array([pos for pos, _ in stops], dtype=np.float64)
+    colors = np.array([rgb for _, rgb in stops], dtype=np.float64)
+    x = np.linspace(0.0, 1.0, LUT_SIZE)
+    channels = [
+        np.rint(np.interp(x, positions, colors[:, i])).astype(np.uint32) for i in range(3)
+    ]
+    return (np.uint32(0xFF000000) | (channels[0] << 16) | (channels[1] << 8) | channels[2])
+
+
+class SpectrumHistory:
+    """固定大小的频谱历史环形缓冲区（frames x bins，float32）。
+
+    只在 GUI 线程使用；渲染所需的临时缓冲区同样预分配，逐帧写入与渲染都不分配内存
+    （QImage 本身除外）。
+    """
+
+    def __init__(self, frames: int = DEFAULT_HISTORY_FRAMES, bins: int = 256) -> None:
+        # 累计写入的帧数（清空与 resize 不归零），供增量读取新帧
+        self._appended = 0
+        self._allocate(max(1, int(frames)), max(1, int(bins)))
+
+    def _allocate(self, frames: int, bins: int) -> None:
+        self._data = np.zeros((frames, bins), dtype=np.float32)
+        self._scaled = np.empty((frames, bins), dtype=np.float32)
+        self._indices = np.empty((frames, bins), dtype=np.uint8)
+        self._head = 0
+        self._count = 0
+
+    @property
+    def frames(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def bins(self) -> int:
+        return self._data.shape[1]
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def appended(self) -> int:
+        """累计写入的帧数；两次读取之差即期间新增的帧数。"""
+        return self._appended
+
+    def resize(self, frames: int | None = None, bins: int | None = None) -> None:
+        """改变帧数或 bin 数，历史被清空。"""
+        frames = self.frames if frames is None else max(1, int(frames))
+        bins = self.bins if bins is None else max(1, int(bins))
+        if (frames, bins) != self._data.shape:
+            self._allocate(frames, bins)
+
+    def clear(self) -> None:
+        self._data.fill(0.0)
+        self._head = 0
+        self._count = 0
+
+    def append(self, frame: NDArray[np.float64]) -> None:
+        """写入一帧（长度应等于 bins，多余部分截断、不足部分补 0）。"""
+        row = self._data[self._head]
+        count = min(len(frame), self.bins)
+        row[:count] = frame[:count]
+        if count < self.bins:
+            row[count:] = 0.0
+        self._head = (self._head + 1) % self.frames
+        self._count = min(self._count + 1, self.frames)
+        self._appended += 1
+
+    def latest(self, n: int | None = None) -> NDArray[np.float32]:
+        """按时间从新到旧返回最近 n 帧（副本）。"""
+        n = self._count if n is None else max(0, min(int(n), self._count))
+        order = (self._head - 1 - np.arange(n)) % self.frames
+        return self._data[order]
+
+    def render_into(self, lut: NDArray[np.uint32], out: NDArray[np.uint32]) -> None:
+        """按 LUT 着色写入 out（形状 frames x bins），最新一帧在第 0 行。"""
+        np.multiply(self._data, LUT_SIZE - 1, out=self._scaled)
+        np.clip(self._scaled, 0, LUT_SIZE - 1, out=self._scaled)
+        np.copyto(self._indices, self._scaled, casting="unsafe")
+        # 环形缓冲区倒序后，[frames-head:] 是从最新到最旧的前半段，[:frames-head] 是后半段
+        reversed_rows = self._indices[::-1]
+        split = self.frames - self._head
+        np.take(lut, reversed_rows[split:], out=out[: self._head], mode="clip")
+        np.take(lut, reversed_rows[:split], out=out[self._head :], mode="clip")
+
+    def render_image(self, lut: NDArray[np.uint32]) -> QImage:
+        """生成 bins x frames 像素的 RGB32 QImage。"""
+        image = QImage(self.bins, self.frames, QImage.Format.Format_RGB32)
+        pixels = np.frombuffer(image.bits(), dtype=np.uint32).reshape(self.frames, self.bins)
+        self.render_into(lut, pixels)
+        return image
+
+
+class WaterfallImageProvider(QQuickImageProvider):
+    """image://waterfall/<配色>/<序号>：按需渲染 SpectrumDataModel 的历史。
+
+    序号只用于让 QML Image 在每次通知后重新请求，不参与渲染。
+    """
+
+    def __init__(self, spectrum_model) -> None:
+        super().__init__(QQmlImageProviderBase.ImageType.Image)
+        self._model = spectrum_model
+        self._luts: Dict[str, NDArray[np.uint32]] = {}
+
+    def _lut(self, scheme: str) -> NDArray[np.uint32]:
+        lut = self._luts.get(scheme)
+        if lut is None:
+            lut = self._luts[scheme] = build_colormap_lut(scheme)
+        return lut
+
+    def requestImage(self, id: str, size: QSize, requestedSize: QSize) -> QImage:
+        scheme = id.split("/", 1)[0]
+        history = self._model.history
+        image = history.render_image(self._lut(scheme))
+        size.setWidth(image.width())
+        size.setHeight(image.height())
+        return image
@@ -0,0 +1,129 @@
+"""测试 csv_index 模块"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui import csv_index
+from voc_app.gui.csv_index import CsvFileIndex, read_csv_metadata
+
+
+def _write(path: Path, rows: int, start: int = 1700000000) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = ["time,a,b"] + [f"{start + i},{i},{i * 2}" for i in range(rows)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _age(path: Path, seconds: float = 3600.0) -> None:
+    """把 mtime 调到很久以前，使文件不再被当作热文件"""
+    stat = path.stat()
+    old = stat.st_mtime_ns - int(seconds * 1e9)
+    os.utime(path, ns=(old, old))
+
+
+class TestReadCsvMetadata(unittest.TestCase):
+    """测试元数据读取"""
+
+    def test_metadata(self) -> None:
+        """行数、列名与毫秒时间范围"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.csv"
+            _write(path, 5)
+            entry = read_csv_metadata(path, "a.csv", path.stat())
+            self.assertEqual(entry.rows, 5)
+            self.assertEqual(entry.columns, ["a", "b"])
+            self.assertEqual((entry.start_ms, entry.end_ms), (1700000000000.0, 1700000004000.0))
+
+    def test_header_only(self) -> None:
+        """只有表头时行数为 0，时间范围为空"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "a.csv"
+            path.write_text("time,a\n", encoding="utf-8")
+            entry = read_csv_metadata(path, "a.csv", path.stat())
+            self.assertEqual(entry.rows, 0)
+            self.assertIsNone(entry.start_ms)
+
+
+class TestCsvFileIndex(unittest.TestCase):
+    """测试增量文件索引"""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "Log"
+        self.index_path = Path(self._tmp.name) / "csv_index.json"
+        _write(self.root / "a.csv", 3)
+        _write(self.root / "sub" / "b.csv", 4)
+        (self.root / "notes.txt").write_text("x", encoding="utf-8")
+        (self.root / ".hidden.csv").write_text("time,a\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_initial_scan(self) -> None:
+        """首次刷新收录所有 CSV，忽略隐藏文件和其他扩展名"""
+        index = CsvFileIndex(self.root, self.index_path)
+        changes = index.refresh()
+        self.assertEqual(sorted(e.path for e in changes.added), ["a.csv", "sub/b.csv"])
+        self.assertEqual(index.paths(), ["a.csv", "sub/b.csv"])
+        self.assertEqual(index.get("sub/b.csv").rows, 4)
+        self.assertTrue(self.index_path.exists())
+
+    def test_unchanged_tree_is_not_rescanned(self) -> None:
+        """持久化后重新打开，目录未变化时不读取任何文件"""
+        CsvFileIndex(self.root, self.index_path).refresh()
+        for path in (self.root / "a.csv", self.root / "sub" / "b.csv"):
+            _age(path)
+        CsvFileIndex(self.root, self.index_path).refresh()
+
+        reopened = CsvFileIndex(self.root, self.index_path)
+        with mock.patch.object(csv_index, "read_csv_metadata") as reader, \
+                mock.patch.object(csv_index.os, "scandir") as scandir:
+            changes = reopened.refresh()
+        self.assertFalse(changes)
+        reader.assert_not_called()
+        scandir.assert_not_called()
+        self.assertEqual(reopened.paths(), ["a.csv", "sub/b.csv"])
+
+    def test_add_remove_and_modify(self) -> None:
+        """新增、删除与原地追加都能被识别"""
+        index = CsvFileIndex(self.root, self.index_path)
+        index.refresh()
+        _write(self.root / "sub" / "c.csv", 2)
+        (self.root / "a.csv").unlink()
+        with open(self.root / "sub" / "b.csv", "a", encoding="utf-8") as f:
+            f.write("1700000100,1,2\n")
+
+        changes = index.refresh()
+        self.assertEqual([e.path for e in changes.added], ["sub/c.csv"])
+        self.assertEqual([e.path for e in changes.updated], ["sub/b.csv"])
+        self.assertEqual(changes.removed, ["a.csv"])
+        self.assertEqual(index.get("sub/b.csv").rows, 5)
+
+    def test_removed_directory(self) -> None:
+        """整个子目录删除后其中文件全部移除"""
+        index = CsvFileIndex(self.root, self.index_path)
+        index.refresh()
+        (self.root / "sub" / "b.csv").unlink()
+        (self.root / "sub").rmdir()
+        changes = index.refresh()
+        self.assertEqual(changes.removed, ["sub/b.csv"])
+        self.assertEqual([p.name for p in index.directories()], ["Log"])
+
+    def test_corrupt_index_rebuilt(self) -> None:
+        """索引文件损坏时重新扫描"""
+        self.index_path.write_text("{broken", encoding="utf-8")
+        index = CsvFileIndex(self.root, self.index_path)
+        self.assertEqual(len(index), 0)
+        index.refresh()
+        self.assertEqual(len(index), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
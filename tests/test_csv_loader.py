@@ -0,0 +1,83 @@
+"""测试 csv_loader 模块"""
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.csv_loader import load_csv_columns, to_milliseconds
+
+
+class TestLoadCsvColumns(unittest.TestCase):
+    """测试 load_csv_columns"""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _write(self, text: str) -> Path:
+        path = self.dir / "data.csv"
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def test_clean_file(self) -> None:
+        """规整文件走快速路径，时间转为毫秒"""
+        path = self._write("timestamp,ch1,ch2\n0,1.0,2.0\n1,1.5,2.5\n")
+        table = load_csv_columns(path)
+        self.assertEqual(table.names, ["ch1", "ch2"])
+        self.assertEqual(table.x.tolist(), [0.0, 1000.0])
+        self.assertEqual(table.columns[1].tolist(), [2.0, 2.5])
+        self.assertTrue(table.columns[0].flags["C_CONTIGUOUS"])
+
+    def test_invalid_cells_become_nan(self) -> None:
+        """非法单元格记为 NaN，时间列非法的行整行丢弃"""
+        path = self._write("t,a,b\n0,1,2\nbad,3,4\n2,x,6\n3,7\n")
+        table = load_csv_columns(path, chunk_rows=2)
+        self.assertEqual(table.x.tolist(), [0.0, 2000.0, 3000.0])
+        xs, ys = table.column_points(0)
+        self.assertEqual(xs.tolist(), [0.0, 3000.0])
+        self.assertEqual(ys.tolist(), [1.0, 7.0])
+        xs, ys = table.column_points(1)
+        self.assertEqual(ys.tolist(), [2.0, 6.0])
+
+    def test_many_chunks(self) -> None:
+        """跨多个块的结果与逐行解析一致"""
+        rows = [f"{i},{i * 0.5},{i * 2}" for i in range(1000)]
+        path = self._write("t,a,b\n" + "\n".join(rows) + "\n")
+        progress = []
+        table = load_csv_columns(path, chunk_rows=128, progress=lambda done, total: progress.append(done))
+        self.assertEqual(len(table), 1000)
+        np.testing.assert_allclose(table.columns[0], np.arange(1000) * 0.5)
+        self.assertEqual(len(progress), 8)
+        self.assertEqual(progress[-1], path.stat().st_size)
+
+    def test_cancel(self) -> None:
+        """progress 返回 False 时中止"""
+        path = self._write("t,a\n" + "\n".join(f"{i},{i}" for i in range(100)) + "\n")
+        with self.assertRaises(InterruptedError):
+            load_csv_columns(path, chunk_rows=10, progress=lambda done, total: False)
+
+    def test_header_only(self) -> None:
+        """只有表头的文件返回空列"""
+        table = load_csv_columns(self._write("t,a,b\n"))
+        self.assertEqual(table.names, ["a", "b"])
+        self.assertEqual(len(table), 0)
+        self.assertEqual(len(table.columns[0]), 0)
+
+    def test_to_milliseconds(self) -> None:
+        """毫秒时间戳保持不变，秒级与相对秒乘 1000"""
+        values = np.array([1.7e12, 1.7e9, 2.5])
+        self.assertEqual(to_milliseconds(values).tolist(), [1.7e12, 1.7e12, 2500.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
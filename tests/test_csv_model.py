@@ -0,0 +1,373 @@
+"""测试 csv_model 模块"""
+import csv
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.csv_index import CsvFileEntry, IndexChanges
+from voc_app.gui.csv_model import (
+    ColumnData,
+    CsvDataModel,
+    CsvFileListModel,
+    CsvFileManager,
+    SeriesTableModel,
+)
+from voc_app.gui.csv_pyramid import CsvPyramid, sidecar_path
+
+# 解析结果由工作线程排队投递，需要事件循环派发
+_app = None
+
+
+def get_app():
+    """获取或创建 QGuiApplication 实例"""
+    global _app
+    if _app is None:
+        _app = QGuiApplication.instance()
+        if _app is None:
+            _app = QGuiApplication([])
+    return _app
+
+
+def _rows(model: SeriesTableModel) -> list:
+    return [
+        (model.data(model.index(row, 0)), model.data(model.index(row, 1)))
+        for row in range(model.rowCount())
+    ]
+
+
+class TestSeriesTableModel(unittest.TestCase):
+    """测试 SeriesTableModel 类"""
+
+    def setUp(self) -> None:
+        self.model = SeriesTableModel(max_rows=5)
+
+    def test_append_point_updates_bounds(self) -> None:
+        """测试逐点追加维护坐标范围"""
+        self.model.append_point(1.0, 10.0)
+        self.model.append_point(2.0, 5.0)
+        self.assertEqual(self.model.rowCount(), 2)
+        self.assertEqual((self.model.minX, self.model.maxX), (1.0, 2.0))
+        self.assertEqual((self.model.minY, self.model.maxY), (5.0, 10.0))
+
+    def test_append_point_evicts_oldest(self) -> None:
+        """测试超过 max_rows 后淘汰最旧数据"""
+        for i in range(7):
+            self.model.append_point(float(i), float(i * 10))
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(_rows(self.model)[0], (2.0, 20.0))
+        self.assertEqual(self.model.minX, 2.0)
+        self.assertEqual(self.model.minY, 20.0)
+
+    def test_append_points_single_insert(self) -> None:
+        """测试批量追加只触发一次插入"""
+        inserts = []
+        self.model.rowsInserted.connect(lambda *args: inserts.append(args))
+        self.model.append_points([1.0, 2.0, 3.0], [3.0, 1.0, 2.0])
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.model.rowCount(), 3)
+        self.assertEqual((self.model.minY, self.model.maxY), (1.0, 3.0))
+
+    def test_append_points_overflow(self) -> None:
+        """测试批量追加超过容量时保留最新数据"""
+        self.model.append_points(np.arange(3.0), np.arange(3.0))
+        self.model.append_points(np.arange(3.0, 11.0), np.arange(3.0, 11.0))
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(_rows(self.model)[0], (6.0, 6.0))
+        self.assertEqual((self.model.minX, self.model.maxX), (6.0, 10.0))
+
+    def test_append_points_skips_nan(self) -> None:
+        """测试批量追加跳过 NaN"""
+        self.model.append_points([1.0, 2.0, 3.0], [1.0, float("nan"), 3.0])
+        self.assertEqual(_rows(self.model), [(1.0, 1.0), (3.0, 3.0)])
+
+    def test_max_rows_shrink(self) -> None:
+        """测试缩小 maxRows 时裁剪最旧数据并更新边界"""
+        self.model.append_points([1.0, 2.0, 3.0, 4.0], [40.0, 30.0, 20.0, 10.0])
+        self.model.maxRows = 2
+        self.assertEqual(_rows(self.model), [(3.0, 20.0), (4.0, 10.0)])
+        self.assertEqual((self.model.minY, self.model.maxY), (10.0, 20.0))
+
+    def test_large_window_bounds_after_eviction(self) -> None:
+        """测试大窗口下淘汰极值点后边界正确"""
+        model = SeriesTableModel(max_rows=20000)
+        model.append_point(0.0, 1000.0)
+        model.append_points(np.arange(1.0, 20001.0), np.zeros(20000))
+        self.assertEqual(model.rowCount(), 20000)
+        self.assertEqual(model.maxY, 0.0)
+        self.assertEqual(model.minX, 1.0)
+
+    def test_clear(self) -> None:
+        """测试清空"""
+        self.model.append_points([1.0, 2.0], [1.0, 2.0])
+        self.model.clear()
+        self.assertEqual(self.model.rowCount(), 0)
+        self.assertFalse(self.model.hasData)
+
+
+class TestColumnData(unittest.TestCase):
+    """测试 ColumnData 数组存储"""
+
+    def test_array_backed_points(self) -> None:
+        """点列表按需生成，统计量预先计算"""
+        column = ColumnData("a", xs=np.array([0.0, 1.0, 2.0]), ys=np.array([5.0, 1.0, 3.0]))
+        self.assertEqual(column.pointCount, 3)
+        self.assertEqual((column.minY, column.maxY), (1.0, 5.0))
+        self.assertEqual(column.dataPoints[1], {"x": 1.0, "y": 1.0})
+        self.assertEqual(column.pointAt(2), {"x": 2.0, "y": 3.0})
+        self.assertEqual(column.pointAt(5), {})
+        self.assertEqual([p["x"] for p in column.pointsInRange(0.5, 2.0)], [1.0, 2.0])
+
+    def test_legacy_points_argument(self) -> None:
+        """兼容以点列表构造"""
+        column = ColumnData("a", points=[{"x": 1, "y": 2}])
+        self.assertEqual(column.dataPoints, [{"x": 1.0, "y": 2.0}])
+
+    def test_empty(self) -> None:
+        column = ColumnData("a")
+        self.assertEqual(column.pointCount, 0)
+        self.assertEqual(column.dataPoints, [])
+
+    def test_model_roles(self) -> None:
+        """CsvDataModel 暴露统计角色"""
+        model = CsvDataModel()
+        model.resetModelData([ColumnData("a", xs=[0.0, 1.0], ys=[2.0, 4.0], parent=model)])
+        row = model.get(0)
+        self.assertEqual(row["pointCount"], 2)
+        self.assertEqual(row["maxY"], 4.0)
+        self.assertEqual(model.data(model.index(0), CsvDataModel.MinYRole), 2.0)
+        column = model.columnAt(0)
+        self.assertIs(model.data(model.index(0), CsvDataModel.ColumnDataRole), column)
+        self.assertIsNone(model.columnAt(3))
+
+    def test_decimated_points(self) -> None:
+        """按像素宽度降采样，NaN 范围表示全部数据"""
+        xs = np.arange(10000, dtype=np.float64)
+        column = ColumnData("a", xs=xs, ys=np.sin(xs / 100.0))
+        points = column.decimatedPoints(float("nan"), float("nan"), 200)
+        self.assertLessEqual(len(points), 400)
+        self.assertEqual((points[0]["x"], points[-1]["x"]), (0.0, 9999.0))
+        # 相同请求复用缓存结果
+        self.assertIs(column.decimatedPoints(float("nan"), float("nan"), 200), points)
+        ranged = column.decimatedPoints(100.0, 200.0, 1000, "minmax")
+        self.assertEqual((ranged[0]["x"], ranged[-1]["x"]), (99.0, 201.0))
+
+    def test_decimated_points_from_pyramid(self) -> None:
+        """提供金字塔时从层级桶极值取点，全局极值保留"""
+        xs = np.arange(100000, dtype=np.float64)
+        ys = np.sin(xs / 1000.0)
+        ys[54321] = 9.0
+        pyramid = CsvPyramid.build(xs, ys[np.newaxis, :])
+        column = ColumnData("a", xs=xs, ys=ys, pyramid=pyramid.column(0))
+        points = column.decimatedPoints(float("nan"), float("nan"), 300, "minmax")
+        self.assertLessEqual(len(points), 600)
+        self.assertIn({"x": 54321.0, "y": 9.0}, points)
+
+
+
+class TestCsvFileListModel(unittest.TestCase):
+    """测试 CsvFileListModel 排序、过滤与增量更新"""
+
+    def setUp(self) -> None:
+        self.model = CsvFileListModel()
+        self.model.set_entries([
+            CsvFileEntry("b.csv", size=30, mtime_ns=2, rows=3),
+            CsvFileEntry("a.csv", size=10, mtime_ns=3, rows=1),
+            CsvFileEntry("sub/c.csv", size=20, mtime_ns=1, rows=2),
+        ])
+
+    def test_sort_and_filter(self) -> None:
+        """按键排序、倒序和子串过滤"""
+        self.assertEqual(self.model.paths(), ["a.csv", "b.csv", "sub/c.csv"])
+        self.model.sortKey = "size"
+        self.model.sortAscending = False
+        self.assertEqual(self.model.paths(), ["b.csv", "sub/c.csv", "a.csv"])
+        self.model.filterText = "SUB"
+        self.assertEqual(self.model.paths(), ["sub/c.csv"])
+        self.assertEqual(self.model.count, 1)
+        self.assertEqual(self.model.get(0)["name"], "c.csv")
+        self.assertEqual(self.model.get(0)["directory"], "sub")
+
+    def test_incremental_changes(self) -> None:
+        """增量变化逐行插入/删除，不重置模型"""
+        self.model.sortKey = "modified"
+        resets: list[int] = []
+        inserted: list[int] = []
+        self.model.modelReset.connect(lambda: resets.append(1))
+        self.model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+        self.model.apply_changes(IndexChanges(
+            added=[CsvFileEntry("d.csv", size=1, mtime_ns=5, rows=9)],
+            updated=[CsvFileEntry("sub/c.csv", size=20, mtime_ns=4, rows=7)],
+            removed=["b.csv"],
+        ))
+        self.assertEqual(self.model.paths(), ["a.csv", "sub/c.csv", "d.csv"])
+        self.assertEqual(self.model.get(1)["rows"], 7)
+        self.assertEqual(resets, [])
+        self.assertEqual(inserted, [1, 2])
+
+
+class TestCsvFileManager(unittest.TestCase):
+    """测试 CsvFileManager 后台解析"""
+
+    def setUp(self) -> None:
+        self.app = get_app()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.log_dir = Path(self._tmp.name)
+        (self.log_dir / "a.csv").write_text("time,v1,v2\n1,10,20\n2,11,21\n", encoding="utf-8")
+        lines = ["time,v1"] + [f"{i},{i * 2}" for i in range(200000)]
+        (self.log_dir / "big.csv").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        self.manager = CsvFileManager(log_dir=self.log_dir, index_path=self.log_dir / "index" / "csv.json")
+        self._wait_refreshed()
+
+    def tearDown(self) -> None:
+        self.manager.shutdown()
+        self._tmp.cleanup()
+
+    def _wait_idle(self, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.manager.parsing and time.monotonic() < deadline:
+            self.manager.wait_for_parsing(50)
+            self.app.processEvents()
+
+    def _wait_refreshed(self, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.manager.refreshing and time.monotonic() < deadline:
+            self.manager.wait_for_index(50)
+            self.app.processEvents()
+
+    def test_parse_runs_in_background(self) -> None:
+        """parse_csv_file 立即返回，完成后一次性替换模型内容"""
+        self.manager.parse_csv_file("a.csv")
+        self.assertTrue(self.manager.parsing)
+        self._wait_idle()
+        self.assertFalse(self.manager.parsing)
+        self.assertEqual(self.manager.parseProgress, 1.0)
+        self.assertEqual(self.manager.activeFile, "a.csv")
+        # 小文件没有金字塔层级，不写旁路缓存
+        self.assertFalse(sidecar_path(self.log_dir / "a.csv").exists())
+        model = self.manager.dataModel
+        self.assertEqual(model.columnNames, ["v1", "v2"])
+        self.assertEqual(model.get(1)["maxY"], 21.0)
+
+        # 大文件的旁路缓存为隐藏文件，不出现在 CSV 列表中
+        self.manager.parse_csv_file("big.csv")
+        self._wait_idle()
+        self.assertTrue(sidecar_path(self.log_dir / "big.csv").exists())
+        self.manager.list_csv_files()
+        self._wait_refreshed()
+        self.assertEqual(self.manager.csvFiles, ["a.csv", "big.csv"])
+
+    def test_newer_request_supersedes_older(self) -> None:
+        """切换文件时取消旧任务，只应用最后一次请求的结果"""
+        resets: list[int] = []
+        self.manager.dataModel.modelReset.connect(lambda: resets.append(1))
+        self.manager.parse_csv_file("big.csv")
+        self.manager.parse_csv_file("a.csv")
+        self._wait_idle()
+        self.assertEqual(self.manager.activeFile, "a.csv")
+        self.assertEqual(self.manager.dataModel.columnNames, ["v1", "v2"])
+        self.assertEqual(len(resets), 1)
+
+    def test_cancel_keeps_previous_content(self) -> None:
+        """取消解析后模型保持原内容"""
+        self.manager.parse_csv_file("a.csv")
+        self._wait_idle()
+        self.manager.parse_csv_file("big.csv")
+        self.manager.cancelParsing()
+        self.manager.wait_for_parsing(5000)
+        self.app.processEvents()
+        self.assertFalse(self.manager.parsing)
+        self.assertEqual(self.manager.activeFile, "a.csv")
+        self.assertEqual(self.manager.dataModel.columnNames, ["v1", "v2"])
+
+    def test_file_list_refresh(self) -> None:
+        """list_csv_files 增量更新 csvFiles 和文件列表模型"""
+        self.assertEqual(self.manager.csvFiles, ["a.csv", "big.csv"])
+        self.assertEqual(self.manager.fileListModel.count, 2)
+        changed: list[int] = []
+        self.manager.csvFilesChanged.connect(lambda: changed.append(1))
+        (self.log_dir / "sub").mkdir()
+        (self.log_dir / "sub" / "new.csv").write_text("time,v\n1,2\n", encoding="utf-8")
+        self.manager.list_csv_files()
+        self._wait_refreshed()
+        self.assertEqual(self.manager.csvFiles, ["a.csv", "big.csv", "sub/new.csv"])
+        self.assertEqual(self.manager.fileListModel.count, 3)
+        self.assertEqual(len(changed), 1)
+        self.manager.list_csv_files()
+        self._wait_refreshed()
+        self.assertEqual(len(changed), 1)
+
+    def test_refresh_runs_in_background(self) -> None:
+        """list_csv_files 立即返回；刷新期间的重复请求合并为一次后续刷新"""
+        (self.log_dir / "c.csv").write_text("time,v\n1,2\n", encoding="utf-8")
+        with mock.patch.object(self.manager._index, "refresh", wraps=self.manager._index.refresh) as refresh:
+            self.manager.list_csv_files()
+            self.assertTrue(self.manager.refreshing)
+            self.manager.list_csv_files()
+            self.manager.list_csv_files()
+            self.assertEqual(self.manager.csvFiles, ["a.csv", "big.csv"])
+            self._wait_refreshed()
+        self.assertFalse(self.manager.refreshing)
+        self.assertEqual(refresh.call_count, 2)
+        self.assertEqual(self.manager.csvFiles, ["a.csv", "big.csv", "c.csv"])
+
+    def test_refresh_result_applied_without_index_lock(self) -> None:
+        """主线程只使用刷新任务发回的快照，不访问索引（后续刷新可能正持有索引锁）"""
+        index = self.manager._index
+        gui_calls: list[str] = []
+
+        def record(name, method):
+            def wrapper(*args, **kwargs):
+                if threading.current_thread() is threading.main_thread():
+                    gui_calls.append(name)
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        (self.log_dir / "c.csv").write_text("time,v\n1,2\n", encoding="utf-8")
+        with mock.patch.object(index, "paths", record("paths", index.paths)), mock.patch.object(
+            index, "directories", record("directories", index.directories)
+        ):
+            self.manager.list_csv_files()
+            self.manager.list_csv_files()
+            self._wait_refreshed()
+        self.assertEqual(gui_calls, [])
+        self.assertEqual(self.manager.csvFiles, ["a.csv", "big.csv", "c.csv"])
+
+    def test_parse_failure_reported(self) -> None:
+        """无法解码的文件通过 parseFailed 报告"""
+        (self.log_dir / "bad.csv").write_bytes(b"time,v1\n\xff\xfe,1\n")
+        failures: list[str] = []
+        self.manager.parseFailed.connect(lambda file, message: failures.append(file))
+        self.manager.parse_csv_file("bad.csv")
+        self._wait_idle()
+        self.assertEqual(failures, ["bad.csv"])
+        self.assertFalse(self.manager.parsing)
+
+    def test_unexpected_error_reported(self) -> None:
+        """解析中的其他异常同样报告失败并结束 parsing"""
+        failures: list[str] = []
+        self.manager.parseFailed.connect(lambda file, message: failures.append(message))
+        with mock.patch(
+            "voc_app.gui.csv_model.load_csv_with_pyramid", side_effect=csv.Error("ragged row")
+        ):
+            self.manager.parse_csv_file("a.csv")
+            self._wait_idle()
+        self.assertEqual(failures, ["ragged row"])
+        self.assertFalse(self.manager.parsing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+"""测试 csv_pyramid 模块"""
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.csv_pyramid import CsvPyramid, load_csv_with_pyramid, sidecar_path
+
+
+class TestCsvPyramid(unittest.TestCase):
+    """测试金字塔构建与查询"""
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(3)
+        self.x = np.arange(20000, dtype=np.float64) * 10.0
+        self.values = rng.standard_normal((2, 20000))
+        self.values[1, 500:700] = np.nan
+        self.pyramid = CsvPyramid.build(self.x, self.values, base_bucket_rows=16, factor=4, min_buckets=8)
+
+    def test_levels_match_raw_aggregates(self) -> None:
+        """每层桶的 min/max/均值与原始数据一致"""
+        self.assertEqual([lvl.bucket_rows for lvl in self.pyramid.levels], [16, 64, 256, 1024])
+        for level in self.pyramid.levels:
+            rows = level.bucket_rows
+            for b in (0, len(level) // 2, len(level) - 1):
+                chunk = self.values[0, b * rows : (b + 1) * rows]
+                self.assertEqual(level.mins[0, b], chunk.min())
+                self.assertEqual(level.maxs[0, b], chunk.max())
+                self.assertAlmostEqual(level.means[0, b], chunk.mean())
+                self.assertEqual(level.x_at_max[0, b], self.x[b * rows + int(np.argmax(chunk))])
+                self.assertEqual(level.x_first[b], self.x[b * rows])
+
+    def test_missing_values_ignored(self) -> None:
+        """NaN 不参与统计，全部缺失的桶计数为 0"""
+        level = self.pyramid.levels[0]
+        self.assertEqual(level.counts[1, 35], 0)
+        chunk = self.values[1, 496:512]
+        self.assertEqual(level.maxs[1, 31], np.nanmax(chunk))
+        self.assertEqual(level.counts[1, 31], 4)
+
+    def test_query_selects_level_by_width(self) -> None:
+        """可视范围越小选用越细的层级，点数与可视桶数成正比"""
+        column = self.pyramid.column(0)
+        xs, ys = column.minmax_points(-np.inf, np.inf, 100)
+        # 1024 行一桶只有 20 桶、256 行一桶 79 桶，均不足 100 → 选 64 行一桶
+        self.assertEqual(len(xs), 2 * (20000 // 64 + 1))
+        self.assertEqual(ys.max(), self.values[0].max())
+        self.assertTrue(np.all(np.diff(xs) >= 0))
+        narrow = column.minmax_points(0.0, 5000.0, 20)
+        self.assertIsNotNone(narrow)
+        self.assertLessEqual(narrow[0][-1], 5000.0 + 16 * 10.0)
+        self.assertIsNone(column.minmax_points(0.0, 100.0, 50))
+
+    def test_small_input_has_no_levels(self) -> None:
+        """数据太少时不构建层级"""
+        pyramid = CsvPyramid.build(self.x[:100], self.values[:, :100])
+        self.assertEqual(len(pyramid), 0)
+
+
+class TestPyramidSidecar(unittest.TestCase):
+    """测试旁路缓存"""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "log.csv"
+        lines = ["time,a"] + [f"{1700000000 + i},{i % 97}" for i in range(5000)]
+        self.path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_cache_written_and_reused(self) -> None:
+        """首次解析写入隐藏缓存，再次打开直接读取"""
+        table, pyramid = load_csv_with_pyramid(self.path)
+        cache = sidecar_path(self.path)
+        self.assertEqual(cache.name, ".log.csv.pyr.npz")
+        self.assertTrue(cache.exists())
+        self.assertGreater(len(pyramid), 0)
+
+        # 破坏 CSV 内容但保持大小和 mtime，应仍命中缓存
+        stat = self.path.stat()
+        self.path.write_bytes(b"x" * stat.st_size)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        cached_table, cached_pyramid = load_csv_with_pyramid(self.path)
+        self.assertEqual(cached_table.names, ["a"])
+        np.testing.assert_array_equal(cached_table.x, table.x)
+        np.testing.assert_array_equal(cached_table.columns[0], table.columns[0])
+        np.testing.assert_array_equal(cached_pyramid.levels[0].maxs, pyramid.levels[0].maxs)
+
+    def test_cache_rebuilt_when_source_changes(self) -> None:
+        """源文件大小或 mtime 变化后重新解析"""
+        load_csv_with_pyramid(self.path)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("1700009999,5\n")
+        table, _ = load_csv_with_pyramid(self.path)
+        self.assertEqual(len(table), 5001)
+
+    def test_small_file_skips_cache(self) -> None:
+        """行数不足以构建层级时不写缓存，也不复制原始数据"""
+        small = self.path.with_name("small.csv")
+        small.write_text("time,a\n1700000000,1\n1700000001,2\n", encoding="utf-8")
+        table, pyramid = load_csv_with_pyramid(small)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(len(pyramid), 0)
+        self.assertFalse(sidecar_path(small).exists())
+
+    def test_corrupt_cache_ignored(self) -> None:
+        """缓存损坏时回退到解析 CSV"""
+        sidecar_path(self.path).write_bytes(b"not a zip")
+        table, _ = load_csv_with_pyramid(self.path)
+        self.assertEqual(len(table), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""测试 decimation 模块"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.decimation import (
+    METHOD_MINMAX,
+    decimate,
+    decimate_range,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def _reference_lttb(xs: list, ys: list, threshold: int) -> list:
+    """逐点实现的 LTTB，作为向量化版本的对照"""
+    n = len(xs)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        next_lo = hi
+        next_hi = min(int((i + 2) * every) + 1, n - 1) if i + 1 < threshold - 2 else n
+        if i + 1 < threshold - 2:
+            cx = sum(xs[next_lo:next_hi]) / (next_hi - next_lo)
+            cy = sum(ys[next_lo:next_hi]) / (next_hi - next_lo)
+        else:
+            cx, cy = xs[-1], ys[-1]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((xs[a] - cx) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (cy - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+class TestLttb(unittest.TestCase):
+    """测试 LTTB 降采样"""
+
+    def test_matches_reference(self) -> None:
+        """与逐点实现选出相同的点"""
+        rng = np.random.default_rng(1)
+        xs = np.arange(503, dtype=np.float64)
+        ys = rng.standard_normal(503)
+        expected = _reference_lttb(xs.tolist(), ys.tolist(), 40)
+        self.assertEqual(lttb_indices(xs, ys, 40).tolist(), expected)
+
+    def test_keeps_endpoints_and_peak(self) -> None:
+        """首尾点必选，孤立尖峰被保留"""
+        xs = np.arange(1000, dtype=np.float64)
+        ys = np.zeros(1000)
+        ys[437] = 50.0
+        indices = lttb_indices(xs, ys, 20)
+        self.assertEqual(len(indices), 20)
+        self.assertEqual((indices[0], indices[-1]), (0, 999))
+        self.assertIn(437, indices.tolist())
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_small_input_unchanged(self) -> None:
+        """点数不超过目标时原样返回"""
+        xs = np.arange(5, dtype=np.float64)
+        self.assertEqual(lttb_indices(xs, xs, 10).tolist(), [0, 1, 2, 3, 4])
+        out_x, _ = decimate(xs, xs, 10)
+        self.assertIs(out_x, xs)
+
+
+class TestMinMax(unittest.TestCase):
+    """测试 min/max 降采样"""
+
+    def test_keeps_extrema_per_bucket(self) -> None:
+        """每列保留最小值和最大值，整体极值不丢失"""
+        rng = np.random.default_rng(2)
+        xs = np.arange(10000, dtype=np.float64)
+        ys = rng.standard_normal(10000)
+        indices = minmax_indices(xs, ys, 100)
+        self.assertLessEqual(len(indices), 200)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertEqual(ys[indices].max(), ys.max())
+        self.assertEqual(ys[indices].min(), ys.min())
+        # 第一列（x < 100）的极值都在结果中
+        first = ys[:100]
+        self.assertIn(int(np.argmax(first)), indices.tolist())
+        self.assertIn(int(np.argmin(first)), indices.tolist())
+
+    def test_decimate_minmax_budget(self) -> None:
+        """decimate 的 min/max 方法输出不超过 max_points"""
+        xs = np.arange(5000, dtype=np.float64)
+        out_x, out_y = decimate(xs, np.sin(xs), 300, METHOD_MINMAX)
+        self.assertLessEqual(len(out_x), 300)
+        self.assertEqual(len(out_x), len(out_y))
+
+    def test_unknown_method(self) -> None:
+        """未知方法抛出 ValueError"""
+        xs = np.arange(10, dtype=np.float64)
+        with self.assertRaises(ValueError):
+            decimate(xs, xs, 4, "median")
+
+
+class TestDecimateRange(unittest.TestCase):
+    """测试按范围和像素宽度降采样"""
+
+    def test_range_includes_neighbours(self) -> None:
+        """范围两侧各多带一个点"""
+        xs = np.arange(100, dtype=np.float64)
+        out_x, _ = decimate_range(xs, xs, 10.5, 20.5, 100)
+        self.assertEqual(out_x.tolist(), [float(i) for i in range(10, 22)])
+
+    def test_output_bounded_by_width(self) -> None:
+        """输出点数与像素宽度相关，与数据量无关"""
+        xs = np.arange(200000, dtype=np.float64)
+        ys = np.cos(xs / 50.0)
+        out_x, _ = decimate_range(xs, ys, 0.0, 200000.0, 400)
+        self.assertLessEqual(len(out_x), 800)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,221 @@
+"""测试 e84_jobs 模块"""
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.e84_jobs import LANE_DOWNLOAD, E84JobQueue
+from voc_app.gui.foup_acquisition import (
+    JOB_E84_LOAD_STOP,
+    JOB_LOG_DOWNLOAD,
+    FoupAcquisitionController,
+)
+
+# 任务结束信号从工作线程发出，需要事件循环派发到主线程
+_app = None
+
+
+def get_app():
+    """获取或创建 QGuiApplication 实例"""
+    global _app
+    if _app is None:
+        _app = QGuiApplication.instance()
+        if _app is None:
+            _app = QGuiApplication([])
+    return _app
+
+
+def _wait_until(predicate, timeout: float = 3.0) -> bool:
+    app = get_app()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    app.processEvents()
+    return predicate()
+
+
+class TestE84JobQueue(unittest.TestCase):
+    """测试后台任务队列"""
+
+    def setUp(self) -> None:
+        get_app()
+        self.queue = E84JobQueue()
+        self.finished: list[tuple[int, str, bool, str]] = []
+        self.progress: list[float] = []
+        self.queue.jobFinished.connect(lambda *args: self.finished.append(args))
+        self.queue.jobProgress.connect(lambda job_id, kind, f: self.progress.append(f))
+
+    def tearDown(self) -> None:
+        self.queue.shutdown()
+
+    def test_submit_returns_immediately(self) -> None:
+        """提交立即返回，任务在后台执行，结果与进度经信号送达"""
+        release = threading.Event()
+
+        def job(cancel, progress):
+            release.wait(2.0)
+            progress(0.5)
+            return "done"
+
+        job_id = self.queue.submit("a", job)
+        self.assertTrue(self.queue.busy)
+        self.assertEqual(self.queue.pendingCount, 1)
+        release.set()
+        self.assertTrue(_wait_until(lambda: self.finished))
+        self.assertEqual(self.finished, [(job_id, "a", True, "done")])
+        self.assertEqual(self.progress, [0.5])
+        self.assertFalse(self.queue.busy)
+
+    def test_lane_runs_in_order(self) -> None:
+        """同一通道按提交顺序执行，不同通道互不阻塞"""
+        order: list[str] = []
+        release = threading.Event()
+
+        def blocking(cancel, progress):
+            release.wait(2.0)
+            order.append("download")
+            return ""
+
+        self.queue.submit("download", blocking, lane=LANE_DOWNLOAD)
+        for name in ("first", "second"):
+            self.queue.submit(name, lambda cancel, progress, n=name: order.append(n) or "")
+        self.assertTrue(_wait_until(lambda: len(self.finished) == 2))
+        self.assertEqual(order, ["first", "second"])
+        release.set()
+        self.assertTrue(_wait_until(lambda: len(self.finished) == 3))
+
+    def test_coalesce_queued_job(self) -> None:
+        """同类任务仍在排队时合并，已开始的任务不参与合并"""
+        started = threading.Event()
+        release = threading.Event()
+        calls: list[int] = []
+
+        def job(cancel, progress):
+            calls.append(1)
+            started.set()
+            release.wait(2.0)
+            return ""
+
+        running = self.queue.submit("dl", job, lane=LANE_DOWNLOAD, coalesce=True)
+        self.assertTrue(started.wait(2.0))
+        queued = self.queue.submit("dl", job, lane=LANE_DOWNLOAD, coalesce=True)
+        again = self.queue.submit("dl", job, lane=LANE_DOWNLOAD, coalesce=True)
+        self.assertNotEqual(running, queued)
+        self.assertEqual(queued, again)
+        release.set()
+        self.assertTrue(_wait_until(lambda: len(self.finished) == 2))
+        self.assertEqual(len(calls), 2)
+
+    def test_timeout_sets_cancel_event(self) -> None:
+        """超时后置位取消事件，任务以失败结束"""
+
+        def job(cancel, progress):
+            cancel.wait(2.0)
+            return "late"
+
+        self.queue.submit("slow", job, timeout_s=0.05)
+        self.assertTrue(_wait_until(lambda: self.finished))
+        _, _, ok, message = self.finished[0]
+        self.assertFalse(ok)
+        self.assertIn("超时", message)
+
+    def test_timeout_interrupts_blocking_io(self) -> None:
+        """超时调用 on_timeout 中断阻塞 IO，异常退出的任务仍标记为超时"""
+        closed = threading.Event()
+
+        def job(cancel, progress):
+            closed.wait(2.0)
+            raise OSError("socket closed")
+
+        self.queue.submit("blocked", job, timeout_s=0.05, on_timeout=closed.set)
+        self.assertTrue(_wait_until(lambda: self.finished))
+        _, _, ok, message = self.finished[0]
+        self.assertFalse(ok)
+        self.assertIn("超时", message)
+
+    def test_failure_and_cancel(self) -> None:
+        """异常转为失败结果；cancelAll 让排队中的任务直接结束"""
+        started = threading.Event()
+        release = threading.Event()
+
+        def boom(cancel, progress):
+            started.set()
+            release.wait(2.0)
+            raise RuntimeError("boom")
+
+        self.queue.submit("boom", boom)
+        self.queue.submit("queued", lambda cancel, progress: "never")
+        self.assertTrue(started.wait(2.0))
+        self.queue.cancelAll()
+        release.set()
+        self.assertTrue(_wait_until(lambda: len(self.finished) == 2))
+        self.assertEqual([(kind, ok, msg) for _, kind, ok, msg in self.finished], [
+            ("boom", False, "boom"),
+            ("queued", False, "已取消"),
+        ])
+
+
+class TestControllerAsyncE84(unittest.TestCase):
+    """测试控制器的异步 E84 槽"""
+
+    def setUp(self) -> None:
+        get_app()
+        self.controller = FoupAcquisitionController(series_models=[])
+        self.results: list[tuple[str, bool, str]] = []
+        self.controller.e84JobFinished.connect(lambda *args: self.results.append(args))
+
+    def tearDown(self) -> None:
+        self.controller.shutdownE84Jobs()
+
+    def test_load_stop_queues_download(self) -> None:
+        """停止命令成功后在下载通道排队日志下载，调用方不被阻塞"""
+        release = threading.Event()
+
+        def download(cancel_event=None, progress=None):
+            release.wait(2.0)
+            progress(1, 2)
+            return ["a.csv"]
+
+        with patch.object(self.controller, "_e84_stop_collection", return_value="stopped"), \
+                patch.object(self.controller, "_download_logs", side_effect=download):
+            self.controller.e84StopDataCollectionForLoadAsync()
+            self.assertTrue(_wait_until(lambda: len(self.results) == 1))
+            self.assertEqual(self.results[0], (JOB_E84_LOAD_STOP, True, "stopped"))
+            self.assertTrue(self.controller.e84Jobs.busy)
+            release.set()
+            self.assertTrue(_wait_until(lambda: len(self.results) == 2))
+        kind, ok, message = self.results[1]
+        self.assertEqual((kind, ok), (JOB_LOG_DOWNLOAD, True))
+        self.assertIn("1 个文件", message)
+
+    def test_failure_reported(self) -> None:
+        """命令失败时发出 errorOccurred，不再排队下载"""
+        errors: list[str] = []
+        self.controller.errorOccurred.connect(errors.append)
+        with patch.object(
+            self.controller, "_e84_stop_collection", side_effect=OSError("refused")
+        ), patch.object(self.controller, "_download_logs") as mocked_download:
+            self.controller.e84StopDataCollectionForLoadAsync()
+            self.assertTrue(_wait_until(lambda: self.results))
+            self.controller.e84Jobs.wait(1000)
+            get_app().processEvents()
+        mocked_download.assert_not_called()
+        self.assertFalse(self.results[0][1])
+        self.assertEqual(len(errors), 1)
+        self.assertIn("refused", errors[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
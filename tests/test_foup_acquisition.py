@@ -1,15 +1,45 @@
 """测试 foup_acquisition 模块"""
 import sys
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch, PropertyMock
 
+import numpy as np
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 SRC_DIR = ROOT_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
+from voc_app.gui.channel_config import ChannelConfigManager
 from voc_app.gui.foup_acquisition import FoupAcquisitionController
+from voc_app.gui.foup_protocol import (
+    FRAME_SAMPLES,
+    FRAME_SPECTRUM_F32,
+    FRAME_SPECTRUM_U32,
+    encode_binary_frame,
+)
+from voc_app.gui.sample_batch import SampleBatchBuffer
+from voc_app.gui.server_identity import ServerIdentityCache
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+
+
+def make_isolated_controller(testcase: unittest.TestCase, **kwargs) -> FoupAcquisitionController:
+    """创建通道配置与身份缓存都写入临时目录的控制器。
+
+    检测到通道数时会设置前缀并延迟保存通道配置，不隔离会改写仓库中的 channel_config.json。
+    """
+    tmp = tempfile.TemporaryDirectory()
+    testcase.addCleanup(tmp.cleanup)
+    root = Path(tmp.name)
+    config_manager = ChannelConfigManager(root / "channel_config.json")
+    # 清理时先写入待保存的配置，再删除临时目录
+    testcase.addCleanup(config_manager.flush)
+    with patch("voc_app.gui.foup_acquisition.ChannelConfigManager", return_value=config_manager):
+        return FoupAcquisitionController(
+            identity_cache=ServerIdentityCache(root / "server_identity.json"), **kwargs
+        )
 
 
 class MockSeriesModel:
@@ -32,7 +62,8 @@ class TestFoupAcquisitionController(unittest.TestCase):
 
     def setUp(self) -> None:
         self.series_models = [MockSeriesModel() for _ in range(3)]
-        self.controller = FoupAcquisitionController(
+        self.controller = make_isolated_controller(
+            self,
             series_models=self.series_models,
             host="127.0.0.1",
             port=65432,
@@ -189,7 +220,8 @@ class TestFoupAcquisitionController(unittest.TestCase):
         spectrum_simulator = MagicMock()
         spectrum_simulator.running = True
 
-        controller = FoupAcquisitionController(
+        controller = make_isolated_controller(
+            self,
             series_models=self.series_models,
             host="127.0.0.1",
             port=65432,
@@ -215,7 +247,8 @@ class TestFoupAcquisitionController(unittest.TestCase):
     def test_handle_line_noise_spectrum_prefixed_payload(self) -> None:
         """测试每包带 prefix 的 Noise_Spectrum 数据格式"""
         spectrum_model = MagicMock()
-        controller = FoupAcquisitionController(
+        controller = make_isolated_controller(
+            self,
             series_models=self.series_models,
             host="127.0.0.1",
             port=65432,
@@ -233,7 +266,8 @@ class TestFoupAcquisitionController(unittest.TestCase):
     def test_handle_line_spec_with_timestamp_normalizes_uint32(self) -> None:
         """测试 SPEC,ts,uint32... 会丢弃 ts 并归一化到 0~1"""
         spectrum_model = MagicMock()
-        controller = FoupAcquisitionController(
+        controller = make_isolated_controller(
+            self,
             series_models=self.series_models,
             host="127.0.0.1",
             port=65432,
@@ -337,6 +371,19 @@ class TestFoupAcquisitionController(unittest.TestCase):
         self.controller._set_running(False)
         self.assertFalse(self.controller.running)
 
+    def test_start_refused_while_stream_engine_active(self) -> None:
+        """多主机引擎运行期间不启动单机采集，也不清空共用的曲线"""
+        self.series_models[0].points.append((1.0, 2.0))
+        self.controller.setStreamEngineActive(True)
+        self.assertTrue(self.controller.streamEngineActive)
+        self.controller.startAcquisition()
+        self.assertFalse(self.controller.running)
+        self.assertIsNone(self.controller._worker)
+        self.assertEqual(self.controller.statusMessage, "多主机采集运行中，单机采集已禁用")
+        self.assertEqual(self.series_models[0].points, [(1.0, 2.0)])
+        self.controller.setStreamEngineActive(False)
+        self.assertFalse(self.controller.streamEngineActive)
+
     def test_set_status(self) -> None:
         """测试设置状态消息"""
         self.controller._set_status("测试状态")
@@ -352,12 +399,285 @@ class TestFoupAcquisitionController(unittest.TestCase):
         self.assertEqual(self.series_models[2].points[0], (1000.0, 30.0))
 
 
+class BatchSeriesModel(MockSeriesModel):
+    """支持 append_points 批量接口的模拟曲线模型"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def append_points(self, xs, ys):
+        self.batches.append((list(xs), list(ys)))
+
+
+class TestFoupAcquisitionBatchIngest(unittest.TestCase):
+    """测试批量入库模式"""
+
+    def setUp(self) -> None:
+        self.series_models = [BatchSeriesModel() for _ in range(3)]
+        self.controller = make_isolated_controller(
+            self,
+            series_models=self.series_models,
+            host="127.0.0.1",
+            port=65432,
+            batch_max_size=4,
+            batch_max_latency_ms=20,
+        )
+
+    def test_samples_are_buffered_until_drained(self) -> None:
+        """批量模式下样本先进入缓冲区，不逐条写入模型"""
+        emitted = []
+        self.controller.dataPointReceived.connect(lambda *args: emitted.append(args))
+        self.controller._handle_line("1.0, 2.0, 3.0")
+        self.controller._handle_line("4.0, 5.0, 6.0")
+
+        self.assertEqual(emitted, [])
+        self.assertEqual(self.series_models[0].batches, [])
+        # 通道值仍实时可读
+        self.assertAlmostEqual(self.controller.getChannelValue(2), 6.0)
+
+        self.controller._drain_sample_batch()
+
+        self.assertEqual(len(self.series_models[0].batches), 1)
+        xs, ys = self.series_models[0].batches[0]
+        self.assertEqual(len(xs), 2)
+        self.assertEqual(ys, [1.0, 4.0])
+        self.assertEqual(self.series_models[2].batches[0][1], [3.0, 6.0])
+
+    def test_batch_emits_value_signals_once(self) -> None:
+        """整批只发一次 channelValuesChanged"""
+        counter = []
+        self.controller.channelValuesChanged.connect(lambda: counter.append(1))
+        for value in range(3):
+            self.controller._handle_line(f"{value}.0, 1.0, 2.0")
+        self.controller._drain_sample_batch()
+        self.assertEqual(len(counter), 1)
+
+    def test_batch_signal_emits_copies(self) -> None:
+        """dataBatchReceived 发出副本，下一批不会覆盖已发出的数组"""
+        received = []
+        self.controller.dataBatchReceived.connect(lambda xs, ys: received.append(ys))
+        self.controller._handle_line("1.0, 2.0, 3.0")
+        self.controller._drain_sample_batch()
+        self.controller._handle_line("7.0, 8.0, 9.0")
+        self.controller._drain_sample_batch()
+        self.controller._handle_line("4.0, 5.0, 6.0")
+        self.controller._drain_sample_batch()
+        self.assertEqual(
+            [ys.tolist() for ys in received],
+            [[[1.0, 2.0, 3.0]], [[7.0, 8.0, 9.0]], [[4.0, 5.0, 6.0]]],
+        )
+
+    def test_full_batch_requests_flush(self) -> None:
+        """批次写满时请求 GUI 取批（同线程下直接执行）"""
+        for value in range(4):
+            self.controller._handle_line(f"{value}.0, 1.0, 2.0")
+        self.assertEqual(len(self.series_models[0].batches), 1)
+        self.assertEqual(self.series_models[0].batches[0][1], [0.0, 1.0, 2.0, 3.0])
+
+    def test_binary_frames_batched_with_timestamp(self) -> None:
+        """二进制采样帧直接写入批缓冲，x 为帧内时间戳"""
+        for ts in (1000, 1010):
+            self.controller._handle_frame(
+                encode_binary_frame(FRAME_SAMPLES, [0.5, 1.5, 2.5], timestamp_ms=ts)
+            )
+        self.controller._drain_sample_batch()
+        xs, ys = self.series_models[1].batches[0]
+        self.assertEqual(xs, [1000.0, 1010.0])
+        self.assertEqual(ys, [1.5, 1.5])
+
+    def test_fallback_to_append_point(self) -> None:
+        """模型不支持 append_points 时逐点写入并跳过缺失通道"""
+        models = [MockSeriesModel() for _ in range(2)]
+        controller = make_isolated_controller(
+            self,
+            series_models=models,
+            host="127.0.0.1",
+            port=65432,
+            batch_max_size=8,
+        )
+        controller._handle_line("1.0, 2.0")
+        controller._handle_line("3.0")
+        controller._drain_sample_batch()
+        self.assertEqual([p[1] for p in models[0].points], [1.0, 3.0])
+        self.assertEqual([p[1] for p in models[1].points], [2.0])
+
+    def test_drain_empty_is_noop(self) -> None:
+        """无数据时取批不应发信号"""
+        counter = []
+        self.controller.channelValuesChanged.connect(lambda: counter.append(1))
+        self.controller._drain_sample_batch()
+        self.assertEqual(counter, [])
+
+
+class TestSampleBatchBuffer(unittest.TestCase):
+    """测试样本批缓冲的扩容上限"""
+
+    def test_growth_capped_and_oldest_dropped(self) -> None:
+        """GUI 未取批时扩容到上限，之后丢弃最旧的一批并计数"""
+        buffer = SampleBatchBuffer(2, 1, max_capacity=6)
+        for value in range(6):
+            buffer.append(float(value), [float(value)])
+        self.assertEqual(buffer.dropped, 0)
+        buffer.append(6.0, [6.0])
+        buffer.append(7.0, [7.0])
+        self.assertEqual(buffer.dropped, 2)
+        xs, ys = buffer.drain()
+        self.assertEqual(xs.tolist(), [2.0, 3.0, 4.0, 5.0, 6.0, 7.0])
+        self.assertEqual(ys[:, 0].tolist(), xs.tolist())
+        # 交换回写侧的缓冲区不会超过上限
+        for value in range(20):
+            buffer.append(float(value), [float(value)])
+        self.assertEqual(len(buffer), 6)
+        self.assertEqual(buffer.dropped, 16)
+
+    def test_default_max_capacity(self) -> None:
+        """未指定上限时按 MAX_GROWTH 倍数计算"""
+        buffer = SampleBatchBuffer(4, 2)
+        self.assertEqual(buffer.max_capacity, 4 * SampleBatchBuffer.MAX_GROWTH)
+
+
+class TestFoupAcquisitionBinaryFrames(unittest.TestCase):
+    """测试二进制帧解析与文本帧回退"""
+
+    def setUp(self) -> None:
+        self.series_models = [MockSeriesModel() for _ in range(3)]
+        self.spectrum_model = MagicMock()
+        self.controller = make_isolated_controller(
+            self,
+            series_models=self.series_models,
+            host="127.0.0.1",
+            port=65432,
+            spectrum_model=self.spectrum_model,
+            prefer_binary_frames=True,
+        )
+
+    def test_select_command_frame_binary(self) -> None:
+        """测试二进制协商命令"""
+        self.controller._command_prefix = "FOUP"
+        self.assertEqual(
+            self.controller._select_command("frame_binary"), "FOUP_frame_format_binary"
+        )
+
+    def test_binary_samples_frame(self) -> None:
+        """二进制采样帧与文本帧写入相同的曲线模型"""
+        payload = encode_binary_frame(FRAME_SAMPLES, [1.5, 2.5, 3.5])
+        self.controller._handle_frame(payload)
+        self.assertEqual(self.controller.channelCount, 3)
+        self.assertEqual(self.series_models[0].points[0][1], 1.5)
+        self.assertEqual(self.series_models[2].points[0][1], 3.5)
+
+    def test_binary_samples_use_frame_timestamp(self) -> None:
+        """采样帧携带的时间戳直接作为 x；时间戳为 0 或回退时按本机时间与单调规则处理"""
+        self.controller._handle_frame(encode_binary_frame(FRAME_SAMPLES, [1.0], timestamp_ms=5000))
+        self.controller._handle_frame(encode_binary_frame(FRAME_SAMPLES, [2.0], timestamp_ms=5000))
+        with patch("voc_app.gui.foup_acquisition.time.time", return_value=9.0):
+            self.controller._handle_frame(encode_binary_frame(FRAME_SAMPLES, [3.0]))
+        self.assertEqual([p[0] for p in self.series_models[0].points], [5000.0, 5001.0, 9000.0])
+        self.assertEqual(self.controller.getChannelValue(0), 3.0)
+
+    def test_binary_spectrum_frame_normalizes_uint32(self) -> None:
+        """uint32 频谱帧按最大值归一化"""
+        bins = [0, 10, 2**32 - 1] + [1] * 253
+        self.controller._handle_frame(encode_binary_frame(FRAME_SPECTRUM_U32, bins))
+        self.spectrum_model.updateSpectrum.assert_called_once()
+        values = self.spectrum_model.updateSpectrum.call_args[0][0]
+        self.assertEqual(len(values), 256)
+        self.assertAlmostEqual(max(values), 1.0, places=6)
+        self.assertEqual(len(self.series_models[0].points), 0)
+
+    def test_binary_spectrum_frame_in_range(self) -> None:
+        """0~1 范围内的 float32 频谱原样转发"""
+        self.controller._handle_frame(encode_binary_frame(FRAME_SPECTRUM_F32, [0.25, 0.5]))
+        values = self.spectrum_model.updateSpectrum.call_args[0][0]
+        self.assertEqual(values.dtype, np.float64)
+        self.assertEqual(values.tolist(), [0.25, 0.5])
+
+    def test_spectrum_frames_coalesced_until_taken(self) -> None:
+        """GUI 未取走前到达的频谱帧只保留最新一帧，且不经过 Python list"""
+        self.controller._spectrumFrameReady.disconnect(self.controller._take_spectrum_frame)
+        self.controller._handle_line("SPEC,0,50,100")
+        self.controller._handle_frame(encode_binary_frame(FRAME_SPECTRUM_F32, [0.25, 0.5]))
+        self.controller._take_spectrum_frame()
+        self.spectrum_model.updateSpectrum.assert_called_once()
+        values = self.spectrum_model.updateSpectrum.call_args[0][0]
+        self.assertIsInstance(values, np.ndarray)
+        self.assertEqual(values.tolist(), [0.25, 0.5])
+        self.assertEqual(self.controller._spectrum_mailbox.dropped, 1)
+
+    def test_spectrum_frames_routed_by_channel(self) -> None:
+        """多通道模型按二进制帧中的通道号更新对应通道"""
+        model = MultiChannelSpectrumModel(channel_count=2, bin_count=2)
+        model.maxFps = 0
+        controller = make_isolated_controller(
+            self,
+            series_models=self.series_models,
+            host="127.0.0.1",
+            port=65432,
+            spectrum_model=model,
+        )
+        controller._spectrumFrameReady.disconnect(controller._take_spectrum_frame)
+        controller._handle_frame(encode_binary_frame(FRAME_SPECTRUM_F32, [0.25, 0.5], channel=1))
+        controller._handle_frame(encode_binary_frame(FRAME_SPECTRUM_F32, [0.75, 1.0], channel=0))
+        controller._take_spectrum_frame()
+        self.assertEqual(model.spectra.tolist(), [[0.75, 1.0], [0.25, 0.5]])
+
+    def test_text_frame_fallback(self) -> None:
+        """旧固件的文本帧仍按原逻辑解析"""
+        self.controller._handle_frame(b"1.0,2.0,3.0")
+        self.assertEqual(self.series_models[1].points[0][1], 2.0)
+
+    def test_invalid_binary_frame_is_dropped(self) -> None:
+        """截断的二进制帧被丢弃而不是抛出异常"""
+        payload = encode_binary_frame(FRAME_SAMPLES, [1.0, 2.0])
+        self.controller._handle_frame(payload[:-2])
+        self.assertEqual(self.series_models[0].points, [])
+
+    def test_invalid_utf8_is_ignored(self) -> None:
+        """非法 UTF-8 的文本帧被忽略"""
+        self.controller._handle_frame(b"\xff\xfe")
+        self.assertEqual(self.series_models[0].points, [])
+
+
+class TestFoupAcquisitionSampleStore(unittest.TestCase):
+    """测试采样写入磁盘存储"""
+
+    def setUp(self) -> None:
+        import tempfile
+
+        from voc_app.gui.timeseries_store import TimeSeriesStore
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = TimeSeriesStore(self._tmp.name)
+        self.controller = make_isolated_controller(
+            self,
+            series_models=[MockSeriesModel(), MockSeriesModel()],
+            host="127.0.0.1",
+            port=65432,
+            sample_store=self.store,
+        )
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self._tmp.cleanup()
+
+    def test_samples_are_persisted(self) -> None:
+        """每条采样都写入存储，可按时间范围查询"""
+        for i in range(5):
+            self.controller._handle_line(f"{i}.0, {i}.5")
+        self.store.flush()
+        ts, values = self.store.query(0.0, float("inf"))
+        self.assertEqual(len(ts), 5)
+        self.assertEqual(values[:, 1].tolist(), [0.5, 1.5, 2.5, 3.5, 4.5])
+
+
 class TestFoupAcquisitionControllerNoSeries(unittest.TestCase):
     """测试没有曲线模型的情况"""
 
     def test_init_empty_series(self) -> None:
         """测试空曲线模型列表"""
-        controller = FoupAcquisitionController(
+        controller = make_isolated_controller(
+            self,
             series_models=[],
             host="127.0.0.1",
             port=65432,
@@ -366,7 +686,8 @@ class TestFoupAcquisitionControllerNoSeries(unittest.TestCase):
 
     def test_init_none_series(self) -> None:
         """测试 None 曲线模型"""
-        controller = FoupAcquisitionController(
+        controller = make_isolated_controller(
+            self,
             series_models=[None, None],
             host="127.0.0.1",
             port=65432,
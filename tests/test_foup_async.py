@@ -0,0 +1,270 @@
+"""测试 foup_async 模块"""
+import socket
+import struct
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+import numpy as np
+
+from voc_app.gui.foup_async import (
+    STATE_CONNECTED,
+    STATE_STOPPED,
+    FoupStreamEngine,
+    FoupStreamRouter,
+    parse_host_list,
+)
+from voc_app.gui.foup_protocol import FRAME_SAMPLES, encode_binary_frame
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+
+
+def _send_frame(conn: socket.socket, payload: bytes) -> None:
+    conn.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytes | None:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+class FakeFoupServer:
+    """应答版本查询，收到 start 后推送文本/二进制/频谱帧，直到收到 stop"""
+
+    def __init__(self, prefix: str, samples: list[str]) -> None:
+        self.prefix = prefix
+        self.samples = samples
+        self.commands: list[str] = []
+        self.stopped = threading.Event()
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(1)
+        self.port = self._server.getsockname()[1]
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        conn, _ = self._server.accept()
+        with conn:
+            while True:
+                header = _recv_exact(conn, 4)
+                if header is None:
+                    break
+                body = _recv_exact(conn, struct.unpack(">I", header)[0])
+                if body is None:
+                    break
+                cmd = body.decode("utf-8")
+                self.commands.append(cmd)
+                if cmd == "get_function_version_info":
+                    _send_frame(conn, f"{self.prefix},1.2.3".encode("utf-8"))
+                elif cmd.endswith("_data_coll_ctrl_start"):
+                    for line in self.samples:
+                        _send_frame(conn, line.encode("utf-8"))
+                    _send_frame(conn, encode_binary_frame(FRAME_SAMPLES, [7.0, 8.0]))
+                    _send_frame(conn, b"SPEC,0.1,0.2,0.3")
+                elif cmd.endswith("_data_coll_ctrl_stop"):
+                    self.stopped.set()
+                    break
+        self._server.close()
+
+    def join(self) -> None:
+        self._thread.join(timeout=2.0)
+
+
+# 引擎信号从事件循环线程发出，需要 Qt 事件循环把它们排队到主线程
+_app = None
+
+
+def get_app():
+    """获取或创建 QGuiApplication 实例"""
+    global _app
+    if _app is None:
+        _app = QGuiApplication.instance()
+        if _app is None:
+            _app = QGuiApplication([])
+    return _app
+
+
+def _wait_until(predicate, timeout: float = 3.0) -> bool:
+    app = get_app()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if predicate():
+            return True
+        time.sleep(0.01)
+    app.processEvents()
+    return predicate()
+
+
+class TestFoupStreamEngine(unittest.TestCase):
+    """测试多主机 asyncio 采集引擎"""
+
+    def setUp(self) -> None:
+        get_app()
+        self.engine = FoupStreamEngine(batch_max_size=64, reconnect_delay_s=0.05)
+        self.samples: dict[str, list] = {}
+        self.spectra: dict[str, list] = {}
+        self.states: list[tuple[str, str]] = []
+        self.engine.samplesReceived.connect(self._on_samples)
+        self.engine.spectrumReceived.connect(
+            lambda name, bins: self.spectra.setdefault(name, []).append(bins)
+        )
+        self.engine.hostStateChanged.connect(lambda name, state: self.states.append((name, state)))
+
+    def tearDown(self) -> None:
+        self.engine.stop()
+
+    def _on_samples(self, name, xs, ys) -> None:
+        self.samples.setdefault(name, []).extend(ys.tolist())
+
+    def test_multiple_hosts_share_one_loop(self) -> None:
+        """多台主机在同一事件循环中并发采集，数据按主机区分"""
+        server_a = FakeFoupServer("VOC", ["1.0,2.0", "3.0,4.0"])
+        server_b = FakeFoupServer("FOUP", ["10.0,20.0"])
+        self.engine.addHost("a", "127.0.0.1", server_a.port)
+        self.engine.addHost("b", "127.0.0.1", server_b.port)
+        threads_before = threading.active_count()
+        self.engine.start()
+        self.assertEqual(threading.active_count(), threads_before + 1)
+
+        self.assertTrue(_wait_until(lambda: len(self.spectra) == 2))
+        self.engine.drainSamples()
+
+        self.assertEqual(self.samples["a"], [[1.0, 2.0], [3.0, 4.0], [7.0, 8.0]])
+        self.assertEqual(self.samples["b"], [[10.0, 20.0], [7.0, 8.0]])
+        self.assertEqual(self.spectra["a"][0].tolist(), [0.1, 0.2, 0.3])
+        self.assertEqual(self.engine.hostPrefix("b"), "FOUP")
+        self.assertEqual(self.engine.hostState("a"), STATE_CONNECTED)
+        self.assertIn("FOUP_sample_type_test", server_b.commands)
+        self.assertIn("FOUP_data_coll_ctrl_start", server_b.commands)
+
+        self.engine.stop()
+        self.assertFalse(self.engine.running)
+        # stop() 不等待断开完成，stop 命令与状态变化随后到达
+        self.assertTrue(_wait_until(lambda: server_a.stopped.is_set() and server_b.stopped.is_set()))
+        self.assertTrue(_wait_until(lambda: ("a", STATE_STOPPED) in self.states))
+        server_a.join()
+        server_b.join()
+
+    def test_binary_negotiation_command(self) -> None:
+        """prefer_binary_frames 时在 start 之前发送协商命令"""
+        engine = FoupStreamEngine(prefer_binary_frames=True)
+        server = FakeFoupServer("VOC", [])
+        engine.addHost("a", "127.0.0.1", server.port)
+        engine.start()
+        try:
+            self.assertTrue(_wait_until(lambda: "VOC_data_coll_ctrl_start" in server.commands))
+            self.assertLess(
+                server.commands.index("VOC_frame_format_binary"),
+                server.commands.index("VOC_data_coll_ctrl_start"),
+            )
+        finally:
+            engine.stop()
+            server.join()
+
+    def test_unreachable_host_reports_error_and_retries(self) -> None:
+        """连接失败的主机不断重试，不影响引擎停止"""
+        probe = socket.socket()
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        errors: list[str] = []
+        self.engine.errorOccurred.connect(lambda name, message: errors.append(name))
+        self.engine.addHost("dead", "127.0.0.1", port)
+        self.engine.start()
+        self.assertTrue(_wait_until(lambda: len(errors) >= 2))
+        self.engine.stop()
+        self.assertFalse(self.engine.running)
+
+    def test_stop_does_not_block_and_drains_pending(self) -> None:
+        """stop() 立即返回，事件循环结束后取走剩余样本"""
+        server = FakeFoupServer("VOC", ["1.0", "2.0"])
+        self.engine.addHost("a", "127.0.0.1", server.port)
+        self.engine.start()
+        self.assertTrue(_wait_until(lambda: "a" in self.spectra))
+        started = time.monotonic()
+        self.engine.stop()
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertTrue(_wait_until(lambda: len(self.samples.get("a", [])) == 3))
+        self.assertTrue(server.stopped.wait(2.0))
+        server.join()
+
+    def test_remove_host(self) -> None:
+        """移除主机会断开连接并发送 stop"""
+        server = FakeFoupServer("VOC", ["1.0"])
+        self.engine.addHost("a", "127.0.0.1", server.port)
+        self.engine.start()
+        self.assertTrue(_wait_until(lambda: "VOC_data_coll_ctrl_start" in server.commands))
+        self.engine.removeHost("a")
+        self.assertTrue(server.stopped.wait(2.0))
+        self.assertEqual(self.engine.hostNames, [])
+        server.join()
+
+
+class BatchSeriesModel:
+    """记录 append_points 调用的曲线模型"""
+
+    def __init__(self):
+        self.points = []
+
+    def append_points(self, xs, ys):
+        self.points.extend(zip(list(xs), list(ys)))
+
+
+class TestFoupStreamRouter(unittest.TestCase):
+    """测试主机列表解析与数据分发"""
+
+    def test_parse_host_list(self) -> None:
+        """名称与端口可省略，端口无效的条目被忽略"""
+        self.assertEqual(
+            parse_host_list("a=10.0.0.1:7000, 10.0.0.2,b=10.0.0.3:x,"),
+            [("a", "10.0.0.1", 7000), ("FOUP 2", "10.0.0.2", 65432)],
+        )
+
+    def test_routes_hosts_to_series_and_spectrum_channels(self) -> None:
+        """每台主机分得连续的曲线模型，频谱按主机序号写入多通道模型"""
+        get_app()
+        engine = FoupStreamEngine()
+        models = [BatchSeriesModel() for _ in range(4)]
+        spectrum = MultiChannelSpectrumModel(channel_count=2, bin_count=4)
+        spectrum.maxFps = 0
+        FoupStreamRouter(engine, models, spectrum, host_names=["a", "b"], parent=engine)
+        engine.samplesReceived.emit("b", np.array([1.0]), np.array([[5.0, 6.0, 7.0]]))
+        engine.spectrumReceived.emit("b", np.array([0.5, 0.25]))
+        engine.samplesReceived.emit("unknown", np.array([1.0]), np.array([[9.0]]))
+        self.assertEqual([m.points for m in models], [[], [], [(1.0, 5.0)], [(1.0, 6.0)]])
+        self.assertEqual(spectrum.spectra[1].tolist(), [0.5, 0.25, 0.0, 0.0])
+        self.assertFalse(spectrum.spectra[0].any())
+
+    def test_routes_samples_to_host_store(self) -> None:
+        """每台主机的采样写入自己的存储，保留设备时间戳"""
+        get_app()
+        engine = FoupStreamEngine()
+        stores = {"a": mock.Mock(), "b": mock.Mock()}
+        models = [BatchSeriesModel() for _ in range(2)]
+        FoupStreamRouter(engine, models, host_names=["a", "b"], sample_stores=stores, parent=engine)
+        engine.samplesReceived.emit("b", np.array([10.0, 11.0]), np.array([[1.0], [2.0]]))
+        stores["a"].append.assert_not_called()
+        self.assertEqual(
+            stores["b"].append.call_args_list, [mock.call(10.0, [1.0]), mock.call(11.0, [2.0])]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
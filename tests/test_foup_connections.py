@@ -0,0 +1,253 @@
+"""测试 foup_connections 模块"""
+import socket
+import struct
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.foup_connections import CHANNEL_CONTROL, CHANNEL_DATA, FoupConnectionPool
+from voc_app.gui.socket_client import Client, SocketCommunicator
+
+
+def _send_frame(conn: socket.socket, text: str) -> None:
+    payload = text.encode("utf-8")
+    conn.sendall(struct.pack(">I", len(payload)) + payload)
+
+
+def _recv_exact(conn: socket.socket, size: int) -> bytes | None:
+    data = bytearray()
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+class _CommandServer:
+    """版本查询回 ACK + 版本，其他命令回 ACK（extra_ack 时多回一个）；记录连接数与命令"""
+
+    def __init__(self, extra_ack: bool = False) -> None:
+        self.extra_ack = extra_ack
+        self.accepted = 0
+        self.commands: list[str] = []
+        self.connections: list[socket.socket] = []
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(8)
+        self.port = self._server.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            self.connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket) -> None:
+        with conn:
+            while True:
+                try:
+                    header = _recv_exact(conn, 4)
+                    body = header and _recv_exact(conn, struct.unpack(">I", header)[0])
+                except OSError:
+                    return
+                if body is None:
+                    return
+                cmd = body.decode("utf-8")
+                self.commands.append(cmd)
+                try:
+                    if cmd == "get_function_version_info":
+                        _send_frame(conn, "ACK")
+                        _send_frame(conn, "VOC,1.0")
+                    else:
+                        _send_frame(conn, f"ACK {cmd}")
+                        if self.extra_ack:
+                            _send_frame(conn, "ACK")
+                except OSError:
+                    return
+
+    def drop_all(self) -> None:
+        for conn in self.connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        self._server.close()
+        self.drop_all()
+
+
+def _wait_until(predicate, timeout: float = 3.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+def _command(conn, text: str) -> str:
+    conn.send_frame(text.encode("utf-8"))
+    return str(conn.reader.read_frame(), "utf-8")
+
+
+class TestFoupConnectionPool(unittest.TestCase):
+    """测试常驻连接池"""
+
+    def setUp(self) -> None:
+        self.server = _CommandServer()
+        self.pool = FoupConnectionPool(
+            lambda host, port: SocketCommunicator(host, port, timeout=2.0),
+            ping_interval_s=10.0,
+            backoff_initial_s=0.05,
+            backoff_max_s=0.2,
+        )
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.close()
+
+    def test_control_connection_is_reused(self) -> None:
+        """控制连接在命令之间保持，不重复建连"""
+        for text in ("a", "b"):
+            conn = self.pool.checkout("127.0.0.1", self.server.port, CHANNEL_CONTROL)
+            self.assertEqual(_command(conn, text), f"ACK {text}")
+            self.pool.release(conn)
+        self.assertEqual(self.server.accepted, 1)
+
+    def test_control_channel_is_exclusive(self) -> None:
+        """控制连接租出期间其他调用方等待"""
+        pool = FoupConnectionPool(
+            lambda host, port: SocketCommunicator(host, port, timeout=2.0),
+            checkout_timeout_s=0.05,
+        )
+        try:
+            conn = pool.checkout("127.0.0.1", self.server.port)
+            with self.assertRaises(TimeoutError):
+                pool.checkout("127.0.0.1", self.server.port)
+            pool.release(conn)
+            pool.release(pool.checkout("127.0.0.1", self.server.port))
+        finally:
+            pool.close()
+
+    def test_unread_replies_drained_before_checkout(self) -> None:
+        """上一次未读的应答在租出前被丢弃"""
+        self.server.extra_ack = True
+        conn = self.pool.checkout("127.0.0.1", self.server.port)
+        self.assertEqual(_command(conn, "a"), "ACK a")
+        self.pool.release(conn)
+        # 多出的 ACK 可能已被预读进缓冲区，也可能仍在 socket 中
+        time.sleep(0.05)
+        conn = self.pool.checkout("127.0.0.1", self.server.port)
+        self.assertEqual(_command(conn, "b"), "ACK b")
+        self.pool.release(conn)
+
+    def test_dropped_control_connection_reconnects_in_background(self) -> None:
+        """连接被对端断开后，维护线程探活失败并在后台重新连接"""
+        pool = FoupConnectionPool(
+            lambda host, port: SocketCommunicator(host, port, timeout=2.0),
+            ping_interval_s=0.05,
+            ping_timeout_s=0.5,
+        )
+        try:
+            pool.warm_up("127.0.0.1", self.server.port)
+            self.assertTrue(_wait_until(lambda: self.server.accepted == 1))
+            self.assertTrue(_wait_until(lambda: "get_function_version_info" in self.server.commands))
+            self.server.drop_all()
+            self.assertTrue(_wait_until(lambda: self.server.accepted == 2))
+            conn = pool.checkout("127.0.0.1", self.server.port)
+            self.assertEqual(_command(conn, "x"), "ACK x")
+            pool.release(conn)
+            self.assertEqual(self.server.accepted, 2)
+        finally:
+            pool.close()
+
+    def test_reconnect_backoff(self) -> None:
+        """建连连续失败时重试间隔指数增长"""
+        attempts: list[float] = []
+
+        def failing(host, port):
+            attempts.append(time.monotonic())
+            raise ConnectionRefusedError("refused")
+
+        pool = FoupConnectionPool(failing, backoff_initial_s=0.05, backoff_max_s=0.2)
+        try:
+            pool.warm_up("127.0.0.1", 1)
+            time.sleep(0.6)
+        finally:
+            pool.close()
+        gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+        self.assertGreaterEqual(len(gaps), 2)
+        self.assertLess(len(attempts), 8)
+        self.assertGreater(gaps[-1], gaps[0])
+
+    def test_data_connections_returned_to_pool(self) -> None:
+        """数据连接 close() 后归还连接池，下次复用"""
+        factory = self.pool.data_factory("127.0.0.1", self.server.port)
+        used = []
+        for _ in range(2):
+            communicator = factory()
+            communicator.send(struct.pack(">I", 1) + b"q")
+            self.assertEqual(_recv_exact_from(communicator, 4 + len("ACK q")), b"\x00\x00\x00\x05ACK q")
+            communicator.close()
+            used.append(communicator._conn)
+        self.assertIs(used[0], used[1])
+        self.assertFalse(used[0].broken)
+
+    def test_broken_data_connection_is_not_reused(self) -> None:
+        """不可复用的数据连接关闭而不归还"""
+        first = self.pool.checkout("127.0.0.1", self.server.port, CHANNEL_DATA)
+        self.pool.release(first, reusable=False)
+        second = self.pool.checkout("127.0.0.1", self.server.port, CHANNEL_DATA)
+        self.pool.release(second)
+        self.assertTrue(first.broken)
+        self.assertIsNot(first, second)
+
+    def test_client_releases_only_after_clean_exchange(self) -> None:
+        """Client 关闭时：交互完整结束的连接放回池中，中途失败的连接被关闭"""
+        factory = self.pool.data_factory("127.0.0.1", self.server.port)
+        client = Client(factory())
+        self.assertEqual(client.run_shell("x"), "ACK run x")
+        self.assertTrue(client.idle)
+        clean = client.comm._conn
+        client.close()
+        self.assertFalse(clean.broken)
+
+        client = Client(factory())
+        self.assertIs(client.comm._conn, clean)
+        with self.assertRaises(RuntimeError):
+            client.fetch_file("/remote.csv", str(Path(__file__).with_name("unused.part")))
+        self.assertFalse(client.idle)
+        client.close()
+        self.assertTrue(clean.broken)
+        client = Client(factory())
+        self.assertIsNot(client.comm._conn, clean)
+        client.close()
+
+
+def _recv_exact_from(communicator, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = communicator.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+if __name__ == "__main__":
+    unittest.main()
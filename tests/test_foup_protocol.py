@@ -0,0 +1,171 @@
+"""测试 foup_protocol 模块"""
+import struct
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui import foup_protocol
+from voc_app.gui.foup_protocol import (
+    BINARY_HEADER,
+    BINARY_MAGIC,
+    FRAME_SAMPLES,
+    FRAME_SPECTRUM_F32,
+    FRAME_SPECTRUM_U32,
+    build_command,
+    decode_binary_frame,
+    encode_binary_frame,
+    is_binary_frame,
+    normalize_spectrum,
+    parse_sample_text,
+    parse_spectrum_text,
+    parse_version_response,
+)
+
+
+class TestBinaryFrame(unittest.TestCase):
+    """测试二进制帧编解码"""
+
+    def test_round_trip_samples(self) -> None:
+        """采样帧编码后可无损解码"""
+        payload = encode_binary_frame(FRAME_SAMPLES, [1.5, -2.25, 3.0], timestamp_ms=1234)
+        frame = decode_binary_frame(payload)
+        self.assertEqual(frame.frame_type, FRAME_SAMPLES)
+        self.assertEqual(frame.timestamp_ms, 1234)
+        self.assertFalse(frame.is_spectrum)
+        self.assertEqual(frame.values.tolist(), [1.5, -2.25, 3.0])
+
+    def test_round_trip_spectrum_u32(self) -> None:
+        """uint32 频谱帧保留整数值与通道号"""
+        bins = [0, 1, 2**32 - 1]
+        frame = decode_binary_frame(encode_binary_frame(FRAME_SPECTRUM_U32, bins, channel=2))
+        self.assertTrue(frame.is_spectrum)
+        self.assertEqual(frame.channel, 2)
+        self.assertEqual(frame.values.tolist(), bins)
+
+    def test_header_layout(self) -> None:
+        """头部固定 16 字节，负载为大端 float32"""
+        payload = encode_binary_frame(FRAME_SPECTRUM_F32, [1.0])
+        self.assertEqual(BINARY_HEADER.size, 16)
+        self.assertEqual(len(payload), 20)
+        self.assertEqual(payload[16:], struct.pack(">f", 1.0))
+
+    def test_decode_is_zero_copy(self) -> None:
+        """解码结果直接引用接收缓冲区"""
+        buffer = bytearray(encode_binary_frame(FRAME_SAMPLES, [1.0, 2.0]))
+        frame = decode_binary_frame(buffer)
+        buffer[16:20] = struct.pack(">f", 9.0)
+        self.assertEqual(float(frame.values[0]), 9.0)
+
+    def test_is_binary_frame(self) -> None:
+        """文本帧与二进制帧按首字节区分"""
+        self.assertTrue(is_binary_frame(bytes([BINARY_MAGIC, 1])))
+        self.assertFalse(is_binary_frame(b"1.0,2.0"))
+        self.assertFalse(is_binary_frame(b"SPEC,1,2"))
+        self.assertFalse(is_binary_frame(b""))
+
+    def test_decode_errors(self) -> None:
+        """非法帧抛出 ValueError"""
+        payload = encode_binary_frame(FRAME_SAMPLES, [1.0, 2.0])
+        with self.assertRaises(ValueError):
+            decode_binary_frame(payload[:10])
+        with self.assertRaises(ValueError):
+            decode_binary_frame(payload[:-1])
+        bad_version = bytearray(payload)
+        bad_version[1] = 99
+        with self.assertRaises(ValueError):
+            decode_binary_frame(bad_version)
+        bad_type = bytearray(payload)
+        bad_type[2] = 99
+        with self.assertRaises(ValueError):
+            decode_binary_frame(bad_type)
+
+    def test_encode_unknown_type(self) -> None:
+        """未知帧类型不能编码"""
+        with self.assertRaises(ValueError):
+            encode_binary_frame(99, [1.0])
+
+
+class TestNormalizeSpectrum(unittest.TestCase):
+    """测试频谱归一化"""
+
+    def test_in_range_unchanged(self) -> None:
+        bins = np.array([0.0, 0.5, 1.0])
+        self.assertIs(normalize_spectrum(bins), bins)
+
+    def test_scales_by_max(self) -> None:
+        result = normalize_spectrum(np.array([0.0, 50.0, 100.0]))
+        self.assertEqual(result.tolist(), [0.0, 0.5, 1.0])
+
+    def test_negative_clamped(self) -> None:
+        result = normalize_spectrum(np.array([-10.0, 5.0, 10.0]))
+        self.assertEqual(result.tolist(), [0.0, 0.5, 1.0])
+
+    def test_non_positive_max(self) -> None:
+        result = normalize_spectrum(np.array([-3.0, -1.0]))
+        self.assertEqual(result.tolist(), [0.0, 0.0])
+
+    def test_empty(self) -> None:
+        self.assertEqual(normalize_spectrum(np.array([])).size, 0)
+
+    def test_out_buffer(self) -> None:
+        """给出 out 时结果写入 out，uint32 输入也不另外分配"""
+        out = np.empty(3, dtype=np.float64)
+        result = normalize_spectrum(np.array([0, 50, 100], dtype=">u4"), out=out)
+        self.assertIs(result, out)
+        self.assertEqual(out.tolist(), [0.0, 0.5, 1.0])
+        bins = np.array([-3.0, -1.0])
+        self.assertIs(normalize_spectrum(bins, out=bins), bins)
+        self.assertEqual(bins.tolist(), [0.0, 0.0])
+
+
+class TestTextFrames(unittest.TestCase):
+    """测试文本帧解析与命令生成"""
+
+    def test_build_command(self) -> None:
+        self.assertEqual(build_command("VOC", "start"), "VOC_data_coll_ctrl_start")
+        self.assertEqual(build_command("FOUP", "custom"), "FOUP_custom")
+
+    def test_parse_version_response(self) -> None:
+        self.assertEqual(parse_version_response("foup, 1.2.3"), ("1.2.3", "FOUP"))
+        self.assertEqual(parse_version_response("1.0,2.0"), ("", ""))
+
+    def test_parse_sample_text(self) -> None:
+        self.assertEqual(parse_sample_text("1.0, x, 3"), [1.0, 3.0])
+        self.assertEqual(parse_sample_text("42"), [42.0])
+        self.assertEqual(parse_sample_text("abc"), [])
+
+    def test_parse_spectrum_text(self) -> None:
+        self.assertIsNone(parse_spectrum_text("1.0,2.0"))
+        self.assertIsNone(parse_spectrum_text("VOC,1.0"))
+        self.assertEqual(parse_spectrum_text("SPEC,0.5,1.0").tolist(), [0.5, 1.0])
+        self.assertEqual(parse_spectrum_text("SPEC,1,bad").size, 0)
+        # 空字段按旧实现跳过；normalize=False 返回原始值
+        self.assertEqual(parse_spectrum_text("SPEC, 1 ,,3", normalize=False).tolist(), [1.0, 3.0])
+
+    def test_parse_spectrum_text_rejects_partial_fast_parse(self) -> None:
+        # 模拟 NumPy 1.x：遇到无效字段时不抛异常，只返回已解析的前缀
+        def lenient(body, dtype, sep):
+            return np.array([1.0], dtype=dtype)
+
+        with mock.patch.object(foup_protocol.np, "fromstring", side_effect=lenient):
+            self.assertEqual(parse_spectrum_text("SPEC,1,bad").size, 0)
+            self.assertEqual(
+                parse_spectrum_text("SPEC,1,,3", normalize=False).tolist(), [1.0, 3.0]
+            )
+
+    def test_parse_spectrum_text_drops_timestamp(self) -> None:
+        bins = [0.5] * 256
+        payload = "SPEC,566167600," + ",".join(str(v) for v in bins)
+        self.assertEqual(parse_spectrum_text(payload).tolist(), bins)
+
+
+if __name__ == "__main__":
+    unittest.main()
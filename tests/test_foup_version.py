@@ -11,6 +11,7 @@ if str(UPDATER_DIR) not in sys.path:
     sys.path.insert(0, str(UPDATER_DIR))
 
 from voc_updater.foup_version import FoupVersionClient
+from voc_updater.framing import FrameReader
 
 
 def _recv_msg(conn: socket.socket) -> str:
@@ -76,3 +77,32 @@ def test_foup_version_client_rejects_missing_fields() -> None:
         assert "pl_version" in str(exc)
     else:
         raise AssertionError("expected ValueError")
+
+
+def test_foup_version_client_keeps_read_ahead_between_messages() -> None:
+    left, right = socket.socketpair()
+    with left, right:
+        # ACK and reply arrive in a single segment
+        right.sendall(struct.pack(">I", 3) + b"ack" + struct.pack(">I", 5) + b"reply")
+        left.settimeout(2.0)
+        reader = FrameReader(left)
+        assert FoupVersionClient._recv_msg(reader) == "ack"
+        assert FoupVersionClient._recv_msg(reader) == "reply"
+
+
+def test_frame_reader_reads_consecutive_frames_from_one_recv() -> None:
+    left, right = socket.socketpair()
+    with left, right:
+        for text in ("ack", "x" * 40_000, ""):
+            _send_msg(right, text)
+        reader = FrameReader(left, buffer_size=64)
+        assert bytes(reader.read_frame()) == b"ack"
+        assert bytes(reader.read_frame()) == b"x" * 40_000
+        assert bytes(reader.read_frame()) == b""
+        right.close()
+        try:
+            reader.read_frame()
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("expected ConnectionError")
@@ -217,6 +217,12 @@ class TestStatusViewOptimization(unittest.TestCase):
             f"typeof 检查出现 {typeof_count} 次，应减少到 2 次以下",
         )
 
+    def test_spectrum_feature_cards_bound_by_name(self):
+        """测试频谱页按名称从 spectrumFeatures 取特征曲线"""
+        self.assertIn('(typeof spectrumFeatures !== "undefined")', self.content)
+        self.assertIn("globalSpectrumFeatures.seriesNames", self.content)
+        self.assertIn("globalSpectrumFeatures.seriesModel(modelData)", self.content)
+
 
 class TestConfigFoupPageOptimization(unittest.TestCase):
     """测试 ConfigFoupPage.qml 优化"""
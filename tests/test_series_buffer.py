@@ -0,0 +1,91 @@
+"""测试 series_buffer 模块"""
+import random
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.series_buffer import RingSeriesBuffer, SlidingExtrema
+
+
+class TestSlidingExtrema(unittest.TestCase):
+    """测试 SlidingExtrema 类"""
+
+    def test_window_min_max(self) -> None:
+        """测试滑动窗口极值与暴力计算一致"""
+        values = [5.0, 1.0, 4.0, 2.0, 8.0, 3.0, 3.0, 0.5]
+        extrema = SlidingExtrema()
+        window = 3
+        for seq, value in enumerate(values):
+            extrema.push(seq, value)
+            extrema.expire(seq - window + 1)
+            expected = values[max(0, seq - window + 1) : seq + 1]
+            self.assertEqual(extrema.minimum, min(expected))
+            self.assertEqual(extrema.maximum, max(expected))
+
+
+class TestRingSeriesBuffer(unittest.TestCase):
+    """测试 RingSeriesBuffer 类"""
+
+    def test_append_and_evict(self) -> None:
+        """测试追加与淘汰"""
+        buf = RingSeriesBuffer(3)
+        evicted = [buf.append(float(i), float(10 - i)) for i in range(5)]
+        self.assertEqual(evicted, [0, 0, 0, 1, 1])
+        self.assertEqual(len(buf), 3)
+        self.assertEqual([buf.x_at(i) for i in range(3)], [2.0, 3.0, 4.0])
+        self.assertEqual(buf.bounds(), (2.0, 4.0, 6.0, 8.0))
+
+    def test_extend_matches_bruteforce(self) -> None:
+        """测试随机批量追加后的顺序和边界与暴力计算一致"""
+        rng = random.Random(1234)
+        buf = RingSeriesBuffer(50)
+        reference: list[tuple[float, float]] = []
+        for _ in range(200):
+            n = rng.randint(1, 70)
+            xs = [rng.uniform(-100, 100) for _ in range(n)]
+            ys = [rng.uniform(-100, 100) for _ in range(n)]
+            buf.extend(xs, ys)
+            reference.extend(zip(xs, ys))
+            reference = reference[-50:]
+            got_x, got_y = buf.to_arrays()
+            self.assertEqual(got_x.tolist(), [p[0] for p in reference])
+            self.assertEqual(got_y.tolist(), [p[1] for p in reference])
+            self.assertEqual(
+                buf.bounds(),
+                (
+                    min(p[0] for p in reference),
+                    max(p[0] for p in reference),
+                    min(p[1] for p in reference),
+                    max(p[1] for p in reference),
+                ),
+            )
+
+    def test_discard_oldest(self) -> None:
+        """测试丢弃最旧数据后边界更新"""
+        buf = RingSeriesBuffer(4)
+        buf.extend([1.0, 2.0, 3.0, 4.0], [9.0, 1.0, 5.0, 6.0])
+        self.assertEqual(buf.discard_oldest(2), 2)
+        self.assertEqual(buf.bounds(), (3.0, 4.0, 5.0, 6.0))
+        self.assertEqual(buf.discard_oldest(10), 2)
+        self.assertIsNone(buf.bounds())
+
+    def test_set_capacity(self) -> None:
+        """测试调整容量保留最新数据"""
+        buf = RingSeriesBuffer(5)
+        buf.extend(np.arange(5.0), np.arange(5.0))
+        self.assertEqual(buf.set_capacity(3), 2)
+        self.assertEqual(buf.to_arrays()[0].tolist(), [2.0, 3.0, 4.0])
+        buf.set_capacity(10)
+        buf.append(5.0, 5.0)
+        self.assertEqual(buf.to_arrays()[0].tolist(), [2.0, 3.0, 4.0, 5.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+"""测试 server_identity 模块"""
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui import server_identity
+from voc_app.gui.server_identity import ServerIdentityCache
+
+
+class TestServerIdentityCache(unittest.TestCase):
+    """测试服务端身份缓存"""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "server_identity.json"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_record_and_reload(self) -> None:
+        """记录后持久化，重新打开可读取；不同端口互不影响"""
+        cache = ServerIdentityCache(self.path)
+        cache.record("10.0.0.1", 65432, "NOISE", "1.2.3")
+        cache.record_channel_count("10.0.0.1", 65432, 3)
+
+        reopened = ServerIdentityCache(self.path)
+        identity = reopened.get("10.0.0.1", 65432)
+        self.assertEqual((identity.prefix, identity.version, identity.channel_count), ("NOISE", "1.2.3", 3))
+        self.assertIsNone(reopened.get("10.0.0.1", 1))
+
+    def test_prefix_change_resets_entry(self) -> None:
+        """前缀变化时旧的版本与通道数不再保留"""
+        cache = ServerIdentityCache(self.path)
+        cache.record("h", 1, "VOC", "1.0")
+        cache.record_channel_count("h", 1, 1)
+        cache.record("h", 1, "NOISE")
+        identity = cache.get("h", 1)
+        self.assertEqual((identity.prefix, identity.version, identity.channel_count), ("NOISE", "", 0))
+
+    def test_expired_entry_ignored(self) -> None:
+        """超过有效期未确认的缓存不再使用"""
+        cache = ServerIdentityCache(self.path, max_age_s=60.0)
+        cache.record("h", 1, "VOC")
+        with mock.patch.object(server_identity.time, "time", return_value=time.time() + 120.0):
+            self.assertIsNone(cache.get("h", 1))
+        cache.invalidate("h", 1)
+        self.assertIsNone(ServerIdentityCache(self.path).get("h", 1))
+
+    def test_corrupt_file_ignored(self) -> None:
+        """缓存文件损坏时视为空缓存"""
+        self.path.write_text("{broken", encoding="utf-8")
+        self.assertIsNone(ServerIdentityCache(self.path).get("h", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,7 +13,13 @@ SRC_DIR = ROOT_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from voc_app.gui.socket_client import Communicator, SocketCommunicator, Client
+from voc_app.gui.socket_client import (
+    Client,
+    Communicator,
+    FrameReader,
+    ParallelDownloader,
+    SocketCommunicator,
+)
 
 
 class MockCommunicator(Communicator):
@@ -266,5 +272,459 @@ class TestClientFileTransfer(unittest.TestCase):
         self.assertIn("File not found", str(ctx.exception))
 
 
+class StreamCommunicator(MockCommunicator):
+    """支持预读的模拟通信器：recv 返回当前已有的任意字节数，并统计调用次数"""
+
+    supports_readahead = True
+
+    def __init__(self):
+        super().__init__()
+        self.recv_calls = 0
+
+    def recv(self, size: int) -> bytes:
+        self.recv_calls += 1
+        result = bytes(self.recv_buffer[:size])
+        self.recv_buffer = self.recv_buffer[size:]
+        return result
+
+
+def _frame(payload: bytes) -> bytes:
+    return struct.pack(">I", len(payload)) + payload
+
+
+class TestFrameReader(unittest.TestCase):
+    """测试 FrameReader 缓冲读取"""
+
+    def test_readahead_batches_frames(self) -> None:
+        """预读模式下多帧共享一次 recv"""
+        comm = StreamCommunicator()
+        for index in range(100):
+            comm.feed(_frame(f"{index}.0,1.0,2.0".encode("utf-8")))
+        reader = FrameReader(comm)
+        frames = [bytes(reader.read_frame()) for _ in range(100)]
+        self.assertEqual(frames[0], b"0.0,1.0,2.0")
+        self.assertEqual(frames[99], b"99.0,1.0,2.0")
+        self.assertEqual(comm.recv_calls, 1)
+        self.assertIsNone(reader.read_frame())
+
+    def test_strict_mode_does_not_read_ahead(self) -> None:
+        """不支持预读的通信器只按需读取"""
+        comm = MockCommunicator()
+        comm.feed(_frame(b"abc") + b"tail")
+        reader = FrameReader(comm)
+        self.assertEqual(bytes(reader.read_frame()), b"abc")
+        self.assertEqual(reader.buffered, 0)
+        self.assertEqual(bytes(comm.recv_buffer), b"tail")
+
+    def test_zero_length_frame(self) -> None:
+        """长度为 0 的帧返回空视图而不是 None"""
+        comm = StreamCommunicator()
+        comm.feed(_frame(b""))
+        frame = FrameReader(comm).read_frame()
+        self.assertIsNotNone(frame)
+        self.assertEqual(len(frame), 0)
+
+    def test_frame_split_across_reads(self) -> None:
+        """跨缓冲区边界的帧会被搬移并补齐"""
+        comm = StreamCommunicator()
+        reader = FrameReader(comm, buffer_size=16)
+        comm.feed(_frame(b"0123456789") + _frame(b"abcdefgh"))
+        self.assertEqual(bytes(reader.read_frame()), b"0123456789")
+        self.assertEqual(bytes(reader.read_frame()), b"abcdefgh")
+
+    def test_large_frame_grows_buffer(self) -> None:
+        """超过缓冲区大小的帧会扩容"""
+        comm = StreamCommunicator()
+        payload = bytes(range(256)) * 10
+        comm.feed(_frame(payload))
+        reader = FrameReader(comm, buffer_size=64)
+        self.assertEqual(bytes(reader.read_frame()), payload)
+
+    def test_read_chunk_drains_buffer_first(self) -> None:
+        """read_chunk 先返回已预读的数据"""
+        comm = StreamCommunicator()
+        comm.feed(_frame(b"FILE") + b"0123456789")
+        reader = FrameReader(comm)
+        self.assertEqual(bytes(reader.read_frame()), b"FILE")
+        self.assertEqual(bytes(reader.read_chunk(4)), b"0123")
+        self.assertEqual(bytes(reader.read_chunk(100)), b"456789")
+        self.assertIsNone(reader.read_chunk(1))
+
+    def test_communicator_without_recv_into(self) -> None:
+        """只实现 recv 的通信器也可使用"""
+
+        class PlainCommunicator:
+            def __init__(self, data: bytes) -> None:
+                self.data = bytearray(data)
+
+            def recv(self, size: int) -> bytes:
+                chunk = bytes(self.data[:size])
+                del self.data[:size]
+                return chunk
+
+        reader = FrameReader(PlainCommunicator(_frame(b"hello")))
+        self.assertEqual(bytes(reader.read_frame()), b"hello")
+
+    def test_client_get_file_with_readahead(self) -> None:
+        """预读模式下消息头之后的文件内容不会丢失"""
+        import tempfile
+        import os
+
+        comm = StreamCommunicator()
+        content = os.urandom(200_000)
+        comm.feed(_frame(f"FILE /remote/big.bin {len(content)}".encode("utf-8")) + content)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            saved = Client(comm).get_file("/remote/big.bin", tmpdir)
+            with open(saved[0], "rb") as f:
+                self.assertEqual(f.read(), content)
+
+
+class TestCompressedTransfer(unittest.TestCase):
+    """测试压缩传输协商与增量解压"""
+
+    @staticmethod
+    def _compressed_frames(packed: bytes, size: int = 1000) -> bytes:
+        frames = b"".join(_frame(packed[i : i + size]) for i in range(0, len(packed), size))
+        return frames + _frame(b"")
+
+    def _get(self, algorithm: str, content: bytes, compress) -> bytes:
+        import os
+        import tempfile
+
+        comm = MockCommunicator()
+        comm.feed(_frame(f"COMPRESS {algorithm}".encode("utf-8")))
+        comm.feed(_frame(f"ZFILE /remote/log.csv {len(content)}".encode("utf-8")))
+        comm.feed(self._compressed_frames(compress(content)))
+        client = Client(comm, compression=("zlib", "lzma"))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            saved = client.get_file("/remote/log.csv", tmpdir)
+            self.assertEqual(client.compression, algorithm)
+            self.assertIn(b"compress zlib lzma", bytes(comm.sent_data))
+            with open(saved[0], "rb") as f:
+                data = f.read()
+            self.assertEqual(os.path.basename(saved[0]), "log.csv")
+        return data
+
+    def test_zlib(self) -> None:
+        """zlib 流分多帧到达时边解压边写盘"""
+        import zlib
+
+        content = b"".join(f"{i},1.0,2.0\n".encode() for i in range(20000))
+        self.assertEqual(self._get("zlib", content, zlib.compress), content)
+
+    def test_lzma_high_ratio(self) -> None:
+        """高压缩比数据（解压后远大于缓冲区）也能完整写出"""
+        import lzma
+
+        content = b"0" * (5 * 1024 * 1024)
+        self.assertEqual(self._get("lzma", content, lzma.compress), content)
+
+    def test_server_without_compression(self) -> None:
+        """旧服务端对 compress 回复未知命令时按原始字节传输"""
+        import tempfile
+
+        comm = MockCommunicator()
+        comm.feed(_frame(b"Unknown command: compress"))
+        comm.feed(_frame(b"FILE /remote/a.txt 5") + b"hello")
+        client = Client(comm, compression=("zlib",))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            saved = client.get_file("/remote/a.txt", tmpdir)
+            with open(saved[0], "rb") as f:
+                self.assertEqual(f.read(), b"hello")
+        self.assertIsNone(client.compression)
+
+    def test_length_mismatch(self) -> None:
+        """解压后长度与声明不符时报错"""
+        import tempfile
+        import zlib
+
+        comm = MockCommunicator()
+        comm.feed(_frame(b"COMPRESS zlib"))
+        comm.feed(_frame(b"ZFILE /remote/a.txt 10"))
+        comm.feed(self._compressed_frames(zlib.compress(b"short")))
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with self.assertRaises(RuntimeError):
+                Client(comm, compression=("zlib",)).get_file("/remote/a.txt", tmpdir)
+
+
+class _TreeServer:
+    """在本地端口上提供 list/get 的最小文件服务器，每个连接一个线程"""
+
+    def __init__(
+        self,
+        root: Path,
+        support_list: bool = True,
+        support_offset: bool = True,
+        compression: tuple[str, ...] = (),
+    ) -> None:
+        self.root = root
+        self.support_list = support_list
+        self.support_offset = support_offset
+        self.compression = compression
+        # 首次 get 该文件时只发送前 drop_after 字节后断开，模拟传输中断
+        self.drop_file: str | None = None
+        self.drop_after = 0
+        self.connections = 0
+        self.commands: list[str] = []
+        self.requests: list[str] = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(8)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def _accept_loop(self) -> None:
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    @staticmethod
+    def _send(conn: socket.socket, text: str) -> None:
+        conn.sendall(_frame(text.encode("utf-8")))
+
+    @staticmethod
+    def _send_zlib(conn: socket.socket, data: bytes) -> None:
+        import zlib
+
+        packed = zlib.compress(data)
+        for start in range(0, len(packed), 4096):
+            conn.sendall(_frame(packed[start : start + 4096]))
+        conn.sendall(_frame(b""))
+
+    def _serve(self, conn: socket.socket) -> None:
+        zlib_enabled = False
+        with conn:
+            reader = FrameReader(conn)
+            while True:
+                payload = reader.read_frame()
+                if payload is None:
+                    return
+                command, _, path = bytes(payload).decode("utf-8").partition(" ")
+                self.commands.append(command)
+                self.requests.append(path)
+                target = self.root / path
+                if command == "compress" and self.compression:
+                    zlib_enabled = "zlib" in path.split() and "zlib" in self.compression
+                    self._send(conn, f"COMPRESS {'zlib' if zlib_enabled else 'none'}")
+                    continue
+                if command == "get" and zlib_enabled and target.is_file():
+                    data = target.read_bytes()
+                    self._send(conn, f"ZFILE {path} {len(data)}")
+                    self._send_zlib(conn, data)
+                    continue
+                head, _, tail = path.rpartition(" ")
+                if command == "get" and self.support_offset and tail.isdigit() and not target.exists():
+                    data = (self.root / head).read_bytes()
+                    offset = min(int(tail), len(data))
+                    self._send(conn, f"RANGE {offset} {len(data) - offset} {head}")
+                    conn.sendall(data[offset:])
+                    continue
+                if command == "list" and self.support_list:
+                    self._send(conn, f"L_START D {path}")
+                    for item in sorted(target.rglob("*")):
+                        kind = "D" if item.is_dir() else "F"
+                        size = 0 if item.is_dir() else item.stat().st_size
+                        rel = item.relative_to(target).as_posix()
+                        mtime = int(item.stat().st_mtime)
+                        self._send(conn, f"ENTRY {kind} {size} {mtime} {path}/{rel}")
+                    self._send(conn, "L_END 0")
+                elif command == "get" and target.is_file():
+                    data = target.read_bytes()
+                    self._send(conn, f"FILE {path} {len(data)}")
+                    if path == self.drop_file:
+                        self.drop_file = None
+                        conn.sendall(data[: self.drop_after])
+                        conn.shutdown(socket.SHUT_RDWR)
+                        return
+                    conn.sendall(data)
+                elif command == "get" and not target.exists():
+                    self._send(conn, "ERROR Path not found or could not be resolved.")
+                elif command == "get":
+                    self._send(conn, f"D_START {path}")
+                    for item in sorted(target.rglob("*")):
+                        rel = f"{path}/{item.relative_to(target).as_posix()}"
+                        if item.is_dir():
+                            self._send(conn, f"D_START {rel}")
+                            self._send(conn, f"D_END {rel}")
+                        else:
+                            data = item.read_bytes()
+                            self._send(conn, f"FILE {rel} {len(data)}")
+                            conn.sendall(data)
+                    self._send(conn, f"D_END {path}")
+                else:
+                    self._send(conn, f"Unknown command: {command}")
+
+
+class TestParallelDownloader(unittest.TestCase):
+    """测试并行目录下载"""
+
+    def setUp(self) -> None:
+        import os
+        import tempfile
+
+        self._tmp = tempfile.TemporaryDirectory()
+        base = Path(self._tmp.name)
+        self.remote = base / "remote"
+        self.local = base / "local"
+        self.files = {
+            "Log/a.csv": os.urandom(300_000),
+            "Log/b.csv": b"time,a\n1,2\n",
+            "Log/day/c.csv": os.urandom(50_000),
+            "Log/day/d.csv": b"",
+        }
+        for rel, data in self.files.items():
+            path = self.remote / rel
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        (self.remote / "Log" / "empty").mkdir()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _download(
+        self, server: _TreeServer, connections: int = 3, sync: bool = False, close: bool = True
+    ) -> tuple[list, ParallelDownloader]:
+        downloader = ParallelDownloader(
+            lambda: SocketCommunicator("127.0.0.1", server.port, timeout=2.0),
+            connections=connections,
+        )
+        try:
+            method = downloader.sync if sync else downloader.download
+            return method("Log", str(self.local)), downloader
+        finally:
+            if close:
+                server.close()
+
+    def _assert_tree(self, saved: list) -> None:
+        self.assertEqual(len(saved), len(self.files))
+        for rel, data in self.files.items():
+            self.assertEqual((self.local / rel).read_bytes(), data)
+
+    def test_parallel_download(self) -> None:
+        """先 list 再多连接并发 get，本地目录结构与串行下载一致"""
+        server = _TreeServer(self.remote)
+        saved, downloader = self._download(server)
+        self._assert_tree(saved)
+        self.assertTrue((self.local / "Log" / "empty").is_dir())
+        self.assertEqual(server.connections, 3)
+        self.assertEqual(server.commands.count("list"), 1)
+        self.assertEqual(server.commands.count("get"), 4)
+        stats = downloader.last_stats
+        self.assertEqual(stats.files, 4)
+        self.assertEqual(stats.bytes, sum(len(d) for d in self.files.values()))
+        self.assertGreater(stats.throughput, 0)
+
+    def test_fallback_without_list(self) -> None:
+        """服务端不支持 list 时在同一连接上回退到串行 get_file"""
+        server = _TreeServer(self.remote, support_list=False)
+        saved, downloader = self._download(server)
+        self._assert_tree(saved)
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(downloader.last_stats.connections, 1)
+
+    def test_extra_connection_failure(self) -> None:
+        """额外连接建立失败时用已有连接完成下载"""
+        server = _TreeServer(self.remote)
+        opened = []
+
+        def factory() -> SocketCommunicator:
+            if opened:
+                raise ConnectionRefusedError("busy")
+            opened.append(1)
+            return SocketCommunicator("127.0.0.1", server.port, timeout=2.0)
+
+        try:
+            downloader = ParallelDownloader(factory, connections=4)
+            saved = downloader.download("Log", str(self.local))
+        finally:
+            server.close()
+        self._assert_tree(saved)
+        self.assertEqual(downloader.last_stats.connections, 1)
+
+    def test_sync_skips_unchanged_files(self) -> None:
+        """同步时只下载新增或变化的文件"""
+        import os
+
+        server = _TreeServer(self.remote)
+        self._download(server, close=False)
+        self.assertFalse(list(self.local.rglob("*.part")))
+
+        changed = self.remote / "Log" / "b.csv"
+        changed.write_bytes(b"time,a\n1,2\n2,3\n")
+        self.files["Log/b.csv"] = changed.read_bytes()
+        (self.remote / "Log" / "new.csv").write_bytes(b"x")
+        self.files["Log/new.csv"] = b"x"
+        server.commands.clear()
+        saved, downloader = self._download(server, sync=True)
+
+        self.assertEqual([Path(p).name for p in saved], ["b.csv", "new.csv"])
+        self.assertEqual(server.commands.count("get"), 2)
+        self.assertEqual(downloader.last_stats.skipped, 3)
+        for rel, data in self.files.items():
+            self.assertEqual((self.local / rel).read_bytes(), data)
+        remote_mtime = int(os.stat(changed).st_mtime)
+        self.assertEqual(int(os.stat(self.local / "Log" / "b.csv").st_mtime), remote_mtime)
+
+    def test_resume_after_dropped_connection(self) -> None:
+        """连接中断后重连，从 .part 的长度处续传"""
+        server = _TreeServer(self.remote)
+        server.drop_file = "Log/a.csv"
+        server.drop_after = 120_000
+        saved, downloader = self._download(server, connections=1, sync=True)
+        self._assert_tree(saved)
+        self.assertIn("Log/a.csv 120000", server.requests)
+        self.assertEqual(downloader.last_stats.resumed, 1)
+        self.assertFalse(list(self.local.rglob("*.part")))
+
+    def test_resume_partial_from_previous_run(self) -> None:
+        """上次留下的 .part 在下次同步时续传；服务端不支持偏移时完整重下"""
+        import os
+
+        from voc_app.gui.socket_client import partial_path
+
+        source = self.remote / "Log" / "a.csv"
+        local = self.local / "Log" / "a.csv"
+        local.parent.mkdir(parents=True)
+        part = Path(partial_path(str(local), int(os.stat(source).st_mtime)))
+        part.write_bytes(self.files["Log/a.csv"][:1000])
+        stale = local.with_name(".a.csv.123.part")
+        stale.write_bytes(b"old")
+
+        server = _TreeServer(self.remote, support_offset=False)
+        saved, _ = self._download(server, sync=True)
+        self._assert_tree(saved)
+        self.assertIn("Log/a.csv 1000", server.requests)
+        self.assertFalse(stale.exists())
+
+    def test_compressed_parallel_download(self) -> None:
+        """协商压缩后文件以 ZFILE 压缩帧传输，解压结果与原文件一致"""
+        server = _TreeServer(self.remote, compression=("zlib",))
+        downloader = ParallelDownloader(
+            lambda: SocketCommunicator("127.0.0.1", server.port, timeout=2.0),
+            connections=2,
+            compression=("lzma", "zlib"),
+        )
+        try:
+            saved = downloader.download("Log", str(self.local))
+        finally:
+            server.close()
+        self._assert_tree(saved)
+        self.assertEqual(server.commands.count("compress"), 2)
+
+    def test_list_error_raises(self) -> None:
+        """list 返回 ERROR 时抛出 RuntimeError"""
+        comm = MockCommunicator()
+        comm.feed(_frame(b"ERROR Path not found"))
+        with self.assertRaises(RuntimeError):
+            Client(comm).list_files("/missing")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,196 @@
+"""测试 spectrum_features 频谱特征提取"""
+import math
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.alarm_store import AlarmStore
+from voc_app.gui.spectrum_features import (
+    FeatureHistory,
+    SpectrumFeatureExtractor,
+    parse_thresholds,
+)
+from voc_app.gui.spectrum_model import SpectrumDataModel
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+from voc_app.gui.spectrum_stft import db_to_linear
+
+
+def get_app():
+    app = QGuiApplication.instance()
+    if app is None:
+        app = QGuiApplication([])
+    return app
+
+
+class MockSeriesModel:
+    """模拟的曲线模型"""
+
+    def __init__(self):
+        self.points = []
+
+    def append_point(self, x, y):
+        self.points.append((x, y))
+
+
+class TestFeatureHistory(unittest.TestCase):
+    """测试特征环形缓冲区"""
+
+    def test_extend_wraps_in_time_order(self) -> None:
+        """跨越缓冲区末尾写入后，latest() 仍按时间从旧到新返回"""
+        history = FeatureHistory(("a", "b"), frames=4)
+        history.extend(np.array([[1.0, 10.0], [2.0, 20.0], [3.0, 30.0]]))
+        history.extend(np.array([[4.0, 40.0], [5.0, 50.0]]))
+        self.assertEqual(len(history), 4)
+        self.assertEqual(history.latest("a").tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(history.latest("b", 2).tolist(), [40.0, 50.0])
+        history.extend(np.arange(12.0).reshape(6, 2))
+        self.assertEqual(history.latest("a").tolist(), [4.0, 6.0, 8.0, 10.0])
+
+
+class TestSpectrumFeatureExtractor(unittest.TestCase):
+    """测试特征计算、模型跟随、曲线与告警"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = get_app()
+
+    def setUp(self) -> None:
+        self.model = SpectrumDataModel(bin_count=64)
+        self.model.maxFps = 0
+        self.model.setSampleRate(12800.0)
+        self.extractor = SpectrumFeatureExtractor(self.model)
+
+    def test_extract_matches_per_frame_reference(self) -> None:
+        """批量结果与逐帧按定义计算的结果一致"""
+        frames = np.random.default_rng(7).random((5, 64))
+        bin_hz = 100.0
+        features = self.extractor.extract(frames, bin_hz)
+        freqs = np.arange(64) * bin_hz
+        for row, result in zip(frames, features):
+            power = row * row
+            expected = [
+                row.argmax(),
+                row.argmax() * bin_hz,
+                (row * freqs).sum() / row.sum(),
+                np.exp(np.log(power + 1e-12).mean()) / power.mean(),
+            ] + [power[i * 16 : (i + 1) * 16].mean() for i in range(4)]
+            np.testing.assert_allclose(result, expected, rtol=1e-9)
+
+    def test_tone_and_noise_signatures(self) -> None:
+        """单峰频谱平坦度接近 0，常数频谱平坦度为 1；全零帧特征为 0"""
+        tone = np.zeros(64)
+        tone[20] = 1.0
+        flat = np.full(64, 0.5)
+        features = self.extractor.extract(np.stack([tone, flat, np.zeros(64)]), 100.0)
+        self.assertEqual(features[0, 1], 2000.0)
+        self.assertAlmostEqual(features[0, 2], 2000.0)
+        self.assertLess(features[0, 3], 1e-6)
+        self.assertAlmostEqual(features[1, 3], 1.0)
+        self.assertTrue((features[2] == 0.0).all())
+
+    def test_follows_model_frames(self) -> None:
+        """每次通知处理期间新增的全部帧，频率间隔取奈奎斯特频率 / binCount"""
+        self.model.maxFps = 1000
+        for index in (5, 10, 15):
+            frame = np.zeros(64)
+            frame[index] = 1.0
+            self.model.updateSpectrum(frame)
+        self.model._publish()
+        self.assertEqual(self.extractor.history.latest("peak_bin").tolist(), [5.0, 10.0, 15.0])
+        self.assertEqual(self.extractor.features["peak_frequency"], 15 * 100.0)
+        self.model._publish()
+        self.assertEqual(len(self.extractor.history), 3)
+
+    def test_db_frames_converted_to_linear(self) -> None:
+        """时域输入得到的 dB 归一化帧按模型 db_range 还原为线性幅度后再计算"""
+        t = np.arange(512) / 12800.0
+        signal = np.sin(2 * np.pi * 2000.0 * t) + 0.01 * np.sin(2 * np.pi * 5000.0 * t)
+        self.model.updateFromTimeDomain(signal)
+        self.assertEqual(self.model.db_range, (-80.0, 0.0))
+        display = self.model.spectrum_array.copy()
+        linear = db_to_linear(display, -80.0, 0.0)
+        expected = self.extractor.extract(linear, 100.0)[0]
+        self.assertAlmostEqual(self.extractor.features["centroid"], expected[2], places=3)
+        # 显示刻度上次峰被抬高，质心明显偏向 5000Hz；线性幅度下接近主峰
+        self.assertLess(abs(expected[2] - 2000.0), 100.0)
+        self.assertGreater(self.extractor.extract(display, 100.0)[0, 2], expected[2] + 200.0)
+        self.model.updateSpectrum(display)
+        self.assertIsNone(self.model.db_range)
+
+    def test_custom_bands(self) -> None:
+        """自定义频带边界 (Hz) 换算为 bin 区间"""
+        extractor = SpectrumFeatureExtractor(band_edges=[0.0, 1000.0, 6400.0])
+        self.assertEqual(extractor.columns[-2:], ("band_0", "band_1"))
+        frame = np.zeros(64)
+        frame[:10] = 1.0
+        features = extractor.process(frame, bin_hz=100.0)
+        self.assertAlmostEqual(features[0, -2], 1.0)
+        self.assertEqual(features[0, -1], 0.0)
+
+    def test_threshold_alarm_on_transition(self) -> None:
+        """进入越限状态时告警一次，恢复后再次越限会重新告警"""
+        store = AlarmStore(duplicate_window_seconds=0.0)
+        extractor = SpectrumFeatureExtractor(alarm_store=store)
+        extractor.setThreshold("peak_bin", math.nan, 30.0)
+        exceeded = []
+        extractor.thresholdExceeded.connect(lambda name, value: exceeded.append((name, value)))
+        frames = np.zeros((4, 64))
+        for row, index in zip(frames, (10, 40, 50, 10)):
+            row[index] = 1.0
+        extractor.process(frames[:3], bin_hz=1.0)
+        extractor.process(frames[2:3], bin_hz=1.0)
+        self.assertEqual(exceeded, [("peak_bin", 50.0)])
+        extractor.process(frames[3:], bin_hz=1.0)
+        extractor.process(frames[1:2], bin_hz=1.0)
+        self.assertEqual(len(exceeded), 2)
+        self.assertEqual(store.alarmModel.rowCount(), 2)
+        message = store.alarmModel.index(0).data(store.alarmModel.MessageRole)
+        self.assertEqual(message, "[SPECTRUM] 峰值 bin: 高于上限 30")
+
+    def test_series_and_parse_thresholds(self) -> None:
+        """最新特征按图表间隔写入曲线；阈值配置支持留空一侧"""
+        series = MockSeriesModel()
+        self.extractor.add_series("centroid", series)
+        self.extractor.chartIntervalMs = 60_000
+        self.extractor.process(np.ones((2, 64)), bin_hz=10.0)
+        self.extractor.process(np.ones((2, 64)), bin_hz=10.0)
+        self.assertEqual(len(series.points), 1)
+        self.assertAlmostEqual(series.points[0][1], 315.0)
+        self.assertEqual(self.extractor.seriesNames, ["centroid"])
+        # 非 QObject 的曲线模型不暴露给 QML
+        self.assertIsNone(self.extractor.seriesModel("centroid"))
+        self.assertEqual(self.extractor.featureLabel("centroid"), "频谱质心")
+        self.assertEqual(self.extractor.featureUnit("centroid"), "Hz")
+        self.assertEqual(
+            parse_thresholds("centroid:100:8000, flatness::0.6,bad"),
+            {"centroid": (100.0, 8000.0), "flatness": (None, 0.6)},
+        )
+
+    def test_multichannel_view(self) -> None:
+        """也可以跟随多通道模型的单个通道视图"""
+        model = MultiChannelSpectrumModel(channel_count=2, bin_count=16)
+        model.maxFps = 0
+        extractor = SpectrumFeatureExtractor(model.channel(1), sample_rate=3200.0)
+        frames = np.zeros((2, 16))
+        frames[1, 3] = 1.0
+        model.updateSpectra(frames)
+        self.assertEqual(extractor.features["peak_frequency"], 300.0)
+        self.assertIsNone(model.channel(1).db_range)
+        model.setDbRange(-60.0, 0.0)
+        model.updateFromTimeDomain(np.random.default_rng(3).standard_normal((2, 64)))
+        self.assertEqual(model.channel(1).db_range, (-60.0, 0.0))
+        linear = db_to_linear(model.channel(1).spectrum_array, -60.0, 0.0)
+        np.testing.assert_allclose(extractor.history.latest()[-1], extractor.extract(linear, 100.0)[0], rtol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
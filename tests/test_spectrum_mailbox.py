@@ -0,0 +1,58 @@
+"""测试 spectrum_mailbox 模块"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.spectrum_mailbox import SpectrumMailbox
+
+
+class TestSpectrumMailbox(unittest.TestCase):
+    """测试频谱帧邮箱"""
+
+    def test_take_returns_latest_frame(self) -> None:
+        """未取走前的新帧覆盖旧帧，只有第一帧需要通知"""
+        mailbox = SpectrumMailbox(4)
+        self.assertIsNone(mailbox.take())
+        self.assertTrue(mailbox.post(np.array([1.0, 2.0])))
+        self.assertFalse(mailbox.post(np.array([3.0, 4.0, 5.0])))
+        self.assertEqual(mailbox.take().tolist(), [3.0, 4.0, 5.0])
+        self.assertIsNone(mailbox.take())
+        self.assertEqual(mailbox.dropped, 1)
+
+    def test_buffers_are_reused(self) -> None:
+        """写缓冲区在三块预分配缓冲区之间轮换，不随帧分配"""
+        mailbox = SpectrumMailbox(4)
+        seen = set()
+        for i in range(6):
+            buf = mailbox.back_buffer(4)
+            buf[:] = i
+            seen.add(id(buf.base))
+            mailbox.publish()
+            self.assertEqual(mailbox.take().tolist(), [float(i)] * 4)
+        self.assertLessEqual(len(seen), 3)
+
+    def test_taken_frame_not_overwritten_by_writer(self) -> None:
+        """GUI 持有的帧在下一次 take() 之前不会被工作线程改写"""
+        mailbox = SpectrumMailbox(2)
+        mailbox.post(np.array([0.1, 0.2]))
+        front = mailbox.take()
+        for value in (0.3, 0.4, 0.5):
+            mailbox.post(np.array([value, value]))
+        self.assertEqual(front.tolist(), [0.1, 0.2])
+
+    def test_grows_for_larger_frames(self) -> None:
+        """帧长度超过初始容量时自动扩容"""
+        mailbox = SpectrumMailbox(2)
+        mailbox.post(np.arange(8, dtype=np.float64))
+        self.assertEqual(mailbox.take().tolist(), list(range(8)))
+
+
+if __name__ == "__main__":
+    unittest.main()
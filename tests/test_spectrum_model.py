@@ -1,5 +1,6 @@
 """测试 spectrum_model 模块"""
 import sys
+import time
 import unittest
 from pathlib import Path
 from unittest.mock import MagicMock, patch
@@ -11,7 +12,23 @@ SRC_DIR = ROOT_DIR / "src"
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-from voc_app.gui.spectrum_model import SpectrumDataModel, SpectrumSimulator
+from PySide6.QtCore import QObject
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.spectrum_model import PublishThrottle, SpectrumDataModel, SpectrumSimulator
+
+# 延后通知依赖 QTimer，需要事件循环
+_app = None
+
+
+def get_app():
+    """获取或创建 QGuiApplication 实例"""
+    global _app
+    if _app is None:
+        _app = QGuiApplication.instance()
+        if _app is None:
+            _app = QGuiApplication([])
+    return _app
 
 
 class TestSpectrumDataModel(unittest.TestCase):
@@ -65,6 +82,13 @@ class TestSpectrumDataModel(unittest.TestCase):
         data = self.model.spectrumData
         self.assertEqual(len(data), 256)
 
+    def test_update_spectrum_copies_input(self) -> None:
+        """调用方复用传入的数组时，模型中的数据不受影响"""
+        buffer = np.full(256, 0.5)
+        self.model.updateSpectrum(buffer)
+        buffer.fill(0.9)
+        self.assertTrue(all(v == 0.5 for v in self.model.spectrumData))
+
     def test_update_spectrum_truncate(self) -> None:
         """测试过长数据被截断"""
         test_data = [0.5] * 512  # 超过 bin_count
@@ -128,6 +152,19 @@ class TestSpectrumDataModel(unittest.TestCase):
         # 应该有一些非零值
         self.assertTrue(any(v > 0 for v in data))
 
+    def test_time_domain_plan_cached(self) -> None:
+        """参数不变时复用计算计划，dB 范围或输入长度变化时重建"""
+        signal = np.sin(2 * np.pi * 0.1 * np.arange(1024))
+        self.model.updateFromTimeDomain(signal)
+        plan = self.model._spectrum_plan
+        self.model.updateFromTimeDomain(signal * 0.5)
+        self.assertIs(self.model._spectrum_plan, plan)
+        self.model.setDbRange(-60.0, 0.0)
+        self.model.updateFromTimeDomain(signal)
+        self.assertIsNot(self.model._spectrum_plan, plan)
+        self.model.updateFromTimeDomain(signal[:500])
+        self.assertEqual(self.model._spectrum_plan.key[0], 500)
+
     def test_update_from_time_domain_empty(self) -> None:
         """测试空时域数据"""
         self.model.updateFromTimeDomain([])  # 不应该崩溃
@@ -149,7 +186,7 @@ class TestSpectrumDataModel(unittest.TestCase):
     def test_buffer_operations(self) -> None:
         """测试缓冲区操作"""
         self.model.setBufferSize(512)
-        self.assertEqual(self.model._buffer_size, 512)
+        self.assertEqual(self.model._stft.frame_size, 512)
 
         self.model.setSampleRate(48000.0)
         self.assertEqual(self.model._sample_rate, 48000.0)
@@ -171,6 +208,7 @@ class TestSpectrumDataModel(unittest.TestCase):
     def test_push_samples(self) -> None:
         """测试批量推入采样"""
         self.model.setBufferSize(100)
+        self.model.setOverlap(0.0)
         self.model.setAutoUpdate(False)
 
         self.model.pushSamples([0.1] * 50)
@@ -180,6 +218,25 @@ class TestSpectrumDataModel(unittest.TestCase):
         # 应该消费掉一个缓冲区的数据
         self.assertEqual(self.model.getBufferLevel(), 10)
 
+    def test_push_samples_overlap(self) -> None:
+        """测试滑动窗口：50% 重叠时每半帧更新一次频谱"""
+        self.model.setBufferSize(128)
+        self.model.setOverlap(0.5)
+        self.model.maxFps = 0
+        updates = []
+        self.model.spectrumDataChanged.connect(lambda: updates.append(1))
+
+        t = np.arange(128 + 64 * 3)
+        self.model.pushSamples(np.sin(2 * np.pi * 0.25 * t))
+        self.assertEqual(len(updates), 4)
+        self.assertEqual(len(self.model.history), 4)
+        # 剩余的 64 个采样属于最后一帧的重叠部分，已经计算过
+        self.assertEqual(self.model.getBufferLevel(), 0)
+        self.assertEqual(self.model.getBufferProgress(), 0.0)
+        # 0.25 * 采样率 处的正弦波：峰值位于频谱中点附近
+        peak_bin = int(np.argmax(self.model.spectrum_array))
+        self.assertAlmostEqual(peak_bin / self.model.binCount, 0.5, delta=0.02)
+
     def test_push_raw_sample(self) -> None:
         """测试推入原始 ADC 采样"""
         self.model.setBufferSize(10)
@@ -193,6 +250,25 @@ class TestSpectrumDataModel(unittest.TestCase):
         self.model.flushBuffer()
         self.assertEqual(self.model.getBufferLevel(), 0)
 
+    def test_flush_skips_analyzed_overlap(self) -> None:
+        """重叠部分已计算过：恰好成帧后 flush 不再产生新帧，只处理之后的新采样"""
+        self.model.setBufferSize(128)
+        self.model.setOverlap(0.5)
+        self.model.maxFps = 0
+        self.model.pushSamples(np.ones(128))
+        self.assertEqual(len(self.model.history), 1)
+        self.model.flushBuffer()
+        self.assertEqual(len(self.model.history), 1)
+
+        # flush 清空了缓冲区，下一帧重新需要完整帧长
+        self.model.pushSamples(np.ones(32))
+        self.assertEqual(self.model.getBufferLevel(), 32)
+        self.assertAlmostEqual(self.model.getBufferProgress(), 0.25)
+        with patch.object(self.model, "updateFromTimeDomain") as update:
+            self.model.flushBuffer()
+        self.assertEqual(len(update.call_args[0][0]), 32)
+        self.assertEqual(self.model.getBufferLevel(), 0)
+
     def test_clear_buffer(self) -> None:
         """测试清空缓冲区"""
         self.model.pushSamples([0.5] * 50)
@@ -245,6 +321,88 @@ class TestSpectrumDataModel(unittest.TestCase):
         self.assertTrue(len(signal_received) > 0)
 
 
+class TestSpectrumPresentationRate(unittest.TestCase):
+    """测试通知帧率控制与列表快照缓存"""
+
+    def setUp(self) -> None:
+        get_app()
+        self.model = SpectrumDataModel(bin_count=4)
+        self.model.maxFps = 20.0
+        self.notified: list[list[float]] = []
+        self.model.spectrumDataChanged.connect(
+            lambda: self.notified.append(self.model.spectrumData)
+        )
+
+    def _process_for(self, seconds: float) -> None:
+        app = get_app()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            app.processEvents()
+            time.sleep(0.005)
+
+    def test_burst_coalesced(self) -> None:
+        """周期内的多帧只通知一次，延后的通知携带最新一帧"""
+        for value in (0.1, 0.2, 0.3, 0.4):
+            self.model.updateSpectrum([value] * 4)
+        self.assertEqual(len(self.notified), 1)
+        self.assertEqual(self.notified[0], [0.1] * 4)
+        # NumPy 状态立即更新
+        self.assertEqual(self.model._spectrum_data.tolist(), [0.4] * 4)
+        self._process_for(0.15)
+        self.assertEqual(len(self.notified), 2)
+        self.assertEqual(self.notified[1], [0.4] * 4)
+
+    def test_unlimited_fps(self) -> None:
+        """maxFps 为 0 时每帧都通知"""
+        self.model.maxFps = 0
+        for value in (0.1, 0.2, 0.3):
+            self.model.updateSpectrum([value] * 4)
+        self.assertEqual(len(self.notified), 3)
+
+    def test_snapshot_cached_until_next_frame(self) -> None:
+        """同一帧多次读取返回同一个列表，数据变化后重新生成"""
+        self.model.updateSpectrum([0.5] * 4)
+        first = self.model.spectrumData
+        self.assertIs(self.model.spectrumData, first)
+        self.assertIs(self.model.peakHoldData, self.model.peakHoldData)
+        self.model.updateSpectrum([0.7] * 4)
+        self.assertEqual(self.model.spectrumData, [0.7] * 4)
+        self.assertEqual(first, [0.5] * 4)
+
+    def test_max_fps_change_reschedules_pending(self) -> None:
+        """周期内改为不限制帧率时，延后的通知立即发出；相同值不重复发 maxFpsChanged"""
+        changed: list[int] = []
+        self.model.maxFpsChanged.connect(lambda: changed.append(1))
+        self.model.updateSpectrum([0.1] * 4)
+        self.model.updateSpectrum([0.2] * 4)
+        self.assertEqual(len(self.notified), 1)
+        self.model.maxFps = 20.0
+        self.assertEqual(changed, [])
+        self.model.maxFps = 0
+        self.assertEqual(changed, [1])
+        self.assertEqual(self.notified[-1], [0.2] * 4)
+
+    def test_throttle_shared_helper(self) -> None:
+        """PublishThrottle 单独使用：周期内的多次 schedule 合并为一次延后调用"""
+        calls: list[float] = []
+        owner = QObject()
+        throttle = PublishThrottle(owner, lambda: (throttle.mark_published(), calls.append(1)), 20.0)
+        for _ in range(3):
+            throttle.schedule()
+        self.assertEqual(len(calls), 1)
+        self._process_for(0.15)
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(throttle.set_max_fps(20.0))
+        self.assertTrue(throttle.set_max_fps(-1.0))
+        self.assertEqual(throttle.max_fps, 0.0)
+
+    def test_clear_notifies_immediately(self) -> None:
+        """clear() 不受帧率限制"""
+        self.model.updateSpectrum([0.5] * 4)
+        self.model.clear()
+        self.assertEqual(self.notified, [[0.5] * 4, [0.0] * 4])
+
+
 class TestSpectrumSimulator(unittest.TestCase):
     """测试 SpectrumSimulator 类"""
 
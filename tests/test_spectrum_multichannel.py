@@ -0,0 +1,107 @@
+"""测试 spectrum_multichannel 多通道频谱模型"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.spectrum_model import SpectrumDataModel
+from voc_app.gui.spectrum_multichannel import MultiChannelSpectrumModel
+
+
+def get_app():
+    app = QGuiApplication.instance()
+    if app is None:
+        app = QGuiApplication([])
+    return app
+
+
+class TestMultiChannelSpectrumModel(unittest.TestCase):
+    """测试共享缓冲区、批量计算与通道视图"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = get_app()
+
+    def setUp(self) -> None:
+        self.model = MultiChannelSpectrumModel(channel_count=3, bin_count=8)
+        self.model.maxFps = 0
+
+    def test_channel_views_share_buffer(self) -> None:
+        """通道视图是共享数组的行，接口与 SpectrumDataModel 一致"""
+        frames = np.linspace(0.0, 1.0, 24).reshape(3, 8)
+        self.model.updateSpectra(frames)
+        view = self.model.channel(1)
+        self.assertEqual(view.channelIndex, 1)
+        self.assertEqual(view.binCount, 8)
+        self.assertTrue(np.shares_memory(view.spectrum_array, self.model.spectra))
+        self.assertEqual(view.spectrumData, frames[1].tolist())
+        self.assertEqual(len(view.history), 1)
+        self.assertIsNone(self.model.channel(3))
+        self.assertEqual(len(self.model.channels), 3)
+
+    def test_peak_hold_vectorized(self) -> None:
+        """峰值保持按行衰减，与单通道模型结果一致"""
+        single = SpectrumDataModel(bin_count=8)
+        single.maxFps = 0
+        rng = np.random.default_rng(5)
+        for _ in range(5):
+            frames = rng.random((3, 8))
+            self.model.updateSpectra(frames)
+            single.updateSpectrum(frames[2])
+        np.testing.assert_allclose(self.model.peak_holds[2], single.peak_hold_array)
+
+    def test_update_channel_notifies_only_that_channel(self) -> None:
+        """单通道更新只通知对应视图"""
+        counts = [0, 0, 0]
+        for index in range(3):
+            self.model.channel(index).spectrumDataChanged.connect(
+                lambda i=index: counts.__setitem__(i, counts[i] + 1)
+            )
+        self.model.updateChannel(2, [0.5] * 4)
+        self.assertEqual(counts, [0, 0, 1])
+        self.assertEqual(self.model.spectra[2].tolist(), [0.5] * 4 + [0.0] * 4)
+        self.assertEqual(self.model.channel(2).frameSerial, 1)
+
+    def test_time_domain_matches_single_channel(self) -> None:
+        """批量 FFT 的每一行与单通道 updateFromTimeDomain 结果一致"""
+        model = MultiChannelSpectrumModel(channel_count=2, bin_count=64)
+        single = SpectrumDataModel(bin_count=64)
+        t = np.arange(300)
+        samples = np.stack([np.sin(2 * np.pi * 0.05 * t), np.sin(2 * np.pi * 0.3 * t)])
+        model.updateFromTimeDomain(samples)
+        for index in range(2):
+            single.updateFromTimeDomain(samples[index])
+            np.testing.assert_allclose(model.spectra[index], single.spectrum_array, atol=1e-12)
+
+    def test_resize_channels_and_bins(self) -> None:
+        """增加通道保留已有数据，修改 bin 数时清空"""
+        self.model.updateSpectra(np.full((3, 8), 0.5))
+        self.model.channelCount = 5
+        self.assertEqual(self.model.spectra.shape, (5, 8))
+        self.assertEqual(self.model.spectra[0, 0], 0.5)
+        self.assertEqual(self.model.spectra[4, 0], 0.0)
+        self.model.binCount = 16
+        self.assertEqual(self.model.channel(4).spectrum_array.shape, (16,))
+        self.assertEqual(self.model.channel(0).history.bins, 16)
+        self.assertFalse(self.model.spectra.any())
+
+    def test_clear_channel(self) -> None:
+        """通道视图的 clear() 只清空本通道"""
+        self.model.updateSpectra(np.full((3, 8), 0.5))
+        self.model.channel(1).clear()
+        self.assertFalse(self.model.spectra[1].any())
+        self.assertFalse(self.model.peak_holds[1].any())
+        self.assertEqual(len(self.model.channel(1).history), 0)
+        self.assertTrue(self.model.spectra[0].all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""测试 SpectrumRenderer 顶点生成"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.spectrum_model import SpectrumDataModel
+from voc_app.gui.spectrum_renderer import (
+    VERTEX_DTYPE,
+    SpectrumGeometryBuilder,
+    SpectrumRenderer,
+    SpectrumStyle,
+    geometry_vertices,
+)
+
+
+def get_app():
+    app = QGuiApplication.instance()
+    if app is None:
+        app = QGuiApplication([])
+    return app
+
+
+def _plain_style(**kwargs) -> SpectrumStyle:
+    """关闭所有效果的样式，便于逐项验证。"""
+    style = SpectrumStyle(glow_enabled=False, reflection_enabled=False, show_peak_hold=False)
+    for key, value in kwargs.items():
+        setattr(style, key, value)
+    return style
+
+
+def _build(builder: SpectrumGeometryBuilder, values, peaks=None, width=100.0, height=50.0):
+    out = np.zeros(builder.vertex_count(len(values)), dtype=VERTEX_DTYPE)
+    builder.fill(out, np.asarray(values, dtype=np.float64), peaks, width, height)
+    return out
+
+
+class TestSpectrumGeometryBuilder(unittest.TestCase):
+    """测试纯 NumPy 顶点生成"""
+
+    def test_vertex_count_per_layer(self) -> None:
+        """每启用一种效果，柱状图每个 bin 多一个四边形"""
+        builder = SpectrumGeometryBuilder(_plain_style())
+        self.assertEqual(builder.vertex_count(10), 60)
+        builder.style.glow_enabled = True
+        builder.style.reflection_enabled = True
+        builder.style.show_peak_hold = True
+        self.assertEqual(builder.vertex_count(10), 240)
+        self.assertEqual(builder.vertex_count(0), 0)
+        builder.style.chart_type = "line"
+        builder.style.line_fill = False
+        self.assertEqual(builder.vertex_count(10), 9 * 4 * 6)
+        self.assertEqual(builder.vertex_count(1), 0)
+
+    def test_bar_geometry(self) -> None:
+        """柱高与数值成正比，柱宽平分宽度"""
+        builder = SpectrumGeometryBuilder(_plain_style(use_gradient=False, bar_min_height=0.0))
+        out = _build(builder, [0.0, 0.5, 1.0, 0.25], width=100.0, height=50.0)
+        quads = out.reshape(4, 6)
+        np.testing.assert_allclose(quads["y"].min(axis=1), [50.0, 25.0, 0.0, 37.5])
+        np.testing.assert_allclose(quads["y"].max(axis=1), [50.0] * 4)
+        np.testing.assert_allclose(quads["x"].min(axis=1), [0.0, 25.0, 50.0, 75.0])
+        np.testing.assert_allclose(quads["x"].max(axis=1), [25.0, 50.0, 75.0, 100.0])
+
+    def test_colors_follow_scheme_and_are_premultiplied(self) -> None:
+        """配色按数值查表，单色模式 alpha 预乘到 RGB"""
+        builder = SpectrumGeometryBuilder(_plain_style(use_gradient=False))
+        out = _build(builder, [0.0, 1.0])
+        # spectrum 配色：0 为蓝，1 为红
+        self.assertEqual(tuple(out[0][["r", "g", "b", "a"]].item()), (0, 0, 255, 255))
+        self.assertEqual(tuple(out[6][["r", "g", "b", "a"]].item()), (255, 0, 0, 255))
+
+        builder.style.color_scheme = "mono"
+        builder.style.mono_color = (200, 100, 0, 255)
+        out = _build(builder, [0.0])
+        r, g, b, a = out[0][["r", "g", "b", "a"]].item()
+        self.assertEqual(a, 76)
+        self.assertEqual((r, g, b), (60, 30, 0))
+
+    def test_reflection_fades_below_baseline(self) -> None:
+        """倒影位于基线以下，高度不超过 0.3 倍图高，远端完全透明"""
+        builder = SpectrumGeometryBuilder(_plain_style(reflection_enabled=True, reflection_opacity=0.5))
+        out = _build(builder, [1.0, 0.2], height=100.0)
+        reflection = out[:12].reshape(2, 6)
+        self.assertTrue((reflection["y"] >= 100.0).all())
+        np.testing.assert_allclose(reflection["y"].max(axis=1), [130.0, 110.0])
+        far = reflection[reflection["y"] > 100.0]
+        self.assertTrue((far["a"] == 0).all())
+
+    def test_peak_hold_hidden_for_empty_bins(self) -> None:
+        """峰值为 0 的 bin 不显示峰值线"""
+        builder = SpectrumGeometryBuilder(_plain_style(show_peak_hold=True))
+        out = _build(builder, [0.5, 0.5], peaks=np.array([0.0, 0.8]), height=100.0)
+        peaks = out[12:].reshape(2, 6)
+        self.assertTrue((peaks[0]["a"] == 0).all())
+        self.assertTrue((peaks[1]["a"] > 0).all())
+        self.assertAlmostEqual(float(peaks[1]["y"].mean()), 20.0, places=4)
+
+    def test_line_segments_pass_through_points(self) -> None:
+        """折线四边形中心线经过各数据点"""
+        builder = SpectrumGeometryBuilder(_plain_style(chart_type="line", line_fill=False, line_width=2.0))
+        out = _build(builder, [0.0, 1.0, 0.5], width=100.0, height=10.0)
+        segments = out.reshape(2, 6)
+        # 顶点 0/2 为左端两侧，中点即数据点
+        left_x = (segments["x"][:, 0] + segments["x"][:, 2]) / 2
+        left_y = (segments["y"][:, 0] + segments["y"][:, 2]) / 2
+        np.testing.assert_allclose(left_x, [0.0, 50.0], atol=1e-4)
+        np.testing.assert_allclose(left_y, [10.0, 0.0], atol=1e-4)
+
+
+class TestSpectrumRenderer(unittest.TestCase):
+    """测试 QQuickItem 属性与几何节点"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = get_app()
+
+    def test_properties_update_style(self) -> None:
+        """QML 属性写入 SpectrumStyle"""
+        renderer = SpectrumRenderer()
+        renderer.chartType = "line"
+        renderer.glowEnabled = False
+        renderer.peakHoldColor = "#ff0000"
+        style = renderer._builder.style
+        self.assertEqual(style.chart_type, "line")
+        self.assertFalse(style.glow_enabled)
+        self.assertEqual(style.peak_hold_color, (255, 0, 0, 255))
+        self.assertEqual(renderer.peakHoldColor.name(), "#ff0000")
+
+    def test_update_paint_node_writes_model_buffer(self) -> None:
+        """几何节点的顶点直接由模型缓冲区生成，bin 数不变时复用"""
+        model = SpectrumDataModel(bin_count=16)
+        model.updateSpectrum(np.linspace(0.0, 1.0, 16))
+        renderer = SpectrumRenderer()
+        renderer.setWidth(160)
+        renderer.setHeight(80)
+        renderer.spectrumModel = model
+
+        node = renderer.updatePaintNode(None, None)
+        geometry = node.geometry()
+        expected = renderer._builder.vertex_count(16)
+        self.assertEqual(geometry.vertexCount(), expected)
+        reference = np.zeros(expected, dtype=VERTEX_DTYPE)
+        renderer._builder.fill(reference, model.spectrum_array, model.peak_hold_array, 160, 80)
+        np.testing.assert_array_equal(geometry_vertices(geometry), reference)
+
+        model.updateSpectrum(np.zeros(16))
+        self.assertIs(renderer.updatePaintNode(node, None), node)
+        self.assertEqual(node.geometry().vertexCount(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""测试 spectrum_stft 流式 STFT"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.spectrum_stft import BinResampler, SpectrumPlan, StreamingSTFT, normalize_db
+
+
+def _reference(signal: np.ndarray, start: int, frame: int, fft_size: int) -> np.ndarray:
+    segment = signal[start : start + frame] * np.hanning(frame)
+    return np.abs(np.fft.rfft(segment, n=fft_size))[: fft_size // 2]
+
+
+class TestStreamingSTFT(unittest.TestCase):
+    """测试滑动窗口切帧与批量 FFT"""
+
+    def test_overlapping_frames_match_direct_fft(self) -> None:
+        """分块推入与一次性计算的各帧一致，帧起点间隔 hop_size"""
+        signal = np.sin(2 * np.pi * 0.05 * np.arange(2000))
+        stft = StreamingSTFT(frame_size=256, hop_size=64)
+        rows = [stft.push(signal[i : i + 70]) for i in range(0, len(signal), 70)]
+        spectra = np.concatenate(rows)
+        self.assertEqual(len(spectra), (2000 - 256) // 64 + 1)
+        for index in (0, 5, len(spectra) - 1):
+            np.testing.assert_allclose(spectra[index], _reference(signal, index * 64, 256, 256), atol=1e-9)
+        self.assertLess(stft.pending, 256)
+
+    def test_push_sample_matches_batch(self) -> None:
+        """逐点推入只在凑齐一帧时返回结果"""
+        signal = np.random.default_rng(1).standard_normal(600)
+        single = StreamingSTFT(frame_size=128, hop_size=32)
+        results = [single.push_sample(v) for v in signal]
+        produced = [r for r in results if r is not None]
+        self.assertIsNone(results[126])
+        self.assertIsNotNone(results[127])
+        batch = StreamingSTFT(frame_size=128, hop_size=32).push(signal)
+        np.testing.assert_allclose(np.concatenate(produced), batch)
+
+    def test_configure_keeps_overlap_and_fft_size(self) -> None:
+        """修改帧长时保持重叠比例，FFT 长度取 2 的幂且不小于最小值"""
+        stft = StreamingSTFT(frame_size=512)
+        self.assertEqual(stft.hop_size, 256)
+        stft.configure(frame_size=300)
+        self.assertEqual(stft.hop_size, 150)
+        self.assertEqual(stft.fft_size, 512)
+        stft.configure(min_fft_size=1024)
+        self.assertEqual(stft.fft_size, 1024)
+        stft.configure(hop_size=10_000)
+        self.assertEqual(stft.hop_size, 300)
+
+    def test_buffer_only_and_drain(self) -> None:
+        """只缓存模式按帧移推进但不计算，drain 取出剩余采样后清空"""
+        stft = StreamingSTFT(frame_size=100, hop_size=100)
+        self.assertEqual(len(stft.push(np.arange(250.0), buffer_only=True)), 0)
+        self.assertEqual(stft.pending, 50)
+        tail = stft.drain()
+        np.testing.assert_array_equal(tail, np.arange(200.0, 250.0))
+        self.assertEqual(stft.pending, 0)
+
+    def test_pending_excludes_analyzed_overlap(self) -> None:
+        """有重叠时 pending 与 drain 只包含尚未进入任何一帧的新采样"""
+        stft = StreamingSTFT(frame_size=100, hop_size=50)
+        self.assertAlmostEqual(stft.progress, 0.0)
+        stft.push(np.arange(80.0))
+        self.assertEqual(stft.pending, 80)
+        self.assertAlmostEqual(stft.progress, 0.8)
+        self.assertEqual(len(stft.push(np.arange(80.0, 170.0))), 2)
+        self.assertEqual(stft.pending, 20)
+        self.assertAlmostEqual(stft.progress, 0.4)
+        np.testing.assert_array_equal(stft.drain(), np.arange(150.0, 170.0))
+        self.assertEqual(stft.pending, 0)
+        self.assertEqual(len(stft.drain()), 0)
+
+
+class TestSpectrumHelpers(unittest.TestCase):
+    """测试归一化与重采样"""
+
+    def test_resampler_matches_interp(self) -> None:
+        """缓存的插值索引与 np.interp 结果一致"""
+        rows = np.random.default_rng(2).random((3, 256))
+        resampled = BinResampler()(rows, 100)
+        positions = np.linspace(0, 255, 100)
+        for row, result in zip(rows, resampled):
+            np.testing.assert_allclose(result, np.interp(positions, np.arange(256), row))
+
+    def test_normalize_db_per_frame(self) -> None:
+        """每帧最大值对应 1.0，低于 db_min 截断为 0"""
+        magnitude = np.array([[1.0, 0.1, 1e-6], [10.0, 10.0, 1.0]])
+        normalized = normalize_db(magnitude, -40.0, 0.0)
+        np.testing.assert_allclose(normalized, [[1.0, 0.5, 0.0], [1.0, 1.0, 0.5]])
+
+
+
+class TestSpectrumPlan(unittest.TestCase):
+    """测试单帧计算计划"""
+
+    @staticmethod
+    def _naive(samples, fft_size, bins, db_min, db_max):
+        magnitude = np.abs(np.fft.rfft(samples * np.hanning(len(samples)), n=fft_size))[: fft_size // 2]
+        magnitude = np.maximum(magnitude, 1e-10)
+        db = 20 * np.log10(magnitude / magnitude.max())
+        normalized = np.clip((db - db_min) / (db_max - db_min), 0.0, 1.0)
+        positions = np.linspace(0, len(normalized) - 1, bins)
+        return np.interp(positions, np.arange(len(normalized)), normalized)
+
+    def test_matches_naive_pipeline(self) -> None:
+        """与逐步分配数组的实现结果一致（含无需重采样的情况）"""
+        samples = np.random.default_rng(3).standard_normal(300)
+        for fft_size, bins in ((512, 100), (512, 256), (1024, 300)):
+            plan = SpectrumPlan(len(samples), fft_size, bins, -80.0, 0.0)
+            np.testing.assert_allclose(
+                plan.execute(samples), self._naive(samples, fft_size, bins, -80.0, 0.0), atol=1e-12
+            )
+
+    def test_reuses_buffers(self) -> None:
+        """多次执行返回同一个内部缓冲区，零填充部分保持为 0"""
+        plan = SpectrumPlan(64, 256, 32, -60.0, 0.0)
+        first = plan.execute(np.ones(64))
+        second = plan.execute(np.random.default_rng(4).standard_normal(64))
+        self.assertIs(first, second)
+        self.assertTrue((plan._padded[64:] == 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""测试 store_history 采样存储回看"""
+import math
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.store_history import StoreHistoryManager
+from voc_app.gui.timeseries_store import TimeSeriesStore
+
+
+def get_app():
+    app = QGuiApplication.instance()
+    if app is None:
+        app = QGuiApplication([])
+    return app
+
+
+class TestStoreHistoryManager(unittest.TestCase):
+    """测试后台查询与结果模型"""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = get_app()
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = TimeSeriesStore(Path(self._tmp.name), chunk_rows=8)
+        for i in range(20):
+            # 通道 2 只在后半段有数据
+            self.store.append(float(i), [float(i), 100.0 + i, i if i >= 10 else math.nan])
+        self.manager = StoreHistoryManager({"本机采集": self.store})
+
+    def tearDown(self) -> None:
+        self.manager.shutdown()
+        self.store.close()
+        self._tmp.cleanup()
+
+    def _wait_idle(self, timeout: float = 5.0) -> None:
+        deadline = time.monotonic() + timeout
+        while self.manager.querying and time.monotonic() < deadline:
+            self.manager.wait_for_query(50)
+            self.app.processEvents()
+
+    def test_query_runs_in_background(self) -> None:
+        """query 立即返回；查询在工作线程执行，包含尚未落盘的样本"""
+        threads: list[bool] = []
+        original = self.store.query
+
+        def query(*args, **kwargs):
+            threads.append(threading.current_thread() is threading.main_thread())
+            return original(*args, **kwargs)
+
+        with mock.patch.object(self.store, "query", side_effect=query):
+            self.manager.query("本机采集", 5.0, math.nan)
+            self.assertTrue(self.manager.querying)
+            self._wait_idle()
+        self.assertEqual(threads, [False])
+        self.assertFalse(self.manager.querying)
+        self.assertEqual(self.manager.source, "本机采集")
+        self.assertEqual(self.manager.rowCount, 15)
+        model = self.manager.dataModel
+        self.assertEqual(model.columnNames, ["通道 1", "通道 2", "通道 3"])
+        self.assertEqual(model.get(0)["pointCount"], 15)
+        self.assertEqual(model.get(2)["pointCount"], 10)
+        self.assertEqual(model.get(1)["minY"], 105.0)
+
+    def test_newer_query_supersedes_older(self) -> None:
+        """连续查询时只应用最后一次的结果"""
+        resets: list[int] = []
+        self.manager.dataModel.modelReset.connect(lambda: resets.append(1))
+        self.manager.query("本机采集", math.nan, math.nan)
+        self.manager.query("本机采集", 15.0, 17.0)
+        self._wait_idle()
+        self.assertEqual(self.manager.rowCount, 3)
+        self.assertEqual(len(resets), 1)
+
+    def test_unknown_source_and_clear(self) -> None:
+        """未知数据源直接报告失败；clear 丢弃结果"""
+        failures: list[str] = []
+        self.manager.queryFailed.connect(lambda source, message: failures.append(source))
+        self.manager.query("foup9", math.nan, math.nan)
+        self.assertEqual(failures, ["foup9"])
+        self.assertFalse(self.manager.querying)
+        self.manager.queryRecent("本机采集", 0)
+        self._wait_idle()
+        self.assertEqual(self.manager.rowCount, 20)
+        self.manager.clear()
+        self.assertEqual(self.manager.dataModel.rowCount(), 0)
+        self.assertEqual(self.manager.source, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+"""测试 timeseries_store 模块"""
+import json
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from voc_app.gui.timeseries_store import INDEX_FILE, TimeSeriesStore
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    """测试 TimeSeriesStore 类"""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _fill(self, store: TimeSeriesStore, count: int, channels: int = 2) -> None:
+        for i in range(count):
+            store.append(float(i), [float(i * 10 + c) for c in range(channels)])
+
+    def test_append_and_query_range(self) -> None:
+        """写入后按时间范围查询，包含两端"""
+        store = TimeSeriesStore(self.root, chunk_rows=4)
+        self._fill(store, 10)
+        store.flush()
+        ts, values = store.query(3.0, 6.0)
+        self.assertEqual(ts.tolist(), [3.0, 4.0, 5.0, 6.0])
+        self.assertEqual(values[:, 1].tolist(), [31.0, 41.0, 51.0, 61.0])
+        self.assertEqual(len(store), 10)
+        self.assertEqual(len(store.chunks), 3)
+        self.assertEqual(store.time_range(), (0.0, 9.0))
+        store.close()
+
+    def test_query_selected_channels(self) -> None:
+        """只读取指定通道，不存在的通道填 NaN"""
+        store = TimeSeriesStore(self.root)
+        self._fill(store, 5)
+        store.flush()
+        _, values = store.query(0.0, 10.0, channels=[1, 5])
+        self.assertEqual(values.shape, (5, 2))
+        self.assertEqual(values[:, 0].tolist(), [1.0, 11.0, 21.0, 31.0, 41.0])
+        self.assertTrue(np.isnan(values[:, 1]).all())
+        store.close()
+
+    def test_query_empty(self) -> None:
+        """无数据或范围外查询返回空数组"""
+        store = TimeSeriesStore(self.root)
+        ts, values = store.query(0.0, 1.0)
+        self.assertEqual(len(ts), 0)
+        self._fill(store, 3)
+        store.flush()
+        ts, values = store.query(100.0, 200.0, channels=[0])
+        self.assertEqual(len(ts), 0)
+        self.assertEqual(values.shape, (0, 1))
+        store.close()
+
+    def test_reopen_continues_existing_chunk(self) -> None:
+        """重新打开后可查询旧数据并继续追加"""
+        store = TimeSeriesStore(self.root, chunk_rows=100)
+        self._fill(store, 5)
+        store.close()
+
+        reopened = TimeSeriesStore(self.root, chunk_rows=100)
+        for i in range(5, 8):
+            reopened.append(float(i), [float(i), float(i)])
+        reopened.flush()
+        ts, _ = reopened.query(0.0, 100.0)
+        self.assertEqual(ts.tolist(), [float(i) for i in range(8)])
+        self.assertEqual(len(reopened.chunks), 1)
+        reopened.close()
+
+    def test_reopen_truncates_partial_rows(self) -> None:
+        """数据文件比索引多出的半截写入在重新打开时被截掉"""
+        store = TimeSeriesStore(self.root)
+        self._fill(store, 4)
+        store.close()
+        with open(self.root / "000001.ts.f64", "ab") as f:
+            f.write(np.array([99.0]).tobytes())
+
+        reopened = TimeSeriesStore(self.root)
+        ts, _ = reopened.query(0.0, 1000.0)
+        self.assertEqual(ts.tolist(), [0.0, 1.0, 2.0, 3.0])
+        self.assertEqual((self.root / "000001.ts.f64").stat().st_size, 4 * 8)
+        reopened.close()
+
+    def test_channel_count_change_starts_new_chunk(self) -> None:
+        """通道数变化时新建数据块"""
+        store = TimeSeriesStore(self.root)
+        self._fill(store, 2, channels=2)
+        store.flush()
+        store.append(10.0, [1.0, 2.0, 3.0])
+        store.flush()
+        self.assertEqual([c.channels for c in store.chunks], [2, 3])
+        _, values = store.query(0.0, 10.0)
+        self.assertEqual(values.shape, (3, 3))
+        self.assertTrue(np.isnan(values[0, 2]))
+        store.close()
+
+    def test_retention_drops_oldest_chunks(self) -> None:
+        """max_chunks 限制磁盘上保留的块数"""
+        store = TimeSeriesStore(self.root, chunk_rows=2, max_chunks=2)
+        self._fill(store, 10)
+        store.flush()
+        self.assertEqual(len(store.chunks), 2)
+        self.assertEqual(store.time_range(), (6.0, 9.0))
+        self.assertFalse((self.root / "000001.ts.f64").exists())
+        index = json.loads((self.root / INDEX_FILE).read_text(encoding="utf-8"))
+        self.assertEqual(len(index), 2)
+        store.close()
+
+    def test_retention_applied_on_open(self) -> None:
+        """以更小的 max_chunks 重新打开时立即删除多余的旧块"""
+        store = TimeSeriesStore(self.root, chunk_rows=2)
+        self._fill(store, 10)
+        store.close()
+        reopened = TimeSeriesStore(self.root, chunk_rows=2, max_chunks=1)
+        self.assertEqual(reopened.time_range(), (8.0, 9.0))
+        self.assertEqual(len(json.loads((self.root / INDEX_FILE).read_text(encoding="utf-8"))), 1)
+        self.assertFalse((self.root / "000004.ts.f64").exists())
+        reopened.close()
+
+    def test_background_writer(self) -> None:
+        """后台写线程按间隔落盘"""
+        store = TimeSeriesStore(self.root, flush_interval_s=0.02)
+        store.start()
+        self._fill(store, 3)
+        deadline = time.monotonic() + 2.0
+        while len(store) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(store), 3)
+        store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""测试 waterfall 模块"""
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SRC_DIR = ROOT_DIR / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QGuiApplication
+
+from voc_app.gui.spectrum_model import SpectrumDataModel
+from voc_app.gui.waterfall import SpectrumHistory, WaterfallImageProvider, build_colormap_lut
+
+_app = None
+
+
+def get_app():
+    """获取或创建 QGuiApplication 实例"""
+    global _app
+    if _app is None:
+        _app = QGuiApplication.instance()
+        if _app is None:
+            _app = QGuiApplication([])
+    return _app
+
+
+class TestColormapLut(unittest.TestCase):
+    """测试颜色查找表"""
+
+    def test_endpoints_match_scheme(self) -> None:
+        lut = build_colormap_lut("spectrum")
+        self.assertEqual(lut.shape, (256,))
+        self.assertEqual(int(lut[0]), 0xFF0000FF)
+        self.assertEqual(int(lut[-1]), 0xFFFF0000)
+
+    def test_unknown_scheme_falls_back(self) -> None:
+        np.testing.assert_array_equal(build_colormap_lut("nope"), build_colormap_lut("spectrum"))
+
+
+class TestSpectrumHistory(unittest.TestCase):
+    """测试频谱历史环形缓冲区"""
+
+    def test_ring_keeps_latest_frames(self) -> None:
+        """写满后覆盖最旧的帧，latest() 按从新到旧返回"""
+        history = SpectrumHistory(frames=3, bins=2)
+        for i in range(5):
+            history.append(np.array([i, i], dtype=np.float64))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(history.latest()[:, 0].tolist(), [4.0, 3.0, 2.0])
+        self.assertEqual(history.latest(1).tolist(), [[4.0, 4.0]])
+
+    def test_constant_memory(self) -> None:
+        """逐帧写入复用同一块缓冲区，长度不符的帧截断或补零"""
+        history = SpectrumHistory(frames=4, bins=3)
+        buffer = history._data
+        for _ in range(10):
+            history.append(np.ones(5))
+        history.append(np.full(1, 0.5))
+        self.assertIs(history._data, buffer)
+        self.assertEqual(history.latest(1).tolist(), [[0.5, 0.0, 0.0]])
+
+    def test_render_newest_on_top(self) -> None:
+        """渲染结果第 0 行为最新一帧，未写入的行为 LUT 起点颜色"""
+        lut = build_colormap_lut("spectrum")
+        history = SpectrumHistory(frames=4, bins=2)
+        history.append(np.array([1.0, 1.0]))
+        history.append(np.array([0.0, 1.0]))
+        out = np.zeros((4, 2), dtype=np.uint32)
+        history.render_into(lut, out)
+        self.assertEqual(out[0].tolist(), [int(lut[0]), int(lut[-1])])
+        self.assertEqual(out[1].tolist(), [int(lut[-1])] * 2)
+        self.assertEqual(out[2:].ravel().tolist(), [int(lut[0])] * 4)
+
+
+class TestWaterfallImageProvider(unittest.TestCase):
+    """测试瀑布图提供者与模型历史"""
+
+    def setUp(self) -> None:
+        get_app()
+        self.model = SpectrumDataModel(bin_count=8, history_frames=5)
+        self.model.maxFps = 0
+
+    def test_model_records_history(self) -> None:
+        """updateSpectrum 写入历史，clear() 清空，binCount 变化时重建"""
+        self.model.updateSpectrum([1.0] * 8)
+        self.model.updateSpectrum([0.5] * 4)
+        self.assertEqual(len(self.model.history), 2)
+        self.assertEqual(self.model.history.latest(1)[0].tolist(), [0.5] * 4 + [0.0] * 4)
+        self.model.clear()
+        self.assertEqual(len(self.model.history), 0)
+        self.model.binCount = 16
+        self.assertEqual(self.model.history.bins, 16)
+        self.model.historyFrames = 10
+        self.assertEqual(self.model.history.frames, 10)
+
+    def test_request_image(self) -> None:
+        """提供者返回 bins x frames 像素的图像，首行为最新一帧"""
+        self.model.updateSpectrum([1.0] * 8)
+        provider = WaterfallImageProvider(self.model)
+        size = QSize()
+        serial = self.model.frameSerial
+        image = provider.requestImage(f"fire/{serial}", size, QSize())
+        self.assertEqual((image.width(), image.height()), (8, 5))
+        self.assertEqual((size.width(), size.height()), (8, 5))
+        lut = build_colormap_lut("fire")
+        self.assertEqual(image.pixel(0, 0), int(lut[-1]))
+        self.assertEqual(image.pixel(0, 4), int(lut[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
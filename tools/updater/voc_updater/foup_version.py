@@ -2,9 +2,10 @@ from __future__ import annotations
 
 import json
 import socket
-import struct
 from dataclasses import dataclass
 
+from .framing import FrameReader, send_frame
+
 
 @dataclass(frozen=True)
 class FoupVersion:
@@ -21,8 +22,11 @@ class FoupVersionClient:
     def get_version(self) -> FoupVersion:
         with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
             sock.settimeout(self.timeout)
+            # FrameReader reads ahead, so one connection uses a single reader:
+            # frames that arrive in the same segment stay buffered for the next read.
+            reader = FrameReader(sock)
             self._send_msg(sock, "get_version")
-            response = self._recv_msg(sock)
+            response = self._recv_msg(reader)
         try:
             payload = json.loads(response)
         except json.JSONDecodeError as exc:
@@ -37,22 +41,8 @@ class FoupVersionClient:
 
     @staticmethod
     def _send_msg(sock: socket.socket, text: str) -> None:
-        body = text.encode("utf-8")
-        sock.sendall(struct.pack(">I", len(body)) + body)
-
-    @staticmethod
-    def _recv_msg(sock: socket.socket) -> str:
-        header = FoupVersionClient._recv_exact(sock, 4)
-        size = struct.unpack(">I", header)[0]
-        body = FoupVersionClient._recv_exact(sock, size)
-        return body.decode("utf-8")
+        send_frame(sock, text)
 
     @staticmethod
-    def _recv_exact(sock: socket.socket, size: int) -> bytes:
-        chunks = bytearray()
-        while len(chunks) < size:
-            chunk = sock.recv(size - len(chunks))
-            if not chunk:
-                raise ConnectionError("socket closed while reading FOUP response")
-            chunks.extend(chunk)
-        return bytes(chunks)
+    def _recv_msg(reader: FrameReader) -> str:
+        return str(reader.read_frame(), "utf-8")
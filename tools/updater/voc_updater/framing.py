@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import socket
+import struct
+
+HEADER = struct.Struct(">I")
+
+
+class FrameReader:
+    """Buffered reader for the 4-byte big-endian length-prefixed protocol.
+
+    Reads into one reusable buffer with ``recv_into`` so a header and its body
+    (and any following frames) usually arrive in a single syscall.  Returned
+    views point into the buffer and are only valid until the next read.
+
+    Mirrors ``voc_app.gui.socket_client.FrameReader``; the updater keeps its own
+    copy so it does not depend on the GUI package.
+    """
+
+    def __init__(self, sock: socket.socket, buffer_size: int = 16 * 1024) -> None:
+        self.sock = sock
+        self._buffer = bytearray(max(HEADER.size, int(buffer_size)))
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+    def read_exact(self, size: int) -> memoryview:
+        if self._end - self._start < size:
+            self._fill(size)
+        start = self._start
+        self._start = start + size
+        return self._view[start : start + size]
+
+    def read_frame(self) -> memoryview:
+        (size,) = HEADER.unpack(self.read_exact(HEADER.size))
+        return self.read_exact(size)
+
+    def _fill(self, size: int) -> None:
+        pending = self._end - self._start
+        if self._start + size > len(self._buffer):
+            if size > len(self._buffer):
+                grown = bytearray(max(size, len(self._buffer) * 2))
+                grown[:pending] = self._view[self._start : self._end]
+                self._buffer = grown
+                self._view = memoryview(grown)
+            elif pending:
+                self._view[:pending] = self._view[self._start : self._end]
+            self._start = 0
+            self._end = pending
+        while self._end - self._start < size:
+            received = self.sock.recv_into(self._view[self._end :])
+            if not received:
+                raise ConnectionError("socket closed while reading FOUP response")
+            self._end += received
+
+
+def send_frame(sock: socket.socket, text: str) -> None:
+    body = text.encode("utf-8")
+    sock.sendall(HEADER.pack(len(body)) + body)